@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Benchmarks for the Python frontend of the xDSL implementation."""
+
+from benchmarks.workloads import WorkloadBuilder
+from xdsl.context import Context
+from xdsl.dialects.arith import Arith
+from xdsl.dialects.builtin import Builtin, ModuleOp
+from xdsl.dialects.test import Test
+from xdsl.frontend.pyast.passes.desymref import Desymrefier
+from xdsl.frontend.pyast.symref import Symref
+from xdsl.parser import Parser as XdslParser
+
+CTX = Context(allow_unregistered=True)
+CTX.load_dialect(Arith)
+CTX.load_dialect(Builtin)
+CTX.load_dialect(Symref)
+CTX.load_dialect(Test)
+
+
+def parse_module(context: Context, contents: str) -> ModuleOp:
+    """Parse a MLIR file as a module."""
+    parser = XdslParser(context, contents)
+    return parser.parse_module()
+
+
+class Desymrefication:
+    """Benchmark the promotion of symref variables to SSA values."""
+
+    WORKLOAD_SYMREF_1000 = parse_module(CTX, WorkloadBuilder.symref(1_000, 100))
+    WORKLOAD_SYMREF_10000 = parse_module(CTX, WorkloadBuilder.symref(10_000, 100))
+
+    workload_symref_1000: ModuleOp
+    workload_symref_10000: ModuleOp
+
+    def setup(self) -> None:
+        """Setup the benchmarks."""
+        self.setup_symref_1000()
+        self.setup_symref_10000()
+
+    def setup_symref_1000(self) -> None:
+        """Setup the desymrefication 1000 statements benchmark."""
+        self.workload_symref_1000 = Desymrefication.WORKLOAD_SYMREF_1000.clone()
+
+    def time_symref_1000(self) -> None:
+        """Time desymrefying 1000 statements over 100 variables."""
+        Desymrefier().desymrefy(self.workload_symref_1000)
+
+    def setup_symref_10000(self) -> None:
+        """Setup the desymrefication 10000 statements benchmark."""
+        self.workload_symref_10000 = Desymrefication.WORKLOAD_SYMREF_10000.clone()
+
+    def time_symref_10000(self) -> None:
+        """Time desymrefying 10000 statements over 100 variables."""
+        Desymrefier().desymrefy(self.workload_symref_10000)
+
+
+if __name__ == "__main__":
+    from bench_utils import Benchmark, profile
+
+    DESYMREFICATION = Desymrefication()
+    profile(
+        {
+            "Desymrefication.symref_1000": Benchmark(
+                DESYMREFICATION.time_symref_1000,
+                DESYMREFICATION.setup_symref_1000,
+            ),
+            "Desymrefication.symref_10000": Benchmark(
+                DESYMREFICATION.time_symref_10000,
+                DESYMREFICATION.setup_symref_10000,
+            ),
+        }
+    )
@@ -60,6 +60,51 @@ class WorkloadBuilder:
         ops.append(f'"test.op"(%{(size // 2) * 2}) : (i32) -> ()')
         return WorkloadBuilder.wrap_module(ops)
 
+    @classmethod
+    def symref(cls, size: int = 100, variables: int = 10) -> str:
+        """Generate a frontend program of a given size with symref variables.
+
+        An example of running `WorkloadBuilder().symref(size=2, variables=2)`
+        is as follows:
+
+        ```mlir
+        "builtin.module"() ({
+            "symref.declare"() <{"sym_name" = "v0"}> : () -> ()
+            %init0 = "arith.constant"() {"value" = 0 : i32} : () -> i32
+            "symref.update"(%init0) <{"symbol" = @v0}> : (i32) -> ()
+            "symref.declare"() <{"sym_name" = "v1"}> : () -> ()
+            %init1 = "arith.constant"() {"value" = 1 : i32} : () -> i32
+            "symref.update"(%init1) <{"symbol" = @v1}> : (i32) -> ()
+            %a0 = "symref.fetch"() <{"symbol" = @v1}> : () -> i32
+            %b0 = "symref.fetch"() <{"symbol" = @v0}> : () -> i32
+            %0 = "arith.addi"(%a0, %b0) : (i32, i32) -> i32
+            "symref.update"(%0) <{"symbol" = @v1}> : (i32) -> ()
+            ...
+        }) : () -> ()
+        ```
+        """
+        assert size >= 0
+        assert variables > 0
+        random.seed(RANDOM_SEED)
+        ops: list[str] = []
+        for v in range(variables):
+            ops.append(f'"symref.declare"() <{{"sym_name" = "v{v}"}}> : () -> ()')
+            ops.append(
+                f'%init{v} = "arith.constant"() {{"value" = {v} : i32}} : () -> i32'
+            )
+            ops.append(
+                f'"symref.update"(%init{v}) <{{"symbol" = @v{v}}}> : (i32) -> ()'
+            )
+        for i in range(size):
+            a, b, c = (random.randrange(variables) for _ in range(3))
+            ops.append(f'%a{i} = "symref.fetch"() <{{"symbol" = @v{a}}}> : () -> i32')
+            ops.append(f'%b{i} = "symref.fetch"() <{{"symbol" = @v{b}}}> : () -> i32')
+            ops.append(f'%{i} = "arith.addi"(%a{i}, %b{i}) : (i32, i32) -> i32')
+            ops.append(f'"symref.update"(%{i}) <{{"symbol" = @v{c}}}> : (i32) -> ()')
+        ops.append('%result = "symref.fetch"() <{"symbol" = @v0}> : () -> i32')
+        ops.append('"test.op"(%result) : (i32) -> ()')
+        return WorkloadBuilder.wrap_module(ops)
+
     @classmethod
     def large_dense_attr(cls, x: int = 1024, y: int = 1024) -> str:
         """Get the MLIR text representation of a large dense attr.
@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+from typing import ClassVar
+
+import pytest
+
+from xdsl.analysis.analysis_manager import (
+    ALL_ANALYSES,
+    AnalysisManager,
+    PreservedAnalyses,
+)
+from xdsl.analysis.liveness import Liveness
+from xdsl.analysis.symbol_table import SymbolTableInfo
+from xdsl.context import Context
+from xdsl.dialects import func, riscv, riscv_func, test
+from xdsl.dialects.builtin import ModuleOp, StringAttr, SymbolRefAttr
+from xdsl.ir import Block, Region
+from xdsl.irdl.dominance import DominanceInfo
+from xdsl.parser import Parser
+from xdsl.passes import ModulePass, PipelinePass
+from xdsl.pattern_rewriter import (
+    PatternRewriter,
+    PatternRewriteWalker,
+    RewritePattern,
+    op_type_rewrite_pattern,
+)
+from xdsl.transforms.riscv_register_allocation import RISCVRegisterAllocation
+
+
+def _module() -> tuple[ModuleOp, Region]:
+    region = Region(Block([test.TestOp()]))
+    return ModuleOp([test.TestOp(regions=[region])]), region
+
+
+def test_results_are_cached():
+    _, region = _module()
+    manager = AnalysisManager()
+
+    assert manager.get_cached(Liveness, region) is None
+    liveness = manager.get(Liveness, region)
+    assert manager.get(Liveness, region) is liveness
+    assert manager.get_cached(Liveness, region) is liveness
+    assert manager.get(DominanceInfo, region) is not liveness
+
+
+def test_invalidate_preserved():
+    _, region = _module()
+    manager = AnalysisManager()
+    liveness = manager.get(Liveness, region)
+    dominance = manager.get(DominanceInfo, region)
+
+    manager.invalidate(ALL_ANALYSES)
+    assert manager.get_cached(Liveness, region) is liveness
+
+    manager.invalidate(PreservedAnalyses(frozenset((DominanceInfo,))))
+    assert manager.get_cached(Liveness, region) is None
+    assert manager.get_cached(DominanceInfo, region) is dominance
+
+    manager.invalidate()
+    assert manager.get_cached(DominanceInfo, region) is None
+
+
+class EraseTestOps(RewritePattern):
+    @op_type_rewrite_pattern
+    def match_and_rewrite(self, op: test.TestOp, rewriter: PatternRewriter):
+        if not op.regions:
+            rewriter.erase_op(op)
+
+
+def test_listener_invalidates_enclosing_ir():
+    module, region = _module()
+    manager = AnalysisManager()
+    manager.get(Liveness, region)
+    manager.get(DominanceInfo, module.body)
+    other = Region(Block())
+    manager.get(Liveness, other)
+
+    PatternRewriteWalker(EraseTestOps(), listener=manager.listener()).rewrite_module(
+        module
+    )
+
+    assert manager.get_cached(Liveness, region) is None
+    assert manager.get_cached(DominanceInfo, module.body) is None
+    assert manager.get_cached(Liveness, other) is not None
+
+
+def test_symbol_table_info():
+    f = func.FuncOp("f", ((), ()))
+    g = func.FuncOp("g", ((), ()))
+    inner = ModuleOp([g], sym_name=StringAttr("inner"))
+    info = SymbolTableInfo(ModuleOp([f, inner]))
+
+    assert info.lookup("f") is f
+    assert info.lookup(SymbolRefAttr("inner", ["g"])) is g
+    assert info.lookup("g") is None
+
+
+computed: list[str] = []
+
+
+def _counting_analysis(region: Region) -> int:
+    computed.append("analysis")
+    return len(computed)
+
+
+@dataclass(frozen=True)
+class UseAnalysisPass(ModulePass):
+    name = "use-analysis"
+
+    preserved_analyses: ClassVar[PreservedAnalyses] = ALL_ANALYSES
+
+    def apply(self, ctx: Context, op: ModuleOp) -> None:
+        AnalysisManager.for_op(op).get(_counting_analysis, op.body)
+
+
+@dataclass(frozen=True)
+class ModifyPass(ModulePass):
+    name = "modify"
+
+    def apply(self, ctx: Context, op: ModuleOp) -> None:
+        op.body.block.add_op(test.TestOp())
+
+
+def test_pipeline_shares_analyses():
+    computed.clear()
+    module, _ = _module()
+    pipeline = PipelinePass(
+        (UseAnalysisPass(), UseAnalysisPass(), ModifyPass(), UseAnalysisPass())
+    )
+    pipeline.apply(Context(), module)
+    # Computed once, then again after the pass that does not preserve it
+    assert computed == ["analysis", "analysis"]
+
+    # Managers are not shared between pipelines
+    pipeline.apply(Context(), module)
+    assert len(computed) == 4
+
+
+@dataclass(frozen=True)
+class RewriteAfterAnalysisPass(ModulePass):
+    name = "rewrite-after-analysis"
+
+    def apply(self, ctx: Context, op: ModuleOp) -> None:
+        analyses = AnalysisManager.for_op(op)
+        analyses.get(_counting_analysis, op.body)
+        PatternRewriteWalker(EraseTestOps()).rewrite_module(op)
+        # The walker notified the manager of the pipeline of the rewrites
+        assert analyses.get_cached(_counting_analysis, op.body) is None
+
+
+def test_walker_invalidates_pipeline_analyses():
+    computed.clear()
+    module, _ = _module()
+    PipelinePass((RewriteAfterAnalysisPass(),)).apply(Context(), module)
+    assert computed == ["analysis"]
+
+
+@dataclass(frozen=True)
+class ComputeLivenessPass(ModulePass):
+    name = "compute-liveness"
+
+    preserved_analyses: ClassVar[PreservedAnalyses] = ALL_ANALYSES
+
+    def apply(self, ctx: Context, op: ModuleOp) -> None:
+        analyses = AnalysisManager.for_op(op)
+        for func_op in op.walk():
+            if isinstance(func_op, riscv_func.FuncOp):
+                analyses.get(Liveness, func_op.body)
+
+
+def _riscv_module() -> tuple[ModuleOp, riscv_func.FuncOp]:
+    ctx = Context()
+    ctx.load_dialect(riscv.RISCV)
+    ctx.load_dialect(riscv_func.RISCV_Func)
+    module = Parser(
+        ctx,
+        """
+        riscv_func.func @f() {
+          %0 = riscv.li 1 : !riscv.reg
+          %1 = riscv.addi %0, 1 : (!riscv.reg) -> !riscv.reg
+          riscv_func.return
+        }
+        """,
+    ).parse_module()
+    (func_op,) = module.ops
+    assert isinstance(func_op, riscv_func.FuncOp)
+    return module, func_op
+
+
+def test_register_allocation_reuses_liveness(monkeypatch: pytest.MonkeyPatch):
+    constructed: list[Region] = []
+    init = Liveness.__init__
+
+    def counting_init(self: Liveness, region: Region):
+        constructed.append(region)
+        init(self, region)
+
+    monkeypatch.setattr(Liveness, "__init__", counting_init)
+
+    module, func_op = _riscv_module()
+    RISCVRegisterAllocation().apply(Context(), module)
+    assert constructed == [func_op.body]
+
+    constructed.clear()
+    module, func_op = _riscv_module()
+    PipelinePass((ComputeLivenessPass(), RISCVRegisterAllocation())).apply(
+        Context(), module
+    )
+    # The allocator used the liveness computed by the previous pass
+    assert constructed == [func_op.body]
+    li = func_op.body.block.first_op
+    assert isinstance(li, riscv.LiOp)
+    assert li.rd.type.is_allocated
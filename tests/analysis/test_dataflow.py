@@ -0,0 +1,238 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from xdsl.analysis.dataflow import (
+    CFGEdge,
+    ConstantValue,
+    ConstantValueLattice,
+    DataFlowSolver,
+    DeadCodeAnalysis,
+    Executable,
+    Lattice,
+    LatticeValue,
+    SparseBackwardDataFlowAnalysis,
+)
+from xdsl.analysis.sparse_constant_propagation import SparseConstantPropagation
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects
+from xdsl.dialects.builtin import IntegerAttr, ModuleOp, i32
+from xdsl.interpreter import Interpreter
+from xdsl.interpreters import register_implementations
+from xdsl.ir import Operation, SSAValue
+from xdsl.parser import Parser
+from xdsl.traits import is_side_effect_free
+
+ctx = Context()
+for name, dialect in get_all_dialects().items():
+    ctx.register_dialect(name, dialect)
+
+
+def parse(program: str) -> ModuleOp:
+    return Parser(ctx, program).parse_module()
+
+
+def solve_constants(module: ModuleOp) -> DataFlowSolver:
+    interpreter = Interpreter(module)
+    register_implementations(interpreter, ctx)
+    solver = DataFlowSolver()
+    solver.load(DeadCodeAnalysis(solver))
+    solver.load(SparseConstantPropagation(solver, interpreter))
+    solver.initialize_and_run(module)
+    return solver
+
+
+def constant(solver: DataFlowSolver, value: SSAValue) -> ConstantValue:
+    lattice = solver.lookup_state(value, ConstantValueLattice)
+    return ConstantValue() if lattice is None else lattice.value
+
+
+def test_constant_value_join():
+    one = ConstantValue(IntegerAttr(1, i32), True)
+    two = ConstantValue(IntegerAttr(2, i32), True)
+
+    assert ConstantValue().join(one) == one
+    assert one.join(ConstantValue()) == one
+    assert one.join(one) == one
+    assert one.join(two) == ConstantValue.unknown()
+    assert ConstantValue.unknown().join(one).is_unknown
+
+
+LOOP = """
+func.func @f(%n : i32) -> i32 {
+  %c0 = arith.constant 0 : i32
+  %c1 = arith.constant 1 : i32
+  %true = arith.constant true
+  cf.cond_br %true, ^head(%c0, %c1 : i32, i32), ^dead
+^dead:
+  %x = arith.addi %n, %c1 : i32
+  cf.br ^head(%x, %x : i32, i32)
+^head(%i : i32, %k : i32):
+  %cond = arith.cmpi slt, %i, %n : i32
+  cf.cond_br %cond, ^body, ^exit
+^body:
+  %next = arith.addi %i, %c1 : i32
+  cf.br ^head(%next, %k : i32, i32)
+^exit:
+  func.return %k : i32
+}
+"""
+
+
+def test_dead_code_analysis():
+    module = parse(LOOP)
+    solver = solve_constants(module)
+    entry, dead, head, body, exit = module.body.block.first_op.regions[0].blocks
+
+    assert solver.is_live(entry)
+    assert not solver.is_live(dead)
+    assert solver.is_live(head)
+    assert solver.is_live(body)
+    assert solver.is_live(exit)
+    dead_edge = solver.lookup_state(CFGEdge(dead, head), Executable)
+    assert dead_edge is None or not dead_edge.live
+    live_edge = solver.lookup_state(CFGEdge(entry, head), Executable)
+    assert live_edge is not None
+    assert live_edge.live
+
+
+def test_sparse_constant_propagation():
+    module = parse(LOOP)
+    solver = solve_constants(module)
+    *_, head, body, _ = module.body.block.first_op.regions[0].blocks
+    i, k = head.args
+    (x,) = next(iter(module.body.block.first_op.regions[0].blocks[1].ops)).results
+
+    # Values in dead blocks are not computed
+    assert constant(solver, x).is_uninitialized
+    # The loop counter is not constant, but the value forwarded unchanged is
+    assert constant(solver, i).is_unknown
+    assert constant(solver, k) == ConstantValue(IntegerAttr(1, i32), True)
+    (next_op, _) = body.ops
+    assert constant(solver, next_op.results[0]).is_unknown
+
+
+def test_visits_are_linear():
+    """Each block argument changes at most twice, whatever the length of the chain."""
+    blocks = "\n".join(
+        f"""^bb{i}(%a{i} : i32):
+  %b{i} = arith.addi %a{i}, %c0 : i32
+  cf.br ^bb{i + 1}(%b{i} : i32)"""
+        for i in range(50)
+    )
+    module = parse(
+        f"""
+func.func @f() -> i32 {{
+  %c0 = arith.constant 0 : i32
+  cf.br ^bb0(%c0 : i32)
+{blocks}
+^bb50(%r : i32):
+  func.return %r : i32
+}}
+"""
+    )
+
+    class CountingPropagation(SparseConstantPropagation):
+        visits = 0
+
+        def visit_operation(
+            self,
+            op: Operation,
+            operands: Sequence[ConstantValueLattice],
+            results: Sequence[ConstantValueLattice],
+        ):
+            CountingPropagation.visits += 1
+            super().visit_operation(op, operands, results)
+
+    interpreter = Interpreter(module)
+    register_implementations(interpreter, ctx)
+    solver = DataFlowSolver()
+    solver.load(DeadCodeAnalysis(solver))
+    solver.load(CountingPropagation(solver, interpreter))
+    solver.initialize_and_run(module)
+
+    (r,) = module.body.block.first_op.regions[0].blocks.last.args
+    assert constant(solver, r) == ConstantValue(IntegerAttr(0, i32), True)
+    assert CountingPropagation.visits == 51
+
+
+@dataclass(frozen=True)
+class Used(LatticeValue):
+    """Whether an SSA value may be used by an operation with side effects."""
+
+    used: bool = False
+
+    @property
+    def is_uninitialized(self) -> bool:
+        return not self.used
+
+    def join(self, other: "Used") -> "Used":
+        return Used(self.used or other.used)
+
+    def meet(self, other: "Used") -> "Used":
+        return Used(self.used or other.used)
+
+
+class UsedLattice(Lattice[Used]):
+    def __init__(self, anchor: SSAValue):
+        super().__init__(anchor, Used())
+
+
+class UsedAnalysis(SparseBackwardDataFlowAnalysis[UsedLattice]):
+    def __init__(self, solver: DataFlowSolver):
+        super().__init__(solver, UsedLattice)
+
+    def set_to_exit_state(self, lattice: UsedLattice) -> None:
+        self.propagate_if_changed(lattice, lattice.meet(Used(True)))
+
+    def visit_operation(
+        self,
+        op: Operation,
+        operands: Sequence[UsedLattice],
+        results: Sequence[UsedLattice],
+    ) -> None:
+        if is_side_effect_free(op) and not any(r.value.used for r in results):
+            return
+        for operand in operands:
+            self.set_to_exit_state(operand)
+
+
+def test_sparse_backward_analysis():
+    module = parse(
+        """
+func.func @f(%arg0 : i32, %arg1 : i32, %cond : i1) -> i32 {
+  %unused = arith.addi %arg1, %arg1 : i32
+  cf.cond_br %cond, ^a(%arg0, %arg1 : i32, i32), ^b
+^a(%x : i32, %y : i32):
+  %z = arith.muli %x, %x : i32
+  func.return %z : i32
+^b:
+  func.return %arg1 : i32
+}
+"""
+    )
+    func = module.body.block.first_op
+    entry, a, _ = func.regions[0].blocks
+    arg0, arg1, cond = entry.args
+    x, y = a.args
+    (unused,) = entry.first_op.results
+
+    interpreter = Interpreter(module)
+    register_implementations(interpreter, ctx)
+    solver = DataFlowSolver()
+    solver.load(DeadCodeAnalysis(solver))
+    solver.load(SparseConstantPropagation(solver, interpreter))
+    solver.load(UsedAnalysis(solver))
+    solver.initialize_and_run(module)
+
+    def used(value: SSAValue) -> bool:
+        lattice = solver.lookup_state(value, UsedLattice)
+        return lattice is not None and lattice.value.used
+
+    assert used(x)
+    assert not used(y)
+    # Values are propagated backwards through the arguments of successors
+    assert used(arg0)
+    # Operands of branches that are not forwarded are at the exit state
+    assert used(cond)
+    assert used(arg1)
+    assert not used(unused)
@@ -0,0 +1,139 @@
+from xdsl.analysis.dataflow import (
+    ConstantValueLattice,
+    DataFlowSolver,
+    DeadCodeAnalysis,
+)
+from xdsl.analysis.integer_range import (
+    IntegerRangeAnalysis,
+    IntegerValueRange,
+    IntegerValueRangeLattice,
+    type_range,
+)
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects, scf
+from xdsl.dialects.builtin import (
+    IndexType,
+    IntegerAttr,
+    IntegerType,
+    ModuleOp,
+    Signedness,
+    f32,
+    i1,
+    i8,
+)
+from xdsl.ir import SSAValue
+from xdsl.parser import Parser
+from xdsl.utils.test_value import TestSSAValue
+
+ctx = Context()
+for name, dialect in get_all_dialects().items():
+    ctx.register_dialect(name, dialect)
+
+
+def solve(program: str) -> tuple[ModuleOp, DataFlowSolver]:
+    module = Parser(ctx, program).parse_module()
+    solver = DataFlowSolver()
+    solver.load(DeadCodeAnalysis(solver))
+    solver.load(IntegerRangeAnalysis(solver))
+    solver.initialize_and_run(module)
+    return module, solver
+
+
+def value_range(solver: DataFlowSolver, value: SSAValue) -> IntegerValueRange:
+    lattice = solver.lookup_state(value, IntegerValueRangeLattice)
+    assert lattice is not None
+    return lattice.value
+
+
+def test_type_range():
+    assert type_range(i1) == (-1, 0)
+    assert type_range(i8) == (-128, 127)
+    assert type_range(IntegerType(8, Signedness.UNSIGNED)) == (0, 255)
+    assert type_range(IndexType()) == (-(2**63), 2**63 - 1)
+    assert type_range(f32) is None
+
+
+def test_join():
+    assert IntegerValueRange().join(IntegerValueRange.of(1, 2)) == (
+        IntegerValueRange.of(1, 2)
+    )
+    assert IntegerValueRange.of(1, 2).join(IntegerValueRange.of(5, 6)) == (
+        IntegerValueRange.of(1, 6)
+    )
+    assert IntegerValueRange.of(1, 2).join(IntegerValueRange.unknown()) == (
+        IntegerValueRange.unknown()
+    )
+    assert IntegerValueRange.of(3, 3).constant == 3
+    assert IntegerValueRange.of(3, 4).constant is None
+
+
+def test_widening():
+    lattice = IntegerValueRangeLattice(TestSSAValue(i8))
+    for upper in range(IntegerValueRangeLattice.MAX_CHANGES):
+        assert lattice.join(IntegerValueRange.of(0, upper))
+        assert lattice.value == IntegerValueRange.of(0, upper)
+
+    assert lattice.join(IntegerValueRange.of(0, 10))
+    assert lattice.value == IntegerValueRange.of(-128, 127)
+    assert not lattice.join(IntegerValueRange.of(0, 11))
+
+
+def test_arith_ranges():
+    module, solver = solve(
+        """
+func.func @f(%arg0 : i8, %arg1 : i32) -> () {
+  %c3 = arith.constant 3 : i32
+  %c100 = arith.constant 100 : i32
+  %ext = arith.extui %arg0 : i8 to i32
+  %sum = arith.addi %ext, %c3 : i32
+  %prod = arith.muli %sum, %c3 : i32
+  %masked = arith.andi %arg1, %c100 : i32
+  %rem = arith.remsi %masked, %c3 : i32
+  %cmp = arith.cmpi slt, %rem, %c3 : i32
+  %unknown = arith.cmpi slt, %arg1, %c3 : i32
+  func.return
+}
+"""
+    )
+    ops = list(module.body.block.first_op.regions[0].block.ops)
+    ranges = [value_range(solver, op.results[0]) for op in ops[:-1]]
+    assert ranges == [
+        IntegerValueRange.of(3, 3),
+        IntegerValueRange.of(100, 100),
+        IntegerValueRange.of(0, 255),
+        IntegerValueRange.of(3, 258),
+        IntegerValueRange.of(9, 774),
+        IntegerValueRange.of(0, 100),
+        IntegerValueRange.of(0, 2),
+        IntegerValueRange.of(-1, -1),
+        IntegerValueRange.of(-1, 0),
+    ]
+
+    # Single values are also recorded as constants
+    cmp = ops[-3].results[0]
+    constant = solver.lookup_state(cmp, ConstantValueLattice)
+    assert constant is not None
+    assert constant.value.constant == IntegerAttr(-1, i1)
+
+
+def test_loop_ranges():
+    module, solver = solve(
+        """
+func.func @f(%n : index) -> () {
+  %c2 = arith.constant 2 : index
+  %c8 = arith.constant 8 : index
+  %c1 = arith.constant 1 : index
+  %ub = arith.minsi %n, %c8 : index
+  scf.for %i = %c2 to %ub step %c1 {
+    %j = arith.addi %i, %c1 : index
+    scf.yield
+  }
+  func.return
+}
+"""
+    )
+    loop = next(op for op in module.walk() if isinstance(op, scf.ForOp))
+    (i,) = loop.body.block.args
+    (j,) = loop.body.block.first_op.results
+    assert value_range(solver, i) == IntegerValueRange.of(2, 7)
+    assert value_range(solver, j) == IntegerValueRange.of(3, 8)
@@ -0,0 +1,65 @@
+from xdsl.analysis.liveness import Liveness
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects
+from xdsl.parser import Parser
+
+ctx = Context()
+ctx.register_dialect("test", get_all_dialects()["test"])
+
+# A loop from ^1 to itself, with %a used in the loop and %c in a nested region
+op = Parser(
+    ctx,
+    """
+"test.op"() ({
+^0():
+  %a, %b, %c = "test.op"() : () -> (i32, i32, i32)
+  "test.op"()[^1] : () -> ()
+^1():
+  %d = "test.op"(%a) : (i32) -> i32
+  "test.op"() ({
+    "test.op"(%c, %d) : (i32, i32) -> ()
+  }) : () -> ()
+  "test.op"()[^1, ^2] : () -> ()
+^2():
+  "test.op"(%b) : (i32) -> ()
+}) : () -> ()
+""",
+).parse_op()
+
+region = op.regions[0]
+b0, b1, b2 = region.blocks
+a, b, c = next(iter(b0.ops)).results
+def_d, loop_op, branch = b1.ops
+d = def_d.results[0]
+nested = loop_op.regions[0].block
+(nested_use,) = nested.ops
+(use_b,) = b2.ops
+
+
+def test_live_in_out():
+    liveness = Liveness(region)
+
+    assert liveness.live_in(b0) == set()
+    assert liveness.live_out(b0) == {a, b, c}
+    assert liveness.live_in(b1) == {a, b, c}
+    assert liveness.live_out(b1) == {a, b, c}
+    assert liveness.live_in(b2) == {b}
+    assert liveness.live_out(b2) == set()
+
+
+def test_uses_from_above():
+    liveness = Liveness(region)
+
+    assert set(liveness.uses_from_above(nested)) == {c, d}
+    assert set(liveness.uses_from_above(b1)) == {a, c}
+
+
+def test_is_dead_after():
+    liveness = Liveness(region)
+
+    assert liveness.is_dead_after(d, loop_op)
+    assert not liveness.is_dead_after(d, def_d)
+    # %c is used in the next iteration of the loop
+    assert not liveness.is_dead_after(c, nested_use)
+    assert not liveness.is_dead_after(b, branch)
+    assert liveness.is_dead_after(b, use_b)
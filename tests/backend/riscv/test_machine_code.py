@@ -0,0 +1,186 @@
+import struct
+from io import BytesIO
+
+import pytest
+
+from xdsl.backend.riscv.machine_code import (
+    R_RISCV_64,
+    R_RISCV_HI20,
+    R_RISCV_JAL,
+    R_RISCV_LO12_I,
+    MachineCodeException,
+    RiscvAssembler,
+    encode_instruction,
+    write_riscv_object,
+)
+from xdsl.context import Context
+from xdsl.dialects import riscv, riscv_func
+from xdsl.dialects.builtin import Builtin
+from xdsl.parser import Parser
+
+A0, A1, S0, S1, SP = (
+    riscv.Registers.A0,
+    riscv.Registers.A1,
+    riscv.Registers.S0,
+    riscv.Registers.S1,
+    riscv.Registers.SP,
+)
+T0, ZERO, FA0, FA1, FS0, FT3 = (
+    riscv.Registers.T0,
+    riscv.Registers.ZERO,
+    riscv.Registers.FA0,
+    riscv.Registers.FA1,
+    riscv.Registers.FS0,
+    riscv.Registers.FT3,
+)
+
+
+# Reference encodings are the output of the LLVM assembler
+@pytest.mark.parametrize(
+    "mnemonic, args, expected",
+    [
+        ("add", (T0, A0, A1), "b302b500"),
+        ("sub", (S0, S0, S1), "33049440"),
+        ("mul", (riscv.Registers.A2, A0, A1), "3306b502"),
+        ("addi", (riscv.Registers.A3, A0, -2000), "93060583"),
+        ("srai", (S0, S0, 20), "13544441"),
+        ("lw", (S1, A0, -8), "832485ff"),
+        ("lbu", (S1, A0, 1), "83441500"),
+        ("sb", (A0, A1, -3), "a30eb5fe"),
+        ("fsw", (A0, FT3, 2), "27213500"),
+        ("fadd.d", (FA1, FA0, FS0), "d3758502"),
+        ("fmadd.d", (FA1, FA0, FS0, FT3), "c375851a"),
+        ("fmv.d", (FA1, FA0), "d305a522"),
+        ("fcvt.d.wu", (FA1, A0), "d30515d2"),
+        ("fcvt.w.s", (A1, FA0), "d37505c0"),
+        ("feq.s", (A1, FA0, FS0), "d32585a0"),
+        ("lui", (A0, 74565), "37553412"),
+        ("csrrs", (A0, 3860, ZERO), "732540f1"),
+        ("csrrwi", (A0, 3860, 5), "73d542f1"),
+        ("bne", (A0, A1, 8), "6314b500"),
+        ("jal", (16,), "ef000001"),
+        ("li", (A0, 100000), "378501001b05056a"),
+        ("li", (riscv.Registers.A4, 2048), "371700001b070780"),
+        ("ret", (), "67800000"),
+        ("wfi", (), "73005010"),
+    ],
+)
+def test_encoding(
+    mnemonic: str, args: tuple[riscv.AssemblyInstructionArg, ...], expected: str
+):
+    assert encode_instruction(mnemonic, args).hex() == expected
+
+
+@pytest.mark.parametrize(
+    "mnemonic, args, expected",
+    [
+        ("add", (A0, A0, A1), "2e95"),
+        ("and", (S0, S0, S1), "658c"),
+        ("addi", (A0, A0, 5), "1505"),
+        ("addi", (SP, SP, -16), "4111"),
+        ("andi", (S0, S0, 7), "1d88"),
+        ("slli", (A0, A0, 3), "0e05"),
+        ("li", (A0, 3), "0d45"),
+        ("li", (riscv.Registers.A4, -4096), "7d77"),
+        ("mv", (riscv.Registers.A5, A0), "aa87"),
+        ("lw", (A0, SP, 12), "3245"),
+        ("lw", (S1, S0, 8), "0444"),
+        ("sw", (SP, A0, 16), "2ac8"),
+        ("fld", (FS0, S0, 16), "0028"),
+        ("fsd", (SP, FA0, 8), "2aa4"),
+        ("jalr", (A0, 0), "0295"),
+        ("ebreak", (), "0290"),
+        ("ret", (), "8280"),
+        # No compressed form
+        ("sub", (riscv.Registers.T2, A0, S1), "b3039540"),
+        ("lw", (S1, A0, -8), "832485ff"),
+    ],
+)
+def test_compressed_encoding(
+    mnemonic: str, args: tuple[riscv.AssemblyInstructionArg, ...], expected: str
+):
+    assert encode_instruction(mnemonic, args, compress=True).hex() == expected
+
+
+def test_machine_code():
+    a0 = riscv.GetRegisterOp(A0).res
+    op = riscv.AddiOp(a0, 5, rd=A0)
+    assert op.machine_code() == bytes.fromhex("13055500")
+    assert op.machine_code(compress=True) == bytes.fromhex("1505")
+
+
+def test_encoding_errors():
+    with pytest.raises(MachineCodeException, match="unallocated register"):
+        encode_instruction("add", (A0, riscv.IntRegisterType.unallocated(), A1))
+    with pytest.raises(MachineCodeException, match="does not fit in 12 bits"):
+        encode_instruction("addi", (A0, A0, 4096))
+    with pytest.raises(MachineCodeException, match="Cannot encode instruction"):
+        encode_instruction("dmsrc", (A0, A1))
+
+
+def _parse(source: str):
+    ctx = Context()
+    ctx.load_dialect(Builtin)
+    ctx.load_dialect(riscv.RISCV)
+    ctx.load_dialect(riscv_func.RISCV_Func)
+    return Parser(ctx, source).parse_module()
+
+
+PROGRAM = """
+riscv_func.func public @main() attributes {p2align = 2 : i8} {
+  %a = riscv.li 0 : !riscv.reg<a0>
+  %b = riscv.li 10 : !riscv.reg<a1>
+  riscv.label "loop"
+  %c = riscv.addi %a, 1 : (!riscv.reg<a0>) -> !riscv.reg<a0>
+  riscv.blt %c, %b, "loop" : (!riscv.reg<a0>, !riscv.reg<a1>) -> ()
+  %d = riscv.li "table" : !riscv.reg<a2>
+  riscv_func.call @helper() : () -> ()
+  riscv_func.return
+}
+riscv.assembly_section ".data" {
+  riscv.label "table"
+  riscv.directive ".dword" "main"
+}
+"""
+
+
+def test_assembler():
+    assembler = RiscvAssembler()
+    assembler.assemble_module(_parse(PROGRAM))
+
+    text = assembler.sections[".text"]
+    # The backwards branch is resolved, as it is in the same section
+    assert text.data.hex() == "0145a9450505e34fb5fe3706000013060600ef0000008280"
+    assert [(r.offset, r.symbol, r.type) for r in text.relocations] == [
+        (10, "table", R_RISCV_HI20),
+        (14, "table", R_RISCV_LO12_I),
+        (18, "helper", R_RISCV_JAL),
+    ]
+    data = assembler.sections[".data"]
+    assert data.data == bytes(8)
+    assert [(r.offset, r.symbol, r.type) for r in data.relocations] == [
+        (0, "main", R_RISCV_64)
+    ]
+    assert {s.name: (s.section, s.value) for s in assembler.symbols()} == {
+        "main": (".text", 0),
+        "loop": (".text", 4),
+        "table": (".data", 0),
+        "helper": (None, 0),
+    }
+
+
+def test_write_object():
+    io = BytesIO()
+    write_riscv_object(_parse(PROGRAM), io)
+    contents = io.getvalue()
+
+    ident, e_type, machine, _, _, _, shoff, flags, _, _, _, _, shnum, shstrndx = (
+        struct.unpack_from("<16sHHIQQQIHHHHHH", contents)
+    )
+    assert ident[:4] == b"\x7fELF"
+    assert (e_type, machine, flags) == (1, 243, 0x5)
+    # null, .text, .data, .rela.text, .rela.data, .symtab, .strtab, .shstrtab
+    assert shnum == 8
+    assert shstrndx == 7
+    assert shoff % 8 == 0
+    assert len(contents) == shoff + shnum * 64
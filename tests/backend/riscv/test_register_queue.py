@@ -92,3 +92,16 @@ def test_limit():
     assert register_queue.pop(riscv.FloatRegisterType).register_name.data.startswith(
         "fj"
     )
+
+
+def test_can_pop():
+    register_queue = RiscvRegisterQueue.default()
+    register_queue.limit_registers(1)
+
+    assert register_queue.can_pop(riscv.IntRegisterType)
+    reg = register_queue.pop(riscv.IntRegisterType)
+    assert not register_queue.can_pop(riscv.IntRegisterType)
+    assert register_queue.can_pop(riscv.FloatRegisterType)
+
+    register_queue.push(reg)
+    assert register_queue.can_pop(riscv.IntRegisterType)
@@ -0,0 +1,60 @@
+from xdsl.backend.riscv.snitch_performance import (
+    PerformanceEstimate,
+    SnitchPerformanceModel,
+)
+from xdsl.builder import Builder
+from xdsl.dialects import riscv, riscv_func, riscv_snitch
+from xdsl.ir import BlockArgument
+
+
+def _accumulate_func(accumulators: int, iterations: int) -> riscv_func.FuncOp:
+    """A function accumulating into independent registers in an frep loop."""
+
+    @Builder.implicit_region
+    def body():
+        inits = [
+            riscv.FCvtDWOp(
+                riscv.GetRegisterOp(riscv.Registers.ZERO),
+                rd=riscv.Registers.FT[3 + i],
+            ).rd
+            for i in range(accumulators)
+        ]
+        reps = riscv.LiOp(iterations - 1, rd=riscv.Registers.T0)
+
+        @Builder.implicit_region(tuple(init.type for init in inits))
+        def loop_body(args: tuple[BlockArgument, ...]):
+            riscv_snitch.FrepYieldOp(
+                *(riscv.FAddDOp(arg, arg, rd=arg.type).rd for arg in args)
+            )
+
+        riscv_snitch.FrepOuterOp(reps, loop_body, inits)
+        riscv_func.ReturnOp()
+
+    return riscv_func.FuncOp("f", body, ((), ()))
+
+
+def test_fpu_utilization():
+    assert PerformanceEstimate().fpu_utilization == 0
+    assert PerformanceEstimate(cycles=4, fpu_ops=3).fpu_utilization == 0.75
+
+
+def test_latency_bound_loop():
+    func = _accumulate_func(accumulators=1, iterations=10)
+
+    estimate = SnitchPerformanceModel().estimate_function(func)
+    assert estimate.fpu_ops == 10
+    assert estimate.frep_iterations == 10
+    # Each iteration waits for the result of the previous one
+    assert estimate.stall_cycles == 10 * 2
+
+    slower = SnitchPerformanceModel(fpu_latency=5).estimate_function(func)
+    assert slower.cycles - estimate.cycles == 10 * 2 + 2
+
+
+def test_interleaved_loop():
+    func = _accumulate_func(accumulators=4, iterations=10)
+
+    estimate = SnitchPerformanceModel().estimate_function(func)
+    assert estimate.fpu_ops == 40
+    assert estimate.stall_cycles == 0
+    assert estimate.fpu_utilization > 0.75
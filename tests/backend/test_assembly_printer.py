@@ -0,0 +1,29 @@
+from io import StringIO
+
+from xdsl.backend.assembly_printer import AssemblyPrinter
+from xdsl.dialects import riscv
+from xdsl.dialects.builtin import ModuleOp
+
+
+def test_print_string_is_buffered():
+    stream = StringIO()
+    printer = AssemblyPrinter(stream=stream)
+    printer.emit_section(".text")
+    printer.print_string("main:\n")
+    assert stream.getvalue() == ""
+
+    printer.flush()
+    assert stream.getvalue() == ".text\nmain:\n"
+
+
+def test_print_module_flushes_in_batches():
+    a0 = riscv.GetRegisterOp(riscv.Registers.A0)
+    ops = [riscv.AddiOp(a0, i % 100, rd=riscv.Registers.A1) for i in range(5000)]
+    module = ModuleOp([riscv.DirectiveOp(".text", None), a0, *ops])
+
+    stream = StringIO()
+    AssemblyPrinter(stream=stream).print_module(module)
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 5001
+    assert lines[0] == ".text"
+    assert lines[-1] == "    addi a1, a0, 99"
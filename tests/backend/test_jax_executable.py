@@ -213,3 +213,55 @@ def test_return_value_count_mismatch():
 
         @executable
         def abs_return_count_mismatch(a: jax.Array) -> jax.Array: ...  # pyright: ignore[reportUnusedFunction]
+
+
+def add_module() -> ModuleOp:
+    T = TensorType(i32, (4,))
+
+    main_op = func.FuncOp("main", ((T, T), (T,)))
+    with ImplicitBuilder(main_op.body) as (arg0, arg1):
+        res = stablehlo.AddOp(arg0, arg1).result
+        func.ReturnOp(res)
+
+    return ModuleOp([main_op])
+
+
+def test_executable_cache():
+    JaxExecutable.clear_cache()
+    first = JaxExecutable.compile(add_module())
+    second = JaxExecutable.compile(add_module())
+    assert first.loaded_executable is second.loaded_executable
+
+    donated = JaxExecutable.compile(add_module(), donate_argnums=(0,))
+    assert donated.loaded_executable is not first.loaded_executable
+
+    JaxExecutable.clear_cache()
+    assert JaxExecutable.compile(add_module()).loaded_executable is not (
+        first.loaded_executable
+    )
+
+
+def test_donate_argnums():
+    module = add_module()
+    executable = JaxExecutable.compile(module, donate_argnums=(0,))
+    # The module itself is left unchanged
+    assert module.body.block.first_op.arg_attrs is None
+
+    a = array([1, 2, 3, 4], dtype=jax.numpy.int32)
+    b = array([10, 20, 30, 40], dtype=jax.numpy.int32)
+    a_pointer = a.unsafe_buffer_pointer()
+    (result,) = executable.execute([a, b])
+
+    assert (result == array([11, 22, 33, 44], dtype=jax.numpy.int32)).all()
+    # The result reuses the buffer of the donated argument
+    assert result.unsafe_buffer_pointer() == a_pointer
+    assert a.is_deleted()
+    assert not b.is_deleted()
+
+
+def test_donate_argnums_errors():
+    with pytest.raises(ValueError, match="Cannot donate argument 2 of `main`"):
+        JaxExecutable.compile(add_module(), donate_argnums=(2,))
+
+    with pytest.raises(ValueError, match="Argument 1 of `main` has no result"):
+        JaxExecutable.compile(add_module(), donate_argnums=(0, 1))
@@ -0,0 +1,72 @@
+import pytest
+
+from xdsl.backend.x86.x86_register_queue import X86RegisterQueue
+from xdsl.dialects.x86 import register
+
+
+def test_default_reserved_registers():
+    register_queue = X86RegisterQueue.default()
+
+    for reg in (register.RSP, register.RBP):
+        available_before = register_queue.available_general_registers.copy()
+        register_queue.push(reg)
+        assert available_before == register_queue.available_general_registers
+
+
+def test_default_pops_caller_saved_first():
+    register_queue = X86RegisterQueue.default()
+
+    assert register_queue.pop(register.GeneralRegisterType) == register.R11
+    assert register_queue.pop(register.GeneralRegisterType) == register.R10
+    assert register_queue.pop(register.AVX2RegisterType) == register.YMM0
+
+
+def test_push_infinite_register():
+    register_queue = X86RegisterQueue()
+
+    with pytest.raises(ValueError, match="Cannot push an unallocated register"):
+        register_queue.push(register.GeneralRegisterType.unallocated())
+
+    assert register_queue.pop(
+        register.GeneralRegisterType
+    ) == register.GeneralRegisterType.infinite_register(0)
+
+
+def test_can_pop():
+    register_queue = X86RegisterQueue()
+    assert not register_queue.can_pop(register.GeneralRegisterType)
+
+    register_queue.push(register.RAX)
+    assert register_queue.can_pop(register.GeneralRegisterType)
+    assert not register_queue.can_pop(register.AVX2RegisterType)
+
+    assert register_queue.pop(register.GeneralRegisterType) == register.RAX
+    assert not register_queue.can_pop(register.GeneralRegisterType)
+
+
+def test_reserve_register():
+    register_queue = X86RegisterQueue()
+
+    register_queue.reserve_register(register.RAX)
+    register_queue.push(register.RAX)
+    assert not register_queue.available_general_registers
+
+    register_queue.unreserve_register(register.RAX)
+    register_queue.push(register.RAX)
+    assert register_queue.pop(register.GeneralRegisterType) == register.RAX
+
+    with pytest.raises(ValueError, match="Cannot unreserve register"):
+        register_queue.unreserve_register(register.RAX)
+
+
+def test_limit_registers():
+    register_queue = X86RegisterQueue.default()
+    register_queue.limit_registers(1)
+
+    assert register_queue.pop(register.GeneralRegisterType) == register.R11
+    assert register_queue.pop(
+        register.GeneralRegisterType
+    ) == register.GeneralRegisterType.infinite_register(0)
+
+    with pytest.raises(ValueError, match="Invalid negative limit value -1"):
+        register_queue.limit_registers(-1)
@@ -1,7 +1,165 @@
+from io import BytesIO
+
+import pytest
+
 from xdsl.dialects import wasm
+from xdsl.dialects.builtin import FunctionType, f64, i32
+from xdsl.dialects.wasm.encoding import (
+    EncodingException,
+    padded_unsigned_leb128,
+    section,
+    write_signed_leb128,
+    write_unsigned_leb128,
+)
 
 
 def test_empty_module():
     module = wasm.WasmModuleOp()
 
     assert module.wasm() == b"\x00asm\x01\x00\x00\x00"
+
+
+@pytest.mark.parametrize(
+    "value, encoding",
+    [
+        (0, b"\x00"),
+        (1, b"\x01"),
+        (127, b"\x7f"),
+        (128, b"\x80\x01"),
+        (624485, b"\xe5\x8e\x26"),
+        (2**32 - 1, b"\xff\xff\xff\xff\x0f"),
+    ],
+)
+def test_unsigned_leb128(value: int, encoding: bytes):
+    io = BytesIO()
+    write_unsigned_leb128(io, value)
+    assert io.getvalue() == encoding
+
+
+@pytest.mark.parametrize(
+    "value, encoding",
+    [
+        (0, b"\x00"),
+        (63, b"\x3f"),
+        (64, b"\xc0\x00"),
+        (-1, b"\x7f"),
+        (-64, b"\x40"),
+        (-65, b"\xbf\x7f"),
+        (-123456, b"\xc0\xbb\x78"),
+        (-(2**31), b"\x80\x80\x80\x80\x78"),
+    ],
+)
+def test_signed_leb128(value: int, encoding: bytes):
+    io = BytesIO()
+    write_signed_leb128(io, value)
+    assert io.getvalue() == encoding
+
+
+def test_leb128_errors():
+    with pytest.raises(EncodingException, match="Cannot encode negative value -1"):
+        write_unsigned_leb128(BytesIO(), -1)
+    with pytest.raises(EncodingException, match="Cannot encode 34359738368 in 5"):
+        padded_unsigned_leb128(2**35)
+
+
+def test_padded_leb128():
+    assert padded_unsigned_leb128(3) == b"\x83\x80\x80\x80\x00"
+    assert padded_unsigned_leb128(624485) == b"\xe5\x8e\xa6\x80\x00"
+
+
+class NonSeekableIO(BytesIO):
+    def seekable(self) -> bool:
+        return False
+
+
+def test_section_back_patching():
+    # Seekable streams get a padded size, patched after the contents are written
+    io = BytesIO()
+    with section(io, 1) as contents:
+        assert contents is io
+        contents.write(b"abc")
+    assert io.getvalue() == b"\x01\x83\x80\x80\x80\x00abc"
+
+    # Other streams get a minimal size, buffering the contents of the section only
+    io = NonSeekableIO()
+    with section(io, 1) as contents:
+        assert contents is not io
+        contents.write(b"abc")
+    assert io.getvalue() == b"\x01\x03abc"
+
+
+def add_module() -> wasm.WasmModuleOp:
+    return wasm.WasmModuleOp(
+        [
+            wasm.WasmFuncOp(
+                "add",
+                FunctionType.from_lists([i32, i32], [i32]),
+                [wasm.LocalGetOp(0), wasm.LocalGetOp(1), wasm.I32AddOp()],
+                export="add",
+            ),
+            wasm.WasmFuncOp(
+                "main",
+                FunctionType.from_lists([], [i32]),
+                [
+                    wasm.I32ConstOp(-1),
+                    wasm.I32ConstOp(2),
+                    wasm.CallOp("add"),
+                    wasm.F64ConstOp(1.5),
+                    wasm.LocalSetOp(0),
+                ],
+                locals=[f64, f64, i32],
+            ),
+        ]
+    )
+
+
+def test_module_encoding():
+    io = NonSeekableIO()
+    add_module().encode(wasm.encoding.WasmBinaryEncodingContext(), io)
+    # fmt: off
+    assert io.getvalue() == (
+        b"\x00asm\x01\x00\x00\x00"
+        # type section: (i32, i32) -> i32, () -> i32
+        b"\x01\x0b\x02\x60\x02\x7f\x7f\x01\x7f\x60\x00\x01\x7f"
+        # function section: type indices
+        b"\x03\x03\x02\x00\x01"
+        # export section: "add" is function 0
+        b"\x07\x07\x01\x03add\x00\x00"
+        # code section, where the sizes of the bodies are back-patched in the buffer
+        b"\x0a\x29\x02"
+        # add: no locals, local.get 0, local.get 1, i32.add, end
+        b"\x87\x80\x80\x80\x00\x00\x20\x00\x20\x01\x6a\x0b"
+        # main: two f64 locals, one i32 local
+        b"\x97\x80\x80\x80\x00\x02\x02\x7c\x01\x7f"
+        # i32.const -1, i32.const 2, call 0
+        b"\x41\x7f\x41\x02\x10\x00"
+        # f64.const 1.5, local.set 0, end
+        b"\x44\x00\x00\x00\x00\x00\x00\xf8\x3f\x21\x00\x0b"
+    )
+    # fmt: on
+
+    # Seekable streams also get padded section sizes
+    padded = add_module().wasm()
+    assert len(padded) == len(io.getvalue()) + 4 * 4
+
+
+def test_shared_function_types():
+    func_type = FunctionType.from_lists([], [])
+    module = wasm.WasmModuleOp(
+        [
+            wasm.WasmFuncOp("a", func_type, [wasm.CallOp("b")]),
+            wasm.WasmFuncOp("b", func_type),
+        ]
+    )
+    ctx = wasm.encoding.WasmBinaryEncodingContext()
+    module.encode(ctx, NonSeekableIO())
+    assert ctx.types == {func_type: 0}
+    assert ctx.funcs == {"a": 0, "b": 1}
+
+
+def test_unknown_callee():
+    module = wasm.WasmModuleOp(
+        [wasm.WasmFuncOp("a", FunctionType.from_lists([], []), [wasm.CallOp("b")])]
+    )
+    with pytest.raises(EncodingException, match=r"Unknown function \$b"):
+        module.wasm()
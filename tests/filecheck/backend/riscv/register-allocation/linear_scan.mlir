@@ -0,0 +1,71 @@
+// RUN: xdsl-opt -p "riscv-allocate-registers{allocation_strategy=LinearScan}" %s | filecheck %s
+
+riscv_func.func @sum(%n : !riscv.reg<a0>) -> !riscv.reg<a0> {
+  %zero = riscv.li 0 : !riscv.reg
+  %one = riscv.li 1 : !riscv.reg
+  %init = riscv.li 0 : !riscv.reg
+  riscv_cf.j ^header(%zero : !riscv.reg, %init : !riscv.reg)
+^header(%i : !riscv.reg, %acc : !riscv.reg):
+  riscv.label "header"
+  %acc2 = riscv.add %acc, %i : (!riscv.reg, !riscv.reg) -> !riscv.reg
+  %i2 = riscv.add %i, %one : (!riscv.reg, !riscv.reg) -> !riscv.reg
+  riscv_cf.blt %i2 : !riscv.reg, %n : !riscv.reg<a0>, ^header(%i2 : !riscv.reg, %acc2 : !riscv.reg), ^exit(%acc2 : !riscv.reg)
+^exit(%res : !riscv.reg):
+  riscv.label "exit"
+  %out = riscv.mv %res : (!riscv.reg) -> !riscv.reg<a0>
+  riscv_func.return %out : !riscv.reg<a0>
+}
+
+riscv_func.func @dot(%X : !riscv.reg<a0>, %Y : !riscv.reg<a1>) -> !riscv.freg<fa0> {
+  %X_moved = riscv.mv %X : (!riscv.reg<a0>) -> !riscv.reg
+  %Y_moved = riscv.mv %Y : (!riscv.reg<a1>) -> !riscv.reg
+  %init = riscv.fcvt.d.w %X_moved : (!riscv.reg) -> !riscv.freg
+  %lb = riscv.li 0 : !riscv.reg
+  %ub = riscv.li 1024 : !riscv.reg
+  %c8 = riscv.li 8 : !riscv.reg
+  %res = riscv_scf.for %i : !riscv.reg = %lb to %ub step %c8 iter_args(%acc_in = %init) -> (!riscv.freg) {
+    %x_ptr = riscv.add %X_moved, %i : (!riscv.reg, !riscv.reg) -> !riscv.reg
+    %x = riscv.fld %x_ptr, 0 : (!riscv.reg) -> !riscv.freg
+    %y_ptr = riscv.add %Y_moved, %i : (!riscv.reg, !riscv.reg) -> !riscv.reg
+    %y = riscv.fld %y_ptr, 0 : (!riscv.reg) -> !riscv.freg
+    %xy = riscv.fmul.d %x, %y : (!riscv.freg, !riscv.freg) -> !riscv.freg
+    %acc_out = riscv.fadd.d %acc_in, %xy : (!riscv.freg, !riscv.freg) -> !riscv.freg
+    riscv_scf.yield %acc_out : !riscv.freg
+  }
+  %res_moved = riscv.fmv.d %res : (!riscv.freg) -> !riscv.freg<fa0>
+  riscv_func.return %res_moved : !riscv.freg<fa0>
+}
+
+// CHECK:       builtin.module {
+// CHECK-NEXT:    riscv_func.func @sum(%n : !riscv.reg<a0>) -> !riscv.reg<a0> {
+// CHECK-NEXT:      %zero = riscv.li 0 : !riscv.reg<t0>
+// CHECK-NEXT:      %one = riscv.li 1 : !riscv.reg<t1>
+// CHECK-NEXT:      %init = riscv.li 0 : !riscv.reg<t2>
+// CHECK-NEXT:      riscv_cf.j ^0(%zero : !riscv.reg<t0>, %init : !riscv.reg<t2>)
+// CHECK-NEXT:    ^0(%i : !riscv.reg<t0>, %acc : !riscv.reg<t2>):
+// CHECK-NEXT:      riscv.label "header"
+// CHECK-NEXT:      %acc2 = riscv.add %acc, %i : (!riscv.reg<t2>, !riscv.reg<t0>) -> !riscv.reg<t2>
+// CHECK-NEXT:      %i2 = riscv.add %i, %one : (!riscv.reg<t0>, !riscv.reg<t1>) -> !riscv.reg<t0>
+// CHECK-NEXT:      riscv_cf.blt %i2 : !riscv.reg<t0>, %n : !riscv.reg<a0>, ^0(%i2 : !riscv.reg<t0>, %acc2 : !riscv.reg<t2>), ^1(%acc2 : !riscv.reg<t2>)
+// CHECK-NEXT:    ^1(%res : !riscv.reg<t2>):
+// CHECK-NEXT:      riscv.label "exit"
+// CHECK-NEXT:      %out = riscv.mv %res : (!riscv.reg<t2>) -> !riscv.reg<a0>
+// CHECK-NEXT:      riscv_func.return %out : !riscv.reg<a0>
+// CHECK-NEXT:    }
+// CHECK-NEXT:    riscv_func.func @dot(%X : !riscv.reg<a0>, %Y : !riscv.reg<a1>) -> !riscv.freg<fa0> {
+// CHECK-NEXT:      %init = riscv.fcvt.d.w %X : (!riscv.reg<a0>) -> !riscv.freg<fa0>
+// CHECK-NEXT:      %lb = riscv.li 0 : !riscv.reg<zero>
+// CHECK-NEXT:      %ub = riscv.li 1024 : !riscv.reg<t0>
+// CHECK-NEXT:      %c8 = riscv.li 8 : !riscv.reg<t1>
+// CHECK-NEXT:      %res = riscv_scf.for %i : !riscv.reg<t2>  = %lb to %ub step %c8 iter_args(%acc_in = %init) -> (!riscv.freg<fa0>) {
+// CHECK-NEXT:        %x_ptr = riscv.add %X, %i : (!riscv.reg<a0>, !riscv.reg<t2>) -> !riscv.reg<t3>
+// CHECK-NEXT:        %x = riscv.fld %x_ptr, 0 : (!riscv.reg<t3>) -> !riscv.freg<ft0>
+// CHECK-NEXT:        %y_ptr = riscv.add %Y, %i : (!riscv.reg<a1>, !riscv.reg<t2>) -> !riscv.reg<t3>
+// CHECK-NEXT:        %y = riscv.fld %y_ptr, 0 : (!riscv.reg<t3>) -> !riscv.freg<ft1>
+// CHECK-NEXT:        %xy = riscv.fmul.d %x, %y : (!riscv.freg<ft0>, !riscv.freg<ft1>) -> !riscv.freg<ft1>
+// CHECK-NEXT:        %acc_out = riscv.fadd.d %acc_in, %xy : (!riscv.freg<fa0>, !riscv.freg<ft1>) -> !riscv.freg<fa0>
+// CHECK-NEXT:        riscv_scf.yield %acc_out : !riscv.freg<fa0>
+// CHECK-NEXT:      }
+// CHECK-NEXT:      riscv_func.return %res : !riscv.freg<fa0>
+// CHECK-NEXT:    }
+// CHECK-NEXT:  }
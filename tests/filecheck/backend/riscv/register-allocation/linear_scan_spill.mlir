@@ -0,0 +1,33 @@
+// RUN: xdsl-opt -p "riscv-allocate-registers{allocation_strategy=LinearScan limit_registers=2}" %s | filecheck %s
+
+riscv_func.func @spill(%a : !riscv.reg<a0>, %b : !riscv.reg<a1>) -> !riscv.reg<a0> {
+  %0 = riscv.add %a, %b : (!riscv.reg<a0>, !riscv.reg<a1>) -> !riscv.reg
+  %1 = riscv.sub %a, %b : (!riscv.reg<a0>, !riscv.reg<a1>) -> !riscv.reg
+  %2 = riscv.mul %a, %b : (!riscv.reg<a0>, !riscv.reg<a1>) -> !riscv.reg
+  %3 = riscv.li 7 : !riscv.reg
+  %4 = riscv.add %0, %1 : (!riscv.reg, !riscv.reg) -> !riscv.reg
+  %5 = riscv.add %4, %2 : (!riscv.reg, !riscv.reg) -> !riscv.reg
+  %6 = riscv.add %5, %3 : (!riscv.reg, !riscv.reg) -> !riscv.reg
+  %7 = riscv.mv %6 : (!riscv.reg) -> !riscv.reg<a0>
+  riscv_func.return %7 : !riscv.reg<a0>
+}
+
+// CHECK:       builtin.module {
+// CHECK-NEXT:    riscv_func.func @spill(%a : !riscv.reg<a0>, %b : !riscv.reg<a1>) -> !riscv.reg<a0> {
+// CHECK-NEXT:      %0 = riscv.get_register : !riscv.reg<sp>
+// CHECK-NEXT:      %1 = riscv.addi %0, -16 : (!riscv.reg<sp>) -> !riscv.reg<sp>
+// CHECK-NEXT:      %2 = riscv.add %a, %b : (!riscv.reg<a0>, !riscv.reg<a1>) -> !riscv.reg<t0>
+// CHECK-NEXT:      riscv.sw %0, %2, 8 {comment = "spill"} : (!riscv.reg<sp>, !riscv.reg<t0>) -> ()
+// CHECK-NEXT:      %3 = riscv.sub %a, %b : (!riscv.reg<a0>, !riscv.reg<a1>) -> !riscv.reg<t0>
+// CHECK-NEXT:      %4 = riscv.mul %a, %b : (!riscv.reg<a0>, !riscv.reg<a1>) -> !riscv.reg<t1>
+// CHECK-NEXT:      riscv.sw %0, %4, 0 {comment = "spill"} : (!riscv.reg<sp>, !riscv.reg<t1>) -> ()
+// CHECK-NEXT:      %5 = riscv.lw %0, 8 {comment = "reload"} : (!riscv.reg<sp>) -> !riscv.reg<t1>
+// CHECK-NEXT:      %6 = riscv.add %5, %3 : (!riscv.reg<t1>, !riscv.reg<t0>) -> !riscv.reg<t1>
+// CHECK-NEXT:      %7 = riscv.lw %0, 0 {comment = "reload"} : (!riscv.reg<sp>) -> !riscv.reg<t0>
+// CHECK-NEXT:      %8 = riscv.add %6, %7 : (!riscv.reg<t1>, !riscv.reg<t0>) -> !riscv.reg<t0>
+// CHECK-NEXT:      %9 = riscv.li 7 : !riscv.reg<t1>
+// CHECK-NEXT:      %10 = riscv.add %8, %9 : (!riscv.reg<t0>, !riscv.reg<t1>) -> !riscv.reg<a0>
+// CHECK-NEXT:      %11 = riscv.addi %0, 16 : (!riscv.reg<sp>) -> !riscv.reg<sp>
+// CHECK-NEXT:      riscv_func.return %10 : !riscv.reg<a0>
+// CHECK-NEXT:    }
+// CHECK-NEXT:  }
@@ -0,0 +1,56 @@
+// RUN: xdsl-opt -t riscemu %s | filecheck %s
+
+builtin.module {
+  riscv.assembly_section ".data" {
+    riscv.label "values"
+    riscv.directive ".word" "0x1,0x2,0x3,0xfffffffc"
+  }
+  riscv_func.func public @main() {
+    %values = riscv.li "values" : !riscv.reg<a0>
+    %zero = riscv.get_register : !riscv.reg<zero>
+    %count = riscv.li 4 : !riscv.reg<a1>
+    %acc = riscv.li 0 : !riscv.reg<a2>
+    riscv_cf.branch ^loop(%values : !riscv.reg<a0>, %count : !riscv.reg<a1>, %acc : !riscv.reg<a2>)
+  ^loop(%ptr : !riscv.reg<a0>, %i : !riscv.reg<a1>, %sum : !riscv.reg<a2>):
+    riscv.label "loop"
+    %v = riscv.lw %ptr, 0 : (!riscv.reg<a0>) -> !riscv.reg<t0>
+    %sum2 = riscv.add %sum, %v : (!riscv.reg<a2>, !riscv.reg<t0>) -> !riscv.reg<a2>
+    %ptr2 = riscv.addi %ptr, 4 : (!riscv.reg<a0>) -> !riscv.reg<a0>
+    %i2 = riscv.addi %i, -1 : (!riscv.reg<a1>) -> !riscv.reg<a1>
+    riscv_cf.bne %i2 : !riscv.reg<a1>, %zero : !riscv.reg<zero>, ^loop(%ptr2 : !riscv.reg<a0>, %i2 : !riscv.reg<a1>, %sum2 : !riscv.reg<a2>), ^done(%sum2 : !riscv.reg<a2>)
+  ^done(%total : !riscv.reg<a2>):
+    riscv.label "done"
+    riscv_debug.printf %total "sum = {}\n" : (!riscv.reg<a2>) -> ()
+
+    // Store the sum to the stack and read it back as a double
+    %sp = riscv.get_register : !riscv.reg<sp>
+    %frame = riscv.addi %sp, -16 : (!riscv.reg<sp>) -> !riscv.reg<sp>
+    riscv.sw %frame, %total, 0 : (!riscv.reg<sp>, !riscv.reg<a2>) -> ()
+    %reload = riscv.lw %frame, 0 : (!riscv.reg<sp>) -> !riscv.reg<t1>
+    %f = riscv.fcvt.d.w %reload : (!riscv.reg<t1>) -> !riscv.freg<ft0>
+    %half = riscv.li 2 : !riscv.reg<t2>
+    %fhalf = riscv.fcvt.d.w %half : (!riscv.reg<t2>) -> !riscv.freg<ft1>
+    %q = riscv.fdiv.d %f, %fhalf : (!riscv.freg<ft0>, !riscv.freg<ft1>) -> !riscv.freg<ft2>
+    riscv.fsd %frame, %q, 8 : (!riscv.reg<sp>, !riscv.freg<ft2>) -> ()
+    %qr = riscv.fld %frame, 8 : (!riscv.reg<sp>) -> !riscv.freg<ft3>
+    riscv_debug.printf %qr "half = {}\n" : (!riscv.freg<ft3>) -> ()
+
+    // Accumulate in an frep loop, executing the body max_rep + 1 times
+    %reps = riscv.li 9 : !riscv.reg<t3>
+    %init = riscv.fcvt.d.w %zero : (!riscv.reg<zero>) -> !riscv.freg<ft4>
+    %res = riscv_snitch.frep_outer %reps iter_args(%facc = %init) -> (!riscv.freg<ft4>) {
+      %next = riscv.fadd.d %facc, %qr : (!riscv.freg<ft4>, !riscv.freg<ft3>) -> !riscv.freg<ft4>
+      riscv_snitch.frep_yield %next : !riscv.freg<ft4>
+    }
+    riscv_debug.printf %res "frep = {}\n" : (!riscv.freg<ft4>) -> ()
+
+    %exit = riscv.li 93 : !riscv.reg<a7>
+    %code = riscv.li 0 : !riscv.reg<a0>
+    riscv.ecall
+    riscv_func.return
+  }
+}
+
+// CHECK:      sum = 2
+// CHECK-NEXT: half = 1.0
+// CHECK-NEXT: frep = 10.0
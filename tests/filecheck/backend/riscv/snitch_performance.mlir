@@ -0,0 +1,101 @@
+// RUN: xdsl-opt -t snitch-perf %s | filecheck %s
+
+// A single accumulator serializes the iterations on the latency of fmadd.d
+riscv_func.func @dot_single_accumulator(%a : !riscv.reg<a0>, %b : !riscv.reg<a1>) {
+  %init = riscv.fcvt.d.w %a : (!riscv.reg<a0>) -> !riscv.freg<ft3>
+  "snitch_stream.streaming_region"(%a, %b) <{
+    "stride_patterns" = [#snitch_stream.stride_pattern<ub = [64], strides = [8]>],
+    operandSegmentSizes = array<i32: 2, 0>
+  }> ({
+  ^0(%a_stream : !snitch.readable<!riscv.freg<ft0>>, %b_stream : !snitch.readable<!riscv.freg<ft1>>):
+    %reps = riscv.li 63 : !riscv.reg<t0>
+    %res = riscv_snitch.frep_outer %reps iter_args(%acc = %init) -> (!riscv.freg<ft3>) {
+      %x = riscv_snitch.read from %a_stream : !riscv.freg<ft0>
+      %y = riscv_snitch.read from %b_stream : !riscv.freg<ft1>
+      %next = riscv.fmadd.d %x, %y, %acc : (!riscv.freg<ft0>, !riscv.freg<ft1>, !riscv.freg<ft3>) -> !riscv.freg<ft3>
+      riscv_snitch.frep_yield %next : !riscv.freg<ft3>
+    }
+  }) : (!riscv.reg<a0>, !riscv.reg<a1>) -> ()
+  riscv_func.return
+}
+
+// Interleaving four accumulators hides the latency
+riscv_func.func @dot_four_accumulators(%a : !riscv.reg<a0>, %b : !riscv.reg<a1>) {
+  %init0 = riscv.fcvt.d.w %a : (!riscv.reg<a0>) -> !riscv.freg<ft3>
+  %init1 = riscv.fcvt.d.w %a : (!riscv.reg<a0>) -> !riscv.freg<ft4>
+  %init2 = riscv.fcvt.d.w %a : (!riscv.reg<a0>) -> !riscv.freg<ft5>
+  %init3 = riscv.fcvt.d.w %a : (!riscv.reg<a0>) -> !riscv.freg<ft6>
+  "snitch_stream.streaming_region"(%a, %b) <{
+    "stride_patterns" = [#snitch_stream.stride_pattern<ub = [64], strides = [8]>],
+    operandSegmentSizes = array<i32: 2, 0>
+  }> ({
+  ^0(%a_stream : !snitch.readable<!riscv.freg<ft0>>, %b_stream : !snitch.readable<!riscv.freg<ft1>>):
+    %reps = riscv.li 15 : !riscv.reg<t0>
+    %res0, %res1, %res2, %res3 = riscv_snitch.frep_outer %reps iter_args(%acc0 = %init0, %acc1 = %init1, %acc2 = %init2, %acc3 = %init3) -> (!riscv.freg<ft3>, !riscv.freg<ft4>, !riscv.freg<ft5>, !riscv.freg<ft6>) {
+      %x0 = riscv_snitch.read from %a_stream : !riscv.freg<ft0>
+      %y0 = riscv_snitch.read from %b_stream : !riscv.freg<ft1>
+      %n0 = riscv.fmadd.d %x0, %y0, %acc0 : (!riscv.freg<ft0>, !riscv.freg<ft1>, !riscv.freg<ft3>) -> !riscv.freg<ft3>
+      %x1 = riscv_snitch.read from %a_stream : !riscv.freg<ft0>
+      %y1 = riscv_snitch.read from %b_stream : !riscv.freg<ft1>
+      %n1 = riscv.fmadd.d %x1, %y1, %acc1 : (!riscv.freg<ft0>, !riscv.freg<ft1>, !riscv.freg<ft4>) -> !riscv.freg<ft4>
+      %x2 = riscv_snitch.read from %a_stream : !riscv.freg<ft0>
+      %y2 = riscv_snitch.read from %b_stream : !riscv.freg<ft1>
+      %n2 = riscv.fmadd.d %x2, %y2, %acc2 : (!riscv.freg<ft0>, !riscv.freg<ft1>, !riscv.freg<ft5>) -> !riscv.freg<ft5>
+      %x3 = riscv_snitch.read from %a_stream : !riscv.freg<ft0>
+      %y3 = riscv_snitch.read from %b_stream : !riscv.freg<ft1>
+      %n3 = riscv.fmadd.d %x3, %y3, %acc3 : (!riscv.freg<ft0>, !riscv.freg<ft1>, !riscv.freg<ft6>) -> !riscv.freg<ft6>
+      riscv_snitch.frep_yield %n0, %n1, %n2, %n3 : !riscv.freg<ft3>, !riscv.freg<ft4>, !riscv.freg<ft5>, !riscv.freg<ft6>
+    }
+  }) : (!riscv.reg<a0>, !riscv.reg<a1>) -> ()
+  riscv_func.return
+}
+
+// Loops with an unknown trip count are counted as executing once
+riscv_func.func @scf_loops(%n : !riscv.reg<a0>) {
+  %lb = riscv.li 0 : !riscv.reg<t0>
+  %ub = riscv.li 10 : !riscv.reg<t1>
+  %step = riscv.li 1 : !riscv.reg<t2>
+  %init = riscv.li 0 : !riscv.reg<t3>
+  %sum = riscv_scf.for %i : !riscv.reg<t4> = %lb to %ub step %step iter_args(%acc = %init) -> (!riscv.reg<t3>) {
+    %prod = riscv.mul %i, %i : (!riscv.reg<t4>, !riscv.reg<t4>) -> !riscv.reg<t5>
+    %next = riscv.add %acc, %prod : (!riscv.reg<t3>, !riscv.reg<t5>) -> !riscv.reg<t3>
+    riscv_scf.yield %next : !riscv.reg<t3>
+  }
+  riscv_scf.for %j : !riscv.reg<t4> = %lb to %n step %step {
+    %x = riscv.addi %j, 1 : (!riscv.reg<t4>) -> !riscv.reg<t6>
+  }
+  riscv_func.return
+}
+
+// CHECK:      {
+// CHECK-NEXT:   "dot_single_accumulator": {
+// CHECK-NEXT:     "cycles": 208,
+// CHECK-NEXT:     "instructions": 78,
+// CHECK-NEXT:     "fpu_ops": 64,
+// CHECK-NEXT:     "stall_cycles": 128,
+// CHECK-NEXT:     "frep_iterations": 64,
+// CHECK-NEXT:     "stream_elements": 128,
+// CHECK-NEXT:     "unknown_trip_counts": 0,
+// CHECK-NEXT:     "fpu_utilization": 0.3077
+// CHECK-NEXT:   },
+// CHECK-NEXT:   "dot_four_accumulators": {
+// CHECK-NEXT:     "cycles": 83,
+// CHECK-NEXT:     "instructions": 81,
+// CHECK-NEXT:     "fpu_ops": 64,
+// CHECK-NEXT:     "stall_cycles": 0,
+// CHECK-NEXT:     "frep_iterations": 16,
+// CHECK-NEXT:     "stream_elements": 128,
+// CHECK-NEXT:     "unknown_trip_counts": 0,
+// CHECK-NEXT:     "fpu_utilization": 0.7711
+// CHECK-NEXT:   },
+// CHECK-NEXT:   "scf_loops": {
+// CHECK-NEXT:     "cycles": 70,
+// CHECK-NEXT:     "instructions": 50,
+// CHECK-NEXT:     "fpu_ops": 0,
+// CHECK-NEXT:     "stall_cycles": 20,
+// CHECK-NEXT:     "frep_iterations": 0,
+// CHECK-NEXT:     "stream_elements": 0,
+// CHECK-NEXT:     "unknown_trip_counts": 1,
+// CHECK-NEXT:     "fpu_utilization": 0.0
+// CHECK-NEXT:   }
+// CHECK-NEXT: }
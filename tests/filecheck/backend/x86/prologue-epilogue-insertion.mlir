@@ -0,0 +1,36 @@
+// RUN: xdsl-opt -p x86-prologue-epilogue-insertion %s | filecheck %s
+
+x86_func.func @main(%arg : !x86.reg<rdi>, %sp : !x86.reg<rsp>) {
+  %0 = x86.rm.mov %sp, 8 : (!x86.reg<rsp>) -> !x86.reg<rbx>
+  %1 = x86.rr.add %0, %arg : (!x86.reg<rbx>, !x86.reg<rdi>) -> !x86.reg<rbx>
+  %2 = x86.get_register : () -> !x86.reg<r12>
+  %3 = x86.rr.mov %2, %1 : (!x86.reg<r12>, !x86.reg<rbx>) -> !x86.reg<r12>
+  x86_func.ret
+}
+
+x86_func.func @no_callee_saved(%arg : !x86.reg<rdi>) {
+  %0 = x86.get_register : () -> !x86.reg<rax>
+  %1 = x86.rr.mov %0, %arg : (!x86.reg<rax>, !x86.reg<rdi>) -> !x86.reg<rax>
+  x86_func.ret
+}
+
+// CHECK: builtin.module {
+// CHECK-NEXT:   x86_func.func @main(%arg : !x86.reg<rdi>, %sp : !x86.reg<rsp>) {
+// CHECK-NEXT:     %0 = x86.get_register : () -> !x86.reg<rbx>
+// CHECK-NEXT:     %1 = x86.r.push %sp, %0 : (!x86.reg<rsp>, !x86.reg<rbx>) -> !x86.reg<rsp>
+// CHECK-NEXT:     %2 = x86.get_register : () -> !x86.reg<r12>
+// CHECK-NEXT:     %3 = x86.r.push %1, %2 : (!x86.reg<rsp>, !x86.reg<r12>) -> !x86.reg<rsp>
+// CHECK-NEXT:     %4 = x86.rm.mov %sp, 24 : (!x86.reg<rsp>) -> !x86.reg<rbx>
+// CHECK-NEXT:     %5 = x86.rr.add %4, %arg : (!x86.reg<rbx>, !x86.reg<rdi>) -> !x86.reg<rbx>
+// CHECK-NEXT:     %6 = x86.get_register : () -> !x86.reg<r12>
+// CHECK-NEXT:     %7 = x86.rr.mov %6, %5 : (!x86.reg<r12>, !x86.reg<rbx>) -> !x86.reg<r12>
+// CHECK-NEXT:     %8, %9 = x86.r.pop %3 : (!x86.reg<rsp>) -> (!x86.reg<r12>, !x86.reg<rsp>)
+// CHECK-NEXT:     %10, %11 = x86.r.pop %9 : (!x86.reg<rsp>) -> (!x86.reg<rbx>, !x86.reg<rsp>)
+// CHECK-NEXT:     x86_func.ret
+// CHECK-NEXT:   }
+// CHECK-NEXT:   x86_func.func @no_callee_saved(%arg : !x86.reg<rdi>) {
+// CHECK-NEXT:     %0 = x86.get_register : () -> !x86.reg<rax>
+// CHECK-NEXT:     %1 = x86.rr.mov %0, %arg : (!x86.reg<rax>, !x86.reg<rdi>) -> !x86.reg<rax>
+// CHECK-NEXT:     x86_func.ret
+// CHECK-NEXT:   }
+// CHECK-NEXT: }
@@ -0,0 +1,8 @@
+// RUN: xdsl-opt -p x86-allocate-registers --verify-diagnostics %s | filecheck %s
+
+// CHECK: Cannot register allocate func branches with 2 blocks, only single-block functions are supported.
+x86_func.func @branches() {
+  "test.termop"() [^bb0] : () -> ()
+^bb0:
+  x86_func.ret
+}
@@ -0,0 +1,79 @@
+// RUN: xdsl-opt -p x86-allocate-registers %s | filecheck %s
+// RUN: xdsl-opt -p "x86-allocate-registers{limit_registers=1}" %s | filecheck %s --check-prefix=LIMITED
+
+x86_func.func @add(%a : !x86.reg<rdi>, %b : !x86.reg<rsi>) {
+  %0 = "test.op"() : () -> !x86.reg
+  %1 = x86.rr.mov %0, %a : (!x86.reg, !x86.reg<rdi>) -> !x86.reg
+  %2 = x86.rr.add %1, %b : (!x86.reg, !x86.reg<rsi>) -> !x86.reg
+  %3 = x86.ri.add %2, 2 : (!x86.reg) -> !x86.reg
+  %4 = "test.op"() : () -> !x86.reg
+  %5 = x86.rr.mov %4, %3 : (!x86.reg, !x86.reg) -> !x86.reg
+  %6 = x86.rr.imul %5, %3 : (!x86.reg, !x86.reg) -> !x86.reg
+  %7 = x86.get_register : () -> !x86.reg<rax>
+  %8 = x86.rr.mov %7, %6 : (!x86.reg<rax>, !x86.reg) -> !x86.reg<rax>
+  x86_func.ret
+}
+
+// The first source of a two-address instruction is copied if it is used later
+x86_func.func @live_tied_operand(%a : !x86.reg<rdi>, %b : !x86.reg<rsi>) {
+  %0 = "test.op"() : () -> !x86.reg
+  %1 = "test.op"() : () -> !x86.reg
+  %2 = x86.rr.add %0, %1 : (!x86.reg, !x86.reg) -> !x86.reg
+  %3 = x86.rr.add %0, %2 : (!x86.reg, !x86.reg) -> !x86.reg
+  %4 = x86.rr.add %a, %3 : (!x86.reg<rdi>, !x86.reg) -> !x86.reg<rax>
+  x86_func.ret
+}
+
+// CHECK: builtin.module {
+// CHECK-NEXT:   x86_func.func @add(%a : !x86.reg<rdi>, %b : !x86.reg<rsi>) {
+// CHECK-NEXT:     %0 = "test.op"() : () -> !x86.reg<r10>
+// CHECK-NEXT:     %1 = x86.rr.mov %0, %a : (!x86.reg<r10>, !x86.reg<rdi>) -> !x86.reg<r10>
+// CHECK-NEXT:     %2 = x86.rr.add %1, %b : (!x86.reg<r10>, !x86.reg<rsi>) -> !x86.reg<r10>
+// CHECK-NEXT:     %3 = x86.ri.add %2, 2 : (!x86.reg<r10>) -> !x86.reg<r10>
+// CHECK-NEXT:     %4 = "test.op"() : () -> !x86.reg<r11>
+// CHECK-NEXT:     %5 = x86.rr.mov %4, %3 : (!x86.reg<r11>, !x86.reg<r10>) -> !x86.reg<r11>
+// CHECK-NEXT:     %6 = x86.rr.imul %5, %3 : (!x86.reg<r11>, !x86.reg<r10>) -> !x86.reg<r11>
+// CHECK-NEXT:     %7 = x86.get_register : () -> !x86.reg<rax>
+// CHECK-NEXT:     %8 = x86.rr.mov %7, %6 : (!x86.reg<rax>, !x86.reg<r11>) -> !x86.reg<rax>
+// CHECK-NEXT:     x86_func.ret
+// CHECK-NEXT:   }
+// CHECK-NEXT:   x86_func.func @live_tied_operand(%a : !x86.reg<rdi>, %b : !x86.reg<rsi>) {
+// CHECK-NEXT:     %0 = "test.op"() : () -> !x86.reg<r11>
+// CHECK-NEXT:     %1 = "test.op"() : () -> !x86.reg<r9>
+// CHECK-NEXT:     %2 = x86.get_register : () -> !x86.reg<r10>
+// CHECK-NEXT:     %3 = x86.rr.mov %2, %0 : (!x86.reg<r10>, !x86.reg<r11>) -> !x86.reg<r10>
+// CHECK-NEXT:     %4 = x86.rr.add %3, %1 : (!x86.reg<r10>, !x86.reg<r9>) -> !x86.reg<r10>
+// CHECK-NEXT:     %5 = x86.rr.add %0, %4 : (!x86.reg<r11>, !x86.reg<r10>) -> !x86.reg<r11>
+// CHECK-NEXT:     %6 = x86.get_register : () -> !x86.reg<rax>
+// CHECK-NEXT:     %7 = x86.rr.mov %6, %a : (!x86.reg<rax>, !x86.reg<rdi>) -> !x86.reg<rax>
+// CHECK-NEXT:     %8 = x86.rr.add %7, %5 : (!x86.reg<rax>, !x86.reg<r11>) -> !x86.reg<rax>
+// CHECK-NEXT:     x86_func.ret
+// CHECK-NEXT:   }
+// CHECK-NEXT: }
+
+// LIMITED: builtin.module {
+// LIMITED-NEXT:   x86_func.func @add(%a : !x86.reg<rdi>, %b : !x86.reg<rsi>) {
+// LIMITED-NEXT:     %0 = "test.op"() : () -> !x86.reg<inf_reg_0>
+// LIMITED-NEXT:     %1 = x86.rr.mov %0, %a : (!x86.reg<inf_reg_0>, !x86.reg<rdi>) -> !x86.reg<inf_reg_0>
+// LIMITED-NEXT:     %2 = x86.rr.add %1, %b : (!x86.reg<inf_reg_0>, !x86.reg<rsi>) -> !x86.reg<inf_reg_0>
+// LIMITED-NEXT:     %3 = x86.ri.add %2, 2 : (!x86.reg<inf_reg_0>) -> !x86.reg<inf_reg_0>
+// LIMITED-NEXT:     %4 = "test.op"() : () -> !x86.reg<r11>
+// LIMITED-NEXT:     %5 = x86.rr.mov %4, %3 : (!x86.reg<r11>, !x86.reg<inf_reg_0>) -> !x86.reg<r11>
+// LIMITED-NEXT:     %6 = x86.rr.imul %5, %3 : (!x86.reg<r11>, !x86.reg<inf_reg_0>) -> !x86.reg<r11>
+// LIMITED-NEXT:     %7 = x86.get_register : () -> !x86.reg<rax>
+// LIMITED-NEXT:     %8 = x86.rr.mov %7, %6 : (!x86.reg<rax>, !x86.reg<r11>) -> !x86.reg<rax>
+// LIMITED-NEXT:     x86_func.ret
+// LIMITED-NEXT:   }
+// LIMITED-NEXT:   x86_func.func @live_tied_operand(%a : !x86.reg<rdi>, %b : !x86.reg<rsi>) {
+// LIMITED-NEXT:     %0 = "test.op"() : () -> !x86.reg<r11>
+// LIMITED-NEXT:     %1 = "test.op"() : () -> !x86.reg<inf_reg_1>
+// LIMITED-NEXT:     %2 = x86.get_register : () -> !x86.reg<inf_reg_0>
+// LIMITED-NEXT:     %3 = x86.rr.mov %2, %0 : (!x86.reg<inf_reg_0>, !x86.reg<r11>) -> !x86.reg<inf_reg_0>
+// LIMITED-NEXT:     %4 = x86.rr.add %3, %1 : (!x86.reg<inf_reg_0>, !x86.reg<inf_reg_1>) -> !x86.reg<inf_reg_0>
+// LIMITED-NEXT:     %5 = x86.rr.add %0, %4 : (!x86.reg<r11>, !x86.reg<inf_reg_0>) -> !x86.reg<r11>
+// LIMITED-NEXT:     %6 = x86.get_register : () -> !x86.reg<rax>
+// LIMITED-NEXT:     %7 = x86.rr.mov %6, %a : (!x86.reg<rax>, !x86.reg<rdi>) -> !x86.reg<rax>
+// LIMITED-NEXT:     %8 = x86.rr.add %7, %5 : (!x86.reg<rax>, !x86.reg<r11>) -> !x86.reg<rax>
+// LIMITED-NEXT:     x86_func.ret
+// LIMITED-NEXT:   }
+// LIMITED-NEXT: }
@@ -68,3 +68,21 @@ builtin.module {
 }) {function_type = () -> (), sym_name = "mismatched_sizes"} : () -> ()
 
 // CHECK: Expected result type with dynamic size instead of 5 in dim = 0
+
+
+// -----
+
+%bytes = "test.op"() : () -> memref<64xf32>
+%shift = "test.op"() : () -> index
+%0 = memref.view %bytes[%shift] [] : memref<64xf32> to memref<4x4xf32>
+
+// CHECK: Expected source to be a 1-D memref of i8 with an identity layout, got memref<64xf32>
+
+
+// -----
+
+%bytes = "test.op"() : () -> memref<64xi8>
+%shift = "test.op"() : () -> index
+%0 = memref.view %bytes[%shift] [] : memref<64xi8> to memref<?x4xf32>
+
+// CHECK: Expected 1 size operands for memref<?x4xf32>, got 0
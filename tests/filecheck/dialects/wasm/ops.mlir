@@ -7,12 +7,70 @@
 
 wasm.module
 // CHECK-NEXT:    wasm.module
-// CHECK-GENERIC-NEXT:    "wasm.module"() : () -> ()
+// CHECK-GENERIC-NEXT:    "wasm.module"() ({
+// CHECK-GENERIC-NEXT:    }) : () -> ()
 
 wasm.module attributes {"hello" = "world"}
 // CHECK-NEXT:    wasm.module attributes {hello = "world"}
-// CHECK-GENERIC-NEXT:    "wasm.module"() {hello = "world"} : () -> ()
+// CHECK-GENERIC-NEXT:    "wasm.module"() ({
+// CHECK-GENERIC-NEXT:    }) {hello = "world"} : () -> ()
 
+wasm.module {
+  wasm.func @add : (i32, i32) -> i32 export "add" {
+    wasm.local.get 0
+    wasm.local.get 1
+    wasm.i32.add
+  }
+  wasm.func @main : () -> f64 locals(i64, f64) {
+    wasm.i32.const -1
+    wasm.i32.const 2
+    wasm.call @add
+    wasm.drop
+    wasm.i64.const 4294967296
+    wasm.local.set 0
+    wasm.f64.const 1.5
+    wasm.local.tee 1
+    wasm.return
+  }
+}
+
+// CHECK-NEXT:    wasm.module {
+// CHECK-NEXT:      wasm.func @add : (i32, i32) -> i32 export "add" {
+// CHECK-NEXT:        wasm.local.get 0
+// CHECK-NEXT:        wasm.local.get 1
+// CHECK-NEXT:        wasm.i32.add
+// CHECK-NEXT:      }
+// CHECK-NEXT:      wasm.func @main : () -> f64 locals(i64, f64) {
+// CHECK-NEXT:        wasm.i32.const -1
+// CHECK-NEXT:        wasm.i32.const 2
+// CHECK-NEXT:        wasm.call @add
+// CHECK-NEXT:        wasm.drop
+// CHECK-NEXT:        wasm.i64.const 4294967296
+// CHECK-NEXT:        wasm.local.set 0
+// CHECK-NEXT:        wasm.f64.const 1.5
+// CHECK-NEXT:        wasm.local.tee 1
+// CHECK-NEXT:        wasm.return
+// CHECK-NEXT:      }
+// CHECK-NEXT:    }
+
+// CHECK-GENERIC-NEXT:    "wasm.module"() ({
+// CHECK-GENERIC-NEXT:      "wasm.func"() <{sym_name = "add", function_type = (i32, i32) -> i32, export = "add"}> ({
+// CHECK-GENERIC-NEXT:        "wasm.local.get"() <{local_index = 0 : i32}> : () -> ()
+// CHECK-GENERIC-NEXT:        "wasm.local.get"() <{local_index = 1 : i32}> : () -> ()
+// CHECK-GENERIC-NEXT:        "wasm.i32.add"() : () -> ()
+// CHECK-GENERIC-NEXT:      }) : () -> ()
+// CHECK-GENERIC-NEXT:      "wasm.func"() <{sym_name = "main", function_type = () -> f64, locals = [i64, f64]}> ({
+// CHECK-GENERIC-NEXT:        "wasm.i32.const"() <{value = -1 : i32}> : () -> ()
+// CHECK-GENERIC-NEXT:        "wasm.i32.const"() <{value = 2 : i32}> : () -> ()
+// CHECK-GENERIC-NEXT:        "wasm.call"() <{callee = @add}> : () -> ()
+// CHECK-GENERIC-NEXT:        "wasm.drop"() : () -> ()
+// CHECK-GENERIC-NEXT:        "wasm.i64.const"() <{value = 4294967296 : i64}> : () -> ()
+// CHECK-GENERIC-NEXT:        "wasm.local.set"() <{local_index = 0 : i32}> : () -> ()
+// CHECK-GENERIC-NEXT:        "wasm.f64.const"() <{value = 1.500000e+00 : f64}> : () -> ()
+// CHECK-GENERIC-NEXT:        "wasm.local.tee"() <{local_index = 1 : i32}> : () -> ()
+// CHECK-GENERIC-NEXT:        "wasm.return"() : () -> ()
+// CHECK-GENERIC-NEXT:      }) : () -> ()
+// CHECK-GENERIC-NEXT:    }) : () -> ()
 
 // CHECK-NEXT:  }
 // CHECK-GENERIC-NEXT:  }) : () -> ()
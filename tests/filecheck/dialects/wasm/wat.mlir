@@ -3,3 +3,20 @@
 wasm.module
 
 // CHECK: (module)
+
+wasm.module {
+  wasm.func @add : (i32, i32) -> i32 export "add" {
+    wasm.local.get 0
+    wasm.local.get 1
+    wasm.i32.add
+  }
+  wasm.func @main : () -> f64 locals(i64, f64) {
+    wasm.i32.const -1
+    wasm.i32.const 2
+    wasm.call @add
+    wasm.drop
+    wasm.f64.const 1.5
+  }
+}
+
+// CHECK-NEXT: (module (func $add (export "add") (param i32 i32) (result i32) local.get 0 local.get 1 i32.add) (func $main (result f64) (local i64 f64) i32.const -1 i32.const 2 call $add drop f64.const 1.5))
@@ -0,0 +1,12 @@
+// RUN: not xdsl-opt %s -p frontend-desymrefy 2>&1 | filecheck %s
+
+// A symbol declared in a block cannot be read before it is written.
+
+builtin.module {
+  symref.declare "a"
+  %0 = symref.fetch @a : i32
+  %1 = arith.constant 1 : i32
+  symref.update @a = %1 : i32
+}
+
+// CHECK: Symbol 'a' is read before it is written.
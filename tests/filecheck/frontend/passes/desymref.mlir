@@ -175,4 +175,119 @@ builtin.module {
   symref.update @c = %47 : i32
 }
 
+
+// Reads of a symbol before it is written observe the same value, so the first one
+// is kept.
+
+// CHECK-NEXT: builtin.module {
+// CHECK-NEXT:   %[[A:.*]] = symref.fetch @a : i32
+// CHECK-NEXT:   %{{.*}} = arith.constant 1 : i32
+// CHECK-NEXT:   %[[S:.*]] = arith.addi %[[A]], %{{.*}} : i32
+// CHECK-NEXT:   %[[M:.*]] = arith.muli %[[A]], %[[S]] : i32
+// CHECK-NEXT:   symref.update @a = %[[M]] : i32
+// CHECK-NEXT: }
+builtin.module {
+  %48 = symref.fetch @a : i32
+  %49 = arith.constant 1 : i32
+  %50 = arith.addi %48, %49 : i32
+  %51 = symref.fetch @a : i32
+  %52 = arith.muli %51, %50 : i32
+  symref.update @a = %52 : i32
+}
+
+
+// Nested regions are desymrefied first. Their remaining reads and writes are then
+// read and written by the operation holding them: the last write before it is
+// kept, and reads after it observe the symbol again.
+
+// CHECK-NEXT: builtin.module {
+// CHECK-NEXT:   %{{.*}} = arith.constant 0 : index
+// CHECK-NEXT:   %{{.*}} = arith.constant 4 : index
+// CHECK-NEXT:   %{{.*}} = arith.constant 1 : index
+// CHECK-NEXT:   scf.for %{{.*}} = %{{.*}} to %{{.*}} step %{{.*}} {
+// CHECK-NEXT:     %[[A0:.*]] = symref.fetch @a : i32
+// CHECK-NEXT:     %[[A1:.*]] = arith.addi %[[A0]], %[[A0]] : i32
+// CHECK-NEXT:     %[[A2:.*]] = arith.muli %[[A1]], %[[A0]] : i32
+// CHECK-NEXT:     symref.update @a = %[[A2]] : i32
+// CHECK-NEXT:     %{{.*}} = arith.constant true
+// CHECK-NEXT:     scf.if %{{.*}} {
+// CHECK-NEXT:       %[[T0:.*]] = symref.fetch @a : i32
+// CHECK-NEXT:       %[[T1:.*]] = arith.subi %[[T0]], %[[A2]] : i32
+// CHECK-NEXT:       symref.update @b = %[[T1]] : i32
+// CHECK-NEXT:       %[[T2:.*]] = arith.addi %[[T1]], %[[T1]] : i32
+// CHECK-NEXT:       symref.update @a = %[[T2]] : i32
+// CHECK-NEXT:     } else {
+// CHECK-NEXT:       %[[E0:.*]] = symref.fetch @a : i32
+// CHECK-NEXT:       %[[E1:.*]] = arith.addi %[[E0]], %[[E0]] : i32
+// CHECK-NEXT:       symref.update @a = %[[E1]] : i32
+// CHECK-NEXT:     }
+// CHECK-NEXT:     %[[A3:.*]] = symref.fetch @a : i32
+// CHECK-NEXT:     symref.update @b = %[[A3]] : i32
+// CHECK-NEXT:   }
+// CHECK-NEXT: }
+builtin.module {
+  %lb = arith.constant 0 : index
+  %ub = arith.constant 4 : index
+  %step = arith.constant 1 : index
+  scf.for %i = %lb to %ub step %step {
+    %53 = symref.fetch @a : i32
+    %54 = arith.addi %53, %53 : i32
+    symref.update @a = %54 : i32
+    %55 = symref.fetch @a : i32
+    %56 = arith.muli %55, %53 : i32
+    symref.update @a = %56 : i32
+    %cond = arith.constant true
+    scf.if %cond {
+      %57 = symref.fetch @a : i32
+      %58 = arith.subi %57, %56 : i32
+      symref.update @a = %58 : i32
+      %59 = symref.fetch @a : i32
+      symref.update @b = %59 : i32
+      %60 = symref.fetch @a : i32
+      %61 = arith.addi %60, %59 : i32
+      symref.update @a = %61 : i32
+    } else {
+      %62 = symref.fetch @a : i32
+      %63 = symref.fetch @a : i32
+      %64 = arith.addi %62, %63 : i32
+      symref.update @a = %64 : i32
+    }
+    %65 = symref.fetch @a : i32
+    symref.update @b = %65 : i32
+  }
+}
+
+
+// Symbols used in nested regions are kept, even if they are declared.
+
+// CHECK-NEXT: builtin.module {
+// CHECK-NEXT:   symref.declare "a"
+// CHECK-NEXT:   %[[Z:.*]] = arith.constant 0 : i32
+// CHECK-NEXT:   symref.update @a = %[[Z]] : i32
+// CHECK-NEXT:   %{{.*}} = arith.constant true
+// CHECK-NEXT:   scf.if %{{.*}} {
+// CHECK-NEXT:     %[[X:.*]] = symref.fetch @a : i32
+// CHECK-NEXT:     %[[Y:.*]] = arith.addi %[[X]], %[[X]] : i32
+// CHECK-NEXT:     symref.update @a = %[[Y]] : i32
+// CHECK-NEXT:   } else {
+// CHECK-NEXT:   }
+// CHECK-NEXT:   %[[R:.*]] = symref.fetch @a : i32
+// CHECK-NEXT:   %{{.*}} = arith.muli %[[R]], %[[R]] : i32
+// CHECK-NEXT: }
+builtin.module {
+  symref.declare "a"
+  %66 = arith.constant 0 : i32
+  symref.update @a = %66 : i32
+  %cond2 = arith.constant true
+  scf.if %cond2 {
+    %67 = symref.fetch @a : i32
+    %68 = arith.addi %67, %67 : i32
+    symref.update @a = %68 : i32
+  } else {
+  }
+  %69 = symref.fetch @a : i32
+  %70 = symref.fetch @a : i32
+  %71 = arith.muli %69, %70 : i32
+}
+
 // CHECK-NEXT: }
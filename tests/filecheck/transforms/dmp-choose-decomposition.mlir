@@ -0,0 +1,73 @@
+// RUN: xdsl-opt %s -p "dmp-choose-decomposition{ranks=8}" | filecheck %s
+// RUN: xdsl-opt %s -p "dmp-choose-decomposition{ranks=8 strategy=2d-grid}" | filecheck %s --check-prefix GRID2D
+// RUN: xdsl-opt %s -p "distribute-stencil{strategy=3d-grid slices=2,2,2},shape-inference" -t dmp-cost | filecheck %s --check-prefix COST
+// RUN: xdsl-opt %s -p "dmp-choose-decomposition{ranks=8 report=\"%t.json\"}" && filecheck %s --input-file %t.json --check-prefix REPORT
+// RUN: xdsl-opt %s -p "dmp-choose-decomposition{ranks=7}" --verify-diagnostics | filecheck %s --check-prefix INDIVISIBLE
+
+func.func @laplace(%in : !stencil.field<[-4,68]x[-4,68]x[-4,68]xf64>, %out : !stencil.field<[-4,68]x[-4,68]x[-4,68]xf64>) {
+  %t = stencil.load %in : !stencil.field<[-4,68]x[-4,68]x[-4,68]xf64> -> !stencil.temp<?x?x?xf64>
+  %r = stencil.apply(%a = %t : !stencil.temp<?x?x?xf64>) -> (!stencil.temp<?x?x?xf64>) {
+    %left = stencil.access %a[-1, 0, 0] : !stencil.temp<?x?x?xf64>
+    %right = stencil.access %a[1, 0, 0] : !stencil.temp<?x?x?xf64>
+    %up = stencil.access %a[0, 1, 0] : !stencil.temp<?x?x?xf64>
+    %down = stencil.access %a[0, -1, 0] : !stencil.temp<?x?x?xf64>
+    %0 = arith.addf %left, %right : f64
+    %1 = arith.addf %up, %down : f64
+    %2 = arith.addf %0, %1 : f64
+    stencil.return %2 : f64
+  }
+  stencil.store %r to %out(<[0, 0, 0], [64, 64, 64]>) : !stencil.temp<?x?x?xf64> to !stencil.field<[-4,68]x[-4,68]x[-4,68]xf64>
+  func.return
+}
+
+// Slicing along the dimension without accesses needs no halo exchanges
+
+// CHECK:      "dmp.swap"(%{{.*}}) {strategy = #dmp.grid_slice_3d<#dmp.topo<1x1x8>, false>, swaps = []}
+// CHECK:      stencil.store %{{.*}} to %{{.*}}(<[0, 0, 0], [64, 64, 8]>)
+
+// GRID2D:     "dmp.swap"(%{{.*}}) {strategy = #dmp.grid_slice_2d<#dmp.topo<2x4>, false>, swaps = []}
+// GRID2D:     stencil.store %{{.*}} to %{{.*}}(<[0, 0, 0], [32, 16, 64]>)
+
+// Each rank exchanges one face of 32x32 f64 in each of the first two dimensions
+
+// COST:       "topology": [
+// COST-NEXT:    2,
+// COST-NEXT:    2,
+// COST-NEXT:    2
+// COST-NEXT:  ],
+// COST-NEXT:  "compute_points": 32768,
+// COST-NEXT:  "messages": 2,
+// COST-NEXT:  "halo_bytes": 16384,
+// COST-NEXT:  "total_messages": 16,
+// COST-NEXT:  "total_halo_bytes": 131072,
+// COST-NEXT:  "compute_to_communication": 2.0,
+// COST-NEXT:  "ranks": [
+// COST-NEXT:    {
+// COST-NEXT:      "rank": 0,
+// COST-NEXT:      "coords": [
+// COST-NEXT:        0,
+// COST-NEXT:        0,
+// COST-NEXT:        0
+// COST-NEXT:      ],
+// COST-NEXT:      "messages": 2,
+// COST-NEXT:      "halo_bytes": 16384
+// COST-NEXT:    },
+
+// REPORT:       "topology": [
+// REPORT-NEXT:    1,
+// REPORT-NEXT:    1,
+// REPORT-NEXT:    8
+// REPORT-NEXT:  ],
+// REPORT-NEXT:  "compute_points": 32768,
+// REPORT-NEXT:  "messages": 0,
+// REPORT-NEXT:  "halo_bytes": 0,
+// REPORT:       "topology": [
+// REPORT-NEXT:    1,
+// REPORT-NEXT:    2,
+// REPORT-NEXT:    4
+// REPORT-NEXT:  ],
+// REPORT-NEXT:  "compute_points": 32768,
+// REPORT-NEXT:  "messages": 1,
+// REPORT-NEXT:  "halo_bytes": 8192,
+
+// INDIVISIBLE: No 3d-grid topology of 7 ranks evenly divides the stencil stores
@@ -0,0 +1,149 @@
+// RUN: xdsl-opt %s -p int-range-optimizations | filecheck %s
+
+// Comparisons whose result is known from the ranges of the operands are folded
+
+// CHECK:      func.func @cmpi(%arg0 : i8) -> i1 {
+// CHECK-NEXT:   %c0 = arith.constant 0 : i32
+// CHECK-NEXT:   %c300 = arith.constant 300 : i32
+// CHECK-NEXT:   %ext = arith.extui %arg0 : i8 to i32
+// CHECK-NEXT:   %lt = arith.constant true
+// CHECK-NEXT:   %ge = arith.constant true
+// CHECK-NEXT:   %both = arith.constant true
+// CHECK-NEXT:   func.return %both : i1
+// CHECK-NEXT: }
+func.func @cmpi(%arg0 : i8) -> i1 {
+  %c0 = arith.constant 0 : i32
+  %c300 = arith.constant 300 : i32
+  %ext = arith.extui %arg0 : i8 to i32
+  %lt = arith.cmpi slt, %ext, %c300 : i32
+  %ge = arith.cmpi sge, %ext, %c0 : i32
+  %both = arith.andi %lt, %ge : i1
+  func.return %both : i1
+}
+
+// The induction variable of loops is bounded by the bounds of the loop
+
+// CHECK:      func.func @loop_bounds(%m : memref<10xi32>) {
+// CHECK-NEXT:   %c0 = arith.constant 0 : index
+// CHECK-NEXT:   %c1 = arith.constant 1 : index
+// CHECK-NEXT:   %c10 = arith.constant 10 : index
+// CHECK-NEXT:   scf.for %i = %c0 to %c10 step %c1 {
+// CHECK-NEXT:     %in = arith.constant true
+// CHECK-NEXT:     scf.if %in {
+// CHECK-NEXT:       %v = arith.index_cast %i : index to i32
+// CHECK-NEXT:       memref.store %v, %m[%i] : memref<10xi32>
+// CHECK-NEXT:     }
+// CHECK-NEXT:   }
+// CHECK-NEXT:   func.return
+// CHECK-NEXT: }
+func.func @loop_bounds(%m : memref<10xi32>) {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %c10 = arith.constant 10 : index
+  scf.for %i = %c0 to %c10 step %c1 {
+    %in = arith.cmpi ult, %i, %c10 : index
+    scf.if %in {
+      %v = arith.index_cast %i : index to i32
+      memref.store %v, %m[%i] : memref<10xi32>
+    }
+  }
+  func.return
+}
+
+// CHECK:      func.func @rem(%arg0 : i32) -> i1 {
+// CHECK-NEXT:   %c4 = arith.constant 4 : i32
+// CHECK-NEXT:   %c15 = arith.constant 15 : i32
+// CHECK-NEXT:   %masked = arith.andi %arg0, %c15 : i32
+// CHECK-NEXT:   %rem = arith.remui %masked, %c4 : i32
+// CHECK-NEXT:   %small = arith.constant true
+// CHECK-NEXT:   func.return %small : i1
+// CHECK-NEXT: }
+func.func @rem(%arg0 : i32) -> i1 {
+  %c4 = arith.constant 4 : i32
+  %c15 = arith.constant 15 : i32
+  %masked = arith.andi %arg0, %c15 : i32
+  %rem = arith.remui %masked, %c4 : i32
+  %small = arith.cmpi sle, %rem, %c4 : i32
+  func.return %small : i1
+}
+
+// CHECK:      func.func @select(%cond : i1) -> i32 {
+// CHECK-NEXT:   %c1 = arith.constant 1 : i32
+// CHECK-NEXT:   %c2 = arith.constant 2 : i32
+// CHECK-NEXT:   %c5 = arith.constant 5 : i32
+// CHECK-NEXT:   %s = arith.select %cond, %c1, %c2 : i32
+// CHECK-NEXT:   %lt = arith.constant true
+// CHECK-NEXT:   %r = scf.if %lt -> (i32) {
+// CHECK-NEXT:     scf.yield %s : i32
+// CHECK-NEXT:   } else {
+// CHECK-NEXT:     scf.yield %c5 : i32
+// CHECK-NEXT:   }
+// CHECK-NEXT:   %m = arith.constant 2 : i32
+// CHECK-NEXT:   func.return %m : i32
+// CHECK-NEXT: }
+func.func @select(%cond : i1) -> i32 {
+  %c1 = arith.constant 1 : i32
+  %c2 = arith.constant 2 : i32
+  %c5 = arith.constant 5 : i32
+  %s = arith.select %cond, %c1, %c2 : i32
+  %lt = arith.cmpi slt, %s, %c5 : i32
+  %r = scf.if %lt -> (i32) {
+    scf.yield %s : i32
+  } else {
+    scf.yield %c5 : i32
+  }
+  %m = arith.maxsi %r, %c2 : i32
+  func.return %m : i32
+}
+
+// Ranges that may overflow are unknown
+
+// CHECK:      func.func @overflow(%arg0 : i8) -> i1 {
+// CHECK-NEXT:   %c100 = arith.constant 100 : i8
+// CHECK-NEXT:   %c0 = arith.constant 0 : i8
+// CHECK-NEXT:   %pos = arith.andi %arg0, %c100 : i8
+// CHECK-NEXT:   %sum = arith.addi %pos, %c100 : i8
+// CHECK-NEXT:   %ge = arith.cmpi sge, %sum, %c0 : i8
+// CHECK-NEXT:   func.return %ge : i1
+// CHECK-NEXT: }
+func.func @overflow(%arg0 : i8) -> i1 {
+  %c100 = arith.constant 100 : i8
+  %c0 = arith.constant 0 : i8
+  %pos = arith.andi %arg0, %c100 : i8
+  %sum = arith.addi %pos, %c100 : i8
+  %ge = arith.cmpi sge, %sum, %c0 : i8
+  func.return %ge : i1
+}
+
+// Ranges growing in loops are widened, so that the analysis terminates
+
+// CHECK:      func.func @cf_loop() -> i1 {
+// CHECK-NEXT:   %c0 = arith.constant 0 : i32
+// CHECK-NEXT:   %c1 = arith.constant 1 : i32
+// CHECK-NEXT:   %c10 = arith.constant 10 : i32
+// CHECK-NEXT:   cf.br ^0(%c0 : i32)
+// CHECK-NEXT: ^0(%i : i32):
+// CHECK-NEXT:   %cond = arith.cmpi slt, %i, %c10 : i32
+// CHECK-NEXT:   cf.cond_br %cond, ^1, ^2
+// CHECK-NEXT: ^1:
+// CHECK-NEXT:   %next = arith.addi %i, %c1 : i32
+// CHECK-NEXT:   cf.br ^0(%next : i32)
+// CHECK-NEXT: ^2:
+// CHECK-NEXT:   %nonneg = arith.cmpi sge, %i, %c0 : i32
+// CHECK-NEXT:   func.return %nonneg : i1
+// CHECK-NEXT: }
+func.func @cf_loop() -> i1 {
+  %c0 = arith.constant 0 : i32
+  %c1 = arith.constant 1 : i32
+  %c10 = arith.constant 10 : i32
+  cf.br ^head(%c0 : i32)
+^head(%i : i32):
+  %cond = arith.cmpi slt, %i, %c10 : i32
+  cf.cond_br %cond, ^body, ^exit
+^body:
+  %next = arith.addi %i, %c1 : i32
+  cf.br ^head(%next : i32)
+^exit:
+  %nonneg = arith.cmpi sge, %i, %c0 : i32
+  func.return %nonneg : i1
+}
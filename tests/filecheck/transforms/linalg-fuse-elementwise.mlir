@@ -0,0 +1,93 @@
+// RUN: xdsl-opt -p linalg-fuse-elementwise --split-input-file %s | filecheck %s
+// RUN: xdsl-opt -p "linalg-fuse-elementwise{tile_sizes=0,4}" --split-input-file %s | filecheck %s --check-prefix=TILE
+
+// Producers of tensors are fused, and their results are still returned if they are
+// used after the consumer.
+
+func.func @tensors(%X : tensor<8xf64>, %Y : tensor<8xf64>) -> (tensor<8xf64>, tensor<8xf64>) {
+  %e = tensor.empty() : tensor<8xf64>
+  %T = linalg.generic {indexing_maps = [affine_map<(d0) -> (d0)>, affine_map<(d0) -> (d0)>], iterator_types = ["parallel"]} ins(%X : tensor<8xf64>) outs(%e : tensor<8xf64>) {
+  ^0(%x : f64, %o : f64):
+    %s = arith.mulf %x, %x : f64
+    linalg.yield %s : f64
+  } -> tensor<8xf64>
+  %U = linalg.generic {indexing_maps = [affine_map<(d0) -> (d0)>, affine_map<(d0) -> (d0)>], iterator_types = ["parallel"]} ins(%T : tensor<8xf64>) outs(%e : tensor<8xf64>) {
+  ^0(%t : f64, %o : f64):
+    %s = arith.negf %t : f64
+    linalg.yield %s : f64
+  } -> tensor<8xf64>
+  %R = linalg.generic {indexing_maps = [affine_map<(d0) -> (d0)>, affine_map<(d0) -> (d0)>, affine_map<(d0) -> (d0)>], iterator_types = ["parallel"]} ins(%U, %Y : tensor<8xf64>, tensor<8xf64>) outs(%e : tensor<8xf64>) {
+  ^0(%u : f64, %y : f64, %o : f64):
+    %r = arith.addf %u, %y : f64
+    linalg.yield %r : f64
+  } -> tensor<8xf64>
+  func.return %R, %T : tensor<8xf64>, tensor<8xf64>
+}
+
+// CHECK:       func.func @tensors(%X : tensor<8xf64>, %Y : tensor<8xf64>) -> (tensor<8xf64>, tensor<8xf64>) {
+// CHECK-NEXT:    %e = tensor.empty() : tensor<8xf64>
+// CHECK-NEXT:    %R, %R_1 = linalg.generic {indexing_maps = [affine_map<(d0) -> (d0)>, affine_map<(d0) -> (d0)>, affine_map<(d0) -> (d0)>, affine_map<(d0) -> (d0)>], iterator_types = ["parallel"]} ins(%X, %Y : tensor<8xf64>, tensor<8xf64>) outs(%e, %e : tensor<8xf64>, tensor<8xf64>) {
+// CHECK-NEXT:    ^0(%x : f64, %y : f64, %o : f64, %o_1 : f64):
+// CHECK-NEXT:      %s = arith.mulf %x, %x : f64
+// CHECK-NEXT:      %s_1 = arith.negf %s : f64
+// CHECK-NEXT:      %r = arith.addf %s_1, %y : f64
+// CHECK-NEXT:      linalg.yield %r, %s : f64, f64
+// CHECK-NEXT:    } -> (tensor<8xf64>, tensor<8xf64>)
+// CHECK-NEXT:    func.return %R, %R_1 : tensor<8xf64>, tensor<8xf64>
+// CHECK-NEXT:  }
+
+// -----
+
+// The indexing maps of the producer are composed with the consumer's, here to read
+// a transposed buffer.
+
+func.func @buffers(%X : memref<2x8xf64>, %T : memref<8x2xf64>, %Z : memref<2x8xf64>) {
+  linalg.generic {indexing_maps = [affine_map<(d0, d1) -> (d0, d1)>, affine_map<(d0, d1) -> (d1, d0)>], iterator_types = ["parallel", "parallel"]} ins(%X : memref<2x8xf64>) outs(%T : memref<8x2xf64>) {
+  ^0(%x : f64, %o : f64):
+    %s = arith.negf %x : f64
+    linalg.yield %s : f64
+  }
+  linalg.generic {indexing_maps = [affine_map<(d0, d1) -> (d1, d0)>, affine_map<(d0, d1) -> (d0, d1)>, affine_map<(d0, d1) -> (d0, d1)>], iterator_types = ["parallel", "parallel"]} ins(%T, %X : memref<8x2xf64>, memref<2x8xf64>) outs(%Z : memref<2x8xf64>) {
+  ^0(%t : f64, %x : f64, %o : f64):
+    %r = arith.mulf %t, %x : f64
+    linalg.yield %r : f64
+  }
+  func.return
+}
+
+// CHECK:       func.func @buffers(%X : memref<2x8xf64>, %T : memref<8x2xf64>, %Z : memref<2x8xf64>) {
+// CHECK-NEXT:    linalg.generic {indexing_maps = [affine_map<(d0, d1) -> (d0, d1)>, affine_map<(d0, d1) -> (d0, d1)>, affine_map<(d0, d1) -> (d0, d1)>, affine_map<(d0, d1) -> (d1, d0)>], iterator_types = ["parallel", "parallel"]} ins(%X, %X : memref<2x8xf64>, memref<2x8xf64>) outs(%Z, %T : memref<2x8xf64>, memref<8x2xf64>) {
+// CHECK-NEXT:    ^0(%x : f64, %x_1 : f64, %o : f64, %o_1 : f64):
+// CHECK-NEXT:      %s = arith.negf %x : f64
+// CHECK-NEXT:      %r = arith.mulf %s, %x_1 : f64
+// CHECK-NEXT:      linalg.yield %r, %s : f64, f64
+// CHECK-NEXT:    }
+// CHECK-NEXT:    func.return
+// CHECK-NEXT:  }
+
+// TILE:       func.func @buffers(%X : memref<2x8xf64>, %T : memref<8x2xf64>, %Z : memref<2x8xf64>) {
+// TILE-NEXT:    %c0 = arith.constant 0 : index
+// TILE-NEXT:    %ub = arith.constant 8 : index
+// TILE-NEXT:    %step = arith.constant 4 : index
+// TILE-NEXT:    scf.for %i = %c0 to %ub step %step {
+// TILE-NEXT:      %X_offset = affine.apply affine_map<(d0, d1) -> (d0)> (%c0, %i)
+// TILE-NEXT:      %X_offset_1 = affine.apply affine_map<(d0, d1) -> (d1)> (%c0, %i)
+// TILE-NEXT:      %X_subview = memref.subview %X[%X_offset, %X_offset_1] [2, 4] [1, 1] : memref<2x8xf64> to memref<2x4xf64, strided<[8, 1], offset: ?>>
+// TILE-NEXT:      %X_offset_2 = affine.apply affine_map<(d0, d1) -> (d0)> (%c0, %i)
+// TILE-NEXT:      %X_offset_3 = affine.apply affine_map<(d0, d1) -> (d1)> (%c0, %i)
+// TILE-NEXT:      %X_subview_1 = memref.subview %X[%X_offset_2, %X_offset_3] [2, 4] [1, 1] : memref<2x8xf64> to memref<2x4xf64, strided<[8, 1], offset: ?>>
+// TILE-NEXT:      %Z_offset = affine.apply affine_map<(d0, d1) -> (d0)> (%c0, %i)
+// TILE-NEXT:      %Z_offset_1 = affine.apply affine_map<(d0, d1) -> (d1)> (%c0, %i)
+// TILE-NEXT:      %Z_subview = memref.subview %Z[%Z_offset, %Z_offset_1] [2, 4] [1, 1] : memref<2x8xf64> to memref<2x4xf64, strided<[8, 1], offset: ?>>
+// TILE-NEXT:      %T_offset = affine.apply affine_map<(d0, d1) -> (d1)> (%c0, %i)
+// TILE-NEXT:      %T_offset_1 = affine.apply affine_map<(d0, d1) -> (d0)> (%c0, %i)
+// TILE-NEXT:      %T_subview = memref.subview %T[%T_offset, %T_offset_1] [4, 2] [1, 1] : memref<8x2xf64> to memref<4x2xf64, strided<[2, 1], offset: ?>>
+// TILE-NEXT:      linalg.generic {indexing_maps = [affine_map<(d0, d1) -> (d0, d1)>, affine_map<(d0, d1) -> (d0, d1)>, affine_map<(d0, d1) -> (d0, d1)>, affine_map<(d0, d1) -> (d1, d0)>], iterator_types = ["parallel", "parallel"]} ins(%X_subview, %X_subview_1 : memref<2x4xf64, strided<[8, 1], offset: ?>>, memref<2x4xf64, strided<[8, 1], offset: ?>>) outs(%Z_subview, %T_subview : memref<2x4xf64, strided<[8, 1], offset: ?>>, memref<4x2xf64, strided<[2, 1], offset: ?>>) {
+// TILE-NEXT:      ^0(%x : f64, %x_1 : f64, %o : f64, %o_1 : f64):
+// TILE-NEXT:        %s = arith.negf %x : f64
+// TILE-NEXT:        %r = arith.mulf %s, %x_1 : f64
+// TILE-NEXT:        linalg.yield %r, %s : f64, f64
+// TILE-NEXT:      }
+// TILE-NEXT:    }
+// TILE-NEXT:    func.return
+// TILE-NEXT:  }
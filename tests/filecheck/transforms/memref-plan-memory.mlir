@@ -0,0 +1,166 @@
+// RUN: xdsl-opt %s -p memref-plan-memory --split-input-file | filecheck %s
+
+// Allocations whose lifetimes do not overlap share memory.
+
+func.func @reuse(%arg : memref<16xf32>) -> f32 {
+  %c0 = arith.constant 0 : index
+  %a = memref.alloc() : memref<16xf32>
+  "memref.copy"(%arg, %a) : (memref<16xf32>, memref<16xf32>) -> ()
+  %x = memref.load %a[%c0] : memref<16xf32>
+  memref.dealloc %a : memref<16xf32>
+  %b = memref.alloc() {alignment = 16 : i64} : memref<4x4xf32>
+  %c = memref.alloc() : memref<8xi32>
+  %cast = "memref.cast"(%c) : (memref<8xi32>) -> memref<?xi32>
+  memref.store %x, %b[%c0, %c0] : memref<4x4xf32>
+  memref.dealloc %b : memref<4x4xf32>
+  memref.dealloc %cast : memref<?xi32>
+  func.return %x : f32
+}
+
+// CHECK:       func.func @reuse(%arg : memref<16xf32>) -> f32 {
+// CHECK-NEXT:    %c0 = arith.constant 0 : index
+// CHECK-NEXT:    %0 = memref.alloc() {alignment = 16 : i64} : memref<96xi8>
+// CHECK-NEXT:    %1 = arith.constant 0 : index
+// CHECK-NEXT:    %a = memref.view %0[%1] [] : memref<96xi8> to memref<16xf32>
+// CHECK-NEXT:    "memref.copy"(%arg, %a) : (memref<16xf32>, memref<16xf32>) -> ()
+// CHECK-NEXT:    %x = memref.load %a[%c0] : memref<16xf32>
+// CHECK-NEXT:    %2 = arith.constant 0 : index
+// CHECK-NEXT:    %b = memref.view %0[%2] [] : memref<96xi8> to memref<4x4xf32>
+// CHECK-NEXT:    %3 = arith.constant 64 : index
+// CHECK-NEXT:    %c = memref.view %0[%3] [] : memref<96xi8> to memref<8xi32>
+// CHECK-NEXT:    %cast = "memref.cast"(%c) : (memref<8xi32>) -> memref<?xi32>
+// CHECK-NEXT:    memref.store %x, %b[%c0, %c0] : memref<4x4xf32>
+// CHECK-NEXT:    memref.dealloc %0 : memref<96xi8>
+// CHECK-NEXT:    func.return %x : f32
+// CHECK-NEXT:  }
+
+// -----
+
+// Uses in nested regions extend the lifetime to the whole operation, allocations in
+// different memory spaces are planned separately, and allocations that are never
+// freed leave the arena allocated.
+
+func.func @nested(%n : index) {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %a = memref.alloc() : memref<8xf64, 1 : i32>
+  %b = memref.alloc() : memref<8xf64, 2 : i32>
+  scf.for %i = %c0 to %n step %c1 {
+    %x = memref.load %a[%i] : memref<8xf64, 1 : i32>
+    memref.store %x, %b[%i] : memref<8xf64, 2 : i32>
+  }
+  %c = memref.alloc() : memref<4xf64, 1 : i32>
+  %d = memref.alloc() : memref<4xf64, 2 : i32>
+  "test.op"(%c, %d) : (memref<4xf64, 1 : i32>, memref<4xf64, 2 : i32>) -> ()
+  func.return
+}
+
+// CHECK:       func.func @nested(%n : index) {
+// CHECK-NEXT:    %c0 = arith.constant 0 : index
+// CHECK-NEXT:    %c1 = arith.constant 1 : index
+// CHECK-NEXT:    %0 = memref.alloc() : memref<64xi8, 1 : i32>
+// CHECK-NEXT:    %1 = arith.constant 0 : index
+// CHECK-NEXT:    %a = memref.view %0[%1] [] : memref<64xi8, 1 : i32> to memref<8xf64, 1 : i32>
+// CHECK-NEXT:    %2 = memref.alloc() : memref<64xi8, 2 : i32>
+// CHECK-NEXT:    %3 = arith.constant 0 : index
+// CHECK-NEXT:    %b = memref.view %2[%3] [] : memref<64xi8, 2 : i32> to memref<8xf64, 2 : i32>
+// CHECK-NEXT:    scf.for %i = %c0 to %n step %c1 {
+// CHECK-NEXT:      %x = memref.load %a[%i] : memref<8xf64, 1 : i32>
+// CHECK-NEXT:      memref.store %x, %b[%i] : memref<8xf64, 2 : i32>
+// CHECK-NEXT:    }
+// CHECK-NEXT:    %4 = arith.constant 0 : index
+// CHECK-NEXT:    %c = memref.view %0[%4] [] : memref<64xi8, 1 : i32> to memref<4xf64, 1 : i32>
+// CHECK-NEXT:    %5 = arith.constant 0 : index
+// CHECK-NEXT:    %d = memref.view %2[%5] [] : memref<64xi8, 2 : i32> to memref<4xf64, 2 : i32>
+// CHECK-NEXT:    "test.op"(%c, %d) : (memref<4xf64, 1 : i32>, memref<4xf64, 2 : i32>) -> ()
+// CHECK-NEXT:    func.return
+// CHECK-NEXT:  }
+
+// -----
+
+// Allocations that escape, are dynamically shaped, or are all live at once are left
+// untouched.
+
+func.func @untouched(%n : index) -> memref<8xf32> {
+  %a = memref.alloc() : memref<8xf32>
+  %b = memref.alloc(%n) : memref<?xf32>
+  %c = memref.alloc() : memref<8xf32>
+  %d = memref.alloc() : memref<8xf32>
+  "test.op"(%a, %b, %c, %d) : (memref<8xf32>, memref<?xf32>, memref<8xf32>, memref<8xf32>) -> ()
+  memref.dealloc %b : memref<?xf32>
+  memref.dealloc %c : memref<8xf32>
+  memref.dealloc %d : memref<8xf32>
+  func.return %a : memref<8xf32>
+}
+
+// CHECK:       func.func @untouched(%n : index) -> memref<8xf32> {
+// CHECK-NEXT:    %a = memref.alloc() : memref<8xf32>
+// CHECK-NEXT:    %b = memref.alloc(%n) : memref<?xf32>
+// CHECK-NEXT:    %c = memref.alloc() : memref<8xf32>
+// CHECK-NEXT:    %d = memref.alloc() : memref<8xf32>
+// CHECK-NEXT:    "test.op"(%a, %b, %c, %d) : (memref<8xf32>, memref<?xf32>, memref<8xf32>, memref<8xf32>) -> ()
+// CHECK-NEXT:    memref.dealloc %b : memref<?xf32>
+// CHECK-NEXT:    memref.dealloc %c : memref<8xf32>
+// CHECK-NEXT:    memref.dealloc %d : memref<8xf32>
+// CHECK-NEXT:    func.return %a : memref<8xf32>
+// CHECK-NEXT:  }
+
+// -----
+
+// Aliases through casts to unranked memrefs extend the lifetime, and allocations from
+// which values other than memrefs are derived, such as pointers, are not planned.
+
+func.func @captured() -> index {
+  %a = memref.alloc() : memref<16xf32>
+  %u = "memref.cast"(%a) : (memref<16xf32>) -> memref<*xf32>
+  %b = memref.alloc() : memref<16xf32>
+  "test.op"(%b) : (memref<16xf32>) -> ()
+  "test.op"(%u) : (memref<*xf32>) -> ()
+  %c = memref.alloc() : memref<16xf32>
+  %p = "memref.extract_aligned_pointer_as_index"(%c) : (memref<16xf32>) -> index
+  %d = memref.alloc() : memref<16xf32>
+  "test.op"(%p, %d) : (index, memref<16xf32>) -> ()
+  func.return %p : index
+}
+
+// CHECK:       func.func @captured() -> index {
+// CHECK-NEXT:    %0 = memref.alloc() : memref<128xi8>
+// CHECK-NEXT:    %1 = arith.constant 0 : index
+// CHECK-NEXT:    %a = memref.view %0[%1] [] : memref<128xi8> to memref<16xf32>
+// CHECK-NEXT:    %u = "memref.cast"(%a) : (memref<16xf32>) -> memref<*xf32>
+// CHECK-NEXT:    %2 = arith.constant 64 : index
+// CHECK-NEXT:    %b = memref.view %0[%2] [] : memref<128xi8> to memref<16xf32>
+// CHECK-NEXT:    "test.op"(%b) : (memref<16xf32>) -> ()
+// CHECK-NEXT:    "test.op"(%u) : (memref<*xf32>) -> ()
+// CHECK-NEXT:    %c = memref.alloc() : memref<16xf32>
+// CHECK-NEXT:    %p = "memref.extract_aligned_pointer_as_index"(%c) : (memref<16xf32>) -> index
+// CHECK-NEXT:    %3 = arith.constant 0 : index
+// CHECK-NEXT:    %d = memref.view %0[%3] [] : memref<128xi8> to memref<16xf32>
+// CHECK-NEXT:    "test.op"(%p, %d) : (index, memref<16xf32>) -> ()
+// CHECK-NEXT:    func.return %p : index
+// CHECK-NEXT:  }
+
+// -----
+
+// The arena is freed if any of its allocations was freed.
+
+func.func @partially_freed() {
+  %a = memref.alloc() : memref<8xf32>
+  "test.op"(%a) : (memref<8xf32>) -> ()
+  memref.dealloc %a : memref<8xf32>
+  %b = memref.alloc() : memref<8xf32>
+  "test.op"(%b) : (memref<8xf32>) -> ()
+  func.return
+}
+
+// CHECK:       func.func @partially_freed() {
+// CHECK-NEXT:    %0 = memref.alloc() : memref<32xi8>
+// CHECK-NEXT:    %1 = arith.constant 0 : index
+// CHECK-NEXT:    %a = memref.view %0[%1] [] : memref<32xi8> to memref<8xf32>
+// CHECK-NEXT:    "test.op"(%a) : (memref<8xf32>) -> ()
+// CHECK-NEXT:    %2 = arith.constant 0 : index
+// CHECK-NEXT:    %b = memref.view %0[%2] [] : memref<32xi8> to memref<8xf32>
+// CHECK-NEXT:    "test.op"(%b) : (memref<8xf32>) -> ()
+// CHECK-NEXT:    memref.dealloc %0 : memref<32xi8>
+// CHECK-NEXT:    func.return
+// CHECK-NEXT:  }
@@ -0,0 +1,210 @@
+// RUN: xdsl-opt -p memref-stream-fuse-elementwise --split-input-file %s | filecheck %s
+// RUN: xdsl-opt -p "memref-stream-fuse-elementwise{tile_sizes=2,0}" --split-input-file %s | filecheck %s --check-prefix=TILE
+
+// The temporary buffer between the two generics is removed, and the producer is
+// broadcast along the second dimension of the consumer.
+
+func.func @temporary(%X : memref<4xf64>, %Y : memref<4x8xf64>, %Z : memref<4x8xf64>) {
+  %T = memref.alloc() : memref<4xf64>
+  memref_stream.generic {
+    bounds = [4],
+    indexing_maps = [
+      affine_map<(d0) -> (d0)>,
+      affine_map<(d0) -> (d0)>
+    ],
+    iterator_types = ["parallel"]
+  } ins(%X : memref<4xf64>) outs(%T : memref<4xf64>) {
+  ^0(%x : f64, %t : f64):
+    %s = arith.mulf %x, %x : f64
+    memref_stream.yield %s : f64
+  }
+  %c = arith.constant 2.0 : f64
+  memref_stream.generic {
+    bounds = [4, 8],
+    indexing_maps = [
+      affine_map<(d0, d1) -> (d0)>,
+      affine_map<(d0, d1) -> (d0, d1)>,
+      affine_map<(d0, d1) -> (d0, d1)>
+    ],
+    iterator_types = ["parallel", "parallel"]
+  } ins(%T, %Y : memref<4xf64>, memref<4x8xf64>) outs(%Z : memref<4x8xf64>) {
+  ^0(%t : f64, %y : f64, %z : f64):
+    %p = arith.mulf %t, %y : f64
+    %r = arith.addf %p, %c : f64
+    memref_stream.yield %r : f64
+  }
+  memref.dealloc %T : memref<4xf64>
+  func.return
+}
+
+// CHECK:       func.func @temporary(%X : memref<4xf64>, %Y : memref<4x8xf64>, %Z : memref<4x8xf64>) {
+// CHECK-NEXT:    %c = arith.constant 2.000000e+00 : f64
+// CHECK-NEXT:    memref_stream.generic {
+// CHECK-NEXT:      bounds = [4, 8],
+// CHECK-NEXT:      indexing_maps = [
+// CHECK-NEXT:        affine_map<(d0, d1) -> (d0)>,
+// CHECK-NEXT:        affine_map<(d0, d1) -> (d0, d1)>,
+// CHECK-NEXT:        affine_map<(d0, d1) -> (d0, d1)>
+// CHECK-NEXT:      ],
+// CHECK-NEXT:      iterator_types = ["parallel", "parallel"]
+// CHECK-NEXT:    } ins(%X, %Y : memref<4xf64>, memref<4x8xf64>) outs(%Z : memref<4x8xf64>) {
+// CHECK-NEXT:    ^0(%x : f64, %y : f64, %z : f64):
+// CHECK-NEXT:      %s = arith.mulf %x, %x : f64
+// CHECK-NEXT:      %p = arith.mulf %s, %y : f64
+// CHECK-NEXT:      %r = arith.addf %p, %c : f64
+// CHECK-NEXT:      memref_stream.yield %r : f64
+// CHECK-NEXT:    }
+// CHECK-NEXT:    func.return
+// CHECK-NEXT:  }
+
+// TILE:       func.func @temporary(%X : memref<4xf64>, %Y : memref<4x8xf64>, %Z : memref<4x8xf64>) {
+// TILE-NEXT:    %c = arith.constant 2.000000e+00 : f64
+// TILE-NEXT:    %c0 = arith.constant 0 : index
+// TILE-NEXT:    %ub = arith.constant 4 : index
+// TILE-NEXT:    %step = arith.constant 2 : index
+// TILE-NEXT:    scf.for %i = %c0 to %ub step %step {
+// TILE-NEXT:      %X_offset = affine.apply affine_map<(d0, d1) -> (d0)> (%i, %c0)
+// TILE-NEXT:      %X_subview = memref.subview %X[%X_offset] [2] [1] : memref<4xf64> to memref<2xf64, strided<[1], offset: ?>>
+// TILE-NEXT:      %Y_offset = affine.apply affine_map<(d0, d1) -> (d0)> (%i, %c0)
+// TILE-NEXT:      %Y_offset_1 = affine.apply affine_map<(d0, d1) -> (d1)> (%i, %c0)
+// TILE-NEXT:      %Y_subview = memref.subview %Y[%Y_offset, %Y_offset_1] [2, 8] [1, 1] : memref<4x8xf64> to memref<2x8xf64, strided<[8, 1], offset: ?>>
+// TILE-NEXT:      %Z_offset = affine.apply affine_map<(d0, d1) -> (d0)> (%i, %c0)
+// TILE-NEXT:      %Z_offset_1 = affine.apply affine_map<(d0, d1) -> (d1)> (%i, %c0)
+// TILE-NEXT:      %Z_subview = memref.subview %Z[%Z_offset, %Z_offset_1] [2, 8] [1, 1] : memref<4x8xf64> to memref<2x8xf64, strided<[8, 1], offset: ?>>
+// TILE-NEXT:      memref_stream.generic {
+// TILE-NEXT:        bounds = [2, 8],
+// TILE-NEXT:        indexing_maps = [
+// TILE-NEXT:          affine_map<(d0, d1) -> (d0)>,
+// TILE-NEXT:          affine_map<(d0, d1) -> (d0, d1)>,
+// TILE-NEXT:          affine_map<(d0, d1) -> (d0, d1)>
+// TILE-NEXT:        ],
+// TILE-NEXT:        iterator_types = ["parallel", "parallel"]
+// TILE-NEXT:      } ins(%X_subview, %Y_subview : memref<2xf64, strided<[1], offset: ?>>, memref<2x8xf64, strided<[8, 1], offset: ?>>) outs(%Z_subview : memref<2x8xf64, strided<[8, 1], offset: ?>>) {
+// TILE-NEXT:      ^0(%x : f64, %y : f64, %z : f64):
+// TILE-NEXT:        %s = arith.mulf %x, %x : f64
+// TILE-NEXT:        %p = arith.mulf %s, %y : f64
+// TILE-NEXT:        %r = arith.addf %p, %c : f64
+// TILE-NEXT:        memref_stream.yield %r : f64
+// TILE-NEXT:      }
+// TILE-NEXT:    }
+// TILE-NEXT:    func.return
+// TILE-NEXT:  }
+
+// -----
+
+// The intermediate buffer is still written when it is not a temporary, and chains
+// are fused into a single generic.
+
+func.func @chain(%X : memref<8xf64>, %T : memref<8xf64>, %Z : memref<8xf64>) {
+  %U = memref.alloc() : memref<8xf64>
+  memref_stream.generic {
+    bounds = [8],
+    indexing_maps = [
+      affine_map<(d0) -> (d0)>,
+      affine_map<(d0) -> (d0)>
+    ],
+    iterator_types = ["parallel"]
+  } ins(%X : memref<8xf64>) outs(%T : memref<8xf64>) {
+  ^0(%x : f64, %t : f64):
+    %s = arith.negf %x : f64
+    memref_stream.yield %s : f64
+  }
+  memref_stream.generic {
+    bounds = [8],
+    indexing_maps = [
+      affine_map<(d0) -> (d0)>,
+      affine_map<(d0) -> (d0)>
+    ],
+    iterator_types = ["parallel"]
+  } ins(%T : memref<8xf64>) outs(%U : memref<8xf64>) {
+  ^0(%t : f64, %u : f64):
+    %s = arith.mulf %t, %t : f64
+    memref_stream.yield %s : f64
+  }
+  memref_stream.generic {
+    bounds = [8],
+    indexing_maps = [
+      affine_map<(d0) -> (d0)>,
+      affine_map<(d0) -> (d0)>,
+      affine_map<(d0) -> (d0)>
+    ],
+    iterator_types = ["parallel"]
+  } ins(%U, %X : memref<8xf64>, memref<8xf64>) outs(%Z : memref<8xf64>) {
+  ^0(%u : f64, %x : f64, %z : f64):
+    %s = arith.addf %u, %x : f64
+    memref_stream.yield %s : f64
+  }
+  func.return
+}
+
+// CHECK:       func.func @chain(%X : memref<8xf64>, %T : memref<8xf64>, %Z : memref<8xf64>) {
+// CHECK-NEXT:    memref_stream.generic {
+// CHECK-NEXT:      bounds = [8],
+// CHECK-NEXT:      indexing_maps = [
+// CHECK-NEXT:        affine_map<(d0) -> (d0)>,
+// CHECK-NEXT:        affine_map<(d0) -> (d0)>,
+// CHECK-NEXT:        affine_map<(d0) -> (d0)>,
+// CHECK-NEXT:        affine_map<(d0) -> (d0)>
+// CHECK-NEXT:      ],
+// CHECK-NEXT:      iterator_types = ["parallel"]
+// CHECK-NEXT:    } ins(%X, %X : memref<8xf64>, memref<8xf64>) outs(%Z, %T : memref<8xf64>, memref<8xf64>) {
+// CHECK-NEXT:    ^0(%x : f64, %x_1 : f64, %z : f64, %t : f64):
+// CHECK-NEXT:      %s = arith.negf %x : f64
+// CHECK-NEXT:      %s_1 = arith.mulf %s, %s : f64
+// CHECK-NEXT:      %s_2 = arith.addf %s_1, %x_1 : f64
+// CHECK-NEXT:      memref_stream.yield %s_2, %s : f64, f64
+// CHECK-NEXT:    }
+// CHECK-NEXT:    func.return
+// CHECK-NEXT:  }
+
+// -----
+
+// Generics separated by side effects, or consumed by reductions, are not fused.
+
+func.func @unfused(%X : memref<8xf64>, %T : memref<8xf64>, %Z : memref<f64>) {
+  memref_stream.generic {
+    bounds = [8],
+    indexing_maps = [
+      affine_map<(d0) -> (d0)>,
+      affine_map<(d0) -> (d0)>
+    ],
+    iterator_types = ["parallel"]
+  } ins(%X : memref<8xf64>) outs(%T : memref<8xf64>) {
+  ^0(%x : f64, %t : f64):
+    %s = arith.negf %x : f64
+    memref_stream.yield %s : f64
+  }
+  "test.op"(%X) : (memref<8xf64>) -> ()
+  memref_stream.generic {
+    bounds = [8],
+    indexing_maps = [
+      affine_map<(d0) -> (d0)>,
+      affine_map<(d0) -> (d0)>
+    ],
+    iterator_types = ["parallel"]
+  } ins(%T : memref<8xf64>) outs(%X : memref<8xf64>) {
+  ^0(%t : f64, %x : f64):
+    memref_stream.yield %t : f64
+  }
+  memref_stream.generic {
+    bounds = [8],
+    indexing_maps = [
+      affine_map<(d0) -> (d0)>,
+      affine_map<(d0) -> ()>
+    ],
+    iterator_types = ["reduction"]
+  } ins(%T : memref<8xf64>) outs(%Z : memref<f64>) {
+  ^0(%t : f64, %z : f64):
+    %s = arith.addf %t, %z : f64
+    memref_stream.yield %s : f64
+  }
+  func.return
+}
+
+// CHECK:       func.func @unfused(%X : memref<8xf64>, %T : memref<8xf64>, %Z : memref<f64>) {
+// CHECK-NEXT:    memref_stream.generic {
+// CHECK:         "test.op"(%X) : (memref<8xf64>) -> ()
+// CHECK-NEXT:    memref_stream.generic {
+// CHECK:         } ins(%T : memref<8xf64>) outs(%X : memref<8xf64>) {
+// CHECK:         memref_stream.generic {
+// CHECK:         } ins(%T : memref<8xf64>) outs(%Z : memref<f64>) {
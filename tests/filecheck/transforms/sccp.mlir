@@ -0,0 +1,172 @@
+// RUN: xdsl-opt %s -p sccp | filecheck %s
+
+// Values forwarded along the edges of branches that are not taken are ignored
+
+// CHECK:      func.func @cond_br(%arg0 : i32) -> i32 {
+// CHECK-NEXT:   %c1 = arith.constant 1 : i32
+// CHECK-NEXT:   %true = arith.constant true
+// CHECK-NEXT:   cf.cond_br %true, ^0(%c1 : i32), ^1(%arg0 : i32)
+// CHECK-NEXT: ^0(%x : i32):
+// CHECK-NEXT:   %x_1 = arith.constant 1 : i32
+// CHECK-NEXT:   %y = arith.constant 2 : i32
+// CHECK-NEXT:   cf.br ^2(%y : i32)
+// CHECK-NEXT: ^1(%z : i32):
+// CHECK-NEXT:   cf.br ^2(%z : i32)
+// CHECK-NEXT: ^2(%r : i32):
+// CHECK-NEXT:   %r_1 = arith.constant 2 : i32
+// CHECK-NEXT:   %s = arith.constant 4 : i32
+// CHECK-NEXT:   func.return %s : i32
+// CHECK-NEXT: }
+func.func @cond_br(%arg0 : i32) -> i32 {
+  %c1 = arith.constant 1 : i32
+  %true = arith.constant true
+  cf.cond_br %true, ^bb1(%c1 : i32), ^bb2(%arg0 : i32)
+^bb1(%x : i32):
+  %y = arith.addi %x, %c1 : i32
+  cf.br ^bb3(%y : i32)
+^bb2(%z : i32):
+  cf.br ^bb3(%z : i32)
+^bb3(%r : i32):
+  %s = arith.muli %r, %r : i32
+  func.return %s : i32
+}
+
+// CHECK:      func.func @switch(%arg0 : i32) -> i32 {
+// CHECK-NEXT:   %flag = arith.constant 1 : i32
+// CHECK-NEXT:   cf.switch %flag : i32, [
+// CHECK-NEXT:     default: ^0(%arg0 : i32),
+// CHECK-NEXT:     1: ^1
+// CHECK-NEXT:   ]
+// CHECK-NEXT: ^0(%x : i32):
+// CHECK-NEXT:   cf.br ^2(%x : i32)
+// CHECK-NEXT: ^1:
+// CHECK-NEXT:   cf.br ^2(%flag : i32)
+// CHECK-NEXT: ^2(%r : i32):
+// CHECK-NEXT:   %r_1 = arith.constant 1 : i32
+// CHECK-NEXT:   func.return %r_1 : i32
+// CHECK-NEXT: }
+func.func @switch(%arg0 : i32) -> i32 {
+  %flag = arith.constant 1 : i32
+  cf.switch %flag : i32, [
+    default: ^bb1(%arg0 : i32),
+    1: ^bb2
+  ]
+^bb1(%x : i32):
+  cf.br ^bb3(%x : i32)
+^bb2:
+  cf.br ^bb3(%flag : i32)
+^bb3(%r : i32):
+  func.return %r : i32
+}
+
+// Values that are constant through loop back edges are found
+
+// CHECK:      func.func @cf_loop(%n : i32) -> i32 {
+// CHECK-NEXT:   %c0 = arith.constant 0 : i32
+// CHECK-NEXT:   %c1 = arith.constant 1 : i32
+// CHECK-NEXT:   %c3 = arith.constant 3 : i32
+// CHECK-NEXT:   cf.br ^0(%c0, %c3 : i32, i32)
+// CHECK-NEXT: ^0(%i : i32, %acc : i32):
+// CHECK-NEXT:   %acc_1 = arith.constant 3 : i32
+// CHECK-NEXT:   %cond = arith.cmpi slt, %i, %n : i32
+// CHECK-NEXT:   cf.cond_br %cond, ^1, ^2
+// CHECK-NEXT: ^1:
+// CHECK-NEXT:   %next = arith.addi %i, %c1 : i32
+// CHECK-NEXT:   %acc_next = arith.constant 3 : i32
+// CHECK-NEXT:   cf.br ^0(%next, %acc_next : i32, i32)
+// CHECK-NEXT: ^2:
+// CHECK-NEXT:   func.return %acc_1 : i32
+// CHECK-NEXT: }
+func.func @cf_loop(%n : i32) -> i32 {
+  %c0 = arith.constant 0 : i32
+  %c1 = arith.constant 1 : i32
+  %c3 = arith.constant 3 : i32
+  cf.br ^head(%c0, %c3 : i32, i32)
+^head(%i : i32, %acc : i32):
+  %cond = arith.cmpi slt, %i, %n : i32
+  cf.cond_br %cond, ^body, ^exit
+^body:
+  %next = arith.addi %i, %c1 : i32
+  %acc_next = arith.muli %acc, %c1 : i32
+  cf.br ^head(%next, %acc_next : i32, i32)
+^exit:
+  func.return %acc : i32
+}
+
+// CHECK:      func.func @scf_for(%n : index) -> i32 {
+// CHECK-NEXT:   %c0 = arith.constant 0 : index
+// CHECK-NEXT:   %c1 = arith.constant 1 : index
+// CHECK-NEXT:   %c2 = arith.constant 2 : i32
+// CHECK-NEXT:   %r = arith.constant 2 : i32
+// CHECK-NEXT:   func.return %r : i32
+// CHECK-NEXT: }
+func.func @scf_for(%n : index) -> i32 {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %c2 = arith.constant 2 : i32
+  %r = scf.for %i = %c0 to %n step %c1 iter_args(%acc = %c2) -> (i32) {
+    %m = arith.muli %acc, %c2 : i32
+    %d = arith.subi %m, %c2 : i32
+    scf.yield %d : i32
+  }
+  func.return %r : i32
+}
+
+// CHECK:      func.func @scf_for_no_iterations(%arg0 : i32) -> i32 {
+// CHECK-NEXT:   %c0 = arith.constant 0 : index
+// CHECK-NEXT:   %c1 = arith.constant 1 : index
+// CHECK-NEXT:   %c2 = arith.constant 2 : i32
+// CHECK-NEXT:   %r = arith.constant 2 : i32
+// CHECK-NEXT:   func.return %r : i32
+// CHECK-NEXT: }
+func.func @scf_for_no_iterations(%arg0 : i32) -> i32 {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %c2 = arith.constant 2 : i32
+  %r = scf.for %i = %c1 to %c0 step %c1 iter_args(%acc = %c2) -> (i32) {
+    scf.yield %arg0 : i32
+  }
+  func.return %r : i32
+}
+
+// CHECK:      func.func @scf_if(%arg0 : i32) -> i32 {
+// CHECK-NEXT:   %false = arith.constant false
+// CHECK-NEXT:   %r = arith.constant 2 : i32
+// CHECK-NEXT:   func.return %r : i32
+// CHECK-NEXT: }
+func.func @scf_if(%arg0 : i32) -> i32 {
+  %false = arith.constant false
+  %r = scf.if %false -> (i32) {
+    scf.yield %arg0 : i32
+  } else {
+    %b = arith.constant 2 : i32
+    scf.yield %b : i32
+  }
+  func.return %r : i32
+}
+
+// Operations with side effects are not removed
+
+// CHECK:      func.func @side_effects(%arg0 : i1) -> i32 {
+// CHECK-NEXT:   %c1 = arith.constant 1 : i32
+// CHECK-NEXT:   %r = arith.constant 1 : i32
+// CHECK-NEXT:   %r_1 = scf.if %arg0 -> (i32) {
+// CHECK-NEXT:     func.call @effect() : () -> ()
+// CHECK-NEXT:     scf.yield %c1 : i32
+// CHECK-NEXT:   } else {
+// CHECK-NEXT:     scf.yield %c1 : i32
+// CHECK-NEXT:   }
+// CHECK-NEXT:   func.return %r : i32
+// CHECK-NEXT: }
+func.func @side_effects(%arg0 : i1) -> i32 {
+  %c1 = arith.constant 1 : i32
+  %r = scf.if %arg0 -> (i32) {
+    func.call @effect() : () -> ()
+    scf.yield %c1 : i32
+  } else {
+    scf.yield %c1 : i32
+  }
+  func.return %r : i32
+}
+
+func.func private @effect() -> ()
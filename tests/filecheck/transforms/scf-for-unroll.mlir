@@ -0,0 +1,214 @@
+// RUN: xdsl-opt -p "scf-for-unroll{factor=2}" --split-input-file %s | filecheck %s
+// RUN: xdsl-opt -p "scf-for-unroll{full=true}" --split-input-file %s | filecheck %s --check-prefix FULL
+// RUN: xdsl-opt -p "scf-for-unroll{factor=2 jam=true}" --split-input-file %s | filecheck %s --check-prefix JAM
+
+func.func @sum(%x : memref<?xf64>, %n : index, %init : f64) -> f64 {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %r = scf.for %i = %c0 to %n step %c1 iter_args(%acc = %init) -> (f64) {
+    %xi = memref.load %x[%i] : memref<?xf64>
+    %s = arith.addf %acc, %xi : f64
+    scf.yield %s : f64
+  }
+  func.return %r : f64
+}
+
+// CHECK:      func.func @sum(%x : memref<?xf64>, %n : index, %init : f64) -> f64 {
+// CHECK-NEXT:   %c0 = arith.constant 0 : index
+// CHECK-NEXT:   %c1 = arith.constant 1 : index
+// CHECK-NEXT:   %0 = arith.constant 2 : index
+// CHECK-NEXT:   %1 = arith.subi %n, %c0 : index
+// CHECK-NEXT:   %2 = arith.remsi %1, %0 : index
+// CHECK-NEXT:   %3 = arith.subi %n, %2 : index
+// CHECK-NEXT:   %4 = scf.for %i = %c0 to %3 step %0 iter_args(%acc = %init) -> (f64) {
+// CHECK-NEXT:     %5 = arith.constant 1 : index
+// CHECK-NEXT:     %6 = arith.addi %i, %5 : index
+// CHECK-NEXT:     %xi = memref.load %x[%i] : memref<?xf64>
+// CHECK-NEXT:     %s = arith.addf %acc, %xi : f64
+// CHECK-NEXT:     %xi_1 = memref.load %x[%6] : memref<?xf64>
+// CHECK-NEXT:     %s_1 = arith.addf %s, %xi_1 : f64
+// CHECK-NEXT:     scf.yield %s_1 : f64
+// CHECK-NEXT:   }
+// CHECK-NEXT:   %r = scf.for %i_1 = %3 to %n step %c1 iter_args(%acc_1 = %4) -> (f64) {
+// CHECK-NEXT:     %xi_2 = memref.load %x[%i_1] : memref<?xf64>
+// CHECK-NEXT:     %s_2 = arith.addf %acc_1, %xi_2 : f64
+// CHECK-NEXT:     scf.yield %s_2 : f64
+// CHECK-NEXT:   }
+// CHECK-NEXT:   func.return %r : f64
+// CHECK-NEXT: }
+
+// -----
+
+func.func @square(%x : memref<6xf64>) {
+  %c0 = arith.constant 0 : index
+  %c2 = arith.constant 2 : index
+  %c6 = arith.constant 6 : index
+  scf.for %i = %c0 to %c6 step %c2 {
+    %xi = memref.load %x[%i] : memref<6xf64>
+    %s = arith.mulf %xi, %xi : f64
+    memref.store %s, %x[%i] : memref<6xf64>
+  }
+  func.return
+}
+
+// CHECK:      func.func @square(%x : memref<6xf64>) {
+// CHECK-NEXT:   %c0 = arith.constant 0 : index
+// CHECK-NEXT:   %c2 = arith.constant 2 : index
+// CHECK-NEXT:   %c6 = arith.constant 6 : index
+// CHECK-NEXT:   %0 = arith.constant 4 : index
+// CHECK-NEXT:   %1 = arith.constant 4 : index
+// CHECK-NEXT:   scf.for %i = %c0 to %1 step %0 {
+// CHECK-NEXT:     %2 = arith.constant 2 : index
+// CHECK-NEXT:     %3 = arith.addi %i, %2 : index
+// CHECK-NEXT:     %xi = memref.load %x[%i] : memref<6xf64>
+// CHECK-NEXT:     %s = arith.mulf %xi, %xi : f64
+// CHECK-NEXT:     memref.store %s, %x[%i] : memref<6xf64>
+// CHECK-NEXT:     %xi_1 = memref.load %x[%3] : memref<6xf64>
+// CHECK-NEXT:     %s_1 = arith.mulf %xi_1, %xi_1 : f64
+// CHECK-NEXT:     memref.store %s_1, %x[%3] : memref<6xf64>
+// CHECK-NEXT:   }
+// CHECK-NEXT:   scf.for %i_1 = %1 to %c6 step %c2 {
+// CHECK-NEXT:     %xi_2 = memref.load %x[%i_1] : memref<6xf64>
+// CHECK-NEXT:     %s_2 = arith.mulf %xi_2, %xi_2 : f64
+// CHECK-NEXT:     memref.store %s_2, %x[%i_1] : memref<6xf64>
+// CHECK-NEXT:   }
+// CHECK-NEXT:   func.return
+// CHECK-NEXT: }
+
+// FULL:      func.func @square(%x : memref<6xf64>) {
+// FULL-NEXT:   %c0 = arith.constant 0 : index
+// FULL-NEXT:   %c2 = arith.constant 2 : index
+// FULL-NEXT:   %c6 = arith.constant 6 : index
+// FULL-NEXT:   %0 = arith.constant 2 : index
+// FULL-NEXT:   %1 = arith.constant 4 : index
+// FULL-NEXT:   %xi = memref.load %x[%c0] : memref<6xf64>
+// FULL-NEXT:   %s = arith.mulf %xi, %xi : f64
+// FULL-NEXT:   memref.store %s, %x[%c0] : memref<6xf64>
+// FULL-NEXT:   %xi_1 = memref.load %x[%0] : memref<6xf64>
+// FULL-NEXT:   %s_1 = arith.mulf %xi_1, %xi_1 : f64
+// FULL-NEXT:   memref.store %s_1, %x[%0] : memref<6xf64>
+// FULL-NEXT:   %xi_2 = memref.load %x[%1] : memref<6xf64>
+// FULL-NEXT:   %s_2 = arith.mulf %xi_2, %xi_2 : f64
+// FULL-NEXT:   memref.store %s_2, %x[%1] : memref<6xf64>
+// FULL-NEXT:   func.return
+// FULL-NEXT: }
+
+// -----
+
+func.func @matvec(%a : memref<2x8xf64>, %x : memref<8xf64>, %y : memref<2xf64>) {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %c2 = arith.constant 2 : index
+  %c8 = arith.constant 8 : index
+  scf.for %i = %c0 to %c2 step %c1 {
+    %init = memref.load %y[%i] : memref<2xf64>
+    %r = scf.for %j = %c0 to %c8 step %c1 iter_args(%acc = %init) -> (f64) {
+      %aij = memref.load %a[%i, %j] : memref<2x8xf64>
+      %xj = memref.load %x[%j] : memref<8xf64>
+      %p = arith.mulf %aij, %xj : f64
+      %s = arith.addf %acc, %p : f64
+      scf.yield %s : f64
+    }
+    memref.store %r, %y[%i] : memref<2xf64>
+  }
+  func.return
+}
+
+// JAM:      func.func @matvec(%a : memref<2x8xf64>, %x : memref<8xf64>, %y : memref<2xf64>) {
+// JAM-NEXT:   %c0 = arith.constant 0 : index
+// JAM-NEXT:   %c1 = arith.constant 1 : index
+// JAM-NEXT:   %c2 = arith.constant 2 : index
+// JAM-NEXT:   %c8 = arith.constant 8 : index
+// JAM-NEXT:   %0 = arith.constant 1 : index
+// JAM-NEXT:   %init = memref.load %y[%c0] : memref<2xf64>
+// JAM-NEXT:   %init_1 = memref.load %y[%0] : memref<2xf64>
+// JAM-NEXT:   %r, %r_1 = scf.for %j = %c0 to %c8 step %c1 iter_args(%acc = %init, %acc_1 = %init_1) -> (f64, f64) {
+// JAM-NEXT:     %aij = memref.load %a[%c0, %j] : memref<2x8xf64>
+// JAM-NEXT:     %xj = memref.load %x[%j] : memref<8xf64>
+// JAM-NEXT:     %p = arith.mulf %aij, %xj : f64
+// JAM-NEXT:     %s = arith.addf %acc, %p : f64
+// JAM-NEXT:     %aij_1 = memref.load %a[%0, %j] : memref<2x8xf64>
+// JAM-NEXT:     %xj_1 = memref.load %x[%j] : memref<8xf64>
+// JAM-NEXT:     %p_1 = arith.mulf %aij_1, %xj_1 : f64
+// JAM-NEXT:     %s_1 = arith.addf %acc_1, %p_1 : f64
+// JAM-NEXT:     scf.yield %s, %s_1 : f64, f64
+// JAM-NEXT:   }
+// JAM-NEXT:   memref.store %r, %y[%c0] : memref<2xf64>
+// JAM-NEXT:   memref.store %r_1, %y[%0] : memref<2xf64>
+// JAM-NEXT:   func.return
+// JAM-NEXT: }
+
+// -----
+
+// The outer loop cannot be jammed, as all its iterations store to the same element
+
+func.func @not_jammed(%a : memref<2x8xf64>, %y : memref<2xf64>) {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %c2 = arith.constant 2 : index
+  %c8 = arith.constant 8 : index
+  scf.for %i = %c0 to %c2 step %c1 {
+    scf.for %j = %c0 to %c8 step %c1 {
+      %aij = memref.load %a[%i, %j] : memref<2x8xf64>
+      memref.store %aij, %y[%c0] : memref<2xf64>
+    }
+  }
+  func.return
+}
+
+// JAM:      func.func @not_jammed(%a : memref<2x8xf64>, %y : memref<2xf64>) {
+// JAM-NEXT:   %c0 = arith.constant 0 : index
+// JAM-NEXT:   %c1 = arith.constant 1 : index
+// JAM-NEXT:   %c2 = arith.constant 2 : index
+// JAM-NEXT:   %c8 = arith.constant 8 : index
+// JAM-NEXT:   scf.for %i = %c0 to %c2 step %c1 {
+// JAM-NEXT:     scf.for %j = %c0 to %c8 step %c1 {
+// JAM-NEXT:       %aij = memref.load %a[%i, %j] : memref<2x8xf64>
+// JAM-NEXT:       memref.store %aij, %y[%c0] : memref<2xf64>
+// JAM-NEXT:     }
+// JAM-NEXT:   }
+// JAM-NEXT:   func.return
+// JAM-NEXT: }
+
+// -----
+
+// Constants of the unrolled loop have the type of its induction variable
+
+func.func @sum_i32(%x : memref<?xf64>, %n : i32, %init : f64) -> f64 {
+  %c0 = arith.constant 0 : i32
+  %c1 = arith.constant 1 : i32
+  %r = scf.for %i = %c0 to %n step %c1 iter_args(%acc = %init) -> (f64) : i32 {
+    %j = arith.index_cast %i : i32 to index
+    %xi = memref.load %x[%j] : memref<?xf64>
+    %s = arith.addf %acc, %xi : f64
+    scf.yield %s : f64
+  }
+  func.return %r : f64
+}
+
+// CHECK:      func.func @sum_i32(%x : memref<?xf64>, %n : i32, %init : f64) -> f64 {
+// CHECK-NEXT:   %c0 = arith.constant 0 : i32
+// CHECK-NEXT:   %c1 = arith.constant 1 : i32
+// CHECK-NEXT:   %0 = arith.constant 2 : i32
+// CHECK-NEXT:   %1 = arith.subi %n, %c0 : i32
+// CHECK-NEXT:   %2 = arith.remsi %1, %0 : i32
+// CHECK-NEXT:   %3 = arith.subi %n, %2 : i32
+// CHECK-NEXT:   %4 = scf.for %i = %c0 to %3 step %0 iter_args(%acc = %init) -> (f64)  : i32 {
+// CHECK-NEXT:     %5 = arith.constant 1 : i32
+// CHECK-NEXT:     %6 = arith.addi %i, %5 : i32
+// CHECK-NEXT:     %j = arith.index_cast %i : i32 to index
+// CHECK-NEXT:     %xi = memref.load %x[%j] : memref<?xf64>
+// CHECK-NEXT:     %s = arith.addf %acc, %xi : f64
+// CHECK-NEXT:     %j_1 = arith.index_cast %6 : i32 to index
+// CHECK-NEXT:     %xi_1 = memref.load %x[%j_1] : memref<?xf64>
+// CHECK-NEXT:     %s_1 = arith.addf %s, %xi_1 : f64
+// CHECK-NEXT:     scf.yield %s_1 : f64
+// CHECK-NEXT:   }
+// CHECK-NEXT:   %r = scf.for %i_1 = %3 to %n step %c1 iter_args(%acc_1 = %4) -> (f64)  : i32 {
+// CHECK-NEXT:     %j_2 = arith.index_cast %i_1 : i32 to index
+// CHECK-NEXT:     %xi_2 = memref.load %x[%j_2] : memref<?xf64>
+// CHECK-NEXT:     %s_2 = arith.addf %acc_1, %xi_2 : f64
+// CHECK-NEXT:     scf.yield %s_2 : f64
+// CHECK-NEXT:   }
+// CHECK-NEXT:   func.return %r : f64
+// CHECK-NEXT: }
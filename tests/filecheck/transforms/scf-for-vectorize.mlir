@@ -0,0 +1,191 @@
+// RUN: xdsl-opt -p scf-for-vectorize --split-input-file %s | filecheck %s
+
+func.func @axpy(%a : f32, %x : memref<10xf32>, %y : memref<10xf32>) {
+  %c0 = arith.constant 0 : index
+  %c10 = arith.constant 10 : index
+  %c1 = arith.constant 1 : index
+  scf.for %i = %c0 to %c10 step %c1 {
+    %xi = memref.load %x[%i] : memref<10xf32>
+    %yi = memref.load %y[%i] : memref<10xf32>
+    %m = arith.mulf %a, %xi fastmath<contract> : f32
+    %s = arith.addf %m, %yi fastmath<contract> : f32
+    memref.store %s, %y[%i] : memref<10xf32>
+  }
+  func.return
+}
+
+// CHECK:      func.func @axpy(%a : f32, %x : memref<10xf32>, %y : memref<10xf32>) {
+// CHECK-NEXT:   %c0 = arith.constant 0 : index
+// CHECK-NEXT:   %c10 = arith.constant 10 : index
+// CHECK-NEXT:   %c1 = arith.constant 1 : index
+// CHECK-NEXT:   %0 = arith.constant 4 : index
+// CHECK-NEXT:   %1 = arith.constant 8 : index
+// CHECK-NEXT:   %2 = vector.broadcast %a : f32 to vector<4xf32>
+// CHECK-NEXT:   scf.for %i = %c0 to %1 step %0 {
+// CHECK-NEXT:     %3 = vector.load %x[%i] : memref<10xf32>, vector<4xf32>
+// CHECK-NEXT:     %4 = vector.load %y[%i] : memref<10xf32>, vector<4xf32>
+// CHECK-NEXT:     %5 = vector.fma %2, %3, %4 : vector<4xf32>
+// CHECK-NEXT:     vector.store %5, %y[%i] : memref<10xf32>, vector<4xf32>
+// CHECK-NEXT:   }
+// CHECK-NEXT:   scf.for %i_1 = %1 to %c10 step %c1 {
+// CHECK-NEXT:     %xi = memref.load %x[%i_1] : memref<10xf32>
+// CHECK-NEXT:     %yi = memref.load %y[%i_1] : memref<10xf32>
+// CHECK-NEXT:     %m = arith.mulf %a, %xi fastmath<contract> : f32
+// CHECK-NEXT:     %s = arith.addf %m, %yi fastmath<contract> : f32
+// CHECK-NEXT:     memref.store %s, %y[%i_1] : memref<10xf32>
+// CHECK-NEXT:   }
+// CHECK-NEXT:   func.return
+// CHECK-NEXT: }
+
+// -----
+
+func.func @shifted(%x : memref<4x9xi32>, %y : memref<4x8xi32>, %j : index) {
+  %c0 = arith.constant 0 : index
+  %c8 = arith.constant 8 : index
+  %c1 = arith.constant 1 : index
+  %c2 = arith.constant 2 : i32
+  scf.for %i = %c0 to %c8 step %c1 {
+    %k = arith.addi %i, %c1 : index
+    %xk = memref.load %x[%j, %k] : memref<4x9xi32>
+    %xj = memref.load %x[%j, %c0] : memref<4x9xi32>
+    %d = arith.subi %xk, %xj : i32
+    %s = arith.muli %d, %c2 : i32
+    memref.store %s, %y[%j, %i] : memref<4x8xi32>
+  }
+  func.return
+}
+
+// The scalar loop is removed if the trip count is a multiple of the vector width
+
+// CHECK:      func.func @shifted(%x : memref<4x9xi32>, %y : memref<4x8xi32>, %j : index) {
+// CHECK-NEXT:   %c0 = arith.constant 0 : index
+// CHECK-NEXT:   %c8 = arith.constant 8 : index
+// CHECK-NEXT:   %c1 = arith.constant 1 : index
+// CHECK-NEXT:   %c2 = arith.constant 2 : i32
+// CHECK-NEXT:   %0 = arith.constant 4 : index
+// CHECK-NEXT:   %1 = arith.constant 8 : index
+// CHECK-NEXT:   %2 = vector.broadcast %c2 : i32 to vector<4xi32>
+// CHECK-NEXT:   scf.for %i = %c0 to %1 step %0 {
+// CHECK-NEXT:     %k = arith.addi %i, %c1 : index
+// CHECK-NEXT:     %3 = vector.load %x[%j, %k] : memref<4x9xi32>, vector<4xi32>
+// CHECK-NEXT:     %xj = memref.load %x[%j, %c0] : memref<4x9xi32>
+// CHECK-NEXT:     %4 = vector.broadcast %xj : i32 to vector<4xi32>
+// CHECK-NEXT:     %5 = arith.subi %3, %4 : vector<4xi32>
+// CHECK-NEXT:     %6 = arith.muli %5, %2 : vector<4xi32>
+// CHECK-NEXT:     vector.store %6, %y[%j, %i] : memref<4x8xi32>, vector<4xi32>
+// CHECK-NEXT:   }
+// CHECK-NEXT:   func.return
+// CHECK-NEXT: }
+
+// -----
+
+func.func @sum(%x : memref<?xf64>, %n : index, %init : f64) -> f64 {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %r = scf.for %i = %c0 to %n step %c1 iter_args(%acc = %init) -> (f64) {
+    %xi = memref.load %x[%i] : memref<?xf64>
+    %s = arith.addf %acc, %xi fastmath<reassoc> : f64
+    scf.yield %s : f64
+  }
+  func.return %r : f64
+}
+
+// CHECK:      func.func @sum(%x : memref<?xf64>, %n : index, %init : f64) -> f64 {
+// CHECK-NEXT:   %c0 = arith.constant 0 : index
+// CHECK-NEXT:   %c1 = arith.constant 1 : index
+// CHECK-NEXT:   %0 = arith.constant 4 : index
+// CHECK-NEXT:   %1 = arith.subi %n, %c0 : index
+// CHECK-NEXT:   %2 = arith.remsi %1, %0 : index
+// CHECK-NEXT:   %3 = arith.subi %n, %2 : index
+// CHECK-NEXT:   %4 = arith.constant 0.000000e+00 : f64
+// CHECK-NEXT:   %5 = vector.broadcast %4 : f64 to vector<4xf64>
+// CHECK-NEXT:   %6 = scf.for %i = %c0 to %3 step %0 iter_args(%acc = %5) -> (vector<4xf64>) {
+// CHECK-NEXT:     %7 = vector.load %x[%i] : memref<?xf64>, vector<4xf64>
+// CHECK-NEXT:     %8 = arith.addf %acc, %7 fastmath<reassoc> : vector<4xf64>
+// CHECK-NEXT:     scf.yield %8 : vector<4xf64>
+// CHECK-NEXT:   }
+// CHECK-NEXT:   %9 = arith.constant 0 : index
+// CHECK-NEXT:   %10 = "vector.extractelement"(%6, %9) : (vector<4xf64>, index) -> f64
+// CHECK-NEXT:   %11 = arith.addf %init, %10 fastmath<reassoc> : f64
+// CHECK-NEXT:   %12 = arith.constant 1 : index
+// CHECK-NEXT:   %13 = "vector.extractelement"(%6, %12) : (vector<4xf64>, index) -> f64
+// CHECK-NEXT:   %14 = arith.addf %11, %13 fastmath<reassoc> : f64
+// CHECK-NEXT:   %15 = arith.constant 2 : index
+// CHECK-NEXT:   %16 = "vector.extractelement"(%6, %15) : (vector<4xf64>, index) -> f64
+// CHECK-NEXT:   %17 = arith.addf %14, %16 fastmath<reassoc> : f64
+// CHECK-NEXT:   %18 = arith.constant 3 : index
+// CHECK-NEXT:   %19 = "vector.extractelement"(%6, %18) : (vector<4xf64>, index) -> f64
+// CHECK-NEXT:   %20 = arith.addf %17, %19 fastmath<reassoc> : f64
+// CHECK-NEXT:   %r = scf.for %i_1 = %3 to %n step %c1 iter_args(%acc_1 = %20) -> (f64) {
+// CHECK-NEXT:     %xi = memref.load %x[%i_1] : memref<?xf64>
+// CHECK-NEXT:     %s = arith.addf %acc_1, %xi fastmath<reassoc> : f64
+// CHECK-NEXT:     scf.yield %s : f64
+// CHECK-NEXT:   }
+// CHECK-NEXT:   func.return %r : f64
+// CHECK-NEXT: }
+
+// -----
+
+func.func @not_vectorized(%x : memref<8x8xf32>, %n : index, %init : f32) -> f32 {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %c2 = arith.constant 2 : index
+  %c3 = arith.constant 3 : index
+  %c8 = arith.constant 8 : index
+  // Floating-point reductions need the reassoc flag
+  %r = scf.for %i = %c0 to %n step %c1 iter_args(%acc = %init) -> (f32) {
+    %xi = memref.load %x[%c0, %i] : memref<8x8xf32>
+    %s = arith.addf %acc, %xi : f32
+    scf.yield %s : f32
+  }
+  // Loop-carried dependence through memory
+  scf.for %i = %c1 to %c8 step %c1 {
+    %k = arith.subi %i, %c1 : index
+    %xk = memref.load %x[%c0, %k] : memref<8x8xf32>
+    memref.store %xk, %x[%c0, %i] : memref<8x8xf32>
+  }
+  // Strided accesses
+  scf.for %i = %c0 to %c8 step %c1 {
+    %xi = memref.load %x[%i, %c0] : memref<8x8xf32>
+    memref.store %xi, %x[%i, %c1] : memref<8x8xf32>
+  }
+  // Fewer iterations than lanes
+  scf.for %i = %c0 to %c3 step %c1 {
+    %xi = memref.load %x[%c1, %i] : memref<8x8xf32>
+    memref.store %xi, %x[%c2, %i] : memref<8x8xf32>
+  }
+  // Non-unit step
+  scf.for %i = %c0 to %c8 step %c2 {
+    %xi = memref.load %x[%c1, %i] : memref<8x8xf32>
+    memref.store %xi, %x[%c2, %i] : memref<8x8xf32>
+  }
+  func.return %r : f32
+}
+
+// CHECK:      func.func @not_vectorized(%x : memref<8x8xf32>, %n : index, %init : f32) -> f32 {
+// CHECK-NOT:    vector.
+// CHECK:        func.return %r : f32
+
+// -----
+
+// Loops over integers other than indices are not vectorized
+
+func.func @count(%n : i32, %v : i32) -> i32 {
+  %c0 = arith.constant 0 : i32
+  %c1 = arith.constant 1 : i32
+  %r = scf.for %i = %c0 to %n step %c1 iter_args(%acc = %c0) -> (i32) : i32 {
+    %s = arith.addi %acc, %v : i32
+    scf.yield %s : i32
+  }
+  func.return %r : i32
+}
+
+// CHECK:      func.func @count(%n : i32, %v : i32) -> i32 {
+// CHECK-NEXT:   %c0 = arith.constant 0 : i32
+// CHECK-NEXT:   %c1 = arith.constant 1 : i32
+// CHECK-NEXT:   %r = scf.for %i = %c0 to %n step %c1 iter_args(%acc = %c0) -> (i32)  : i32 {
+// CHECK-NEXT:     %s = arith.addi %acc, %v : i32
+// CHECK-NEXT:     scf.yield %s : i32
+// CHECK-NEXT:   }
+// CHECK-NEXT:   func.return %r : i32
+// CHECK-NEXT: }
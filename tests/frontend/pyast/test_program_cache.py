@@ -0,0 +1,123 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+from xdsl.dialects.bigint import BigIntegerType
+from xdsl.frontend.pyast.cache import ProgramCache, program_key
+from xdsl.frontend.pyast.code_generation import CodeGeneration
+from xdsl.frontend.pyast.context import CodeContext
+from xdsl.frontend.pyast.dialects.builtin import i32, i64
+from xdsl.frontend.pyast.program import FrontendProgram
+
+
+@pytest.fixture
+def codegen_runs(monkeypatch: pytest.MonkeyPatch) -> list[None]:
+    """Records each run of code generation."""
+    runs: list[None] = []
+    run = CodeGeneration.run_with_type_converter
+
+    def counting_run(*args: object, **kwargs: object):
+        runs.append(None)
+        return run(*args, **kwargs)  # pyright: ignore[reportArgumentType]
+
+    monkeypatch.setattr(CodeGeneration, "run_with_type_converter", counting_run)
+    return runs
+
+
+def add_program(cache: ProgramCache | None) -> FrontendProgram:
+    p = FrontendProgram(cache=cache)
+    with CodeContext(p):
+
+        def add(a: i32, b: i32) -> i32:
+            return a + b
+
+    return p
+
+
+def test_in_memory_hit(codegen_runs: list[None]):
+    cache = ProgramCache()
+    first = add_program(cache)
+    first.compile()
+    second = add_program(cache)
+    second.compile()
+
+    assert len(codegen_runs) == 1
+    assert first.textual_format() == second.textual_format()
+    # Hits are copies of the cached module
+    assert first.xdsl_program is not second.xdsl_program
+
+
+def test_desymref_is_part_of_key(codegen_runs: list[None]):
+    cache = ProgramCache()
+    add_program(cache).compile()
+    p = add_program(cache)
+    p.compile(desymref=False)
+
+    assert len(codegen_runs) == 2
+    assert "symref" in p.textual_format()
+
+
+def test_source_and_types_are_part_of_key(codegen_runs: list[None]):
+    cache = ProgramCache()
+    add_program(cache).compile()
+
+    p = FrontendProgram(cache=cache)
+    with CodeContext(p):
+
+        def add(a: i64, b: i64) -> i64:
+            return a + b
+
+    p.compile()
+    assert "i64" in p.textual_format()
+
+    q = FrontendProgram(cache=cache)
+    q.register_type(int, BigIntegerType)
+    with CodeContext(q):
+
+        def add(a: i32, b: i32) -> i32:
+            return a + b
+
+    q.compile()
+    assert len(codegen_runs) == 3
+
+
+def test_redefined_globals_are_part_of_key():
+    stmts = ast.parse("helper()").body
+
+    def helper() -> int:
+        return 0
+
+    def redefined_helper() -> int:
+        return 1
+
+    # As if `helper` was redefined, with the same qualified name but another source
+    redefined_helper.__qualname__ = helper.__qualname__
+    first = program_key(stmts, {"helper": helper}, {}, True)
+    assert program_key(stmts, {"helper": redefined_helper}, {}, True) != first
+    assert program_key(stmts, {"helper": helper}, {}, True) == first
+
+
+def test_lru_eviction(codegen_runs: list[None]):
+    cache = ProgramCache(max_entries=1)
+    add_program(cache).compile()
+    add_program(cache).compile(desymref=False)
+    add_program(cache).compile()
+    assert len(codegen_runs) == 3
+
+
+def test_disk_cache(tmp_path: Path, codegen_runs: list[None]):
+    first = add_program(ProgramCache(directory=str(tmp_path)))
+    first.compile()
+    # A fresh cache, as in another process, finds the module on disk
+    second = add_program(ProgramCache(directory=str(tmp_path)))
+    second.compile()
+
+    assert len(codegen_runs) == 1
+    assert first.textual_format() == second.textual_format()
+
+
+def test_no_cache(codegen_runs: list[None]):
+    add_program(None).compile()
+    add_program(None).compile()
+    assert len(codegen_runs) == 2
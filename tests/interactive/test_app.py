@@ -270,6 +270,8 @@ builtin.module {
         # press "Condense" button
         await pilot.click("#condense_button")
 
+        # wait for the condensed pass list to be computed in the background
+        await app.workers.wait_for_complete()
         await pilot.pause()
         # assert after "Condense Button" is clicked that the state and condensed_pass list change accordingly
         assert app.condense_mode is True
@@ -322,6 +324,8 @@ async def test_rewrites():
             ),
         )
 
+        # wait for the condensed pass list to be computed in the background
+        await app.workers.wait_for_complete()
         await pilot.pause()
         # assert after "Condense Button" is clicked that the state and get_condensed_pass list change accordingly
         assert app.condense_mode is True
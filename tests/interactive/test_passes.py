@@ -0,0 +1,78 @@
+from typing import ClassVar
+
+from xdsl.context import Context
+from xdsl.dialects.builtin import ModuleOp, StringAttr
+from xdsl.dialects.test import TestOp
+from xdsl.interactive.passes import (
+    AvailablePass,
+    CondensedPassCache,
+    iter_condensed_passes,
+)
+from xdsl.passes import ModulePass
+
+
+class CountingPass(ModulePass):
+    """Renames the key of test ops to "b", and counts how often it was applied."""
+
+    name = "counting"
+
+    applications: ClassVar[int] = 0
+
+    def apply(self, ctx: Context, op: ModuleOp) -> None:
+        CountingPass.applications += 1
+        for o in op.walk():
+            if isinstance(o, TestOp):
+                o.attributes["key"] = StringAttr("b")
+
+
+class ReportingPass(ModulePass):
+    """Reports that nothing changed, without comparing modules."""
+
+    name = "reporting"
+
+    def apply(self, ctx: Context, op: ModuleOp) -> None:
+        pass
+
+    def apply_and_check_changed(self, ctx: Context, op: ModuleOp) -> bool:
+        return False
+
+
+def test_condensed_pass_cache():
+    module = ModuleOp([TestOp(attributes={"key": StringAttr("a")})])
+    all_passes = (("counting", CountingPass), ("reporting", ReportingPass))
+    cache = CondensedPassCache()
+    CountingPass.applications = 0
+
+    condensed = tuple(iter_condensed_passes(module, all_passes, cache))
+    assert [p for p, _ in condensed] == [AvailablePass("counting", CountingPass())]
+    assert CountingPass.applications == 1
+    assert cache.results_for(module) == {"counting": True, "reporting": False}
+
+    # A structurally equivalent module hits the cache
+    condensed = tuple(iter_condensed_passes(module.clone(), all_passes, cache))
+    assert condensed == ((AvailablePass("counting", CountingPass()), None),)
+    assert CountingPass.applications == 1
+
+    # A different module does not
+    other = ModuleOp([TestOp(attributes={"key": StringAttr("b")})])
+    assert not tuple(iter_condensed_passes(other, all_passes, cache))
+    assert CountingPass.applications == 2
+
+
+def test_condensed_pass_cache_eviction():
+    cache = CondensedPassCache(max_modules=1)
+    a = ModuleOp([TestOp(attributes={"key": StringAttr("a")})])
+    b = ModuleOp([TestOp(attributes={"key": StringAttr("b")})])
+
+    cache.results_for(a)["p"] = True
+    cache.results_for(b)["p"] = False
+    assert cache.results_for(a) == {}
+
+
+def test_condensed_passes_cancelled():
+    module = ModuleOp([TestOp(attributes={"key": StringAttr("a")})])
+    all_passes = (("counting", CountingPass),)
+    CountingPass.applications = 0
+
+    assert not tuple(iter_condensed_passes(module, all_passes, None, lambda: True))
+    assert CountingPass.applications == 0
@@ -10,14 +10,26 @@ from xdsl.dialects.arith import (
     AddiOp,
     CmpiOp,
     ConstantOp,
+    DivfOp,
     MulfOp,
     MuliOp,
+    NegfOp,
+    RemSIOp,
     SubfOp,
     SubiOp,
 )
-from xdsl.dialects.builtin import IndexType, IntegerType, ModuleOp, Signedness
+from xdsl.dialects.builtin import (
+    IndexType,
+    IntegerType,
+    ModuleOp,
+    Signedness,
+    VectorType,
+    f64,
+)
 from xdsl.interpreter import Interpreter
 from xdsl.interpreters.arith import ArithFunctions
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.utils.ptr import TypedPtr
 
 interpreter = Interpreter(ModuleOp([]))
 interpreter.register_implementations(ArithFunctions())
@@ -79,6 +91,27 @@ def test_muli(lhs_value: int, rhs_value: int):
     assert ret[0] == lhs_value * rhs_value
 
 
+@pytest.mark.parametrize("lhs_value", [1.0, 0.0, -1.0, 127.0])
+@pytest.mark.parametrize("rhs_value", [1.0, -1.0, 0.5])
+def test_divf(lhs_value: float, rhs_value: float):
+    divf = DivfOp(lhs_op, rhs_op)
+
+    ret = interpreter.run_op(divf, (lhs_value, rhs_value))
+
+    assert len(ret) == 1
+    assert ret[0] == lhs_value / rhs_value
+
+
+@pytest.mark.parametrize("value", [1.0, 0.0, -1.0, 127.0])
+def test_negf(value: float):
+    negf = NegfOp(lhs_op)
+
+    ret = interpreter.run_op(negf, (value,))
+
+    assert len(ret) == 1
+    assert ret[0] == -value
+
+
 @pytest.mark.parametrize("lhs_value", [1, 0, -1, 127])
 @pytest.mark.parametrize("rhs_value", [1, 0, -1, 127])
 def test_subf(lhs_value: int, rhs_value: int):
@@ -181,3 +214,27 @@ def test_cmpi(
 
     assert len(ret) == 1
     assert ret[0] == fn(lhs_value, rhs_value)
+
+
+@pytest.mark.parametrize(
+    "lhs_value, rhs_value, result", [(7, 3, 1), (-7, 3, -1), (7, -3, 1), (-6, 3, 0)]
+)
+def test_remsi(lhs_value: int, rhs_value: int, result: int):
+    remsi = RemSIOp(lhs_op, rhs_op)
+
+    ret = interpreter.run_op(remsi, (lhs_value, rhs_value))
+
+    assert ret == (result,)
+
+
+def test_vector_operands():
+    vector_op = test.TestOp(result_types=[VectorType(f64, [3])])
+    lhs = ShapedArray(TypedPtr.new_float64([1.0, 2.0, 3.0]), [3])
+    rhs = ShapedArray(TypedPtr.new_float64([4.0, -5.0, 6.0]), [3])
+
+    (added,) = interpreter.run_op(AddfOp(vector_op, vector_op), (lhs, rhs))
+    (negated,) = interpreter.run_op(NegfOp(vector_op), (rhs,))
+
+    assert added == ShapedArray(TypedPtr.new_float64([5.0, -3.0, 9.0]), [3])
+    assert negated == ShapedArray(TypedPtr.new_float64([-4.0, 5.0, -6.0]), [3])
+    assert lhs.data == [1.0, 2.0, 3.0]
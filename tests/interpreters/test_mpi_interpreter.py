@@ -0,0 +1,164 @@
+import pytest
+
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.interpreter import Interpreter
+from xdsl.interpreters import register_implementations
+from xdsl.interpreters.mpi import MpiWorld
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.utils.ptr import TypedPtr
+from xdsl.parser import Parser
+from xdsl.utils.exceptions import InterpretationError
+
+ctx = Context()
+for name, dialect in get_all_dialects().items():
+    ctx.register_dialect(name, dialect)
+
+
+def parse(program: str) -> ModuleOp:
+    return Parser(ctx, program).parse_module()
+
+
+def buffer(values: list[float]) -> ShapedArray[float]:
+    return ShapedArray(TypedPtr.new_float64(values), [len(values)])
+
+
+RING = parse(
+    """
+func.func @main(%send : memref<3xf64>, %recv : memref<3xf64>) -> i32 {
+  "mpi.init"() : () -> ()
+  %rank = "mpi.comm.rank"() : () -> i32
+  %size = "mpi.comm.size"() : () -> i32
+  %c0 = arith.constant 0 : i32
+  %c1 = arith.constant 1 : i32
+  %c2 = arith.constant 2 : i32
+  %tag = arith.constant 7 : i32
+  %next_rank = arith.addi %rank, %c1 : i32
+  %wraps = arith.cmpi eq, %next_rank, %size : i32
+  %next = scf.if %wraps -> (i32) {
+    scf.yield %c0 : i32
+  } else {
+    scf.yield %next_rank : i32
+  }
+  %is_first = arith.cmpi eq, %rank, %c0 : i32
+  %prev = scf.if %is_first -> (i32) {
+    %last = arith.subi %size, %c1 : i32
+    scf.yield %last : i32
+  } else {
+    %prev_rank = arith.subi %rank, %c1 : i32
+    scf.yield %prev_rank : i32
+  }
+  %reqs = "mpi.allocate"(%c2) {dtype = !mpi.request} : (i32) -> !mpi.vector<!mpi.request>
+  %send_req = "mpi.vector_get"(%reqs, %c0) : (!mpi.vector<!mpi.request>, i32) -> !mpi.request
+  %recv_req = "mpi.vector_get"(%reqs, %c1) : (!mpi.vector<!mpi.request>, i32) -> !mpi.request
+  %send_ptr, %send_count, %send_type = "mpi.unwrap_memref"(%send) : (memref<3xf64>) -> (!llvm.ptr, i32, !mpi.datatype)
+  %recv_ptr, %recv_count, %recv_type = "mpi.unwrap_memref"(%recv) : (memref<3xf64>) -> (!llvm.ptr, i32, !mpi.datatype)
+  "mpi.isend"(%send_ptr, %send_count, %send_type, %next, %tag, %send_req) : (!llvm.ptr, i32, !mpi.datatype, i32, i32, !mpi.request) -> ()
+  "mpi.irecv"(%recv_ptr, %recv_count, %recv_type, %prev, %tag, %recv_req) : (!llvm.ptr, i32, !mpi.datatype, i32, i32, !mpi.request) -> ()
+  "mpi.waitall"(%reqs, %c2) : (!mpi.vector<!mpi.request>, i32) -> ()
+  %status = "mpi.wait"(%recv_req) : (!mpi.request) -> !mpi.status
+  %source = "mpi.status.get"(%status) {field = "MPI_SOURCE"} : (!mpi.status) -> i32
+  "mpi.finalize"() : () -> ()
+  func.return %source : i32
+}
+"""
+)
+
+
+def test_ring_exchange():
+    world = MpiWorld(4)
+    send = [buffer([float(rank)] * 3) for rank in range(4)]
+    recv = [buffer([0.0] * 3) for _ in range(4)]
+
+    results = world.run(RING, ctx, args=list(zip(send, recv)))
+
+    assert results == [(3,), (0,), (1,), (2,)]
+    for rank in range(4):
+        assert recv[rank].data == [float((rank - 1) % 4)] * 3
+    assert world.message_counts == {(r, (r + 1) % 4): 1 for r in range(4)}
+    assert world.byte_counts == {(r, (r + 1) % 4): 24 for r in range(4)}
+
+
+def test_single_rank():
+    """Without a world, programs run as the only rank."""
+    interpreter = Interpreter(RING)
+    register_implementations(interpreter, ctx)
+    recv = buffer([0.0] * 3)
+    assert interpreter.call_op("main", (buffer([1.0, 2.0, 3.0]), recv)) == (0,)
+    assert recv.data == [1.0, 2.0, 3.0]
+
+
+def test_collectives():
+    module = parse(
+        """
+func.func @main(%values : memref<2xi32>, %result : memref<8xi32>) {
+  %c0 = arith.constant 0 : i32
+  %c1 = arith.constant 1 : i32
+  %c8 = arith.constant 8 : i32
+  %ptr, %count, %type = "mpi.unwrap_memref"(%values) : (memref<2xi32>) -> (!llvm.ptr, i32, !mpi.datatype)
+  %result_ptr, %result_count, %result_type = "mpi.unwrap_memref"(%result) : (memref<8xi32>) -> (!llvm.ptr, i32, !mpi.datatype)
+  "mpi.gather"(%ptr, %count, %type, %result_ptr, %c8, %type, %c1) : (!llvm.ptr, i32, !mpi.datatype, !llvm.ptr, i32, !mpi.datatype, i32) -> ()
+  "mpi.allreduce"(%ptr, %ptr, %count, %type) {operationtype = !mpi.operation<"MPI_SUM">} : (!llvm.ptr, !llvm.ptr, i32, !mpi.datatype) -> ()
+  "mpi.bcast"(%result_ptr, %c1, %type, %c0) : (!llvm.ptr, i32, !mpi.datatype, i32) -> ()
+  func.return
+}
+"""
+    )
+    world = MpiWorld(4)
+    values = [
+        ShapedArray(TypedPtr.new_int32([rank, 10 * rank]), [2]) for rank in range(4)
+    ]
+    results = [ShapedArray(TypedPtr.new_int32([-1] * 8), [8]) for _ in range(4)]
+
+    world.run(module, ctx, args=list(zip(values, results)))
+
+    for rank in range(4):
+        assert values[rank].data == [6, 60]
+    # Rank 1 gathered the values, and the first one is broadcast from rank 0
+    assert results[1].data == [-1, 0, 1, 10, 2, 20, 3, 30]
+    assert [r.data[0] for r in results] == [-1] * 4
+    assert not world.message_counts
+
+
+def test_deadlock():
+    module = parse(
+        """
+func.func @main(%recv : memref<1xf64>) {
+  %rank = "mpi.comm.rank"() : () -> i32
+  %c1 = arith.constant 1 : i32
+  %c0 = arith.constant 0 : i32
+  %other = arith.subi %c1, %rank : i32
+  %ptr, %count, %type = "mpi.unwrap_memref"(%recv) : (memref<1xf64>) -> (!llvm.ptr, i32, !mpi.datatype)
+  "mpi.recv"(%ptr, %count, %type, %other, %c0) : (!llvm.ptr, i32, !mpi.datatype, i32, i32) -> ()
+  "mpi.send"(%ptr, %count, %type, %other, %c0) : (!llvm.ptr, i32, !mpi.datatype, i32, i32) -> ()
+  func.return
+}
+"""
+    )
+    world = MpiWorld(2)
+    with pytest.raises(InterpretationError, match="Deadlock"):
+        world.run(module, ctx, args=[(buffer([0.0]),), (buffer([0.0]),)])
+
+
+def test_truncated_message():
+    module = parse(
+        """
+func.func @main(%buffer : memref<2xf64>) {
+  %rank = "mpi.comm.rank"() : () -> i32
+  %c0 = arith.constant 0 : i32
+  %c1 = arith.constant 1 : i32
+  %ptr, %count, %type = "mpi.unwrap_memref"(%buffer) : (memref<2xf64>) -> (!llvm.ptr, i32, !mpi.datatype)
+  %is_sender = arith.cmpi eq, %rank, %c0 : i32
+  scf.if %is_sender {
+    "mpi.send"(%ptr, %count, %type, %c1, %c0) : (!llvm.ptr, i32, !mpi.datatype, i32, i32) -> ()
+  } else {
+    "mpi.recv"(%ptr, %c1, %type, %c0, %c0) : (!llvm.ptr, i32, !mpi.datatype, i32, i32) -> ()
+  }
+  func.return
+}
+"""
+    )
+    world = MpiWorld(2)
+    with pytest.raises(InterpretationError, match="truncated"):
+        world.run(module, ctx, args=[(buffer([1.0, 2.0]),), (buffer([0.0, 0.0]),)])
@@ -0,0 +1,164 @@
+import math
+from io import StringIO
+
+import pytest
+
+from xdsl.builder import Builder
+from xdsl.dialects import riscv, riscv_debug, riscv_func
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.interpreters.riscv_simulator import RiscvSimulator
+from xdsl.ir import Block, Region
+from xdsl.utils.exceptions import InterpretationError
+
+
+def _main_module(body: Region) -> ModuleOp:
+    return ModuleOp([riscv_func.FuncOp("main", body, ((), ()), visibility="public")])
+
+
+def test_counters_and_output():
+    @Builder.implicit_region
+    def body():
+        six = riscv.LiOp(6, rd=riscv.Registers.T0)
+        seven = riscv.LiOp(7, rd=riscv.Registers.T1)
+        forty_two = riscv.MulOp(six, seven, rd=riscv.Registers.T2)
+        riscv_debug.PrintfOp("{}\n", (forty_two,))
+        riscv_func.ReturnOp()
+
+    stream = StringIO()
+    simulator = RiscvSimulator(_main_module(body), file=stream)
+    assert simulator.run() is None
+
+    assert stream.getvalue() == "42\n"
+    assert simulator.instruction_count == 5
+    # The multiplication takes three cycles
+    assert simulator.cycle_count == 7
+    assert simulator.int_registers[riscv.Registers.T2.index.data] == 42
+
+
+def test_integer_semantics():
+    @Builder.implicit_region
+    def body():
+        big = riscv.LiOp(0x7FFF_FFFF, rd=riscv.Registers.T0)
+        one = riscv.LiOp(1, rd=riscv.Registers.T1)
+        zero = riscv.GetRegisterOp(riscv.Registers.ZERO)
+        minus_seven = riscv.LiOp(-7, rd=riscv.Registers.T2)
+        two = riscv.LiOp(2, rd=riscv.Registers.T3)
+        riscv.AddOp(big, one, rd=riscv.Registers.A0)
+        riscv.DivOp(minus_seven, two, rd=riscv.Registers.A1)
+        riscv.RemOp(minus_seven, two, rd=riscv.Registers.A2)
+        riscv.DivOp(one, zero, rd=riscv.Registers.A3)
+        riscv.SrliOp(minus_seven, 28, rd=riscv.Registers.A4)
+        riscv.SltuOp(one, minus_seven, rd=riscv.Registers.A5)
+        # Writes to the zero register are discarded
+        riscv.AddiOp(one, 1, rd=riscv.Registers.ZERO)
+        riscv_func.ReturnOp()
+
+    simulator = RiscvSimulator(_main_module(body))
+    simulator.run()
+
+    registers = simulator.int_registers
+    assert registers[riscv.Registers.A0.index.data] == -(2**31)
+    assert registers[riscv.Registers.A1.index.data] == -3
+    assert registers[riscv.Registers.A2.index.data] == -1
+    assert registers[riscv.Registers.A3.index.data] == -1
+    assert registers[riscv.Registers.A4.index.data] == 15
+    assert registers[riscv.Registers.A5.index.data] == 1
+    assert registers[riscv.Registers.ZERO.index.data] == 0
+
+
+def test_data_words():
+    @Builder.implicit_region
+    def body():
+        values = riscv.LiOp("values", rd=riscv.Registers.T0)
+        riscv.LwOp(values, 0, rd=riscv.Registers.A0)
+        riscv.LwOp(values, 4, rd=riscv.Registers.A1)
+        riscv.LwOp(values, 8, rd=riscv.Registers.A2)
+        riscv_func.ReturnOp()
+
+    data = riscv.AssemblySectionOp(
+        ".data",
+        Region(
+            Block(
+                [riscv.LabelOp("values"), riscv.DirectiveOp(".word", "10, -0x1,0x20")]
+            )
+        ),
+    )
+    module = _main_module(body)
+    module.body.block.insert_op_before(data, module.body.block.first_op)
+    simulator = RiscvSimulator(module)
+    simulator.run()
+
+    registers = simulator.int_registers
+    assert registers[riscv.Registers.A0.index.data] == 10
+    assert registers[riscv.Registers.A1.index.data] == -1
+    assert registers[riscv.Registers.A2.index.data] == 32
+
+
+def test_sqrt_of_negative():
+    @Builder.implicit_region
+    def body():
+        minus_four = riscv.LiOp(-4, rd=riscv.Registers.T0)
+        four = riscv.LiOp(4, rd=riscv.Registers.T1)
+        negative = riscv.FCvtSWOp(minus_four, rd=riscv.Registers.FT0)
+        positive = riscv.FCvtSWOp(four, rd=riscv.Registers.FT1)
+        riscv.FSqrtSOp(negative, rd=riscv.Registers.FA0)
+        riscv.FSqrtSOp(positive, rd=riscv.Registers.FA1)
+        riscv_func.ReturnOp()
+
+    simulator = RiscvSimulator(_main_module(body))
+    simulator.run()
+
+    registers = simulator.float_registers
+    assert math.isnan(registers[riscv.Registers.FA0.index.data])
+    assert registers[riscv.Registers.FA1.index.data] == 2.0
+
+
+def test_exit_code():
+    @Builder.implicit_region
+    def body():
+        riscv.LiOp(93, rd=riscv.Registers.A7)
+        riscv.LiOp(3, rd=riscv.Registers.A0)
+        riscv.EcallOp()
+        riscv.LiOp(4, rd=riscv.Registers.A0)
+        riscv_func.ReturnOp()
+
+    simulator = RiscvSimulator(_main_module(body))
+    assert simulator.run() == 3
+    assert simulator.instruction_count == 3
+
+
+def test_invalid_memory_access():
+    @Builder.implicit_region
+    def body():
+        address = riscv.LiOp(-4, rd=riscv.Registers.T0)
+        riscv.LwOp(address, 0, rd=riscv.Registers.T1)
+        riscv_func.ReturnOp()
+
+    simulator = RiscvSimulator(_main_module(body), memory_size=64)
+    with pytest.raises(
+        InterpretationError,
+        match="Invalid load of 4 bytes at address -4, memory size is 64",
+    ):
+        simulator.run()
+
+
+def test_unallocated_registers():
+    @Builder.implicit_region
+    def body():
+        riscv.LiOp(1)
+        riscv_func.ReturnOp()
+
+    with pytest.raises(InterpretationError, match="registers must be allocated"):
+        RiscvSimulator(_main_module(body))
+
+
+def test_unsupported_operation():
+    @Builder.implicit_region
+    def body():
+        riscv.WfiOp()
+        riscv_func.ReturnOp()
+
+    with pytest.raises(
+        InterpretationError, match="Unsupported operation riscv.wfi in RISC-V simulator"
+    ):
+        RiscvSimulator(_main_module(body))
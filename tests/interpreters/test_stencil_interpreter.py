@@ -0,0 +1,189 @@
+from typing import Any
+
+import pytest
+
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.interpreter import Interpreter
+from xdsl.interpreters.arith import ArithFunctions
+from xdsl.interpreters.func import FuncFunctions
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.stencil import StencilFunctions
+from xdsl.interpreters.utils.ptr import TypedPtr
+from xdsl.parser import Parser
+from xdsl.transforms.stencil_unroll import StencilUnrollPass
+from xdsl.utils.exceptions import InterpretationError
+
+ctx = Context()
+for name, dialect in get_all_dialects().items():
+    ctx.register_dialect(name, dialect)
+
+
+@pytest.fixture(params=[False, True], ids=["lists", "numpy"])
+def use_numpy(request: pytest.FixtureRequest) -> bool:
+    if request.param:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+def run(program: str | ModuleOp, use_numpy: bool, *args: Any) -> tuple[Any, ...]:
+    module = program if isinstance(program, ModuleOp) else parse(program)
+    module.verify()
+    interpreter = Interpreter(module)
+    interpreter.register_implementations(ArithFunctions())
+    interpreter.register_implementations(FuncFunctions())
+    interpreter.register_implementations(StencilFunctions(use_numpy=use_numpy))
+    return interpreter.call_op("f", args)
+
+
+def parse(program: str) -> ModuleOp:
+    return Parser(ctx, program).parse_module()
+
+
+def field(values: list[list[float]]) -> ShapedArray[float]:
+    shape = [len(values), len(values[0])]
+    return ShapedArray(TypedPtr.new_float64([v for row in values for v in row]), shape)
+
+
+def rows(array: ShapedArray[Any]) -> list[list[Any]]:
+    data = array.data
+    return [data[i : i + array.shape[1]] for i in range(0, array.size, array.shape[1])]
+
+
+LAPLACE = """
+func.func @f(%in : !stencil.field<[-1,5]x[-1,5]xf64>, %out : !stencil.field<[-1,5]x[-1,5]xf64>) {
+  %t = stencil.load %in : !stencil.field<[-1,5]x[-1,5]xf64> -> !stencil.temp<[-1,5]x[-1,5]xf64>
+  %r = stencil.apply(%a = %t : !stencil.temp<[-1,5]x[-1,5]xf64>) -> (!stencil.temp<[0,4]x[0,4]xf64>) {
+    %left = stencil.access %a[-1, 0] : !stencil.temp<[-1,5]x[-1,5]xf64>
+    %right = stencil.access %a[1, 0] : !stencil.temp<[-1,5]x[-1,5]xf64>
+    %up = stencil.access %a[0, 1] : !stencil.temp<[-1,5]x[-1,5]xf64>
+    %down = stencil.access %a[0, -1] : !stencil.temp<[-1,5]x[-1,5]xf64>
+    %center = stencil.access %a[0, 0] : !stencil.temp<[-1,5]x[-1,5]xf64>
+    %four = arith.constant 4.0 : f64
+    %0 = arith.addf %left, %right : f64
+    %1 = arith.addf %up, %down : f64
+    %2 = arith.addf %0, %1 : f64
+    %3 = arith.mulf %center, %four : f64
+    %4 = arith.subf %2, %3 : f64
+    stencil.return %4 : f64
+  }
+  stencil.store %r to %out(<[0, 0], [4, 4]>) : !stencil.temp<[0,4]x[0,4]xf64> to !stencil.field<[-1,5]x[-1,5]xf64>
+  func.return
+}
+"""
+
+
+def laplace(values: list[list[float]]) -> list[list[float]]:
+    result = [[0.0] * 6 for _ in range(6)]
+    for i in range(1, 5):
+        for j in range(1, 5):
+            result[i][j] = (
+                values[i - 1][j]
+                + values[i + 1][j]
+                + values[i][j + 1]
+                + values[i][j - 1]
+                - 4 * values[i][j]
+            )
+    return result
+
+
+INPUT = [[float(i * i + 3 * j) for j in range(6)] for i in range(6)]
+
+
+def test_laplace(use_numpy: bool):
+    out = field([[0.0] * 6 for _ in range(6)])
+    assert run(LAPLACE, use_numpy, field(INPUT), out) == ()
+    assert rows(out) == laplace(INPUT)
+
+
+def test_unrolled_laplace(use_numpy: bool):
+    module = parse(LAPLACE)
+    StencilUnrollPass((2, 2)).apply(ctx, module)
+    out = field([[0.0] * 6 for _ in range(6)])
+    run(module, use_numpy, field(INPUT), out)
+    assert rows(out) == laplace(INPUT)
+
+
+def test_mapping_index_and_scalars(use_numpy: bool):
+    """
+    Accesses to lower-dimensional temps, `stencil.index`, scalar arguments, and
+    operations whose implementation only applies to single values.
+    """
+    (values, indices) = run(
+        """
+func.func @f(%in : !stencil.field<[0,3]xf64>, %scale : f64) -> (!stencil.temp<[0,2]x[0,3]xf64>, !stencil.temp<[0,2]x[0,3]xindex>) {
+  %t = stencil.load %in : !stencil.field<[0,3]xf64> -> !stencil.temp<[0,3]xf64>
+  %r, %i = stencil.apply(%a = %t : !stencil.temp<[0,3]xf64>, %s = %scale : f64) -> (!stencil.temp<[0,2]x[0,3]xf64>, !stencil.temp<[0,2]x[0,3]xindex>) {
+    %v = stencil.access %a[_, 0] : !stencil.temp<[0,3]xf64>
+    %scaled = arith.mulf %v, %s : f64
+    %min = arith.minimumf %scaled, %s : f64
+    %index = stencil.index 0 <[10, 0]>
+    stencil.return %min, %index : f64, index
+  }
+  func.return %r, %i : !stencil.temp<[0,2]x[0,3]xf64>, !stencil.temp<[0,2]x[0,3]xindex>
+}
+""",
+        use_numpy,
+        ShapedArray(TypedPtr.new_float64([1.0, 2.0, 3.0]), [3]),
+        2.5,
+    )
+    assert rows(values) == [[2.5, 2.5, 2.5], [2.5, 2.5, 2.5]]
+    assert rows(indices) == [[10, 10, 10], [11, 11, 11]]
+
+
+def test_combine(use_numpy: bool):
+    (result,) = run(
+        """
+func.func @f(%lower_field : !stencil.field<[0,2]x[0,4]xf64>, %upper_field : !stencil.field<[0,2]x[0,4]xf64>) -> !stencil.temp<[0,2]x[0,4]xf64> {
+  %lower = stencil.load %lower_field : !stencil.field<[0,2]x[0,4]xf64> -> !stencil.temp<[0,2]x[0,4]xf64>
+  %upper = stencil.load %upper_field : !stencil.field<[0,2]x[0,4]xf64> -> !stencil.temp<[0,2]x[0,4]xf64>
+  %r = stencil.combine 1 at 1 lower = (%lower : !stencil.temp<[0,2]x[0,4]xf64>) upper = (%upper : !stencil.temp<[0,2]x[0,4]xf64>) : !stencil.temp<[0,2]x[0,4]xf64>
+  func.return %r : !stencil.temp<[0,2]x[0,4]xf64>
+}
+""",
+        use_numpy,
+        field([[1.0] * 4, [1.0] * 4]),
+        field([[2.0] * 4, [2.0] * 4]),
+    )
+    assert rows(result) == [[1.0, 2.0, 2.0, 2.0], [1.0, 2.0, 2.0, 2.0]]
+
+
+DYN_ACCESS = """
+func.func @f(%in : !stencil.field<[0,4]xf64>, %at : index) -> !stencil.temp<[0,3]xf64> {
+  %t = stencil.load %in : !stencil.field<[0,4]xf64> -> !stencil.temp<[0,4]xf64>
+  %r = stencil.apply(%a = %t : !stencil.temp<[0,4]xf64>, %j = %at : index) -> (!stencil.temp<[0,3]xf64>) {
+    %i = stencil.index 0 <[1]>
+    %x = stencil.dyn_access %a[%i] in <[0]> : <[1]> : !stencil.temp<[0,4]xf64>
+    %y = stencil.dyn_access %a[%j] in <[0]> : <[1]> : !stencil.temp<[0,4]xf64>
+    %z = arith.addf %x, %y : f64
+    stencil.return %z : f64
+  }
+  func.return %r : !stencil.temp<[0,3]xf64>
+}
+"""
+
+
+def test_dyn_access(use_numpy: bool):
+    data = ShapedArray(TypedPtr.new_float64([1.0, 2.0, 3.0, 4.0]), [4])
+    (result,) = run(DYN_ACCESS, use_numpy, data, 0)
+    assert result.data == [3.0, 4.0, 5.0]
+
+    with pytest.raises(InterpretationError, match="out of bounds"):
+        run(DYN_ACCESS, use_numpy, data, 4)
+
+
+def test_access_out_of_bounds(use_numpy: bool):
+    program = LAPLACE.replace("[-1,5]x[-1,5]", "[0,5]x[0,5]")
+    values = [row[1:] for row in INPUT[1:]]
+    out = field([[0.0] * 5 for _ in range(5)])
+    with pytest.raises(InterpretationError, match="out of bounds in dimension 0"):
+        run(program, use_numpy, field(values), out)
+
+
+def test_unknown_bounds():
+    program = LAPLACE.replace(
+        "!stencil.temp<[-1,5]x[-1,5]xf64>", "!stencil.temp<?x?xf64>"
+    )
+    with pytest.raises(InterpretationError, match="stencil-shape-inference"):
+        run(program, False, field(INPUT), field(INPUT))
@@ -0,0 +1,70 @@
+from xdsl.dialects import arith, memref, test, vector
+from xdsl.dialects.builtin import IndexType, ModuleOp, VectorType, f64
+from xdsl.interpreter import Interpreter
+from xdsl.interpreters.arith import ArithFunctions
+from xdsl.interpreters.memref import MemRefFunctions
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.utils.ptr import TypedPtr
+from xdsl.interpreters.vector import VectorFunctions
+
+interpreter = Interpreter(ModuleOp([]))
+interpreter.register_implementations(ArithFunctions())
+interpreter.register_implementations(MemRefFunctions())
+interpreter.register_implementations(VectorFunctions())
+
+index = IndexType()
+vector_type = VectorType(f64, [2])
+
+
+def vector_of(values: list[float]) -> ShapedArray[float]:
+    return ShapedArray(TypedPtr.new_float64(values), [2])
+
+
+def test_load_store():
+    memref_op = test.TestOp(result_types=[memref.MemRefType(f64, [2, 3])])
+    value_op = test.TestOp(result_types=[vector_type])
+    row = arith.ConstantOp.from_int_and_width(1, index)
+    column = arith.ConstantOp.from_int_and_width(1, index)
+    load = vector.LoadOp.build(
+        operands=[memref_op, [row, column]], result_types=[vector_type]
+    )
+    store = vector.StoreOp.get(value_op, memref_op, [row, column])
+
+    data = ShapedArray(TypedPtr.new_float64([1.0, 2.0, 3.0, 4.0, 5.0, 6.0]), [2, 3])
+    (loaded,) = interpreter.run_op(load, (data, 1, 1))
+    assert loaded == vector_of([5.0, 6.0])
+
+    assert interpreter.run_op(store, (vector_of([7.0, 8.0]), data, 0, 0)) == ()
+    assert data.data == [7.0, 8.0, 3.0, 4.0, 5.0, 6.0]
+
+
+def test_broadcast_fma():
+    scalar_op = test.TestOp(result_types=[f64])
+    vector_op = test.TestOp(result_types=[vector_type])
+    broadcast = vector.BroadcastOp.build(
+        operands=[scalar_op], result_types=[vector_type]
+    )
+    fma = vector.FMAOp.build(
+        operands=[vector_op, vector_op, vector_op], result_types=[vector_type]
+    )
+
+    (broadcasted,) = interpreter.run_op(broadcast, (3.0,))
+    assert broadcasted == vector_of([3.0, 3.0])
+
+    (result,) = interpreter.run_op(
+        fma, (vector_of([1.0, 2.0]), vector_of([3.0, 4.0]), vector_of([5.0, 6.0]))
+    )
+    assert result == vector_of([8.0, 14.0])
+
+
+def test_extract_insert_element():
+    vector_op = test.TestOp(result_types=[vector_type])
+    scalar_op = test.TestOp(result_types=[f64])
+    position = arith.ConstantOp.from_int_and_width(1, index)
+    extract = vector.ExtractElementOp(vector_op, position)
+    insert = vector.InsertElementOp(scalar_op, vector_op, position)
+
+    source = vector_of([1.0, 2.0])
+    assert interpreter.run_op(extract, (source, 1)) == (2.0,)
+    assert interpreter.run_op(insert, (9.0, source, 1)) == (vector_of([1.0, 9.0]),)
+    assert source == vector_of([1.0, 2.0])
@@ -0,0 +1,103 @@
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.parser import Parser
+from xdsl.transforms.experimental.dmp.decomposition_cost import (
+    DecompositionCost,
+    candidate_costs,
+    decomposition_cost,
+)
+
+ctx = Context()
+for name, dialect in get_all_dialects().items():
+    ctx.register_dialect(name, dialect)
+
+# A 64x64x64 stencil accessing its neighbors in the first two dimensions only
+LAPLACE = """
+func.func @laplace(%in : !stencil.field<[-4,68]x[-4,68]x[-4,68]xf64>, %out : !stencil.field<[-4,68]x[-4,68]x[-4,68]xf64>) {
+  %t = stencil.load %in : !stencil.field<[-4,68]x[-4,68]x[-4,68]xf64> -> !stencil.temp<?x?x?xf64>
+  %r = stencil.apply(%a = %t : !stencil.temp<?x?x?xf64>) -> (!stencil.temp<?x?x?xf64>) {
+    %left = stencil.access %a[-1, 0, 0] : !stencil.temp<?x?x?xf64>
+    %right = stencil.access %a[1, 0, 0] : !stencil.temp<?x?x?xf64>
+    %up = stencil.access %a[0, 1, 0] : !stencil.temp<?x?x?xf64>
+    %down = stencil.access %a[0, -1, 0] : !stencil.temp<?x?x?xf64>
+    %0 = arith.addf %left, %right : f64
+    %1 = arith.addf %up, %down : f64
+    %2 = arith.addf %0, %1 : f64
+    stencil.return %2 : f64
+  }
+  stencil.store %r to %out(<[0, 0, 0], [64, 64, 64]>) : !stencil.temp<?x?x?xf64> to !stencil.field<[-4,68]x[-4,68]x[-4,68]xf64>
+  func.return
+}
+"""
+
+F64_BYTES = 8
+
+
+def laplace_costs(ranks: int, strategy: str = "3d-grid") -> list[DecompositionCost]:
+    module = Parser(ctx, LAPLACE).parse_module()
+    return candidate_costs(module, ctx, ranks, strategy)
+
+
+def test_halo_volume_follows_decomposition_shape():
+    costs = {cost.topology: cost for cost in laplace_costs(8)}
+
+    # Slicing along the dimension without accesses needs no halo exchanges
+    assert costs[1, 1, 8].halo_bytes == 0
+    assert costs[1, 1, 8].messages == 0
+    assert costs[1, 1, 8].compute_to_communication is None
+
+    # Each rank of a 32x32x32 block exchanges one 32x32 face in each of the first
+    # two dimensions
+    cube = costs[2, 2, 2]
+    assert cube.messages == 2
+    assert cube.halo_bytes == 2 * 32 * 32 * F64_BYTES
+    assert cube.total_messages == 8 * 2
+    assert cube.compute_points == 32 * 32 * 32
+    assert cube.compute_to_communication == 2.0
+
+    # Inner ranks of 8x64x64 slabs exchange both of their 64x64 faces
+    slab = costs[8, 1, 1]
+    assert slab.messages == 2
+    assert slab.halo_bytes == 2 * 64 * 64 * F64_BYTES
+    # The two ranks at the ends of the grid have a single neighbor
+    assert slab.total_messages == 6 * 2 + 2 * 1
+
+    # With two ranks per dimension, every rank of the cube has the same neighbors
+    assert all(rank.halo_bytes == cube.halo_bytes for rank in cube.ranks)
+
+
+def test_candidates_are_sorted_by_cost():
+    costs = laplace_costs(8)
+
+    assert [cost.sort_key() for cost in costs] == sorted(
+        cost.sort_key() for cost in costs
+    )
+    assert costs[0].topology == (1, 1, 8)
+    assert costs[-1].halo_bytes == 2 * 64 * 64 * F64_BYTES
+
+
+def test_ties_keep_enumeration_order():
+    costs = laplace_costs(8)
+    topologies = [cost.topology for cost in costs]
+
+    # Both topologies exchange one 64x16 face, and are listed in the order in which
+    # topologies are enumerated
+    first, second = costs[1], costs[2]
+    assert (first.topology, second.topology) == ((1, 2, 4), (2, 1, 4))
+    face_bytes = 64 * 16 * F64_BYTES
+    assert first.sort_key() == second.sort_key() == (face_bytes, 1, 8 * face_bytes)
+    assert topologies.index((1, 8, 1)) < topologies.index((8, 1, 1))
+
+    grid = [cost.topology for cost in laplace_costs(8, "2d-grid")]
+    assert grid == [(2, 4), (4, 2), (1, 8), (8, 1)]
+
+
+def test_indivisible_topologies_are_skipped():
+    assert laplace_costs(7) == []
+    assert all(64 % size == 0 for cost in laplace_costs(4) for size in cost.topology)
+
+
+def test_undistributed_module_has_no_cost():
+    assert decomposition_cost(Parser(ctx, LAPLACE).parse_module()) is None
+    assert decomposition_cost(ModuleOp([])) is None
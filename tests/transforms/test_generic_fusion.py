@@ -0,0 +1,102 @@
+import pytest
+
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects, linalg, memref_stream
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.interpreter import Interpreter
+from xdsl.interpreters import register_implementations
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.utils.ptr import TypedPtr
+from xdsl.parser import Parser
+from xdsl.passes import ModulePass
+from xdsl.transforms.generic_fusion import (
+    LinalgFuseElementwisePass,
+    MemRefStreamFuseElementwisePass,
+)
+
+ctx = Context()
+for name, dialect in get_all_dialects().items():
+    ctx.register_dialect(name, dialect)
+
+LINALG = """
+func.func @main(%X : memref<2x3xf64>, %Y : memref<3xf64>, %T : memref<3x2xf64>, %Z : memref<2x3xf64>) {
+  %U = memref.alloc() : memref<2x3xf64>
+  linalg.generic {indexing_maps = [affine_map<(d0, d1) -> (d1, d0)>, affine_map<(d0, d1) -> (d0, d1)>], iterator_types = ["parallel", "parallel"]} ins(%X : memref<2x3xf64>) outs(%T : memref<3x2xf64>) {
+  ^0(%x : f64, %o : f64):
+    %s = arith.mulf %x, %x : f64
+    linalg.yield %s : f64
+  }
+  linalg.generic {indexing_maps = [affine_map<(d0, d1) -> (d1, d0)>, affine_map<(d0, d1) -> (d1)>, affine_map<(d0, d1) -> (d0, d1)>], iterator_types = ["parallel", "parallel"]} ins(%T, %Y : memref<3x2xf64>, memref<3xf64>) outs(%U : memref<2x3xf64>) {
+  ^0(%t : f64, %y : f64, %o : f64):
+    %s = arith.addf %t, %y : f64
+    linalg.yield %s : f64
+  }
+  linalg.generic {indexing_maps = [affine_map<(d0, d1) -> (d0, d1)>, affine_map<(d0, d1) -> (d0, d1)>], iterator_types = ["parallel", "parallel"]} ins(%U : memref<2x3xf64>) outs(%Z : memref<2x3xf64>) {
+  ^0(%u : f64, %o : f64):
+    %s = arith.negf %u : f64
+    linalg.yield %s : f64
+  }
+  memref.dealloc %U : memref<2x3xf64>
+  func.return
+}
+"""
+
+MEMREF_STREAM = """
+func.func @main(%X : memref<2x3xf64>, %Y : memref<3xf64>, %T : memref<3x2xf64>, %Z : memref<2x3xf64>) {
+  %U = memref.alloc() : memref<2x3xf64>
+  memref_stream.generic {bounds = [3, 2], indexing_maps = [affine_map<(d0, d1) -> (d1, d0)>, affine_map<(d0, d1) -> (d0, d1)>], iterator_types = ["parallel", "parallel"]} ins(%X : memref<2x3xf64>) outs(%T : memref<3x2xf64>) {
+  ^0(%x : f64, %o : f64):
+    %s = arith.mulf %x, %x : f64
+    memref_stream.yield %s : f64
+  }
+  memref_stream.generic {bounds = [2, 3], indexing_maps = [affine_map<(d0, d1) -> (d1, d0)>, affine_map<(d0, d1) -> (d1)>, affine_map<(d0, d1) -> (d0, d1)>], iterator_types = ["parallel", "parallel"]} ins(%T, %Y : memref<3x2xf64>, memref<3xf64>) outs(%U : memref<2x3xf64>) {
+  ^0(%t : f64, %y : f64, %o : f64):
+    %s = arith.addf %t, %y : f64
+    memref_stream.yield %s : f64
+  }
+  memref_stream.generic {bounds = [2, 3], indexing_maps = [affine_map<(d0, d1) -> (d0, d1)>, affine_map<(d0, d1) -> (d0, d1)>], iterator_types = ["parallel", "parallel"]} ins(%U : memref<2x3xf64>) outs(%Z : memref<2x3xf64>) {
+  ^0(%u : f64, %o : f64):
+    %s = arith.negf %u : f64
+    memref_stream.yield %s : f64
+  }
+  memref.dealloc %U : memref<2x3xf64>
+  func.return
+}
+"""
+
+
+def run(module: ModuleOp) -> tuple[list[float], list[float]]:
+    interpreter = Interpreter(module)
+    register_implementations(interpreter, ctx)
+    T = ShapedArray(TypedPtr.new_float64([0.0] * 6), [3, 2])
+    Z = ShapedArray(TypedPtr.new_float64([0.0] * 6), [2, 3])
+    interpreter.call_op(
+        "main",
+        (
+            ShapedArray(TypedPtr.new_float64([1.0, 2.0, 3.0, 4.0, 5.0, 6.0]), [2, 3]),
+            ShapedArray(TypedPtr.new_float64([10.0, 20.0, 30.0]), [3]),
+            T,
+            Z,
+        ),
+    )
+    return T.data, Z.data
+
+
+@pytest.mark.parametrize(
+    "program, module_pass, generic",
+    [
+        (LINALG, LinalgFuseElementwisePass(), linalg.GenericOp),
+        (MEMREF_STREAM, MemRefStreamFuseElementwisePass(), memref_stream.GenericOp),
+    ],
+)
+def test_fusion_preserves_results(
+    program: str, module_pass: ModulePass, generic: type[linalg.GenericOp]
+):
+    module = Parser(ctx, program).parse_module()
+    expected = run(module)
+
+    module_pass.apply(ctx, module)
+    module.verify()
+
+    assert sum(isinstance(op, generic) for op in module.walk()) == 1
+    assert run(module) == expected
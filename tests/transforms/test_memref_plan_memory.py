@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.interpreter import Interpreter
+from xdsl.interpreters import register_implementations
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.utils.ptr import TypedPtr
+from xdsl.parser import Parser
+from xdsl.transforms.memref_plan_memory import MemRefPlanMemoryPass
+
+ctx = Context()
+for name, dialect in get_all_dialects().items():
+    ctx.register_dialect(name, dialect)
+
+KERNEL = """
+func.func @kernel(%input : memref<4xf64>, %output : memref<4xf64>) {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %c4 = arith.constant 4 : index
+  %squares = memref.alloc() : memref<4xf64>
+  scf.for %i = %c0 to %c4 step %c1 {
+    %x = memref.load %input[%i] : memref<4xf64>
+    %y = arith.mulf %x, %x : f64
+    memref.store %y, %squares[%i] : memref<4xf64>
+  }
+  %doubles = memref.alloc() : memref<4xf64>
+  scf.for %i = %c0 to %c4 step %c1 {
+    %y = memref.load %squares[%i] : memref<4xf64>
+    %z = arith.addf %y, %y : f64
+    memref.store %z, %doubles[%i] : memref<4xf64>
+  }
+  memref.dealloc %squares : memref<4xf64>
+  %sums = memref.alloc() : memref<4xf64>
+  scf.for %i = %c0 to %c4 step %c1 {
+    %z = memref.load %doubles[%i] : memref<4xf64>
+    %w = arith.addf %z, %z : f64
+    memref.store %w, %sums[%i] : memref<4xf64>
+  }
+  memref.dealloc %doubles : memref<4xf64>
+  scf.for %i = %c0 to %c4 step %c1 {
+    %w = memref.load %sums[%i] : memref<4xf64>
+    memref.store %w, %output[%i] : memref<4xf64>
+  }
+  memref.dealloc %sums : memref<4xf64>
+  func.return
+}
+"""
+
+
+def run(module: ModuleOp) -> list[float]:
+    interpreter = Interpreter(module)
+    register_implementations(interpreter, ctx)
+    output = ShapedArray(TypedPtr.new_float64([0.0] * 4), [4])
+    interpreter.call_op(
+        "kernel", (ShapedArray(TypedPtr.new_float64([1.0, 2.0, 3.0, 4.0]), [4]), output)
+    )
+    return output.data
+
+
+def test_plan_memory(tmp_path: Path):
+    module = Parser(ctx, KERNEL).parse_module()
+    expected = run(module)
+
+    report = tmp_path / "report.json"
+    MemRefPlanMemoryPass(str(report)).apply(ctx, module)
+    module.verify()
+
+    assert expected == [4.0, 16.0, 36.0, 64.0]
+    assert run(module) == expected
+    ((plan,),) = (json.loads(report.read_text()),)
+    assert plan["parent"] == "kernel"
+    assert plan["naive_bytes"] == 96
+    assert plan["peak_bytes"] == 64
+    assert plan["arena_bytes"] == 64
+    assert plan["saved_bytes"] == 32
+    assert [alloc["offset"] for alloc in plan["allocations"]] == [0, 32, 0]
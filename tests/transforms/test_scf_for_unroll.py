@@ -0,0 +1,103 @@
+import pytest
+
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects, scf
+from xdsl.interpreter import Interpreter
+from xdsl.interpreters import register_implementations
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.utils.ptr import TypedPtr
+from xdsl.parser import Parser
+from xdsl.transforms.scf_for_unroll import (
+    TARGET_REGISTERS,
+    RegisterUse,
+    ScfForUnrollPass,
+    estimate_register_use,
+    register_capped_factor,
+)
+
+ctx = Context()
+for name, dialect in get_all_dialects().items():
+    ctx.register_dialect(name, dialect)
+
+PROGRAM = """
+func.func @main(%a : memref<3x7xf64>, %x : memref<7xf64>, %y : memref<3xf64>, %n : index) -> f64 {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %c2 = arith.constant 2 : index
+  %c3 = arith.constant 3 : index
+  %c7 = arith.constant 7 : index
+  %zero = arith.constant 0.0 : f64
+  scf.for %i = %c0 to %c3 step %c1 {
+    %init = memref.load %y[%i] : memref<3xf64>
+    %r = scf.for %j = %c0 to %c7 step %c1 iter_args(%acc = %init) -> (f64) {
+      %aij = memref.load %a[%i, %j] : memref<3x7xf64>
+      %xj = memref.load %x[%j] : memref<7xf64>
+      %p = arith.mulf %aij, %xj : f64
+      %s = arith.addf %acc, %p : f64
+      scf.yield %s : f64
+    }
+    memref.store %r, %y[%i] : memref<3xf64>
+  }
+  scf.for %j = %c1 to %c7 step %c2 {
+    %xj = memref.load %x[%j] : memref<7xf64>
+    %s = arith.mulf %xj, %xj : f64
+    memref.store %s, %x[%j] : memref<7xf64>
+  }
+  %sum = scf.for %j = %c0 to %n step %c1 iter_args(%acc = %zero) -> (f64) {
+    %xj = memref.load %x[%j] : memref<7xf64>
+    %s = arith.subf %xj, %acc : f64
+    scf.yield %s : f64
+  }
+  func.return %sum : f64
+}
+"""
+
+
+def run(unroll: ScfForUnrollPass | None, n: int) -> tuple[object, ...]:
+    module = Parser(ctx, PROGRAM).parse_module()
+    if unroll is not None:
+        unroll.apply(ctx, module)
+        module.verify()
+    interpreter = Interpreter(module)
+    register_implementations(interpreter, ctx)
+    a = ShapedArray(TypedPtr.new_float64([float(i) for i in range(21)]), [3, 7])
+    x = ShapedArray(TypedPtr.new_float64([float(7 - i) for i in range(7)]), [7])
+    y = ShapedArray(TypedPtr.new_float64([1.0, 2.0, 3.0]), [3])
+    (result,) = interpreter.call_op("main", (a, x, y, n))
+    return (result, *x.data, *y.data)
+
+
+@pytest.mark.parametrize(
+    "unroll",
+    [
+        ScfForUnrollPass(2),
+        ScfForUnrollPass(3),
+        ScfForUnrollPass(8),
+        ScfForUnrollPass(full=True),
+        ScfForUnrollPass(2, jam=True),
+        ScfForUnrollPass(3, full=True, jam=True),
+        ScfForUnrollPass(16, target="riscv"),
+    ],
+)
+@pytest.mark.parametrize("n", [0, 5, 7])
+def test_unroll_preserves_results(unroll: ScfForUnrollPass, n: int):
+    assert run(unroll, n) == run(None, n)
+
+
+def test_register_capped_factor():
+    module = Parser(ctx, PROGRAM).parse_module()
+    inner = next(
+        op
+        for op in module.walk()
+        if isinstance(op, scf.ForOp) and op.body.block.args[0].name_hint == "j"
+    )
+    invariant, iteration = estimate_register_use(inner)
+    assert invariant == RegisterUse(int_registers=3)
+    # %j, the loaded values and the partial sums
+    assert iteration == RegisterUse(int_registers=1, float_registers=3)
+
+    assert register_capped_factor(inner, 16, RegisterUse(8, 32)) == 5
+    assert register_capped_factor(inner, 16, RegisterUse(64, 12)) == 4
+    assert register_capped_factor(inner, 16, TARGET_REGISTERS["x86"]) == 5
+    assert register_capped_factor(inner, 2, TARGET_REGISTERS["riscv"]) == 2
+    assert register_capped_factor(inner, 16, RegisterUse(1, 1)) == 1
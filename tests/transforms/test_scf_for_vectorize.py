@@ -0,0 +1,68 @@
+import pytest
+
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects, scf, vector
+from xdsl.interpreter import Interpreter
+from xdsl.interpreters import register_implementations
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.utils.ptr import TypedPtr
+from xdsl.parser import Parser
+from xdsl.transforms.scf_for_vectorize import ScfForVectorizePass
+
+ctx = Context()
+for name, dialect in get_all_dialects().items():
+    ctx.register_dialect(name, dialect)
+
+PROGRAM = """
+func.func @main(%a : f64, %x : memref<2x11xf64>, %y : memref<11xf64>, %n : index) -> (f64, f64, i32) {
+  %c0 = arith.constant 0 : index
+  %c1 = arith.constant 1 : index
+  %c10 = arith.constant 10 : index
+  %zero = arith.constant 0.0 : f64
+  %one = arith.constant 1 : i32
+  scf.for %i = %c0 to %c10 step %c1 {
+    %k = arith.addi %i, %c1 : index
+    %xi = memref.load %x[%c0, %k] : memref<2x11xf64>
+    %yi = memref.load %y[%i] : memref<11xf64>
+    %m = arith.mulf %a, %xi fastmath<contract> : f64
+    %s = arith.addf %m, %yi fastmath<contract> : f64
+    memref.store %s, %y[%i] : memref<11xf64>
+  }
+  %sum, %max, %count = scf.for %i = %c0 to %n step %c1 iter_args(%acc = %zero, %acc_max = %zero, %acc_count = %one) -> (f64, f64, i32) {
+    %yi = memref.load %y[%i] : memref<11xf64>
+    %xi = memref.load %x[%c1, %i] : memref<2x11xf64>
+    %d = arith.subf %yi, %xi : f64
+    %s = arith.addf %acc, %d fastmath<fast> : f64
+    %mx = arith.maximumf %d, %acc_max fastmath<reassoc> : f64
+    %c = arith.addi %acc_count, %one : i32
+    scf.yield %s, %mx, %c : f64, f64, i32
+  }
+  func.return %sum, %max, %count : f64, f64, i32
+}
+"""
+
+
+def run(module_text: str, vector_width: int | None) -> tuple[object, ...]:
+    module = Parser(ctx, module_text).parse_module()
+    if vector_width is not None:
+        ScfForVectorizePass(vector_width).apply(ctx, module)
+        module.verify()
+        assert any(isinstance(op, vector.LoadOp) for op in module.walk())
+    interpreter = Interpreter(module)
+    register_implementations(interpreter, ctx)
+    x = ShapedArray(TypedPtr.new_float64([float(i) for i in range(22)]), [2, 11])
+    y = ShapedArray(TypedPtr.new_float64([float(i * i) for i in range(11)]), [11])
+    results = interpreter.call_op("main", (2.0, x, y, 11))
+    return (*results, *y.data)
+
+
+@pytest.mark.parametrize("vector_width", [2, 3, 4, 8])
+def test_vectorize_preserves_results(vector_width: int):
+    assert run(PROGRAM, vector_width) == run(PROGRAM, None)
+
+
+def test_short_loops_are_not_vectorized():
+    module = Parser(ctx, PROGRAM).parse_module()
+    ScfForVectorizePass(16).apply(ctx, module)
+    # The loop of 10 iterations is too short, the other has a dynamic trip count
+    assert sum(isinstance(op, scf.ForOp) for op in module.walk()) == 3
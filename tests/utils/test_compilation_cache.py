@@ -0,0 +1,43 @@
+import os
+from io import StringIO
+from pathlib import Path
+
+from xdsl.utils.compilation_cache import CompilationCache
+
+
+def test_key():
+    assert CompilationCache.key(("a", "b")) == CompilationCache.key(("a", "b"))
+    assert CompilationCache.key(("a", "b")) != CompilationCache.key(("ab",))
+    assert CompilationCache.key(("a", "b")) != CompilationCache.key(("b", "a"))
+
+
+def test_store_load(tmp_path: Path):
+    cache = CompilationCache(str(tmp_path))
+    key = CompilationCache.key(("input",))
+
+    stdout = StringIO()
+    output = StringIO()
+    assert not cache.load(key, stdout, output)
+
+    cache.store(key, "diagnostic\n", "output\r\nwith lines\n")
+    assert cache.load(key, stdout, output)
+    assert stdout.getvalue() == "diagnostic\n"
+    assert output.getvalue() == "output\r\nwith lines\n"
+
+
+def test_evict(tmp_path: Path):
+    cache = CompilationCache(str(tmp_path), max_size=130)
+    keys = [CompilationCache.key((str(i),)) for i in range(3)]
+
+    for i, key in enumerate(keys):
+        cache.store(key, "", "x" * 40)
+        # Make the order of use explicit, independently of the timer resolution
+        path = os.path.join(cache.directory, key + CompilationCache.SUFFIX)
+        os.utime(path, (i, i))
+
+    # Using the first entry makes the second one the least recently used
+    assert cache.load(keys[0], StringIO(), StringIO())
+    cache.store(CompilationCache.key(("3",)), "", "x" * 40)
+
+    assert cache.load(keys[0], StringIO(), StringIO())
+    assert not cache.load(keys[1], StringIO(), StringIO())
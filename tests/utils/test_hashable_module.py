@@ -1,9 +1,10 @@
 from collections.abc import Iterable
 
 from xdsl.builder import ImplicitBuilder
-from xdsl.dialects.builtin import ModuleOp, StringAttr
-from xdsl.dialects.test import TestOp
-from xdsl.utils.hashable_module import HashableModule
+from xdsl.dialects.builtin import ModuleOp, StringAttr, i32, i64
+from xdsl.dialects.test import TestOp, TestTermOp
+from xdsl.ir import Block, Region
+from xdsl.utils.hashable_module import HashableModule, structural_hash
 
 
 def _gen_module(labels: Iterable[str]):
@@ -31,3 +32,46 @@ def test_hashable_module():
     assert hash(HashableModule(abra0)) == hash(HashableModule(abra1))
 
     assert HashableModule(a0) != HashableModule(abra1)
+
+
+def test_hashable_module_structure():
+    # Modules with the same operation names but different attributes do not collide
+    assert hash(HashableModule(_gen_module("a"))) != hash(
+        HashableModule(_gen_module("b"))
+    )
+
+    def gen_uses(swap: bool):
+        module = ModuleOp([])
+        with ImplicitBuilder(module.body):
+            a, b = TestOp(result_types=(i32, i32)).results
+            TestOp((b, a) if swap else (a, b))
+        return module
+
+    # The hash depends on the def-use structure, not the identity of the values
+    assert hash(HashableModule(gen_uses(False))) == hash(
+        HashableModule(gen_uses(False))
+    )
+    assert hash(HashableModule(gen_uses(False))) != hash(HashableModule(gen_uses(True)))
+
+    # Result types are taken into account
+    assert hash(HashableModule(ModuleOp([TestOp(result_types=(i32,))]))) != hash(
+        HashableModule(ModuleOp([TestOp(result_types=(i64,))]))
+    )
+
+    # The order of attributes in the dictionary does not matter
+    x, y = StringAttr("x"), StringAttr("y")
+    assert hash(
+        HashableModule(ModuleOp([TestOp(attributes={"a": x, "b": y})]))
+    ) == hash(HashableModule(ModuleOp([TestOp(attributes={"b": y, "a": x})])))
+
+
+def test_structural_hash_successors():
+    def gen_module(target: int):
+        block0 = Block()
+        block1 = Block()
+        block0.add_op(TestTermOp(successors=((block0, block1)[target],)))
+        block1.add_op(TestTermOp(successors=(block0,)))
+        return ModuleOp([TestOp(regions=[Region([block0, block1])])])
+
+    assert structural_hash(gen_module(0)) == structural_hash(gen_module(0))
+    assert structural_hash(gen_module(0)) != structural_hash(gen_module(1))
@@ -3,8 +3,13 @@ This test file needs the other files in the same folder to read and reprint them
 test functions below.
 """
 
+import json
+import os
+import threading
+import time
 from contextlib import redirect_stdout
 from io import StringIO
+from pathlib import Path
 from typing import IO
 
 import pytest
@@ -12,8 +17,9 @@ import pytest
 from xdsl.context import Context
 from xdsl.dialects import builtin, get_all_dialects
 from xdsl.passes import ModulePass
+from xdsl.tools.xdsl_opt_client import send_request
 from xdsl.transforms import get_all_passes
-from xdsl.utils.exceptions import DiagnosticException
+from xdsl.utils.exceptions import DiagnosticException, ParseError
 from xdsl.xdsl_opt_main import xDSLOptMain
 
 
@@ -208,3 +214,200 @@ def test_split_input():
         expected = file.read()
 
     assert inp.strip() == expected.strip()
+
+
+def test_process_request():
+    opt = xDSLOptMain(args=["--server"])
+
+    response = opt.process_request(
+        {
+            "id": 0,
+            "input": '"test.op"() : () -> ()',
+            "target": "mlir",
+        }
+    )
+    assert response == {
+        "id": 0,
+        "output": 'builtin.module {\n  "test.op"() : () -> ()\n}\n\n',
+    }
+
+    response = opt.process_request({"id": 1, "input": "", "passes": "wrong"})
+    assert response == {"id": 1, "error": "Unrecognized pass: wrong", "output": ""}
+
+    response = opt.process_request({"id": 2, "input": "", "target": "wasm"})
+    assert response == {
+        "id": 2,
+        "error": "Binary target wasm is not supported by the server",
+        "output": "",
+    }
+
+    # Pipelines are built once per pass-pipeline string
+    opt.process_request({"input": "", "passes": "dce"})
+    pipeline = opt.pipeline_cache["dce"]
+    opt.process_request({"input": "", "passes": "dce"})
+    assert opt.pipeline_cache["dce"] is pipeline
+
+    # The arguments of the server are left untouched by requests
+    assert opt.args.passes == ""
+
+
+def test_server_stdin(monkeypatch: pytest.MonkeyPatch):
+    requests = (
+        '{"id": 0, "input": "builtin.module {}"}\n\nnot json\n[1, 2]\n'
+        '{"id": 3, "input": 5}\n{"id": 4, "input": "builtin.module {}"}\n'
+    )
+    monkeypatch.setattr("sys.stdin", StringIO(requests))
+
+    opt = xDSLOptMain(args=["--server"])
+    f = StringIO("")
+    with redirect_stdout(f):
+        opt.run()
+
+    responses = [json.loads(line) for line in f.getvalue().splitlines()]
+    assert responses[0] == {"id": 0, "output": "builtin.module {\n}\n\n"}
+    assert responses[1]["id"] is None
+    assert "error" in responses[1]
+    # Valid JSON that is not a request object does not stop the server
+    assert responses[2] == {
+        "id": None,
+        "error": "Expected a JSON object, got list",
+        "output": "",
+    }
+    assert responses[3]["id"] == 3
+    assert "error" in responses[3]
+    assert responses[4] == {"id": 4, "output": "builtin.module {\n}\n\n"}
+
+
+def test_server_stdin_workers(monkeypatch: pytest.MonkeyPatch):
+    requests = '[1, 2]\n{"id": 1, "input": "builtin.module {}"}\n"request"\n'
+    monkeypatch.setattr("sys.stdin", StringIO(requests))
+
+    opt = xDSLOptMain(args=["--server", "--server-workers", "2"])
+    f = StringIO("")
+    with redirect_stdout(f):
+        opt.run()
+
+    responses = [json.loads(line) for line in f.getvalue().splitlines()]
+    assert sorted(responses, key=lambda response: response["id"] or 0) == [
+        {"id": None, "error": "Expected a JSON object, got list", "output": ""},
+        {"id": None, "error": "Expected a JSON object, got str", "output": ""},
+        {"id": 1, "output": "builtin.module {\n}\n\n"},
+    ]
+
+
+def test_server_socket(tmp_path: Path):
+    socket_path = str(tmp_path / "xdsl-opt.sock")
+    opt = xDSLOptMain(args=["--server", "--server-socket", socket_path])
+    server = threading.Thread(target=opt.run, daemon=True)
+    server.start()
+
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.05)
+
+    response = send_request(
+        socket_path, {"id": "a", "input": "builtin.module {}", "passes": "dce"}
+    )
+    assert response == {"id": "a", "output": "builtin.module {\n}\n\n"}
+
+
+def test_split_input_parallel():
+    filename_in = "tests/xdsl_opt/split_input_file.mlir"
+    flags = ["--split-input-file", "--verify-diagnostics", "-p", "dce"]
+
+    sequential = StringIO("")
+    with redirect_stdout(sequential):
+        xDSLOptMain(args=[filename_in, *flags]).run()
+
+    parallel = StringIO("")
+    with redirect_stdout(parallel):
+        xDSLOptMain(args=[filename_in, *flags, "-j", "2"]).run()
+
+    assert parallel.getvalue() == sequential.getvalue()
+    assert parallel.getvalue().count("// -----") == 3
+
+
+class ErrorInputMain(xDSLOptMain):
+    def get_input_stream(self) -> tuple[IO[str], str]:
+        fake_input = StringIO('"test.op"() : () -> ()\n// -----\nbad\n// -----\n')
+        return (fake_input, "mlir")
+
+
+@pytest.mark.parametrize("importable", [True, False])
+def test_split_input_parallel_error(importable: bool):
+    if importable:
+        opt = ErrorInputMain(args=["--split-input-file", "-j", "3"])
+        assert opt.can_use_workers()
+    else:
+        # A class defined locally cannot be passed to worker processes, so the
+        # chunks are processed serially
+        class TestMain(ErrorInputMain):
+            pass
+
+        opt = TestMain(args=["--split-input-file", "-j", "3"])
+        assert not opt.can_use_workers()
+
+    f = StringIO("")
+    with redirect_stdout(f):
+        with pytest.raises(ParseError, match="Operation bad is not registered"):
+            opt.run()
+
+    assert f.getvalue() == 'builtin.module {\n  "test.op"() : () -> ()\n}\n\n// -----\n'
+
+
+def test_cache(tmp_path: Path):
+    class TestMain(xDSLOptMain):
+        runs = 0
+
+        def apply_passes(self, prog: builtin.ModuleOp) -> bool:
+            TestMain.runs += 1
+            return super().apply_passes(prog)
+
+    filename_in = "tests/xdsl_opt/split_input_file.mlir"
+    flags = ["--split-input-file", "--cache-dir", str(tmp_path), "-p", "dce"]
+
+    outputs: list[str] = []
+    for extra_flags in ([], [], ["--print-op-generic"], ["--no-cache"]):
+        f = StringIO("")
+        with redirect_stdout(f):
+            TestMain(args=[filename_in, *flags, *extra_flags]).run()
+        outputs.append(f.getvalue())
+
+    # The second run is a cache hit, changing the options is a miss
+    assert TestMain.runs == 12
+    assert outputs[0] == outputs[1] == outputs[3]
+    assert outputs[2] != outputs[0]
+
+
+def test_binary_target(tmp_path: Path):
+    input_path = tmp_path / "module.mlir"
+    input_path.write_text(
+        'wasm.module {\n  wasm.func @f : () -> () export "f" {\n  }\n}\n'
+    )
+    output_path = tmp_path / "module.wasm"
+
+    opt = xDSLOptMain(args=[str(input_path), "-t", "wasm", "-o", str(output_path)])
+    opt.run()
+
+    assert output_path.read_bytes() == (
+        b"\x00asm\x01\x00\x00\x00"
+        b"\x01\x84\x80\x80\x80\x00\x01\x60\x00\x00"
+        b"\x03\x82\x80\x80\x80\x00\x01\x00"
+        b"\x07\x85\x80\x80\x80\x00\x01\x01f\x00\x00"
+        b"\x0a\x88\x80\x80\x80\x00\x01\x82\x80\x80\x80\x00\x00\x0b"
+    )
+
+
+def test_binary_target_error_keeps_output(tmp_path: Path):
+    input_path = tmp_path / "module.mlir"
+    input_path.write_text("wasm.module {\n  bad\n}\n")
+    output_path = tmp_path / "module.wasm"
+    output_path.write_bytes(b"previous")
+
+    opt = xDSLOptMain(args=[str(input_path), "-t", "wasm", "-o", str(output_path)])
+    with pytest.raises(ParseError):
+        opt.run()
+
+    # The output file is only written once the input was encoded
+    assert output_path.read_bytes() == b"previous"
@@ -0,0 +1,16 @@
+%A, %B, %C = "test.op"() : () -> (memref<3x5xf64>, memref<5x44xf64>, memref<3x44xf64>)
+%zero_float = arith.constant 0.000000e+00 : f64
+memref_stream.generic {
+    bounds = [3, 44, 5],
+    indexing_maps = [
+        affine_map<(d0, d1, d2) -> (d0, d2)>,
+        affine_map<(d0, d1, d2) -> (d2, d1)>,
+        affine_map<(d0, d1) -> (d0, d1)>
+    ],
+    iterator_types = ["parallel", "parallel", "reduction"]
+} ins(%A, %B : memref<3x5xf64>, memref<5x44xf64>) outs(%C : memref<3x44xf64>) inits(%zero_float : f64) {
+^1(%a : f64, %b : f64, %c : f64):
+    %prod = arith.mulf %a, %b fastmath<fast> : f64
+    %res = arith.addf %prod, %c fastmath<fast> : f64
+    memref_stream.yield %res : f64
+}
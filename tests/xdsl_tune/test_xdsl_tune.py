@@ -0,0 +1,128 @@
+"""
+This test file needs the other files in the same folder to tune the pipelines applied
+to them.
+"""
+
+import argparse
+import os
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from xdsl.context import Context
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.tools.xdsl_tune import (
+    ParameterSpace,
+    load_cost_function,
+    op_count_cost,
+    parse_parameter_values,
+    xDSLTuneMain,
+)
+
+GENERIC = "tests/xdsl_tune/generic.mlir"
+INTERLEAVE = "memref-stream-interleave{pipeline-depth=$depth}"
+
+
+def test_parse_parameter_values():
+    assert parse_parameter_values(["1", "4", "8"]) == ("1", "4", "8")
+    assert parse_parameter_values(["1..3", "8"]) == ("1", "2", "3", "8")
+    assert parse_parameter_values(["true", "false"]) == ("true", "false")
+
+
+def test_parameter_space():
+    space = ParameterSpace("p{a=$a b=${b}}", {"a": ("1", "2"), "b": ("x", "y", "z")})
+    assert space.size == 6
+    grid = list(space.grid())
+    assert len(grid) == 6
+    assert grid[0] == {"a": "1", "b": "x"}
+    assert grid[-1] == {"a": "2", "b": "z"}
+    assert space.instantiate(grid[1]) == "p{a=1 b=y}"
+
+    sample = list(space.sample(4, seed=0))
+    assert len(sample) == 4
+    assert all(values in grid for values in sample)
+    assert len({tuple(values.values()) for values in sample}) == 4
+    assert sample == list(space.sample(4, seed=0))
+    assert len(list(space.sample(10))) == 6
+
+
+def test_parameter_space_missing_values():
+    with pytest.raises(ValueError, match="No values given for parameters b"):
+        ParameterSpace("p{a=$a b=$b}", {"a": ("1",)})
+
+
+def test_load_cost_function():
+    assert load_cost_function("op-count") is op_count_cost
+    assert load_cost_function("xdsl.tools.xdsl_tune:op_count_cost") is op_count_cost
+    with pytest.raises(ValueError, match="Unknown cost function nope"):
+        load_cost_function("nope")
+
+
+def run_tune(args: list[str]) -> tuple[str, str]:
+    tune = xDSLTuneMain(args=args)
+    stdout, stderr = StringIO(), StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        tune.run()
+    return stdout.getvalue(), stderr.getvalue()
+
+
+def test_tune_op_count():
+    stdout, stderr = run_tune(
+        [GENERIC, "-p", INTERLEAVE, "--param", "depth", "1..3", "--verbose"]
+    )
+    assert stdout == "memref-stream-interleave{pipeline_depth=1}\n"
+    assert stderr.splitlines() == [
+        "6\tmemref-stream-interleave{pipeline_depth=1}",
+        "8\tmemref-stream-interleave{pipeline_depth=2}",
+        "12\tmemref-stream-interleave{pipeline_depth=3}",
+    ]
+
+
+def largest_op_count(ctx: Context, module: ModuleOp, args: argparse.Namespace):
+    return -op_count_cost(ctx, module, args)
+
+
+def test_tune_custom_cost_in_parallel():
+    stdout, _ = run_tune(
+        [
+            GENERIC,
+            "-p",
+            INTERLEAVE,
+            "--param",
+            "depth",
+            "1",
+            "2",
+            "3",
+            "--cost",
+            "tests.xdsl_tune.test_xdsl_tune:largest_op_count",
+            "-j",
+            "2",
+        ]
+    )
+    assert stdout == "memref-stream-interleave{pipeline_depth=3}\n"
+
+
+def test_tune_cache(tmp_path: Path):
+    args = [GENERIC, "-p", INTERLEAVE, "--param", "depth", "1", "2"]
+    args += ["--cache-dir", str(tmp_path)]
+    tune = xDSLTuneMain(args=args)
+    with open(GENERIC) as f:
+        source = f.read()
+    results = tune.tune(source)
+    assert [result.cost for result in results] == [6, 8]
+    assert len(os.listdir(tmp_path)) == 2
+
+    # Cached costs are used without applying the pipeline
+    tune.evaluate = None  # pyright: ignore[reportAttributeAccessIssue]
+    assert tune.tune(source) == results
+
+
+def test_tune_failures():
+    # The interpreter cannot find the function to run
+    with pytest.raises(SystemExit):
+        run_tune(
+            [GENERIC, "-p", INTERLEAVE, "--param", "depth", "1"]
+            + ["--cost", "interpreter-ops"]
+        )
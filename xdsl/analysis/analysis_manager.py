@@ -0,0 +1,161 @@
+"""
+A cache of analyses of the IR, such as dominance or liveness, shared by the passes of
+a pipeline.
+
+An analysis is any callable computing a result from an operation, region or block,
+typically a class whose constructor takes the IR it analyses, such as
+`DominanceInfo`. Results are computed lazily on first request, and cached until they
+are invalidated, either because the IR they were computed from was modified, which is
+notified by the listener of the manager, or because a pass did not declare the
+analysis as preserved.
+
+The `PatternRewriteWalker` registers the listener of the manager of the pipeline it
+runs in, so that the results cached by a pass remain valid while it rewrites patterns.
+Passes modifying the IR by other means, such as with `Rewriter`, must call
+`invalidate_enclosing` before getting the results of analyses of the IR they modified.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, TypeVar, cast
+
+from xdsl.ir import Block, Operation, Region, SSAValue
+from xdsl.pattern_rewriter import PatternRewriterListener
+
+IRNodeT = TypeVar("IRNodeT", Operation, Region, Block)
+AnalysisT = TypeVar("AnalysisT")
+
+Analysis = Callable[[Any], Any]
+"""A function computing the result of an analysis from an operation, region or block."""
+
+
+@dataclass(frozen=True)
+class PreservedAnalyses:
+    """The analyses whose results remain valid after a pass."""
+
+    analyses: frozenset[Analysis] = field(default_factory=frozenset[Analysis])
+    preserves_all: bool = False
+    """Whether the pass preserves all analyses, for example as it does not modify IR."""
+
+    def is_preserved(self, analysis: Analysis) -> bool:
+        return self.preserves_all or analysis in self.analyses
+
+
+NO_ANALYSES = PreservedAnalyses()
+ALL_ANALYSES = PreservedAnalyses(preserves_all=True)
+
+
+class AnalysisManager:
+    """
+    Computes analyses of IR objects on demand, and caches their results until they are
+    invalidated.
+
+    Analyses are assumed to only depend on the IR they are computed from, so that a
+    modification only invalidates the results of the IR enclosing it. Modifications
+    must be notified to the manager for the cached results to remain valid, by
+    registering `listener` with the rewriter, or with `invalidate`.
+    """
+
+    _cache: dict[int, tuple[Operation | Region | Block, dict[Analysis, Any]]]
+    """
+    The results of analyses, keyed by the identity of the IR they were computed from,
+    which is kept alive by the cache.
+    """
+
+    _managers: ClassVar[dict[Operation, AnalysisManager]] = {}
+    """The managers of the pipelines currently running, keyed by their root operation."""
+
+    def __init__(self):
+        self._cache = {}
+
+    def get(self, analysis: Callable[[IRNodeT], AnalysisT], ir: IRNodeT) -> AnalysisT:
+        """Return the result of `analysis` on `ir`, computing it if it is not cached."""
+        _, results = self._cache.setdefault(id(ir), (ir, {}))
+        if analysis not in results:
+            results[analysis] = analysis(ir)
+        return cast(AnalysisT, results[analysis])
+
+    def get_cached(
+        self, analysis: Callable[[IRNodeT], AnalysisT], ir: IRNodeT
+    ) -> AnalysisT | None:
+        """Return the result of `analysis` on `ir` if it is cached, otherwise None."""
+        _, results = self._cache.get(id(ir), (ir, {}))
+        if analysis not in results:
+            return None
+        return cast(AnalysisT, results[analysis])
+
+    def invalidate(self, preserved: PreservedAnalyses = NO_ANALYSES) -> None:
+        """Drop the cached results of all analyses that are not preserved."""
+        if preserved.preserves_all:
+            return
+        for key, (_, results) in tuple(self._cache.items()):
+            for analysis in tuple(results):
+                if not preserved.is_preserved(analysis):
+                    del results[analysis]
+            if not results:
+                del self._cache[key]
+
+    def invalidate_enclosing(self, ir: Operation | Region | Block) -> None:
+        """
+        Drop the cached results of analyses of `ir` and of all the IR enclosing it,
+        which are invalidated by a modification of `ir`.
+        """
+        node: Operation | Region | Block | None = ir
+        while node is not None:
+            self._cache.pop(id(node), None)
+            node = node.parent
+
+    def listener(self) -> PatternRewriterListener:
+        """
+        A listener invalidating the analyses of the IR enclosing each modification
+        made by a rewriter.
+        """
+
+        def on_replacement(op: Operation, new_results: Sequence[SSAValue | None]):
+            self.invalidate_enclosing(op)
+
+        return PatternRewriterListener(
+            operation_insertion_handler=[self.invalidate_enclosing],
+            block_creation_handler=[self.invalidate_enclosing],
+            operation_removal_handler=[self.invalidate_enclosing],
+            operation_modification_handler=[self.invalidate_enclosing],
+            operation_replacement_handler=[on_replacement],
+        )
+
+    @staticmethod
+    def active(op: Operation) -> AnalysisManager | None:
+        """The manager of the pipeline running on `op` or on one of its ancestors."""
+        if not AnalysisManager._managers:
+            return None
+        node: Operation | None = op
+        while node is not None:
+            if (manager := AnalysisManager._managers.get(node)) is not None:
+                return manager
+            node = node.parent_op()
+        return None
+
+    @staticmethod
+    def for_op(op: Operation) -> AnalysisManager:
+        """
+        The manager of the pipeline running on `op` or on one of its ancestors, or a
+        new manager if there is none, whose results are then not shared with other
+        passes.
+        """
+        if (manager := AnalysisManager.active(op)) is not None:
+            return manager
+        return AnalysisManager()
+
+    @contextmanager
+    def scope(self, op: Operation) -> Iterator[AnalysisManager]:
+        """Make this the manager returned by `for_op` within the context."""
+        if op in AnalysisManager._managers:
+            yield AnalysisManager._managers[op]
+            return
+        AnalysisManager._managers[op] = self
+        try:
+            yield self
+        finally:
+            del AnalysisManager._managers[op]
@@ -0,0 +1,648 @@
+"""
+A framework for sparse dataflow analyses, modelled on MLIR's `DataFlowSolver`.
+
+Analyses compute states, such as lattices attached to SSA values or the liveness of
+blocks, by visiting program points, which are operations and blocks. When reading a
+state, an analysis registers the point it is visiting as a dependent of the state, and
+the point is visited again when the state changes. The solver drives all loaded
+analyses from a single worklist, so that each point is only revisited when one of the
+states it depends on changes, and analyses reach a fixpoint after a number of visits
+proportional to the number of edges of the program times the height of the lattices.
+
+`DeadCodeAnalysis` computes the blocks and control flow edges that may be executed,
+using the `BranchOpInterface` and `RegionBranchOpInterface` traits and the constant
+values of the operands of branches. Sparse analyses only visit executable code, and
+must be loaded in the same solver as `DeadCodeAnalysis`.
+
+See external [documentation](https://mlir.llvm.org/docs/Tutorials/DataFlowAnalysis/).
+"""
+
+from __future__ import annotations
+
+import abc
+from collections import deque
+from collections.abc import Hashable, Sequence
+from dataclasses import dataclass
+from typing import Generic, TypeVar, cast
+
+from typing_extensions import Self
+
+from xdsl.ir import Attribute, Block, Operation, Region, SSAValue
+from xdsl.traits import BranchOpInterface, IsTerminator, RegionBranchOpInterface
+
+ProgramPoint = Operation | Block
+"""A point of the program visited by analyses."""
+
+
+@dataclass(frozen=True)
+class CFGEdge:
+    """A control flow edge between two blocks of a region."""
+
+    from_block: Block
+    to_block: Block
+
+
+class AnalysisState(abc.ABC):
+    """
+    The state computed by analyses about an anchor of the program, such as a lattice
+    value attached to an SSA value.
+    """
+
+    anchor: Hashable
+    dependents: dict[tuple[ProgramPoint, DataFlowAnalysis], None]
+    """The points to visit again when the state changes, with the analysis to run."""
+
+    def __init__(self, anchor: Hashable):
+        self.anchor = anchor
+        self.dependents = {}
+
+    def on_update(self, solver: DataFlowSolver) -> None:
+        """Called by the solver when the state changes."""
+        for point, analysis in self.dependents:
+            solver.enqueue(point, analysis)
+
+
+class Executable(AnalysisState):
+    """Whether a block or a control flow edge may be executed."""
+
+    anchor: Block | CFGEdge
+    live: bool
+    subscribers: set[DataFlowAnalysis]
+    """
+    The analyses visiting a block and all of its operations when the block becomes
+    live, or the destination block of an edge when the edge becomes live.
+    """
+
+    def __init__(self, anchor: Block | CFGEdge):
+        super().__init__(anchor)
+        self.live = False
+        self.subscribers = set()
+
+    def set_to_live(self) -> bool:
+        """Mark the anchor as live, and return whether the state changed."""
+        if self.live:
+            return False
+        self.live = True
+        return True
+
+    def on_update(self, solver: DataFlowSolver) -> None:
+        super().on_update(solver)
+        block = self.anchor if isinstance(self.anchor, Block) else self.anchor.to_block
+        for analysis in self.subscribers:
+            solver.enqueue(block, analysis)
+            for op in block.ops:
+                solver.enqueue(op, analysis)
+
+
+class LatticeValue(abc.ABC):
+    """
+    An element of a lattice, an immutable value with a least upper bound, and for
+    backward analyses a greatest lower bound.
+    """
+
+    @property
+    @abc.abstractmethod
+    def is_uninitialized(self) -> bool:
+        """Whether no information was computed yet for this value."""
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def join(self, other: Self) -> Self:
+        """The least upper bound of the two values."""
+        raise NotImplementedError()
+
+    def meet(self, other: Self) -> Self:
+        """The greatest lower bound of the two values."""
+        raise NotImplementedError()
+
+
+LatticeValueT = TypeVar("LatticeValueT", bound=LatticeValue)
+
+
+class Lattice(AnalysisState, Generic[LatticeValueT]):
+    """The lattice value attached to an SSA value by sparse analyses."""
+
+    anchor: SSAValue
+    value: LatticeValueT
+
+    def __init__(self, anchor: SSAValue, value: LatticeValueT):
+        super().__init__(anchor)
+        self.value = value
+
+    def join(self, value: LatticeValueT) -> bool:
+        """Join `value` into this lattice, and return whether it changed."""
+        new_value = self.value.join(value)
+        if new_value == self.value:
+            return False
+        self.value = new_value
+        return True
+
+    def meet(self, value: LatticeValueT) -> bool:
+        """Meet `value` into this lattice, and return whether it changed."""
+        new_value = self.value.meet(value)
+        if new_value == self.value:
+            return False
+        self.value = new_value
+        return True
+
+
+AnalysisStateT = TypeVar("AnalysisStateT", bound=AnalysisState)
+LatticeT = TypeVar("LatticeT", bound=Lattice[LatticeValue])
+DataFlowAnalysisT = TypeVar("DataFlowAnalysisT", bound="DataFlowAnalysis")
+
+
+class DataFlowSolver:
+    """
+    Runs dataflow analyses to a fixpoint, and holds the states they computed.
+
+    Analyses are loaded with `load`, and run with `initialize_and_run`.
+    """
+
+    analyses: list[DataFlowAnalysis]
+    _states: dict[tuple[Hashable, type[AnalysisState]], AnalysisState]
+    _worklist: deque[tuple[ProgramPoint, DataFlowAnalysis]]
+    _enqueued: set[tuple[ProgramPoint, DataFlowAnalysis]]
+    """The items of the worklist, which are only scheduled once at a time."""
+
+    def __init__(self):
+        self.analyses = []
+        self._states = {}
+        self._worklist = deque()
+        self._enqueued = set()
+
+    def load(self, analysis: DataFlowAnalysisT) -> DataFlowAnalysisT:
+        """Add an analysis to run with the solver."""
+        self.analyses.append(analysis)
+        return analysis
+
+    def initialize_and_run(self, top: Operation) -> None:
+        """Run the loaded analyses on the regions of `top` until a fixpoint."""
+        for analysis in self.analyses:
+            analysis.initialize(top)
+        while self._worklist:
+            item = self._worklist.popleft()
+            self._enqueued.discard(item)
+            point, analysis = item
+            analysis.visit(point)
+
+    def enqueue(self, point: ProgramPoint, analysis: DataFlowAnalysis) -> None:
+        """Schedule a visit of `point` by `analysis`."""
+        item = (point, analysis)
+        if item not in self._enqueued:
+            self._enqueued.add(item)
+            self._worklist.append(item)
+
+    def lookup_state(
+        self, anchor: Hashable, state_type: type[AnalysisStateT]
+    ) -> AnalysisStateT | None:
+        """The state of the given type attached to `anchor`, if it was created."""
+        return cast(AnalysisStateT | None, self._states.get((anchor, state_type)))
+
+    def get_or_create_state(
+        self, anchor: Hashable, state_type: type[AnalysisStateT]
+    ) -> AnalysisStateT:
+        """The state of the given type attached to `anchor`, created if needed."""
+        key = (anchor, state_type)
+        if (state := self._states.get(key)) is None:
+            state = state_type(anchor)
+            self._states[key] = state
+        return cast(AnalysisStateT, state)
+
+    def propagate_if_changed(self, state: AnalysisState, changed: bool) -> None:
+        if changed:
+            state.on_update(self)
+
+    def is_live(self, block: Block) -> bool:
+        """Whether `block` may be executed, according to `DeadCodeAnalysis`."""
+        state = self.lookup_state(block, Executable)
+        return state is not None and state.live
+
+
+class DataFlowAnalysis(abc.ABC):
+    """An analysis computing states by visiting program points."""
+
+    solver: DataFlowSolver
+
+    def __init__(self, solver: DataFlowSolver):
+        self.solver = solver
+
+    @abc.abstractmethod
+    def initialize(self, top: Operation) -> None:
+        """Set up the analysis of the regions of `top`, and schedule first visits."""
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def visit(self, point: ProgramPoint) -> None:
+        """Update the states computed from `point`."""
+        raise NotImplementedError()
+
+    def get_or_create(
+        self, anchor: Hashable, state_type: type[AnalysisStateT]
+    ) -> AnalysisStateT:
+        return self.solver.get_or_create_state(anchor, state_type)
+
+    def get_or_create_for(
+        self,
+        dependent: ProgramPoint,
+        anchor: Hashable,
+        state_type: type[AnalysisStateT],
+    ) -> AnalysisStateT:
+        """
+        The state attached to `anchor`, with `dependent` visited again by this
+        analysis when the state changes.
+        """
+        state = self.solver.get_or_create_state(anchor, state_type)
+        state.dependents[(dependent, self)] = None
+        return state
+
+    def propagate_if_changed(self, state: AnalysisState, changed: bool) -> None:
+        self.solver.propagate_if_changed(state, changed)
+
+    def subscribe_to_blocks(self, top: Operation) -> None:
+        """Visit each block nested in `top` and its operations once it is live."""
+        for block in top.walk_blocks():
+            executable = self.get_or_create(block, Executable)
+            executable.subscribers.add(self)
+            if executable.live:
+                self.solver.enqueue(block, self)
+                for op in block.ops:
+                    self.solver.enqueue(op, self)
+
+
+@dataclass(frozen=True)
+class ConstantValue(LatticeValue):
+    """
+    The constant value of an SSA value, which is unknown if it may take several
+    values.
+    """
+
+    constant: Attribute | None = None
+    initialized: bool = False
+
+    @staticmethod
+    def unknown() -> ConstantValue:
+        return ConstantValue(None, True)
+
+    @property
+    def is_uninitialized(self) -> bool:
+        return not self.initialized
+
+    @property
+    def is_unknown(self) -> bool:
+        return self.initialized and self.constant is None
+
+    def join(self, other: ConstantValue) -> ConstantValue:
+        if self.is_uninitialized:
+            return other
+        if other.is_uninitialized or self == other:
+            return self
+        return ConstantValue.unknown()
+
+
+class ConstantValueLattice(Lattice[ConstantValue]):
+    """
+    The lattice of constant values, computed by `SparseConstantPropagation`, and read
+    by `DeadCodeAnalysis` to find the branches that are not taken.
+    """
+
+    def __init__(self, anchor: SSAValue):
+        super().__init__(anchor, ConstantValue())
+
+
+def _operand_constants(
+    analysis: DataFlowAnalysis, op: Operation
+) -> list[Attribute | None] | None:
+    """
+    The constant values of the operands of `op`, with None for unknown values, or None
+    if the value of an operand was not computed yet. `op` is visited again by the
+    analysis when the values change.
+    """
+    constants: list[Attribute | None] = []
+    for operand in op.operands:
+        value = analysis.get_or_create_for(op, operand, ConstantValueLattice).value
+        if value.is_uninitialized:
+            return None
+        constants.append(value.constant)
+    return constants
+
+
+def _region_branch_parent(op: Operation) -> Operation | None:
+    """
+    The parent operation of `op` if `op` is a terminator branching to its parent's
+    successors according to `RegionBranchOpInterface`.
+    """
+    if op.successors or not op.has_trait(IsTerminator):
+        return None
+    parent = op.parent_op()
+    if parent is None or parent.get_trait(RegionBranchOpInterface) is None:
+        return None
+    return parent
+
+
+def _successor_inputs(
+    op: Operation, successor: Region | None
+) -> Sequence[SSAValue] | None:
+    """
+    The values to which operands are forwarded when `op` branches to `successor`,
+    its results or the arguments of the entry block of a region, or None if the
+    region is empty.
+    """
+    if successor is None:
+        return op.results
+    if (entry := successor.blocks.first) is None:
+        return None
+    return entry.args
+
+
+class DeadCodeAnalysis(DataFlowAnalysis):
+    """
+    Computes the blocks and control flow edges that may be executed.
+
+    The entry blocks of the regions of the analysed operation are executable, as well
+    as the entry blocks of all regions of operations that do not implement
+    `RegionBranchOpInterface`. Successors of branches that do not implement
+    `BranchOpInterface` are all executable. Otherwise, only the successors that may
+    be taken given the constant values of operands are executable, which must be
+    computed by another analysis loaded in the same solver, such as
+    `SparseConstantPropagation`.
+    """
+
+    def initialize(self, top: Operation) -> None:
+        self.subscribe_to_blocks(top)
+        for region in top.regions:
+            self._mark_entry_live(region)
+
+    def _mark_entry_live(self, region: Region) -> None:
+        if (entry := region.blocks.first) is not None:
+            executable = self.get_or_create(entry, Executable)
+            self.propagate_if_changed(executable, executable.set_to_live())
+
+    def _mark_edge_live(self, from_block: Block, to_block: Block) -> None:
+        edge = self.get_or_create(CFGEdge(from_block, to_block), Executable)
+        self.propagate_if_changed(edge, edge.set_to_live())
+        executable = self.get_or_create(to_block, Executable)
+        self.propagate_if_changed(executable, executable.set_to_live())
+
+    def visit(self, point: ProgramPoint) -> None:
+        if isinstance(point, Block):
+            return
+        op = point
+        if op.regions:
+            if (interface := op.get_trait(RegionBranchOpInterface)) is None:
+                for region in op.regions:
+                    self._mark_entry_live(region)
+            elif (constants := _operand_constants(self, op)) is not None:
+                for successor in interface.get_entry_successor_regions(op, constants):
+                    if successor is not None:
+                        self._mark_entry_live(successor)
+        if not op.successors:
+            return
+        block = op.parent_block()
+        assert block is not None
+        if (interface := op.get_trait(BranchOpInterface)) is None:
+            successors = op.successors
+        elif (constants := _operand_constants(self, op)) is None:
+            return
+        elif (successor := interface.get_successor_for_operands(op, constants)) is None:
+            successors = op.successors
+        else:
+            successors = (successor,)
+        for successor in successors:
+            self._mark_edge_live(block, successor)
+
+
+class SparseForwardDataFlowAnalysis(DataFlowAnalysis, Generic[LatticeT]):
+    """
+    Base class of sparse forward analyses, computing a lattice value for each SSA
+    value from the values of the operands of its definition.
+
+    Values forwarded along control flow edges, through `BranchOpInterface` and
+    `RegionBranchOpInterface`, are joined into the arguments of successor blocks and
+    into the results of region operations. Other block arguments and the results of
+    operations with regions are set to the entry state of the lattice.
+    """
+
+    lattice_type: type[LatticeT]
+
+    def __init__(self, solver: DataFlowSolver, lattice_type: type[LatticeT]):
+        super().__init__(solver)
+        self.lattice_type = lattice_type
+
+    @abc.abstractmethod
+    def visit_operation(
+        self, op: Operation, operands: Sequence[LatticeT], results: Sequence[LatticeT]
+    ) -> None:
+        """
+        The transfer function of `op`, joining the values of its results computed from
+        the values of its operands.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def set_to_entry_state(self, lattice: LatticeT) -> None:
+        """Set `lattice` to the most conservative value."""
+        raise NotImplementedError()
+
+    def visit_non_control_flow_arguments(
+        self, op: Operation, region: Region, arguments: Sequence[LatticeT]
+    ) -> None:
+        """
+        Compute the values of the leading arguments of the entry block of `region`,
+        which are not forwarded from operands of `op`, such as induction variables.
+        """
+        for argument in arguments:
+            self.set_to_entry_state(argument)
+
+    def get_lattice(self, value: SSAValue) -> LatticeT:
+        return self.get_or_create(value, self.lattice_type)
+
+    def get_lattice_for(self, dependent: ProgramPoint, value: SSAValue) -> LatticeT:
+        return self.get_or_create_for(dependent, value, self.lattice_type)
+
+    def join(self, lattice: LatticeT, other: LatticeT) -> None:
+        self.propagate_if_changed(lattice, lattice.join(other.value))
+
+    def initialize(self, top: Operation) -> None:
+        self.subscribe_to_blocks(top)
+
+    def visit(self, point: ProgramPoint) -> None:
+        if isinstance(point, Block):
+            self._visit_block(point)
+            return
+        op = point
+        block = op.parent_block()
+        if block is None or not self.solver.is_live(block):
+            return
+        if (interface := op.get_trait(RegionBranchOpInterface)) is not None:
+            self._visit_region_branch(op, interface)
+        elif op.regions:
+            for result in op.results:
+                self.set_to_entry_state(self.get_lattice(result))
+        elif (parent := _region_branch_parent(op)) is not None:
+            self._visit_region_terminator(op, parent)
+        elif op.results:
+            operands = [self.get_lattice_for(op, operand) for operand in op.operands]
+            results = [self.get_lattice(result) for result in op.results]
+            self.visit_operation(op, operands, results)
+
+    def _join_forwarded(
+        self,
+        dependent: ProgramPoint,
+        values: Sequence[SSAValue],
+        inputs: Sequence[SSAValue],
+    ) -> None:
+        """Join `values` into the lattices of the trailing values of `inputs`."""
+        for value, input in zip(values, inputs[len(inputs) - len(values) :]):
+            self.join(self.get_lattice(input), self.get_lattice_for(dependent, value))
+
+    def _visit_region_branch(
+        self, op: Operation, interface: RegionBranchOpInterface
+    ) -> None:
+        if (constants := _operand_constants(self, op)) is None:
+            return
+        for successor in interface.get_entry_successor_regions(op, constants):
+            if (inputs := _successor_inputs(op, successor)) is None:
+                continue
+            operands = interface.get_entry_successor_operands(op, successor)
+            self._join_forwarded(op, operands, inputs)
+            if successor is not None:
+                arguments = [
+                    self.get_lattice(arg)
+                    for arg in inputs[: len(inputs) - len(operands)]
+                ]
+                self.visit_non_control_flow_arguments(op, successor, arguments)
+
+    def _visit_region_terminator(self, op: Operation, parent: Operation) -> None:
+        interface = parent.get_trait(RegionBranchOpInterface)
+        region = op.parent_region()
+        assert interface is not None
+        assert region is not None
+        for successor in interface.get_region_successors(parent, region):
+            if (inputs := _successor_inputs(parent, successor)) is not None:
+                self._join_forwarded(op, op.operands, inputs)
+
+    def _visit_block(self, block: Block) -> None:
+        if not block.args or not self.solver.is_live(block):
+            return
+        region = block.parent
+        if region is not None and region.blocks.first is block:
+            parent = region.parent
+            if parent is None or parent.get_trait(RegionBranchOpInterface) is None:
+                for arg in block.args:
+                    self.set_to_entry_state(self.get_lattice(arg))
+            # Otherwise, the arguments are computed when visiting the parent
+            return
+        for predecessor in dict.fromkeys(block.predecessors()):
+            edge = self.get_or_create_for(
+                block, CFGEdge(predecessor, block), Executable
+            )
+            if not edge.live:
+                continue
+            terminator = predecessor.last_op
+            assert terminator is not None
+            if (interface := terminator.get_trait(BranchOpInterface)) is None:
+                for arg in block.args:
+                    self.set_to_entry_state(self.get_lattice(arg))
+                return
+            for index, successor in enumerate(terminator.successors):
+                if successor is block:
+                    operands = interface.get_successor_operands(terminator, index)
+                    self._join_forwarded(block, operands, block.args)
+
+
+class SparseBackwardDataFlowAnalysis(DataFlowAnalysis, Generic[LatticeT]):
+    """
+    Base class of sparse backward analyses, computing a lattice value for each SSA
+    value from the values of the results of the operations using it.
+
+    Values of block arguments and of the results of region operations are met into
+    the values forwarded to them through `BranchOpInterface` and
+    `RegionBranchOpInterface`. Other operands of branches are set to the exit state
+    of the lattice.
+    """
+
+    lattice_type: type[LatticeT]
+
+    def __init__(self, solver: DataFlowSolver, lattice_type: type[LatticeT]):
+        super().__init__(solver)
+        self.lattice_type = lattice_type
+
+    @abc.abstractmethod
+    def visit_operation(
+        self, op: Operation, operands: Sequence[LatticeT], results: Sequence[LatticeT]
+    ) -> None:
+        """
+        The transfer function of `op`, meeting the values of its operands computed
+        from the values of its results.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def set_to_exit_state(self, lattice: LatticeT) -> None:
+        """Set `lattice` to the most conservative value."""
+        raise NotImplementedError()
+
+    def get_lattice(self, value: SSAValue) -> LatticeT:
+        return self.get_or_create(value, self.lattice_type)
+
+    def get_lattice_for(self, dependent: ProgramPoint, value: SSAValue) -> LatticeT:
+        return self.get_or_create_for(dependent, value, self.lattice_type)
+
+    def meet(self, lattice: LatticeT, other: LatticeT) -> None:
+        self.propagate_if_changed(lattice, lattice.meet(other.value))
+
+    def initialize(self, top: Operation) -> None:
+        self.subscribe_to_blocks(top)
+
+    def visit(self, point: ProgramPoint) -> None:
+        if isinstance(point, Block):
+            return
+        op = point
+        block = op.parent_block()
+        if block is None or not self.solver.is_live(block):
+            return
+        if (interface := op.get_trait(BranchOpInterface)) is not None:
+            forwarded = set[SSAValue]()
+            for index, successor in enumerate(op.successors):
+                operands = interface.get_successor_operands(op, index)
+                self._meet_forwarded(op, operands, successor.args)
+                forwarded.update(operands)
+            self._set_to_exit_state_except(op.operands, forwarded)
+        elif (interface := op.get_trait(RegionBranchOpInterface)) is not None:
+            forwarded = set[SSAValue]()
+            for successor in (*op.regions, None):
+                if (inputs := _successor_inputs(op, successor)) is None:
+                    continue
+                operands = interface.get_entry_successor_operands(op, successor)
+                self._meet_forwarded(op, operands, inputs)
+                forwarded.update(operands)
+            self._set_to_exit_state_except(op.operands, forwarded)
+        elif (parent := _region_branch_parent(op)) is not None:
+            interface = parent.get_trait(RegionBranchOpInterface)
+            region = op.parent_region()
+            assert interface is not None
+            assert region is not None
+            for successor in interface.get_region_successors(parent, region):
+                if (inputs := _successor_inputs(parent, successor)) is not None:
+                    self._meet_forwarded(op, op.operands, inputs)
+        else:
+            operands = [self.get_lattice(operand) for operand in op.operands]
+            results = [self.get_lattice_for(op, result) for result in op.results]
+            self.visit_operation(op, operands, results)
+
+    def _meet_forwarded(
+        self,
+        dependent: ProgramPoint,
+        values: Sequence[SSAValue],
+        inputs: Sequence[SSAValue],
+    ) -> None:
+        """Meet the lattices of the trailing values of `inputs` into `values`."""
+        for value, input in zip(values, inputs[len(inputs) - len(values) :]):
+            self.meet(self.get_lattice(value), self.get_lattice_for(dependent, input))
+
+    def _set_to_exit_state_except(
+        self, operands: Sequence[SSAValue], forwarded: set[SSAValue]
+    ) -> None:
+        for operand in operands:
+            if operand not in forwarded:
+                self.set_to_exit_state(self.get_lattice(operand))
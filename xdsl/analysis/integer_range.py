@@ -0,0 +1,391 @@
+"""
+Integer range analysis, computing bounds of the values that integer SSA values may
+take.
+
+Ranges are signed, inclusive, and bounded by the range of values of the type, with
+index values assumed to be 64 bits wide. Values whose range is a single value are also
+recorded in the lattice of constant values, so that `DeadCodeAnalysis` prunes the
+branches whose condition is known from the ranges. Since constant values of other
+types are unknown, this analysis should not be loaded in the same solver as
+`SparseConstantPropagation`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import ClassVar
+
+from xdsl.analysis.dataflow import (
+    ConstantValue,
+    ConstantValueLattice,
+    DataFlowSolver,
+    Lattice,
+    LatticeValue,
+    SparseForwardDataFlowAnalysis,
+)
+from xdsl.dialects import arith, scf
+from xdsl.dialects.builtin import IndexType, IntegerAttr, IntegerType, Signedness
+from xdsl.ir import Attribute, Operation, Region, SSAValue
+from xdsl.utils.comparisons import signed_value_range, unsigned_value_range
+
+INDEX_BITWIDTH = 64
+"""The bitwidth assumed for values of index type."""
+
+
+def type_range(value_type: Attribute) -> tuple[int, int] | None:
+    """
+    The inclusive bounds of the values of an integer or index type, or None for other
+    types.
+    """
+    if isinstance(value_type, IndexType):
+        lower, upper = signed_value_range(INDEX_BITWIDTH)
+    elif isinstance(value_type, IntegerType):
+        if value_type.signedness.data == Signedness.UNSIGNED:
+            lower, upper = unsigned_value_range(value_type.bitwidth)
+        else:
+            lower, upper = signed_value_range(value_type.bitwidth)
+    else:
+        return None
+    return lower, upper - 1
+
+
+@dataclass(frozen=True)
+class IntegerValueRange(LatticeValue):
+    """The inclusive bounds of the values an SSA value may take."""
+
+    bounds: tuple[int, int] | None = None
+    """The bounds of the values, or None if they are not known."""
+    initialized: bool = False
+
+    @staticmethod
+    def unknown() -> IntegerValueRange:
+        return IntegerValueRange(None, True)
+
+    @staticmethod
+    def of(lower: int, upper: int) -> IntegerValueRange:
+        return IntegerValueRange((lower, upper), True)
+
+    @staticmethod
+    def max_range(value_type: Attribute) -> IntegerValueRange:
+        """The range of all values of the type, unknown for non-integer types."""
+        return IntegerValueRange(type_range(value_type), True)
+
+    @property
+    def is_uninitialized(self) -> bool:
+        return not self.initialized
+
+    @property
+    def constant(self) -> int | None:
+        """The value of the range if it only contains one value."""
+        if self.bounds is None or self.bounds[0] != self.bounds[1]:
+            return None
+        return self.bounds[0]
+
+    def join(self, other: IntegerValueRange) -> IntegerValueRange:
+        if self.is_uninitialized:
+            return other
+        if other.is_uninitialized:
+            return self
+        if self.bounds is None or other.bounds is None:
+            return IntegerValueRange.unknown()
+        return IntegerValueRange.of(
+            min(self.bounds[0], other.bounds[0]), max(self.bounds[1], other.bounds[1])
+        )
+
+
+class IntegerValueRangeLattice(Lattice[IntegerValueRange]):
+    """
+    The lattice of integer ranges.
+
+    Ranges of values in loops may grow by one value per iteration of the solver, so
+    after a few changes the range is widened to the range of the type, keeping the
+    number of visits proportional to the number of edges of the program.
+    """
+
+    MAX_CHANGES: ClassVar[int] = 3
+    """The number of changes after which the range is widened."""
+
+    changes: int
+
+    def __init__(self, anchor: SSAValue):
+        super().__init__(anchor, IntegerValueRange())
+        self.changes = 0
+
+    def join(self, value: IntegerValueRange) -> bool:
+        if not super().join(value):
+            return False
+        self.changes += 1
+        if self.changes > self.MAX_CHANGES:
+            self.value = IntegerValueRange.max_range(self.anchor.type)
+        return True
+
+    def on_update(self, solver: DataFlowSolver) -> None:
+        super().on_update(solver)
+        constant = solver.get_or_create_state(self.anchor, ConstantValueLattice)
+        value = self.value.constant
+        solver.propagate_if_changed(
+            constant,
+            constant.join(
+                ConstantValue.unknown()
+                if value is None
+                else ConstantValue(IntegerAttr(value, self.anchor.type), True)
+            ),
+        )
+
+
+_Bounds = tuple[int, int]
+_TransferFunction = Callable[[Operation, Sequence[_Bounds]], _Bounds | None]
+
+_TRANSFER_FUNCTIONS: dict[type[Operation], _TransferFunction] = {}
+"""
+The functions computing the bounds of the single result of an operation from the
+bounds of its operands, or None if nothing is known about the result.
+"""
+
+
+def _transfer(
+    *op_types: type[Operation],
+) -> Callable[[_TransferFunction], _TransferFunction]:
+    def register(func: _TransferFunction) -> _TransferFunction:
+        for op_type in op_types:
+            _TRANSFER_FUNCTIONS[op_type] = func
+        return func
+
+    return register
+
+
+_TRUE = (-1, -1)
+_FALSE = (0, 0)
+_BOOL = (-1, 0)
+
+
+@_transfer(arith.AddiOp)
+def _addi(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    (a_lower, a_upper), (b_lower, b_upper) = operands
+    return a_lower + b_lower, a_upper + b_upper
+
+
+@_transfer(arith.SubiOp)
+def _subi(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    (a_lower, a_upper), (b_lower, b_upper) = operands
+    return a_lower - b_upper, a_upper - b_lower
+
+
+@_transfer(arith.MuliOp)
+def _muli(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    (a_lower, a_upper), (b_lower, b_upper) = operands
+    products = (
+        a_lower * b_lower,
+        a_lower * b_upper,
+        a_upper * b_lower,
+        a_upper * b_upper,
+    )
+    return min(products), max(products)
+
+
+@_transfer(arith.DivUIOp, arith.DivSIOp)
+def _div(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    (a_lower, a_upper), (b_lower, b_upper) = operands
+    if a_lower < 0 or b_lower <= 0:
+        return None
+    return a_lower // b_upper, a_upper // b_lower
+
+
+@_transfer(arith.RemUIOp, arith.RemSIOp)
+def _rem(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    (a_lower, a_upper), (b_lower, b_upper) = operands
+    if a_lower < 0 or b_lower <= 0:
+        return None
+    return 0, min(a_upper, b_upper - 1)
+
+
+@_transfer(arith.MinSIOp)
+def _minsi(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    (a_lower, a_upper), (b_lower, b_upper) = operands
+    return min(a_lower, b_lower), min(a_upper, b_upper)
+
+
+@_transfer(arith.MaxSIOp)
+def _maxsi(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    (a_lower, a_upper), (b_lower, b_upper) = operands
+    return max(a_lower, b_lower), max(a_upper, b_upper)
+
+
+@_transfer(arith.AndIOp)
+def _andi(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    (a_lower, a_upper), (b_lower, b_upper) = operands
+    if a_lower == a_upper and b_lower == b_upper:
+        return a_lower & b_lower, a_lower & b_lower
+    if a_lower < 0 and b_lower < 0:
+        return None
+    # The result is between zero and any non-negative operand
+    if a_lower < 0:
+        return 0, b_upper
+    if b_lower < 0:
+        return 0, a_upper
+    return 0, min(a_upper, b_upper)
+
+
+@_transfer(arith.ShRUIOp, arith.ShRSIOp)
+def _shr(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    (a_lower, a_upper), (b_lower, b_upper) = operands
+    if a_lower < 0 or b_lower < 0:
+        return None
+    return a_lower >> b_upper, a_upper >> b_lower
+
+
+@_transfer(arith.SelectOp)
+def _select(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    cond, (a_lower, a_upper), (b_lower, b_upper) = operands
+    if cond == _TRUE:
+        return a_lower, a_upper
+    if cond == _FALSE:
+        return b_lower, b_upper
+    return min(a_lower, b_lower), max(a_upper, b_upper)
+
+
+@_transfer(arith.ExtSIOp, arith.TruncIOp, arith.IndexCastOp)
+def _cast(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    # Out of range values are widened by the caller
+    return operands[0]
+
+
+@_transfer(arith.ExtUIOp)
+def _extui(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    (lower, upper), input_type = operands[0], op.operands[0].type
+    if lower >= 0:
+        return lower, upper
+    assert isinstance(input_type, IntegerType)
+    return 0, 2**input_type.bitwidth - 1
+
+
+def _compare(predicate: int, lhs: _Bounds, rhs: _Bounds) -> bool | None:
+    """
+    The result of the signed comparison of values in the two ranges, or None if it
+    depends on the values.
+    """
+    (a_lower, a_upper), (b_lower, b_upper) = lhs, rhs
+    match predicate:
+        case 0:  # eq
+            if a_lower == a_upper == b_lower == b_upper:
+                return True
+            if a_upper < b_lower or b_upper < a_lower:
+                return False
+        case 1:  # ne
+            equal = _compare(0, lhs, rhs)
+            return None if equal is None else not equal
+        case 2 | 6:  # slt, ult
+            if a_upper < b_lower:
+                return True
+            if a_lower >= b_upper:
+                return False
+        case 3 | 7:  # sle, ule
+            if a_upper <= b_lower:
+                return True
+            if a_lower > b_upper:
+                return False
+        case 4 | 8:  # sgt, ugt
+            return _compare(2, rhs, lhs)
+        case 5 | 9:  # sge, uge
+            return _compare(3, rhs, lhs)
+        case _:
+            pass
+    return None
+
+
+@_transfer(arith.CmpiOp)
+def _cmpi(op: Operation, operands: Sequence[_Bounds]) -> _Bounds | None:
+    assert isinstance(op, arith.CmpiOp)
+    predicate = op.predicate.value.data
+    lhs, rhs = operands
+    if predicate >= 6 and (lhs[0] < 0 or rhs[0] < 0):
+        # Unsigned comparisons only match signed ones for non-negative values
+        return _BOOL
+    result = _compare(predicate, lhs, rhs)
+    if result is None:
+        return _BOOL
+    return _TRUE if result else _FALSE
+
+
+class IntegerRangeAnalysis(SparseForwardDataFlowAnalysis[IntegerValueRangeLattice]):
+    """
+    Computes the range of values of each integer SSA value.
+
+    The ranges of `arith` operations are computed from the ranges of their operands,
+    and the range of the induction variable of `scf.for` loops from the ranges of their
+    bounds.
+    """
+
+    def __init__(self, solver: DataFlowSolver):
+        super().__init__(solver, IntegerValueRangeLattice)
+
+    def set_to_entry_state(self, lattice: IntegerValueRangeLattice) -> None:
+        self.propagate_if_changed(
+            lattice, lattice.join(IntegerValueRange.max_range(lattice.anchor.type))
+        )
+
+    def _join_bounds(
+        self, lattice: IntegerValueRangeLattice, bounds: _Bounds | None
+    ) -> None:
+        """Join `bounds` into `lattice`, widened if out of the range of its type."""
+        value_range = type_range(lattice.anchor.type)
+        if (
+            bounds is None
+            or value_range is None
+            or not (value_range[0] <= bounds[0] <= bounds[1] <= value_range[1])
+        ):
+            self.set_to_entry_state(lattice)
+            return
+        self.propagate_if_changed(lattice, lattice.join(IntegerValueRange.of(*bounds)))
+
+    def visit_operation(
+        self,
+        op: Operation,
+        operands: Sequence[IntegerValueRangeLattice],
+        results: Sequence[IntegerValueRangeLattice],
+    ) -> None:
+        if any(operand.value.is_uninitialized for operand in operands):
+            # Wait for the ranges of all operands to be known
+            return
+
+        if isinstance(op, arith.ConstantOp) and isinstance(op.value, IntegerAttr):
+            value = op.value.value.data
+            self._join_bounds(results[0], (value, value))
+            return
+
+        transfer = _TRANSFER_FUNCTIONS.get(type(op))
+        bounds = [operand.value.bounds for operand in operands]
+        if transfer is None or len(results) != 1 or None in bounds:
+            for result in results:
+                self.set_to_entry_state(result)
+            return
+
+        self._join_bounds(
+            results[0],
+            transfer(op, [b for b in bounds if b is not None]),
+        )
+
+    def visit_non_control_flow_arguments(
+        self,
+        op: Operation,
+        region: Region,
+        arguments: Sequence[IntegerValueRangeLattice],
+    ) -> None:
+        if not isinstance(op, scf.ForOp):
+            return super().visit_non_control_flow_arguments(op, region, arguments)
+        (induction_variable,) = arguments
+        lb, ub, step = (
+            self.get_lattice_for(op, operand).value
+            for operand in (op.lb, op.ub, op.step)
+        )
+        if lb.is_uninitialized or ub.is_uninitialized or step.is_uninitialized:
+            return
+        if lb.bounds is None or ub.bounds is None or step.bounds is None:
+            self.set_to_entry_state(induction_variable)
+            return
+        if step.bounds[0] <= 0:
+            self.set_to_entry_state(induction_variable)
+            return
+        lower = lb.bounds[0]
+        self._join_bounds(induction_variable, (lower, max(lower, ub.bounds[1] - 1)))
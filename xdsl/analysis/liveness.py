@@ -0,0 +1,144 @@
+"""
+Liveness of SSA values in the blocks of a region.
+
+A value is live at a point of the program if it may be used later. Uses in nested
+regions are attributed to the operation holding the region, so that the liveness of the
+blocks of a region only depends on the control flow graph of this region.
+"""
+
+from __future__ import annotations
+
+from ordered_set import OrderedSet
+
+from xdsl.ir import Block, Operation, Region, SSAValue
+
+
+def _uses_from_above(
+    block: Block, acc: dict[Block, OrderedSet[SSAValue]]
+) -> OrderedSet[SSAValue]:
+    res = OrderedSet[SSAValue]([])
+
+    for op in reversed(block.ops):
+        # Remove values defined in the block
+        # We are traversing backwards, so cannot use the value removed here again
+        res.difference_update(op.results)
+        # Add values used in the block
+        res.update(op.operands)
+
+        # Process inner blocks
+        for region in op.regions:
+            for inner in region.blocks:
+                # Add the values used in the inner block
+                res.update(_uses_from_above(inner, acc))
+
+    # Remove the block arguments
+    res.difference_update(block.args)
+
+    acc[block] = res
+
+    return res
+
+
+def uses_from_above_per_block(block: Block) -> dict[Block, OrderedSet[SSAValue]]:
+    """
+    Returns a mapping from `block` and the blocks nested in it to the set of values
+    used in them but defined outside of them, in reverse order of their last use.
+    """
+    res: dict[Block, OrderedSet[SSAValue]] = {}
+    _ = _uses_from_above(block, res)
+    return res
+
+
+class Liveness:
+    """
+    The values live at the start and at the end of each block of a region, computed
+    with a backwards dataflow analysis over its control flow graph.
+    """
+
+    region: Region
+
+    _uses_from_above: dict[Block, OrderedSet[SSAValue]]
+    _live_in: dict[Block, set[SSAValue]]
+    _live_out: dict[Block, set[SSAValue]]
+
+    def __init__(self, region: Region):
+        self.region = region
+        self._uses_from_above = {}
+        for block in region.blocks:
+            self._uses_from_above.update(uses_from_above_per_block(block))
+
+        blocks = tuple(region.blocks)
+        self._live_in = {block: set(self._uses_from_above[block]) for block in blocks}
+        self._live_out = {block: set() for block in blocks}
+
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(blocks):
+                live_out = set[SSAValue]()
+                if (terminator := block.last_op) is not None:
+                    for successor in terminator.successors:
+                        live_out |= self._live_in[successor]
+                if live_out == self._live_out[block]:
+                    continue
+                self._live_out[block] = live_out
+                defined = set[SSAValue](block.args)
+                for op in block.ops:
+                    defined.update(op.results)
+                self._live_in[block] = set(self._uses_from_above[block]) | (
+                    live_out - defined
+                )
+                changed = True
+
+    def uses_from_above(self, block: Block) -> OrderedSet[SSAValue]:
+        """
+        The values used in `block` or in the regions nested in it, but defined outside
+        of it, for any block of the region or nested in it.
+        """
+        return self._uses_from_above[block]
+
+    def live_in(self, block: Block) -> set[SSAValue]:
+        """The values live at the start of a block of the region."""
+        return self._live_in[block]
+
+    def live_out(self, block: Block) -> set[SSAValue]:
+        """The values live at the end of a block of the region."""
+        return self._live_out[block]
+
+    def is_live_out(self, value: SSAValue, block: Block) -> bool:
+        return value in self._live_out[block]
+
+    def is_dead_after(self, value: SSAValue, op: Operation) -> bool:
+        """
+        Whether `value` is not used after `op`, which is in a block of the region or
+        nested in it.
+        """
+        block = op.parent_block()
+        assert block is not None
+        # Find the operation of a block of the region that holds `op`
+        holder = op
+        while block.parent is not self.region:
+            parent = block.parent_op()
+            assert parent is not None, "Operation is not in the analysed region"
+            holder = parent
+            block = holder.parent_block()
+            assert block is not None
+        if self.is_live_out(value, block):
+            return False
+        # The operations of the block holding the uses of the value
+        users = set[Operation]()
+        for use in value.uses:
+            user: Operation | None = use.operation
+            while user is not None and user.parent is not block:
+                user = user.parent_op()
+            if user is not None:
+                users.add(user)
+        if holder is not op and holder in users:
+            # The value may be used again in a later iteration of a loop
+            return False
+        later = holder.next_op
+        while later is not None:
+            if later in users:
+                return False
+            later = later.next_op
+        return True
@@ -0,0 +1,114 @@
+"""
+Sparse conditional constant propagation, computing the SSA values that are constant
+in all executions of the program, assuming that branches on constant conditions are
+only taken in one direction.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from xdsl.analysis.dataflow import (
+    ConstantValue,
+    ConstantValueLattice,
+    DataFlowSolver,
+    SparseForwardDataFlowAnalysis,
+)
+from xdsl.dialects.builtin import (
+    AnyFloat,
+    FloatAttr,
+    IndexType,
+    IntegerAttr,
+    IntegerType,
+)
+from xdsl.interpreter import Interpreter
+from xdsl.ir import Attribute, Operation
+from xdsl.traits import ConstantLike, is_side_effect_free
+from xdsl.utils.exceptions import InterpretationError
+
+
+def constant_attr_for_value(value: Any, value_type: Attribute) -> Attribute | None:
+    """
+    The attribute representing a Python value computed by the interpreter, or None if
+    it is not an integer or float of a builtin type.
+    """
+    if isinstance(value, int) and isinstance(value_type, IntegerType | IndexType):
+        return IntegerAttr(int(value), value_type, truncate_bits=True)
+    if isinstance(value, float) and isinstance(value_type, AnyFloat):
+        return FloatAttr(value, value_type)
+    return None
+
+
+class SparseConstantPropagation(SparseForwardDataFlowAnalysis[ConstantValueLattice]):
+    """
+    Computes the constant value of each SSA value.
+
+    The values of `ConstantLike` operations are the `value` attribute of the operation,
+    and the results of other operations without side effects are computed with the
+    interpreter when all of their operands are constant.
+    """
+
+    interpreter: Interpreter
+
+    def __init__(self, solver: DataFlowSolver, interpreter: Interpreter):
+        super().__init__(solver, ConstantValueLattice)
+        self.interpreter = interpreter
+
+    def set_to_entry_state(self, lattice: ConstantValueLattice) -> None:
+        self.propagate_if_changed(lattice, lattice.join(ConstantValue.unknown()))
+
+    def visit_operation(
+        self,
+        op: Operation,
+        operands: Sequence[ConstantValueLattice],
+        results: Sequence[ConstantValueLattice],
+    ) -> None:
+        if any(operand.value.is_uninitialized for operand in operands):
+            # Wait for the values of all operands to be known
+            return
+
+        constants = self._fold(op, [operand.value.constant for operand in operands])
+        if constants is None:
+            for result in results:
+                self.set_to_entry_state(result)
+            return
+        for result, constant in zip(results, constants, strict=True):
+            value = (
+                ConstantValue.unknown()
+                if constant is None
+                else ConstantValue(constant, True)
+            )
+            self.propagate_if_changed(result, result.join(value))
+
+    def _fold(
+        self, op: Operation, operands: Sequence[Attribute | None]
+    ) -> Sequence[Attribute | None] | None:
+        """
+        The constant values of the results of `op`, with None for unknown values, or
+        None if none of them are known.
+        """
+        if op.has_trait(ConstantLike):
+            value = op.properties.get("value", op.attributes.get("value"))
+            if value is None or len(op.results) != 1:
+                return None
+            return (value,)
+
+        if not is_side_effect_free(op) or op.successors:
+            return None
+
+        args: list[Any] = []
+        for operand in operands:
+            if not isinstance(operand, IntegerAttr | FloatAttr):
+                return None
+            args.append(operand.value.data)
+
+        try:
+            values = self.interpreter.run_op(op, tuple(args))
+        except (InterpretationError, ArithmeticError):
+            return None
+
+        return tuple(
+            constant_attr_for_value(value, result.type)
+            for value, result in zip(values, op.results, strict=True)
+        )
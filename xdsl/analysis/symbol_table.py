@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from xdsl.dialects.builtin import StringAttr, SymbolRefAttr
+from xdsl.ir import Operation
+from xdsl.traits import SymbolOpInterface, SymbolTable
+
+
+class SymbolTableInfo:
+    """
+    The symbols defined in a `SymbolTable` operation, indexed by name, so that
+    repeated lookups do not scan its body.
+    """
+
+    op: Operation
+    symbols: dict[str, Operation]
+
+    def __init__(self, op: Operation):
+        if not op.has_trait(SymbolTable):
+            raise ValueError(f"Operation {op.name} is not a symbol table")
+        self.op = op
+        self.symbols = {}
+        for o in op.regions[0].block.ops:
+            if (sym_interface := o.get_trait(SymbolOpInterface)) is None:
+                continue
+            if (sym_name := sym_interface.get_sym_attr_name(o)) is not None:
+                self.symbols.setdefault(sym_name.data, o)
+
+    def lookup(self, name: str | StringAttr | SymbolRefAttr) -> Operation | None:
+        """Lookup a symbol defined in this table, or in the tables nested in it."""
+        if isinstance(name, str | StringAttr):
+            name = SymbolRefAttr(name)
+        symbol = self.symbols.get(name.root_reference.data)
+        if symbol is None or not name.nested_references:
+            return symbol
+        nested_root, *nested_references = name.nested_references.data
+        return SymbolTableInfo(symbol).lookup(
+            SymbolRefAttr(nested_root, nested_references)
+        )
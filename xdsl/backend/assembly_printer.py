@@ -1,14 +1,40 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from functools import cache
 
 from xdsl.dialects.builtin import ModuleOp, StringAttr
 from xdsl.ir import Operation
 from xdsl.utils.base_printer import BasePrinter
 
+_FLUSH_THRESHOLD = 4096
+"""The number of buffered strings above which they are written to the stream."""
 
+
+@dataclass(eq=False, repr=False)
 class AssemblyPrinter(BasePrinter):
-    _current_section: str | None = None
+    """
+    A printer for assembly, which buffers its output and writes it to the stream in
+    batches. The buffer is flushed at the end of `print_module`, and must otherwise
+    be flushed explicitly with `flush`.
+
+    Assembly is not indented, so the printer does not track the current position.
+    """
+
+    _current_section: str | None = field(default=None, init=False)
+    _buffer: list[str] = field(default_factory=list[str], init=False)
+
+    def print_string(self, text: str, *, indent: int | None = None) -> None:
+        self._buffer.append(text)
+        if len(self._buffer) > _FLUSH_THRESHOLD:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered output to the stream."""
+        if self._buffer:
+            print("".join(self._buffer), end="", file=self.stream)
+            self._buffer.clear()
 
     def emit_section(self, new_section: str):
         if self._current_section == new_section:
@@ -41,9 +67,20 @@ class AssemblyPrinter(BasePrinter):
         return code
 
     def print_module(self, module: ModuleOp) -> None:
+        buffer = self._buffer
         for op in module.body.walk():
-            assert isinstance(op, AssemblyPrintable), f"{op}"
-            op.print_assembly(self)
+            if _prints_one_line(type(op)):
+                # Inlined `OneLineAssemblyPrintable.print_assembly`
+                line = op.assembly_line()  # pyright: ignore[reportAttributeAccessIssue]
+                if line is not None:
+                    buffer.append(line)
+                    buffer.append("\n")
+                    if len(buffer) > _FLUSH_THRESHOLD:
+                        self.flush()
+            else:
+                assert isinstance(op, AssemblyPrintable), f"{op}"
+                op.print_assembly(self)
+        self.flush()
 
 
 class AssemblyPrintable(Operation, ABC):
@@ -75,3 +112,15 @@ class OneLineAssemblyPrintable(AssemblyPrintable, ABC):
         if line is not None:
             printer.print_string(line)
             printer.print_string("\n")
+
+
+@cache
+def _prints_one_line(op_type: type[Operation]) -> bool:
+    """
+    Whether operations of this type are printed with the default implementation of
+    `OneLineAssemblyPrintable.print_assembly`.
+    """
+    return (
+        issubclass(op_type, OneLineAssemblyPrintable)
+        and op_type.print_assembly is OneLineAssemblyPrintable.print_assembly
+    )
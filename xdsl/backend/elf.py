@@ -0,0 +1,264 @@
+"""
+A minimal writer of relocatable ELF64 object files.
+
+https://refspecs.linuxfoundation.org/elf/gabi4+/contents.html
+"""
+
+from __future__ import annotations
+
+import struct
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import BinaryIO
+
+
+class SectionType(IntEnum):
+    NULL = 0
+    PROGBITS = 1
+    SYMTAB = 2
+    STRTAB = 3
+    RELA = 4
+    NOBITS = 8
+
+
+class SectionFlags(IntEnum):
+    WRITE = 0x1
+    ALLOC = 0x2
+    EXECINSTR = 0x4
+    INFO_LINK = 0x40
+
+
+class SymbolBinding(IntEnum):
+    LOCAL = 0
+    GLOBAL = 1
+
+
+class SymbolType(IntEnum):
+    NOTYPE = 0
+    OBJECT = 1
+    FUNC = 2
+    SECTION = 3
+
+
+_SHN_UNDEF = 0
+_ET_REL = 1
+_ELF_HEADER = struct.Struct("<16sHHIQQQIHHHHHH")
+_SECTION_HEADER = struct.Struct("<IIQQQQIIQQ")
+_SYMBOL = struct.Struct("<IBBHQQ")
+_RELA = struct.Struct("<QQq")
+
+
+@dataclass
+class Relocation:
+    offset: int
+    """The offset of the relocated location in its section."""
+    symbol: str
+    type: int
+    """The machine-specific type of the relocation."""
+    addend: int = 0
+
+
+@dataclass
+class Section:
+    name: str
+    type: SectionType = SectionType.PROGBITS
+    flags: int = SectionFlags.ALLOC
+    alignment: int = 4
+    data: bytearray = field(default_factory=bytearray)
+    size: int | None = None
+    """The size of a `NOBITS` section, which has no data in the file."""
+    relocations: list[Relocation] = field(default_factory=list[Relocation])
+
+
+@dataclass
+class Symbol:
+    name: str
+    section: str | None
+    """The section the symbol is defined in, or None if it is undefined."""
+    value: int = 0
+    binding: SymbolBinding = SymbolBinding.LOCAL
+    type: SymbolType = SymbolType.NOTYPE
+    size: int = 0
+
+
+class _StringTable:
+    def __init__(self):
+        self.data = bytearray(b"\0")
+        self.offsets: dict[str, int] = {"": 0}
+
+    def add(self, name: str) -> int:
+        if name not in self.offsets:
+            self.offsets[name] = len(self.data)
+            self.data += name.encode() + b"\0"
+        return self.offsets[name]
+
+
+@dataclass
+class _SectionHeader:
+    name: str
+    type: int
+    flags: int
+    data: bytes
+    size: int
+    link: int = 0
+    info: int = 0
+    alignment: int = 1
+    entry_size: int = 0
+    offset: int = 0
+
+
+def _align(offset: int, alignment: int) -> int:
+    return -(-offset // alignment) * alignment
+
+
+def write_elf_object(
+    io: BinaryIO,
+    machine: int,
+    sections: Sequence[Section],
+    symbols: Sequence[Symbol],
+    flags: int = 0,
+) -> None:
+    """
+    Write a little-endian relocatable ELF64 object with the given sections and
+    symbols. Relocations are written to a `.rela` section for each section that has
+    some, and may refer to any of the symbols.
+    """
+    # Local symbols must precede global ones
+    ordered = sorted(symbols, key=lambda s: s.binding != SymbolBinding.LOCAL)
+    symbol_indices = {symbol.name: i + 1 for i, symbol in enumerate(ordered)}
+    first_global = 1 + sum(1 for s in ordered if s.binding == SymbolBinding.LOCAL)
+
+    section_indices = {section.name: i + 1 for i, section in enumerate(sections)}
+    rela_sections = [section for section in sections if section.relocations]
+    symtab_index = 1 + len(sections) + len(rela_sections)
+    strtab_index = symtab_index + 1
+    shstrtab_index = strtab_index + 1
+
+    strtab = _StringTable()
+    symtab = bytearray(_SYMBOL.size)
+    for symbol in ordered:
+        shndx = (
+            _SHN_UNDEF if symbol.section is None else section_indices[symbol.section]
+        )
+        symtab += _SYMBOL.pack(
+            strtab.add(symbol.name),
+            (symbol.binding << 4) | symbol.type,
+            0,
+            shndx,
+            symbol.value,
+            symbol.size,
+        )
+
+    headers: list[_SectionHeader] = []
+    for section in sections:
+        size = len(section.data) if section.size is None else section.size
+        headers.append(
+            _SectionHeader(
+                section.name,
+                section.type,
+                section.flags,
+                bytes(section.data),
+                size,
+                alignment=section.alignment,
+            )
+        )
+    for section in rela_sections:
+        data = b"".join(
+            _RELA.pack(r.offset, (symbol_indices[r.symbol] << 32) | r.type, r.addend)
+            for r in section.relocations
+        )
+        headers.append(
+            _SectionHeader(
+                ".rela" + section.name,
+                SectionType.RELA,
+                SectionFlags.INFO_LINK,
+                data,
+                len(data),
+                link=symtab_index,
+                info=section_indices[section.name],
+                alignment=8,
+                entry_size=_RELA.size,
+            )
+        )
+    headers.append(
+        _SectionHeader(
+            ".symtab",
+            SectionType.SYMTAB,
+            0,
+            bytes(symtab),
+            len(symtab),
+            link=strtab_index,
+            info=first_global,
+            alignment=8,
+            entry_size=_SYMBOL.size,
+        )
+    )
+    headers.append(
+        _SectionHeader(
+            ".strtab", SectionType.STRTAB, 0, bytes(strtab.data), len(strtab.data)
+        )
+    )
+    shstrtab = _StringTable()
+    for header in headers:
+        shstrtab.add(header.name)
+    shstrtab.add(".shstrtab")
+    headers.append(
+        _SectionHeader(
+            ".shstrtab", SectionType.STRTAB, 0, bytes(shstrtab.data), len(shstrtab.data)
+        )
+    )
+
+    # Lay out the contents of the sections after the ELF header
+    offset = _ELF_HEADER.size
+    for header in headers:
+        offset = _align(offset, header.alignment)
+        header.offset = offset
+        if header.type != SectionType.NOBITS:
+            offset += len(header.data)
+    section_header_offset = _align(offset, 8)
+
+    ident = b"\x7fELF" + bytes((2, 1, 1, 0)) + bytes(8)
+    io.write(
+        _ELF_HEADER.pack(
+            ident,
+            _ET_REL,
+            machine,
+            1,
+            0,
+            0,
+            section_header_offset,
+            flags,
+            _ELF_HEADER.size,
+            0,
+            0,
+            _SECTION_HEADER.size,
+            len(headers) + 1,
+            shstrtab_index,
+        )
+    )
+    position = _ELF_HEADER.size
+    for header in headers:
+        if header.type == SectionType.NOBITS:
+            continue
+        io.write(bytes(header.offset - position))
+        io.write(header.data)
+        position = header.offset + len(header.data)
+    io.write(bytes(section_header_offset - position))
+
+    io.write(bytes(_SECTION_HEADER.size))
+    for header in headers:
+        io.write(
+            _SECTION_HEADER.pack(
+                shstrtab.add(header.name),
+                header.type,
+                header.flags,
+                0,
+                header.offset,
+                header.size,
+                header.link,
+                header.info,
+                header.alignment,
+                header.entry_size,
+            )
+        )
@@ -1,19 +1,26 @@
+from collections import OrderedDict
 from collections.abc import Callable, Sequence
 from inspect import signature
-from typing import Any, ParamSpec, TypeVar, cast, get_args, get_origin
+from typing import Any, ClassVar, ParamSpec, TypeVar, cast, get_args, get_origin
 
 import jax.numpy as jnp
 import numpy as np
 from jax import Array
 from jax._src import xla_bridge
-from jax._src.interpreters import mlir
 from jax._src.typing import SupportsDType  # pyright: ignore[reportPrivateImportUsage]
-from jaxlib.mlir import ir
 from jaxlib.xla_client import LoadedExecutable
 
-from xdsl.dialects.builtin import FunctionType, ModuleOp
+from xdsl.dialects.builtin import (
+    ArrayAttr,
+    DictionaryAttr,
+    FunctionType,
+    IntegerAttr,
+    ModuleOp,
+    i32,
+)
 from xdsl.dialects.func import FuncOp
 from xdsl.traits import SymbolTable
+from xdsl.utils.hashable_module import HashableModule
 
 P = ParamSpec("P")
 R = TypeVar("R", bound=tuple[jnp.ndarray, ...] | jnp.ndarray)
@@ -38,6 +45,53 @@ def array(object: Any, dtype: DTypeLike | None = None, copy: bool = True) -> Arr
     return jnp.array(object, None, copy)  # pyright: ignore[reportUnknownMemberType]
 
 
+ALIASING_OUTPUT = "tf.aliasing_output"
+"""
+The argument attribute holding the index of the result that may reuse the buffer of
+a donated argument.
+"""
+
+
+def _donate_arguments(func_op: FuncOp, donate_argnums: Sequence[int]) -> None:
+    """
+    Mark the arguments of `func_op` at `donate_argnums` as aliasing the first result
+    of the same type that no other argument aliases.
+    """
+    inputs = func_op.function_type.inputs.data
+    outputs = func_op.function_type.outputs.data
+    arg_attrs = (
+        [dict(attrs.data) for attrs in func_op.arg_attrs]
+        if func_op.arg_attrs is not None
+        else [{} for _ in inputs]
+    )
+    aliased = {
+        alias.value.data
+        for attrs in arg_attrs
+        if isinstance(alias := attrs.get(ALIASING_OUTPUT), IntegerAttr)
+    }
+    for argnum in donate_argnums:
+        if not 0 <= argnum < len(inputs):
+            raise ValueError(f"Cannot donate argument {argnum} of `main`.")
+        if ALIASING_OUTPUT in arg_attrs[argnum]:
+            continue
+        output = next(
+            (
+                i
+                for i, output in enumerate(outputs)
+                if output == inputs[argnum] and i not in aliased
+            ),
+            None,
+        )
+        if output is None:
+            raise ValueError(
+                f"Argument {argnum} of `main` has no result of type "
+                f"{inputs[argnum]} to alias."
+            )
+        aliased.add(output)
+        arg_attrs[argnum][ALIASING_OUTPUT] = IntegerAttr(output, i32)
+    func_op.arg_attrs = ArrayAttr(DictionaryAttr(attrs) for attrs in arg_attrs)
+
+
 class JaxExecutable:
     """
     A class wrapping a jax LoadedExecutable.
@@ -65,6 +119,13 @@ class JaxExecutable:
     main_type: FunctionType
     loaded_executable: LoadedExecutable
 
+    MAX_CACHED_EXECUTABLES = 64
+    """The maximum number of compiled executables kept for reuse."""
+
+    _cache: ClassVar[OrderedDict[tuple[HashableModule, str], LoadedExecutable]] = (
+        OrderedDict()
+    )
+
     def __init__(
         self, main_type: FunctionType, loaded_executable: LoadedExecutable
     ) -> None:
@@ -75,21 +136,56 @@ class JaxExecutable:
         return self.loaded_executable.execute(arguments)
 
     @staticmethod
-    def compile(module: ModuleOp) -> "JaxExecutable":
+    def compile(
+        module: ModuleOp, backend: str = "cpu", donate_argnums: Sequence[int] = ()
+    ) -> "JaxExecutable":
+        """
+        Compile the `main` function of `module` for the XLA `backend`.
+
+        The buffers of the arguments at `donate_argnums` may be reused for results of
+        the same type, so that these arguments are not copied, and must not be used
+        after each execution. Arguments already carrying a `tf.aliasing_output`
+        attribute are donated too.
+
+        Executables are cached by the structure of the module and the backend, so
+        compiling an equivalent module again does not invoke XLA. Otherwise, the
+        module is printed and passed to XLA as text, as xDSL cannot serialize it to
+        MLIR bytecode or portable StableHLO artifacts, so printing and parsing the
+        module remain part of the cost of each compilation.
+        """
         func_op = SymbolTable.lookup_symbol(module, "main")
         if func_op is None:
             raise ValueError("No `main` function in module.")
         if not isinstance(func_op, FuncOp):
             raise ValueError("`main` operation is not a `func.func`.")
 
-        program = str(module)
+        if donate_argnums:
+            module = module.clone()
+            func_op = SymbolTable.lookup_symbol(module, "main")
+            assert isinstance(func_op, FuncOp)
+            _donate_arguments(func_op, donate_argnums)
 
-        mlir_module = ir.Module.parse(program, context=mlir.make_ir_context())  # pyright: ignore[reportPrivateImportUsage]
-        bytecode = mlir.module_to_bytecode(mlir_module)  # pyright: ignore[reportPrivateImportUsage]
-        client = xla_bridge.backends()["cpu"]  # pyright: ignore[reportPrivateImportUsage]
-        loaded = client.compile(bytecode)
+        cache = JaxExecutable._cache
+        key = (HashableModule(module), backend)
+        if (loaded := cache.get(key)) is not None:
+            cache.move_to_end(key)
+        else:
+            # XLA parses the textual module directly, without a round-trip through
+            # the MLIR Python bindings. Bytecode would avoid the parsing, but xDSL
+            # has no bytecode writer.
+            client = xla_bridge.backends()[backend]  # pyright: ignore[reportPrivateImportUsage]
+            loaded = client.compile(str(module))
+            # The cached module must not change, so keep a copy.
+            cache[(HashableModule(module.clone()), backend)] = loaded
+            while len(cache) > JaxExecutable.MAX_CACHED_EXECUTABLES:
+                cache.popitem(last=False)
         return JaxExecutable(func_op.function_type, loaded)
 
+    @staticmethod
+    def clear_cache() -> None:
+        """Remove all cached executables."""
+        JaxExecutable._cache.clear()
+
     def __call__(self, stub: Callable[P, R]) -> Callable[P, R]:
         func_type = self.main_type
         loaded = self.loaded_executable
@@ -29,6 +29,14 @@ class RegisterQueue(Generic[_T], ABC):
         """
         ...
 
+    @abstractmethod
+    def can_pop(self, reg_type: type[_T]) -> bool:
+        """
+        Returns whether a register of the given type is available for allocation,
+        without falling back to an "infinite" register.
+        """
+        ...
+
     @contextmanager
     def reserve_registers(self, regs: Sequence[_T]):
         for reg in regs:
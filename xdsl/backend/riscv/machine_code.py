@@ -0,0 +1,923 @@
+"""
+Encoding of RISC-V instructions to machine code, and an assembler writing the
+instructions and data of a module of `riscv` operations to a relocatable ELF64 object
+file, without an external toolchain.
+
+Instructions are encoded from their assembly mnemonic and arguments, as returned by
+`RISCVInstruction.assembly_instruction_name` and `assembly_line_args`, for the RV64G
+subset covered by the `riscv` dialect. When compression is enabled, instructions with
+an equivalent in the C extension are emitted as 16-bit instructions, except those
+referring to labels, so that the layout of a section is known before labels are
+resolved.
+
+Branches and jumps to labels defined in the same section are resolved by the
+assembler, other references to labels are left to the linker as relocations.
+"""
+
+from __future__ import annotations
+
+import struct
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import BinaryIO
+
+from xdsl.backend.assembly_printer import OneLineAssemblyPrintable
+from xdsl.backend.elf import (
+    Relocation,
+    Section,
+    SectionFlags,
+    SectionType,
+    Symbol,
+    SymbolBinding,
+    SymbolType,
+    write_elf_object,
+)
+from xdsl.dialects import riscv, riscv_func
+from xdsl.dialects.builtin import IntAttr, IntegerAttr, ModuleOp
+from xdsl.ir import Operation, SSAValue
+from xdsl.utils.exceptions import DiagnosticException
+
+EM_RISCV = 243
+EF_RISCV_RVC = 0x1
+EF_RISCV_FLOAT_ABI_DOUBLE = 0x4
+
+R_RISCV_32 = 1
+R_RISCV_64 = 2
+R_RISCV_BRANCH = 16
+R_RISCV_JAL = 17
+R_RISCV_HI20 = 26
+R_RISCV_LO12_I = 27
+R_RISCV_LO12_S = 28
+
+_ROUNDING_MODE_DYNAMIC = 0b111
+
+# (opcode, funct3, funct7)
+_R_TYPE: dict[str, tuple[int, int, int]] = {
+    "add": (0x33, 0, 0x00),
+    "sub": (0x33, 0, 0x20),
+    "sll": (0x33, 1, 0x00),
+    "slt": (0x33, 2, 0x00),
+    "sltu": (0x33, 3, 0x00),
+    "xor": (0x33, 4, 0x00),
+    "srl": (0x33, 5, 0x00),
+    "sra": (0x33, 5, 0x20),
+    "or": (0x33, 6, 0x00),
+    "and": (0x33, 7, 0x00),
+    "mul": (0x33, 0, 0x01),
+    "mulh": (0x33, 1, 0x01),
+    "mulhsu": (0x33, 2, 0x01),
+    "mulhu": (0x33, 3, 0x01),
+    "div": (0x33, 4, 0x01),
+    "divu": (0x33, 5, 0x01),
+    "rem": (0x33, 6, 0x01),
+    "remu": (0x33, 7, 0x01),
+    "fadd.s": (0x53, _ROUNDING_MODE_DYNAMIC, 0x00),
+    "fsub.s": (0x53, _ROUNDING_MODE_DYNAMIC, 0x04),
+    "fmul.s": (0x53, _ROUNDING_MODE_DYNAMIC, 0x08),
+    "fdiv.s": (0x53, _ROUNDING_MODE_DYNAMIC, 0x0C),
+    "fadd.d": (0x53, _ROUNDING_MODE_DYNAMIC, 0x01),
+    "fsub.d": (0x53, _ROUNDING_MODE_DYNAMIC, 0x05),
+    "fmul.d": (0x53, _ROUNDING_MODE_DYNAMIC, 0x09),
+    "fdiv.d": (0x53, _ROUNDING_MODE_DYNAMIC, 0x0D),
+    "fsgnj.s": (0x53, 0, 0x10),
+    "fsgnjn.s": (0x53, 1, 0x10),
+    "fsgnjx.s": (0x53, 2, 0x10),
+    "fmin.s": (0x53, 0, 0x14),
+    "fmax.s": (0x53, 1, 0x14),
+    "fmin.d": (0x53, 0, 0x15),
+    "fmax.d": (0x53, 1, 0x15),
+    "feq.s": (0x53, 2, 0x50),
+    "flt.s": (0x53, 1, 0x50),
+    "fle.s": (0x53, 0, 0x50),
+}
+
+# (funct7, rs2, funct3) of floating-point operations with a single source
+_FLOAT_UNARY: dict[str, tuple[int, int, int]] = {
+    "fsqrt.s": (0x2C, 0, _ROUNDING_MODE_DYNAMIC),
+    "fcvt.w.s": (0x60, 0, _ROUNDING_MODE_DYNAMIC),
+    "fcvt.wu.s": (0x60, 1, _ROUNDING_MODE_DYNAMIC),
+    "fcvt.s.w": (0x68, 0, _ROUNDING_MODE_DYNAMIC),
+    "fcvt.s.wu": (0x68, 1, _ROUNDING_MODE_DYNAMIC),
+    "fcvt.d.w": (0x69, 0, 0),
+    "fcvt.d.wu": (0x69, 1, 0),
+    "fmv.x.w": (0x70, 0, 0),
+    "fclass.s": (0x70, 0, 1),
+    "fmv.w.x": (0x78, 0, 0),
+}
+
+# (opcode, fmt) of fused multiply-add operations
+_R4_TYPE: dict[str, tuple[int, int]] = {
+    "fmadd.s": (0x43, 0),
+    "fmsub.s": (0x47, 0),
+    "fnmsub.s": (0x4B, 0),
+    "fnmadd.s": (0x4F, 0),
+    "fmadd.d": (0x43, 1),
+    "fmsub.d": (0x47, 1),
+}
+
+# (opcode, funct3)
+_I_TYPE: dict[str, tuple[int, int]] = {
+    "addi": (0x13, 0),
+    "slti": (0x13, 2),
+    "sltiu": (0x13, 3),
+    "xori": (0x13, 4),
+    "ori": (0x13, 6),
+    "andi": (0x13, 7),
+}
+
+# (funct3, funct7)
+_SHIFTS: dict[str, tuple[int, int]] = {
+    "slli": (1, 0x00),
+    "srli": (5, 0x00),
+    "srai": (5, 0x20),
+}
+
+# (opcode, funct3)
+_LOADS: dict[str, tuple[int, int]] = {
+    "lb": (0x03, 0),
+    "lh": (0x03, 1),
+    "lw": (0x03, 2),
+    "lbu": (0x03, 4),
+    "lhu": (0x03, 5),
+    "flw": (0x07, 2),
+    "fld": (0x07, 3),
+}
+
+# (opcode, funct3)
+_STORES: dict[str, tuple[int, int]] = {
+    "sb": (0x23, 0),
+    "sh": (0x23, 1),
+    "sw": (0x23, 2),
+    "fsw": (0x27, 2),
+    "fsd": (0x27, 3),
+}
+
+_BRANCHES: dict[str, int] = {
+    "beq": 0,
+    "bne": 1,
+    "blt": 4,
+    "bge": 5,
+    "bltu": 6,
+    "bgeu": 7,
+}
+
+_CSR: dict[str, int] = {
+    "csrrw": 1,
+    "csrrs": 2,
+    "csrrc": 3,
+    "csrrwi": 5,
+    "csrrsi": 6,
+    "csrrci": 7,
+}
+
+_FIXED: dict[str, int] = {
+    "ecall": 0x00000073,
+    "ebreak": 0x00100073,
+    "wfi": 0x10500073,
+}
+
+_ZERO, _RA, _SP = 0, 1, 2
+_ADDIW = (0x1B, 0)
+
+
+class MachineCodeException(DiagnosticException):
+    """Raised when an operation cannot be encoded to machine code."""
+
+
+LabelResolver = Callable[[str, int], int | None]
+"""
+Returns the offset of a label relative to the instruction at the given offset, or
+None if the reference must be relocated by the linker.
+"""
+
+Relocator = Callable[[int, int, str], None]
+"""Records a relocation of the given type at an offset in the instruction."""
+
+
+def _unresolved(label: str, pc: int) -> int | None:
+    return None
+
+
+def _no_relocation(offset: int, type: int, label: str) -> None:
+    raise MachineCodeException(f"Unexpected reference to label {label}")
+
+
+# region Instruction formats
+
+
+def _check_signed(value: int, bits: int, what: str):
+    if not -(1 << (bits - 1)) <= value < 1 << (bits - 1):
+        raise MachineCodeException(f"{what} {value} does not fit in {bits} bits")
+
+
+def _r_type(opcode: int, rd: int, funct3: int, rs1: int, rs2: int, funct7: int) -> int:
+    return funct7 << 25 | rs2 << 20 | rs1 << 15 | funct3 << 12 | rd << 7 | opcode
+
+
+def _r4_type(
+    opcode: int, rd: int, funct3: int, rs1: int, rs2: int, rs3: int, fmt: int
+) -> int:
+    return (
+        rs3 << 27 | fmt << 25 | rs2 << 20 | rs1 << 15 | funct3 << 12 | rd << 7 | opcode
+    )
+
+
+def _i_type(opcode: int, rd: int, funct3: int, rs1: int, imm: int) -> int:
+    _check_signed(imm, 12, "Immediate")
+    return (imm & 0xFFF) << 20 | rs1 << 15 | funct3 << 12 | rd << 7 | opcode
+
+
+def _s_type(opcode: int, funct3: int, rs1: int, rs2: int, imm: int) -> int:
+    _check_signed(imm, 12, "Immediate")
+    imm &= 0xFFF
+    return (
+        (imm >> 5) << 25
+        | rs2 << 20
+        | rs1 << 15
+        | funct3 << 12
+        | (imm & 0x1F) << 7
+        | opcode
+    )
+
+
+def _b_type(funct3: int, rs1: int, rs2: int, offset: int) -> int:
+    _check_signed(offset, 13, "Branch offset")
+    if offset & 1:
+        raise MachineCodeException(f"Branch offset {offset} is not even")
+    imm = offset & 0x1FFF
+    return (
+        (imm >> 12) << 31
+        | ((imm >> 5) & 0x3F) << 25
+        | rs2 << 20
+        | rs1 << 15
+        | funct3 << 12
+        | ((imm >> 1) & 0xF) << 8
+        | ((imm >> 11) & 1) << 7
+        | 0x63
+    )
+
+
+def _u_type(opcode: int, rd: int, imm: int) -> int:
+    if not -(1 << 19) <= imm < 1 << 20:
+        raise MachineCodeException(f"Immediate {imm} does not fit in 20 bits")
+    return (imm & 0xFFFFF) << 12 | rd << 7 | opcode
+
+
+def _j_type(rd: int, offset: int) -> int:
+    _check_signed(offset, 21, "Jump offset")
+    if offset & 1:
+        raise MachineCodeException(f"Jump offset {offset} is not even")
+    imm = offset & 0x1FFFFF
+    return (
+        (imm >> 20) << 31
+        | ((imm >> 1) & 0x3FF) << 21
+        | ((imm >> 11) & 1) << 20
+        | ((imm >> 12) & 0xFF) << 12
+        | rd << 7
+        | 0x6F
+    )
+
+
+# endregion
+
+# region Compressed instructions
+
+
+def _is_compressed_register(index: int) -> bool:
+    return 8 <= index < 16
+
+
+def _fits_signed(value: int, bits: int) -> bool:
+    return -(1 << (bits - 1)) <= value < 1 << (bits - 1)
+
+
+def _compress_immediate(rd: int, rs1: int, imm: int, mnemonic: str) -> int | None:
+    """The compressed encoding of an integer instruction with an immediate, if any."""
+    imm6 = ((imm & 0x20) << 7) | (imm & 0x1F) << 2
+    match mnemonic:
+        case "addi" if rd == rs1 == imm == 0:
+            # c.nop
+            return 0x0001
+        case "addi" if rd != 0 and rs1 == _ZERO and _fits_signed(imm, 6):
+            # c.li
+            return 0b010 << 13 | imm6 | rd << 7 | 0b01
+        case "addi" if rd == rs1 != 0 and imm != 0 and _fits_signed(imm, 6):
+            # c.addi
+            return imm6 | rd << 7 | 0b01
+        case "addi" if rd != 0 and rs1 != 0 and imm == 0:
+            # c.mv
+            return 0b1000 << 12 | rd << 7 | rs1 << 2 | 0b10
+        case "slli" if rd == rs1 != 0 and 0 < imm < 64:
+            # c.slli
+            return imm6 | rd << 7 | 0b10
+        case "srli" | "srai" | "andi" if (
+            rd == rs1
+            and _is_compressed_register(rd)
+            and (_fits_signed(imm, 6) if mnemonic == "andi" else 0 < imm < 64)
+        ):
+            # c.srli, c.srai, c.andi
+            funct2 = {"srli": 0b00, "srai": 0b01, "andi": 0b10}[mnemonic]
+            return 0b100 << 13 | imm6 | funct2 << 10 | (rd - 8) << 7 | 0b01
+        case _:
+            return None
+
+
+def _compress_lui(rd: int, imm: int) -> int | None:
+    """The compressed encoding of `lui`, if any."""
+    imm = _sign_extend(imm, 20)
+    if rd in (_ZERO, _SP) or imm == 0 or not _fits_signed(imm, 6):
+        return None
+    return 0b011 << 13 | ((imm & 0x20) << 7) | rd << 7 | (imm & 0x1F) << 2 | 0b01
+
+
+def _compress_register(rd: int, rs1: int, rs2: int, mnemonic: str) -> int | None:
+    """The compressed encoding of an integer instruction with two sources, if any."""
+    match mnemonic:
+        case "add" if rd != 0 and rs2 != 0 and rd in (rs1, rs2):
+            # c.add
+            other = rs2 if rd == rs1 else rs1
+            return 0b1001 << 12 | rd << 7 | other << 2 | 0b10
+        case "sub" | "xor" | "or" | "and" if (
+            rd == rs1 and _is_compressed_register(rd) and _is_compressed_register(rs2)
+        ):
+            funct2 = {"sub": 0b00, "xor": 0b01, "or": 0b10, "and": 0b11}[mnemonic]
+            return 0b100011 << 10 | (rd - 8) << 7 | funct2 << 5 | (rs2 - 8) << 2 | 0b01
+        case _:
+            return None
+
+
+def _compress_memory(
+    mnemonic: str, data: int, base: int, offset: int, is_load: bool
+) -> int | None:
+    """The compressed encoding of a load or store, if any."""
+    width = {"lw": 4, "sw": 4, "fld": 8, "fsd": 8}.get(mnemonic)
+    if width is None or offset < 0 or offset % width:
+        return None
+    if mnemonic == "lw" and data == 0:
+        return None
+    funct3 = {"lw": 0b010, "sw": 0b110, "fld": 0b001, "fsd": 0b101}[mnemonic]
+    if base == _SP:
+        if width == 4 and offset < 256:
+            if is_load:
+                # c.lwsp
+                return (
+                    funct3 << 13
+                    | ((offset >> 5) & 1) << 12
+                    | data << 7
+                    | ((offset >> 2) & 0x7) << 4
+                    | ((offset >> 6) & 0x3) << 2
+                    | 0b10
+                )
+            # c.swsp
+            return (
+                funct3 << 13
+                | ((offset >> 2) & 0xF) << 9
+                | ((offset >> 6) & 0x3) << 7
+                | data << 2
+                | 0b10
+            )
+        if width == 8 and offset < 512:
+            if is_load:
+                # c.fldsp
+                return (
+                    funct3 << 13
+                    | ((offset >> 5) & 1) << 12
+                    | data << 7
+                    | ((offset >> 3) & 0x3) << 5
+                    | ((offset >> 6) & 0x7) << 2
+                    | 0b10
+                )
+            # c.fsdsp
+            return (
+                funct3 << 13
+                | ((offset >> 3) & 0x7) << 10
+                | ((offset >> 6) & 0x7) << 7
+                | data << 2
+                | 0b10
+            )
+        return None
+    if not (_is_compressed_register(base) and _is_compressed_register(data)):
+        return None
+    if offset >= 32 * width:
+        return None
+    if width == 4:
+        # c.lw, c.sw
+        low = ((offset >> 2) & 1) << 6 | ((offset >> 6) & 1) << 5
+    else:
+        # c.fld, c.fsd
+        low = ((offset >> 6) & 0x3) << 5
+    return (
+        funct3 << 13
+        | ((offset >> 3) & 0x7) << 10
+        | (base - 8) << 7
+        | low
+        | (data - 8) << 2
+        | 0b00
+    )
+
+
+# endregion
+
+# region Instruction encoding
+
+
+def _register(arg: riscv.AssemblyInstructionArg) -> int:
+    if isinstance(arg, SSAValue):
+        arg = arg.type
+    if not isinstance(arg, riscv.RISCVRegisterType):
+        raise MachineCodeException(f"Expected register, got {arg}")
+    if not isinstance(arg.index, IntAttr) or arg.index.data < 0:
+        raise MachineCodeException(f"Cannot encode unallocated register {arg}")
+    return arg.index.data
+
+
+def _immediate(arg: riscv.AssemblyInstructionArg) -> int | str:
+    """The value of an immediate argument, or the name of the label it refers to."""
+    match arg:
+        case IntegerAttr():
+            return arg.value.data
+        case int():
+            return arg
+        case riscv.LabelAttr():
+            return arg.data
+        case str():
+            return arg
+        case _:
+            raise MachineCodeException(f"Expected immediate, got {arg}")
+
+
+def _sign_extend(value: int, bits: int) -> int:
+    value &= (1 << bits) - 1
+    return value - (1 << bits) if value >> (bits - 1) else value
+
+
+def _pack(*words: int) -> bytes:
+    return b"".join(
+        struct.pack("<H" if word < 0x10000 and (word & 0b11) != 0b11 else "<I", word)
+        for word in words
+    )
+
+
+def encode_instruction(
+    mnemonic: str,
+    args: Sequence[riscv.AssemblyInstructionArg],
+    *,
+    compress: bool = False,
+    pc: int = 0,
+    resolve: LabelResolver = _unresolved,
+    relocate: Relocator = _no_relocation,
+) -> bytes:
+    """
+    Encode an instruction from its assembly mnemonic and arguments.
+
+    Labels are resolved relative to `pc` with `resolve`, and references that it cannot
+    resolve are recorded with `relocate`, relative to the start of the instruction.
+    """
+    match mnemonic:
+        case _ if mnemonic in _R_TYPE:
+            opcode, funct3, funct7 = _R_TYPE[mnemonic]
+            rd, rs1, rs2 = map(_register, args)
+            if compress and (word := _compress_register(rd, rs1, rs2, mnemonic)):
+                return _pack(word)
+            return _pack(_r_type(opcode, rd, funct3, rs1, rs2, funct7))
+        case _ if mnemonic in _FLOAT_UNARY:
+            funct7, rs2, funct3 = _FLOAT_UNARY[mnemonic]
+            rd, rs1 = map(_register, args)
+            return _pack(_r_type(0x53, rd, funct3, rs1, rs2, funct7))
+        case "fmv.s" | "fmv.d":
+            rd, rs = map(_register, args)
+            funct7 = 0x10 if mnemonic == "fmv.s" else 0x11
+            return _pack(_r_type(0x53, rd, 0, rs, rs, funct7))
+        case _ if mnemonic in _R4_TYPE:
+            opcode, fmt = _R4_TYPE[mnemonic]
+            rd, rs1, rs2, rs3 = map(_register, args)
+            return _pack(
+                _r4_type(opcode, rd, _ROUNDING_MODE_DYNAMIC, rs1, rs2, rs3, fmt)
+            )
+        case _ if mnemonic in _I_TYPE or mnemonic in _LOADS:
+            opcode, funct3 = _I_TYPE.get(mnemonic) or _LOADS[mnemonic]
+            rd, rs1 = _register(args[0]), _register(args[1])
+            imm = _immediate(args[2])
+            if isinstance(imm, str):
+                relocate(0, R_RISCV_LO12_I, imm)
+                imm, compress = 0, False
+            if compress:
+                if mnemonic in _LOADS:
+                    word = _compress_memory(mnemonic, rd, rs1, imm, True)
+                else:
+                    word = _compress_immediate(rd, rs1, imm, mnemonic)
+                if word is not None:
+                    return _pack(word)
+            return _pack(_i_type(opcode, rd, funct3, rs1, imm))
+        case "mv":
+            rd, rs = map(_register, args)
+            if compress and (word := _compress_immediate(rd, rs, 0, "addi")):
+                return _pack(word)
+            return _pack(_i_type(0x13, rd, 0, rs, 0))
+        case "nop":
+            return _pack(0x0001) if compress else _pack(_i_type(0x13, 0, 0, 0, 0))
+        case _ if mnemonic in _SHIFTS:
+            funct3, funct7 = _SHIFTS[mnemonic]
+            rd, rs1 = _register(args[0]), _register(args[1])
+            shamt = _immediate(args[2])
+            if not isinstance(shamt, int) or not 0 <= shamt < 64:
+                raise MachineCodeException(f"Invalid shift amount {shamt}")
+            if compress and (word := _compress_immediate(rd, rs1, shamt, mnemonic)):
+                return _pack(word)
+            return _pack(_r_type(0x13, rd, funct3, rs1, 0, funct7) | shamt << 20)
+        case _ if mnemonic in _STORES:
+            opcode, funct3 = _STORES[mnemonic]
+            rs1, rs2 = _register(args[0]), _register(args[1])
+            imm = _immediate(args[2])
+            if isinstance(imm, str):
+                relocate(0, R_RISCV_LO12_S, imm)
+                imm, compress = 0, False
+            if compress and (word := _compress_memory(mnemonic, rs2, rs1, imm, False)):
+                return _pack(word)
+            return _pack(_s_type(opcode, funct3, rs1, rs2, imm))
+        case _ if mnemonic in _BRANCHES:
+            rs1, rs2 = _register(args[0]), _register(args[1])
+            offset = _immediate(args[2])
+            if isinstance(offset, str):
+                label = offset
+                if (offset := resolve(label, pc)) is None:
+                    relocate(0, R_RISCV_BRANCH, label)
+                    offset = 0
+            return _pack(_b_type(_BRANCHES[mnemonic], rs1, rs2, offset))
+        case "jal" | "j":
+            *rd_args, target = args
+            if rd_args:
+                rd = _register(rd_args[0])
+            else:
+                rd = _RA if mnemonic == "jal" else _ZERO
+            offset = _immediate(target)
+            if isinstance(offset, str):
+                label = offset
+                if (offset := resolve(label, pc)) is None:
+                    relocate(0, R_RISCV_JAL, label)
+                    offset = 0
+            return _pack(_j_type(rd, offset))
+        case "jalr":
+            *rd_args, rs1_arg, imm_arg = args
+            rd = _register(rd_args[0]) if rd_args else _RA
+            rs1 = _register(rs1_arg)
+            imm = _immediate(imm_arg)
+            if isinstance(imm, str):
+                relocate(0, R_RISCV_LO12_I, imm)
+                imm, compress = 0, False
+            if compress and imm == 0 and rs1 != 0 and rd in (_ZERO, _RA):
+                # c.jr, c.jalr
+                return _pack((0b1000 | rd) << 12 | rs1 << 7 | 0b10)
+            return _pack(_i_type(0x67, rd, 0, rs1, imm))
+        case "ret":
+            return _pack(0x8082) if compress else _pack(_i_type(0x67, 0, 0, _RA, 0))
+        case "lui" | "auipc":
+            rd = _register(args[0])
+            imm = _immediate(args[1])
+            if isinstance(imm, str):
+                relocate(0, R_RISCV_HI20, imm)
+                imm, compress = 0, False
+            if compress and mnemonic == "lui" and (word := _compress_lui(rd, imm)):
+                return _pack(word)
+            return _pack(_u_type(0x37 if mnemonic == "lui" else 0x17, rd, imm))
+        case "li":
+            rd = _register(args[0])
+            imm = _immediate(args[1])
+            if isinstance(imm, str):
+                relocate(0, R_RISCV_HI20, imm)
+                relocate(4, R_RISCV_LO12_I, imm)
+                return _pack(_u_type(0x37, rd, 0), _i_type(0x13, rd, 0, rd, 0))
+            return _load_immediate(rd, imm, compress)
+        case _ if mnemonic in _CSR:
+            funct3 = _CSR[mnemonic]
+            *rd_args, csr_arg, source = args
+            rd = _register(rd_args[0]) if rd_args else _ZERO
+            csr = _immediate(csr_arg)
+            if isinstance(csr, str) or not 0 <= csr < 4096:
+                raise MachineCodeException(f"Invalid CSR {csr}")
+            if funct3 & 0b100:
+                rs1 = _immediate(source)
+                if isinstance(rs1, str) or not 0 <= rs1 < 32:
+                    raise MachineCodeException(f"Invalid CSR immediate {rs1}")
+            else:
+                rs1 = _register(source)
+            return _pack(csr << 20 | rs1 << 15 | funct3 << 12 | rd << 7 | 0x73)
+        case "ebreak" if compress:
+            return _pack(0x9002)
+        case _ if mnemonic in _FIXED:
+            return _pack(_FIXED[mnemonic])
+        case _:
+            raise MachineCodeException(f"Cannot encode instruction {mnemonic}")
+
+
+def _load_immediate(rd: int, value: int, compress: bool) -> bytes:
+    """The sequence loading a 32-bit immediate, sign-extended to 64 bits."""
+    value = _sign_extend(value, 32)
+    if _fits_signed(value, 12):
+        if compress and (word := _compress_immediate(rd, _ZERO, value, "addi")):
+            return _pack(word)
+        return _pack(_i_type(0x13, rd, 0, _ZERO, value))
+    low = _sign_extend(value, 12)
+    high = ((value - low) >> 12) & 0xFFFFF
+    lui = (compress and _compress_lui(rd, high)) or _u_type(0x37, rd, high)
+    if not low:
+        return _pack(lui)
+    # addiw truncates to 32 bits, so that the upper immediate may overflow
+    return _pack(lui, _i_type(_ADDIW[0], rd, _ADDIW[1], rd, low))
+
+
+def instruction_encoding(
+    op: riscv.RISCVInstruction, *, compress: bool = False
+) -> bytes:
+    """
+    The machine code of an instruction, which must not refer to labels.
+    """
+    return encode_instruction(
+        op.assembly_instruction_name(),
+        [arg for arg in op.assembly_line_args() if arg is not None],
+        compress=compress,
+    )
+
+
+# endregion
+
+# region Assembler
+
+
+_SECTION_FLAGS = {
+    ".text": SectionFlags.ALLOC | SectionFlags.EXECINSTR,
+    ".data": SectionFlags.ALLOC | SectionFlags.WRITE,
+    ".rodata": SectionFlags.ALLOC,
+    ".bss": SectionFlags.ALLOC | SectionFlags.WRITE,
+}
+
+_IGNORED_DIRECTIVES = {
+    ".type",
+    ".size",
+    ".file",
+    ".ident",
+    ".option",
+    ".attribute",
+}
+
+_DATA_DIRECTIVES = {".byte": 1, ".half": 2, ".short": 2, ".word": 4, ".dword": 8}
+
+
+@dataclass
+class _Fixup:
+    section: Section
+    offset: int
+    op: riscv.RISCVInstruction
+    args: list[riscv.AssemblyInstructionArg]
+
+
+@dataclass
+class RiscvAssembler:
+    """
+    Assembles the `riscv` operations of a module into sections of machine code and
+    data, in the order in which they would be printed as assembly.
+    """
+
+    compress: bool = True
+    """Whether to emit compressed instructions when possible."""
+
+    sections: dict[str, Section] = field(default_factory=dict[str, Section])
+    labels: dict[str, tuple[Section, int]] = field(
+        default_factory=dict[str, tuple[Section, int]]
+    )
+    global_labels: set[str] = field(default_factory=set[str])
+    functions: set[str] = field(default_factory=set[str])
+    _section: Section | None = None
+    _fixups: list[_Fixup] = field(default_factory=list[_Fixup])
+    _used_compressed: bool = False
+
+    @property
+    def section(self) -> Section:
+        if self._section is None:
+            self.switch_section(".text")
+        assert self._section is not None
+        return self._section
+
+    def switch_section(self, name: str):
+        name = name.split(",")[0].strip()
+        if name not in self.sections:
+            flags = _SECTION_FLAGS.get(name, SectionFlags.ALLOC)
+            self.sections[name] = Section(
+                name,
+                SectionType.NOBITS if name == ".bss" else SectionType.PROGBITS,
+                flags,
+                size=0 if name == ".bss" else None,
+            )
+        self._section = self.sections[name]
+
+    def define_label(self, label: str):
+        if label in self.labels:
+            raise MachineCodeException(f"Label {label} is defined more than once")
+        self.labels[label] = (self.section, len(self.section.data))
+
+    def align(self, alignment: int):
+        section = self.section
+        section.alignment = max(section.alignment, alignment)
+        padding = -len(section.data) % alignment
+        if section.flags & SectionFlags.EXECINSTR:
+            if padding % 2:
+                raise MachineCodeException("Cannot align code to an odd offset")
+            if padding % 4:
+                section.data += _pack(0x0001)
+                padding -= 2
+            section.data += _pack(_i_type(0x13, 0, 0, 0, 0)) * (padding // 4)
+        else:
+            section.data += bytes(padding)
+
+    def assemble_module(self, module: ModuleOp):
+        for op in module.body.walk():
+            self.assemble_op(op)
+        self.resolve()
+
+    def assemble_op(self, op: Operation):
+        match op:
+            case riscv.AssemblySectionOp():
+                self.switch_section(op.directive.data)
+            case riscv_func.FuncOp():
+                if not op.body.blocks:
+                    return
+                self.switch_section(".text")
+                name = op.sym_name.data
+                if op.sym_visibility is not None and op.sym_visibility.data == "public":
+                    self.global_labels.add(name)
+                if op.p2align is not None:
+                    self.align(1 << op.p2align.value.data)
+                self.functions.add(name)
+                self.define_label(name)
+            case riscv.LabelOp():
+                self.define_label(op.label.data)
+            case riscv.DirectiveOp():
+                value = op.value.data if op.value is not None else ""
+                self.assemble_directive(op.directive.data, value)
+            case riscv.RISCVInstruction():
+                if op.assembly_line() is None:
+                    return
+                self.assemble_instruction(op)
+            case _:
+                line = (
+                    op.assembly_line()
+                    if isinstance(op, OneLineAssemblyPrintable)
+                    else ""
+                )
+                if line is None or line.strip().startswith("#"):
+                    # Comments and operations without assembly
+                    return
+                raise MachineCodeException(f"Cannot encode operation {op.name}")
+
+    def assemble_directive(self, directive: str, value: str):
+        values = [v.strip() for v in value.split(",") if v.strip()]
+        match directive:
+            case ".text" | ".data" | ".rodata" | ".bss":
+                self.switch_section(directive)
+            case ".section":
+                self.switch_section(value)
+            case ".globl" | ".global":
+                self.global_labels.update(values)
+            case ".local":
+                self.global_labels.difference_update(values)
+            case ".p2align":
+                self.align(1 << int(values[0], 0))
+            case ".align" | ".balign":
+                self.align(int(values[0], 0))
+            case ".zero" | ".space":
+                self._append_data(bytes(int(values[0], 0)))
+            case _ if directive in _DATA_DIRECTIVES:
+                size = _DATA_DIRECTIVES[directive]
+                for v in values:
+                    try:
+                        number = int(v, 0)
+                    except ValueError:
+                        if size not in (4, 8):
+                            raise MachineCodeException(
+                                f"Cannot refer to label {v} in {directive}"
+                            )
+                        self.section.relocations.append(
+                            Relocation(
+                                len(self.section.data),
+                                v,
+                                R_RISCV_32 if size == 4 else R_RISCV_64,
+                            )
+                        )
+                        number = 0
+                    self._append_data(
+                        (number % (1 << (8 * size))).to_bytes(size, "little")
+                    )
+            case _ if directive in _IGNORED_DIRECTIVES:
+                pass
+            case _:
+                raise MachineCodeException(f"Unsupported directive {directive}")
+
+    def _append_data(self, data: bytes):
+        section = self.section
+        if section.type == SectionType.NOBITS:
+            if any(data):
+                raise MachineCodeException("Cannot initialize data in .bss")
+            assert section.size is not None
+            section.size += len(data)
+        else:
+            section.data += data
+
+    def assemble_instruction(self, op: riscv.RISCVInstruction):
+        section = self.section
+        if not section.flags & SectionFlags.EXECINSTR:
+            raise MachineCodeException(
+                f"Instruction {op.assembly_instruction_name()} outside of a code section"
+            )
+        args = [arg for arg in op.assembly_line_args() if arg is not None]
+        refers_to_label = False
+
+        def mark(*_: object) -> int | None:
+            nonlocal refers_to_label
+            refers_to_label = True
+            return 0
+
+        try:
+            code = encode_instruction(
+                op.assembly_instruction_name(),
+                args,
+                compress=self.compress,
+                resolve=mark,
+                relocate=mark,
+            )
+        except MachineCodeException as e:
+            raise MachineCodeException(f"{e}, in {op.name}") from e
+        if refers_to_label:
+            # The encoding is computed once all labels are defined
+            self._fixups.append(_Fixup(section, len(section.data), op, args))
+        elif len(code) == 2:
+            self._used_compressed = True
+        section.data += code
+
+    def resolve(self):
+        """Encode the instructions referring to labels, now that all are defined."""
+        for fixup in self._fixups:
+            section, offset = fixup.section, fixup.offset
+
+            def resolve(label: str, pc: int) -> int | None:
+                target = self.labels.get(label)
+                if target is None or target[0] is not section:
+                    return None
+                return target[1] - pc
+
+            def relocate(instruction_offset: int, type: int, label: str) -> None:
+                section.relocations.append(
+                    Relocation(offset + instruction_offset, label, type)
+                )
+
+            code = encode_instruction(
+                fixup.op.assembly_instruction_name(),
+                fixup.args,
+                pc=offset,
+                resolve=resolve,
+                relocate=relocate,
+            )
+            section.data[offset : offset + len(code)] = code
+        self._fixups.clear()
+
+    def symbols(self) -> list[Symbol]:
+        symbols = [
+            Symbol(
+                label,
+                section.name,
+                offset,
+                SymbolBinding.GLOBAL
+                if label in self.global_labels
+                else SymbolBinding.LOCAL,
+                SymbolType.FUNC if label in self.functions else SymbolType.NOTYPE,
+            )
+            for label, (section, offset) in self.labels.items()
+        ]
+        undefined = {
+            relocation.symbol
+            for section in self.sections.values()
+            for relocation in section.relocations
+            if relocation.symbol not in self.labels
+        }
+        symbols.extend(
+            Symbol(label, None, binding=SymbolBinding.GLOBAL)
+            for label in sorted(undefined)
+        )
+        return symbols
+
+    def write_object(self, io: BinaryIO):
+        flags = EF_RISCV_FLOAT_ABI_DOUBLE
+        if self._used_compressed:
+            flags |= EF_RISCV_RVC
+        write_elf_object(
+            io, EM_RISCV, tuple(self.sections.values()), self.symbols(), flags
+        )
+
+
+def write_riscv_object(module: ModuleOp, io: BinaryIO, *, compress: bool = True):
+    """Assemble a module of `riscv` operations into an ELF64 relocatable object."""
+    assembler = RiscvAssembler(compress=compress)
+    assembler.assemble_module(module)
+    assembler.write_object(io)
+
+
+# endregion
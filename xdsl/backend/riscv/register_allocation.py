@@ -1,13 +1,17 @@
 import abc
 import json
 from collections.abc import Iterable, Sequence
-from itertools import chain
+from copy import deepcopy
+from itertools import chain, count
 from typing import cast
 
 from ordered_set import OrderedSet
 
+from xdsl.analysis.analysis_manager import AnalysisManager
+from xdsl.analysis.liveness import Liveness, uses_from_above_per_block
 from xdsl.backend.register_queue import RegisterQueue
-from xdsl.dialects import riscv, riscv_func, riscv_scf, riscv_snitch
+from xdsl.dialects import riscv, riscv_cf, riscv_func, riscv_scf, riscv_snitch
+from xdsl.dialects.builtin import IntAttr
 from xdsl.dialects.riscv import (
     FloatRegisterType,
     IntRegisterType,
@@ -19,6 +23,7 @@ from xdsl.ir import Attribute, Block, Operation, SSAValue
 from xdsl.rewriter import InsertPoint, Rewriter
 from xdsl.transforms.canonicalization_patterns.riscv import get_constant_value
 from xdsl.transforms.snitch_register_allocation import get_snitch_reserved
+from xdsl.utils.disjoint_set import DisjointSet
 from xdsl.utils.exceptions import DiagnosticException
 
 
@@ -87,6 +92,36 @@ def reg_types(regs: Iterable[Attribute]) -> tuple[set[str], set[str]]:
     return int_regs, float_regs
 
 
+def _insert_regalloc_stats(
+    func: riscv_func.FuncOp, preallocated: set[IntRegisterType | FloatRegisterType]
+) -> None:
+    """
+    Inserts a comment op before the function op passed in with a json containing the
+    preallocated and allocated registers.
+    """
+    preallocated_int, preallocated_float = reg_types(preallocated)
+    allocated_int, allocated_float = reg_types(
+        val.type
+        for op in func.body.walk()
+        for vals in (op.results, op.operands)
+        for val in vals
+    )
+
+    stats = {
+        "preallocated_float": sorted(preallocated_float),
+        "preallocated_int": sorted(preallocated_int),
+        "allocated_float": sorted(allocated_float),
+        "allocated_int": sorted(allocated_int),
+    }
+
+    stats_str = json.dumps(stats)
+
+    Rewriter.insert_op(
+        riscv.CommentOp(f"Regalloc stats: {stats_str}"),
+        InsertPoint.before(func),
+    )
+
+
 class RegisterAllocatorLivenessBlockNaive(RegisterAllocator):
     """
     It traverses the use-def SSA chain backwards (i.e., from uses to defs) and:
@@ -116,7 +151,7 @@ class RegisterAllocatorLivenessBlockNaive(RegisterAllocator):
     """
 
     available_registers: RegisterQueue[IntRegisterType | FloatRegisterType]
-    live_ins_per_block: dict[Block, OrderedSet[SSAValue]]
+    liveness: Liveness | None
     new_value_by_old_value: dict[SSAValue, SSAValue]
 
     exclude_preallocated: bool = True
@@ -126,7 +161,7 @@ class RegisterAllocatorLivenessBlockNaive(RegisterAllocator):
         self, available_registers: RegisterQueue[IntRegisterType | FloatRegisterType]
     ) -> None:
         self.available_registers = available_registers
-        self.live_ins_per_block = {}
+        self.liveness = None
         self.new_value_by_old_value = {}
 
     def _replace_value_with_new_type(
@@ -137,7 +172,8 @@ class RegisterAllocatorLivenessBlockNaive(RegisterAllocator):
         return new_val
 
     def _allocate_live_ins_per_block(self, block: Block):
-        live_ins = self.live_ins_per_block[block]
+        assert self.liveness is not None
+        live_ins = self.liveness.uses_from_above(block)
         for live_in in live_ins:
             # We change a value type at most once
             if live_in in self.new_value_by_old_value:
@@ -372,59 +408,650 @@ class RegisterAllocatorLivenessBlockNaive(RegisterAllocator):
 
         block = func.body.block
 
-        self.live_ins_per_block = live_ins_per_block(block)
-        assert not self.live_ins_per_block[block]
+        analyses = AnalysisManager.for_op(func)
+        self.liveness = analyses.get(Liveness, func.body)
+        assert not self.liveness.uses_from_above(block)
         for op in reversed(block.ops):
             self.process_operation(op)
+        # The types of the values of the function were replaced
+        analyses.invalidate_enclosing(func.body)
 
         if add_regalloc_stats:
-            preallocated_int, preallocated_float = reg_types(preallocated)
-            allocated_int, allocated_float = reg_types(
-                val.type
-                for op in block.walk()
-                for vals in (op.results, op.operands)
-                for val in vals
+            _insert_regalloc_stats(func, preallocated)
+
+
+_MOVE_OPS = (riscv.MVOp, riscv.FMVOp, riscv.FMvDOp)
+"""Register to register copies that can be removed by coalescing."""
+
+_SPILL_SLOT_SIZE = 8
+"""The size in bytes of a spill slot, large enough for any integer or float register."""
+
+
+def _is_register(val: SSAValue) -> bool:
+    return isinstance(val.type, IntRegisterType | FloatRegisterType)
+
+
+def _edge_arguments(op: Operation) -> tuple[tuple[Sequence[SSAValue], Block], ...]:
+    """
+    Returns the values passed by a `riscv_cf` terminator to the arguments of each of
+    its successors.
+    """
+    match op:
+        case riscv_cf.ConditionalBranchOperation():
+            return (
+                (op.then_arguments, op.then_block),
+                (op.else_arguments, op.else_block),
             )
+        case riscv_cf.BranchOp() | riscv_cf.JOp():
+            return ((op.block_arguments, op.successor),)
+        case _:
+            return ()
+
+
+def _loop_carried_values(op: Operation) -> Iterable[tuple[SSAValue, ...]]:
+    """
+    Returns the tuples of values that must be allocated to the same register for
+    `riscv_scf` and `riscv_snitch.frep` loops.
+    """
+    match op:
+        case riscv_scf.ForRofOperation():
+            block_args = op.body.block.args[1:]
+        case riscv_snitch.FRepOperation():
+            block_args = op.body.block.args
+        case _:
+            return ()
+    yield_op = op.body.block.last_op
+    assert yield_op is not None
+    return zip(block_args, op.iter_args, yield_op.operands, op.results)
+
+
+def _loop_control_values(op: Operation) -> tuple[SSAValue, ...]:
+    """
+    Returns the values controlling the iteration of a loop, which must stay live for
+    the whole execution of its body.
+    """
+    match op:
+        case riscv_scf.ForRofOperation():
+            return (op.ub, op.step, op.body.block.args[0])
+        case riscv_snitch.FRepOperation():
+            return (op.max_rep,)
+        case _:
+            return ()
+
+
+class _LiveRanges:
+    """
+    The live ranges of the register values of a function, approximated by the first
+    and last positions at which each value is live, and the interference graph
+    computed from the exact liveness.
+    """
+
+    bounds: dict[SSAValue, tuple[int, int]]
+    interference: dict[SSAValue, set[SSAValue]]
+    copied_values: dict[SSAValue, SSAValue]
+    """
+    The value each copy holds, values holding the same value do not interfere even if
+    they are live at the same time.
+    """
 
-            stats = {
-                "preallocated_float": sorted(preallocated_float),
-                "preallocated_int": sorted(preallocated_int),
-                "allocated_float": sorted(allocated_float),
-                "allocated_int": sorted(allocated_int),
-            }
+    def __init__(self, copied_values: dict[SSAValue, SSAValue]) -> None:
+        self.bounds = {}
+        self.interference = {}
+        self.copied_values = copied_values
 
-            stats_str = json.dumps(stats)
+    def extend(self, val: SSAValue, position: int) -> None:
+        if (bounds := self.bounds.get(val)) is None:
+            self.bounds[val] = (position, position)
+        else:
+            start, end = bounds
+            self.bounds[val] = (min(start, position), max(end, position))
 
-            Rewriter.insert_op(
-                riscv.CommentOp(f"Regalloc stats: {stats_str}"),
-                InsertPoint.before(func),
+    def interfere(self, val: SSAValue, others: Iterable[SSAValue]) -> None:
+        neighbours = self.interference.setdefault(val, set())
+        copied = self.copied_values.get(val, val)
+        for other in others:
+            if self.copied_values.get(other, other) is not copied:
+                neighbours.add(other)
+                self.interference.setdefault(other, set()).add(val)
+
+
+class _Interval:
+    """A group of values to be allocated to the same register."""
+
+    start: int
+    end: int
+    values: list[SSAValue]
+    reg_type: type[IntRegisterType] | type[FloatRegisterType]
+    spillable: bool
+
+    def __init__(
+        self,
+        start: int,
+        end: int,
+        values: list[SSAValue],
+        reg_type: type[IntRegisterType] | type[FloatRegisterType],
+        spillable: bool,
+    ) -> None:
+        self.start = start
+        self.end = end
+        self.values = values
+        self.reg_type = reg_type
+        self.spillable = spillable
+
+
+class RegisterAllocatorLinearScan(RegisterAllocator):
+    """
+    A linear scan register allocator operating on whole functions, including functions
+    with multiple `riscv_cf` blocks.
+
+    Values that must share a register, such as loop-carried values and the arguments
+    of blocks and the values passed to them, are grouped together, and copies between
+    values that do not interfere are coalesced and removed.
+    The live range of each group is then approximated by a single interval, and the
+    intervals are allocated in order of their start.
+    When no register is available, the interval that ends furthest away is spilled to
+    the stack, and allocation is restarted, until all values fit in the registers.
+
+    See "Linear Scan Register Allocation", Poletto and Sarkar, 1999.
+    """
+
+    available_registers: RegisterQueue[IntRegisterType | FloatRegisterType]
+
+    exclude_preallocated: bool = True
+    exclude_snitch_reserved: bool = True
+
+    _positions: dict[Operation, tuple[int, int]]
+    """The positions at which each operation uses its operands and defines its results."""
+    _block_bounds: dict[Block, tuple[int, int]]
+    """The first and last position of each block."""
+    _nested_live_ins: dict[Block, OrderedSet[SSAValue]]
+    _spill_slot_count: int
+    _stack_pointer: SSAValue | None
+
+    def __init__(
+        self, available_registers: RegisterQueue[IntRegisterType | FloatRegisterType]
+    ) -> None:
+        self.available_registers = available_registers
+        self._positions = {}
+        self._block_bounds = {}
+        self._nested_live_ins = {}
+        self._spill_slot_count = 0
+        self._stack_pointer = None
+
+    def _number_operations(self, func: riscv_func.FuncOp) -> list[SSAValue]:
+        """
+        Assigns positions to blocks and operations in program order, and returns the
+        register values of the function in the order in which they are defined.
+        """
+        self._positions = {}
+        self._block_bounds = {}
+        values: list[SSAValue] = []
+        counter = count()
+
+        def number_block(block: Block) -> None:
+            start = next(counter)
+            values.extend(arg for arg in block.args if _is_register(arg))
+            end = start
+            for op in block.ops:
+                use_position = next(counter)
+                for region in op.regions:
+                    for inner in region.blocks:
+                        number_block(inner)
+                end = next(counter)
+                self._positions[op] = (use_position, end)
+                values.extend(res for res in op.results if _is_register(res))
+            self._block_bounds[block] = (start, end)
+
+        for block in func.body.blocks:
+            number_block(block)
+
+        return values
+
+    def _scan_block(
+        self,
+        block: Block,
+        live_out: set[SSAValue],
+        ranges: _LiveRanges | None,
+    ) -> set[SSAValue]:
+        """
+        Traverses the block backwards from the values live at its end, recording live
+        ranges and interference if `ranges` is passed in, and returns the values live
+        at its start.
+        """
+        live = set(live_out)
+        block_start, block_end = self._block_bounds[block]
+        if ranges is not None:
+            for val in live:
+                ranges.extend(val, block_end)
+
+        for op in reversed(block.ops):
+            use_position, def_position = self._positions[op]
+            results = [res for res in op.results if _is_register(res)]
+            if ranges is not None:
+                for res in results:
+                    ranges.extend(res, def_position)
+                    ranges.interfere(res, live)
+                    ranges.interfere(res, results)
+            live.difference_update(results)
+
+            # Values used in a loop body must stay live until the end of the loop
+            for region in op.regions:
+                for inner in region.blocks:
+                    inner_live_out = live.union(
+                        val for val in self._nested_live_ins[inner] if _is_register(val)
+                    )
+                    inner_live_out.update(_loop_control_values(op))
+                    live.update(self._scan_block(inner, inner_live_out, ranges))
+
+            operands = [val for val in op.operands if _is_register(val)]
+            live.update(operands)
+            if ranges is not None:
+                for val in operands:
+                    ranges.extend(val, use_position)
+
+        args = [arg for arg in block.args if _is_register(arg)]
+        if ranges is not None:
+            for arg in args:
+                ranges.extend(arg, block_start)
+                ranges.interfere(arg, chain(live, args))
+        live.difference_update(args)
+        if ranges is not None:
+            for val in live:
+                ranges.extend(val, block_start)
+
+        return live
+
+    def _live_ranges(self, func: riscv_func.FuncOp) -> _LiveRanges:
+        """
+        Computes the values live at the start of each block of the function with a
+        backwards dataflow analysis over the control flow graph, and then the live
+        ranges and interference of all values.
+        """
+        self._nested_live_ins = {}
+        for block in func.body.blocks:
+            self._nested_live_ins.update(live_ins_per_block(block))
+
+        blocks = tuple(func.body.blocks)
+        live_ins: dict[Block, set[SSAValue]] = {block: set() for block in blocks}
+
+        def live_out(block: Block) -> set[SSAValue]:
+            res = set[SSAValue]()
+            if (terminator := block.last_op) is not None:
+                for successor in terminator.successors:
+                    res.update(live_ins[successor])
+            return res
+
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(blocks):
+                new_live_in = self._scan_block(block, live_out(block), None)
+                if new_live_in != live_ins[block]:
+                    live_ins[block] = new_live_in
+                    changed = True
+
+        copied_values: dict[SSAValue, SSAValue] = {}
+        for op in func.walk():
+            if isinstance(op, _MOVE_OPS):
+                copied_values[op.rd] = copied_values.get(op.rs, op.rs)
+
+        ranges = _LiveRanges(copied_values)
+        for block in blocks:
+            self._scan_block(block, live_out(block), ranges)
+        return ranges
+
+    def _insert_edge_copies(self, func: riscv_func.FuncOp) -> None:
+        """
+        Copies the values passed to blocks and to loops, so that a value passed to
+        several arguments, or still used after the branch or loop, does not constrain
+        the allocation. Copies that are not needed are later coalesced and removed.
+        """
+        for op in tuple(func.walk()):
+            # The passed values are the trailing operands of loops and branches
+            if isinstance(op, riscv_scf.ForRofOperation | riscv_snitch.FRepOperation):
+                passed_count = len(op.iter_args)
+            else:
+                passed_count = sum(len(args) for args, _ in _edge_arguments(op))
+            for i in range(len(op.operands) - passed_count, len(op.operands)):
+                operand = op.operands[i]
+                if not _is_register(operand):
+                    continue
+                if isinstance(operand.type, IntRegisterType):
+                    copy = riscv.MVOp(operand)
+                else:
+                    copy = riscv.FMvDOp(operand)
+                Rewriter.insert_op(copy, InsertPoint.before(op))
+                op.operands[i] = copy.rd
+
+    def _spill_slot(self) -> int:
+        offset = self._spill_slot_count * _SPILL_SLOT_SIZE
+        self._spill_slot_count += 1
+        return offset
+
+    def _get_stack_pointer(self, func: riscv_func.FuncOp) -> SSAValue:
+        if self._stack_pointer is None:
+            get_sp = riscv.GetRegisterOp(Registers.SP)
+            Rewriter.insert_op(get_sp, InsertPoint.at_start(func.body.blocks[0]))
+            self._stack_pointer = get_sp.res
+        return self._stack_pointer
+
+    def _spill(
+        self, func: riscv_func.FuncOp, val: SSAValue, unspillable: set[SSAValue]
+    ) -> None:
+        """
+        Stores the value to a new stack slot after its definition, and reloads it
+        before each of its uses. Constants are rematerialized instead.
+        """
+        op = val.owner
+        assert isinstance(op, Operation)
+        users = tuple(OrderedSet(use.operation for use in val.uses))
+
+        if isinstance(op, riscv.LiOp):
+            for user in users:
+                clone = op.clone()
+                Rewriter.insert_op(clone, InsertPoint.before(user))
+                val.replace_by_if(clone.rd, lambda use: use.operation is user)
+                unspillable.add(clone.rd)
+            Rewriter.erase_op(op)
+            return
+
+        sp = self._get_stack_pointer(func)
+        offset = self._spill_slot()
+        if isinstance(val.type, IntRegisterType):
+            store = riscv.SwOp(sp, val, offset, comment="spill")
+        else:
+            store = riscv.FSdOp(sp, val, offset, comment="spill")
+        Rewriter.insert_op(store, InsertPoint.after(op))
+        unspillable.add(val)
+
+        for user in users:
+            if isinstance(val.type, IntRegisterType):
+                load = riscv.LwOp(sp, offset, comment="reload")
+            else:
+                load = riscv.FLdOp(sp, offset, comment="reload")
+            Rewriter.insert_op(load, InsertPoint.before(user))
+            val.replace_by_if(load.rd, lambda use: use.operation is user)
+            unspillable.add(load.rd)
+
+    def _insert_spill_frame(self, func: riscv_func.FuncOp) -> None:
+        """
+        Allocates the stack frame holding the spill slots on entry to the function, and
+        deallocates it before each return.
+        """
+        if self._stack_pointer is None:
+            return
+
+        # Keep the stack pointer 16-byte aligned, as required by the ABI
+        frame_size = (self._spill_slot_count * _SPILL_SLOT_SIZE + 15) // 16 * 16
+        if frame_size > 2032:
+            raise DiagnosticException(
+                f"Cannot spill {self._spill_slot_count} values, the spill frame of "
+                f"{frame_size} bytes exceeds the range of addi immediates."
+            )
+
+        sp = self._stack_pointer
+        assert isinstance(sp.owner, Operation)
+        Rewriter.insert_op(
+            riscv.AddiOp(sp, -frame_size, rd=Registers.SP),
+            InsertPoint.after(sp.owner),
+        )
+        for block in func.body.blocks:
+            if isinstance(ret_op := block.last_op, riscv_func.ReturnOp):
+                Rewriter.insert_op(
+                    riscv.AddiOp(sp, frame_size, rd=Registers.SP),
+                    InsertPoint.before(ret_op),
+                )
+
+    def _group_values(
+        self, func: riscv_func.FuncOp, values: list[SSAValue], ranges: _LiveRanges
+    ) -> tuple[
+        dict[SSAValue, list[SSAValue]],
+        dict[SSAValue, IntRegisterType | FloatRegisterType],
+    ]:
+        """
+        Groups values that must be allocated to the same register, then coalesces
+        copies between groups that do not interfere.
+        Returns the members of each group by representative, and the register of the
+        groups containing preallocated values.
+        """
+        groups = DisjointSet(values)
+        members: dict[SSAValue, list[SSAValue]] = {val: [val] for val in values}
+        colors: dict[SSAValue, IntRegisterType | FloatRegisterType] = {}
+        for val in values:
+            if cast(RISCVRegisterType, val.type).is_allocated:
+                colors[val] = cast(IntRegisterType | FloatRegisterType, val.type)
+
+        def union(lhs: SSAValue, rhs: SSAValue) -> None:
+            lhs, rhs = groups.find(lhs), groups.find(rhs)
+            if lhs == rhs:
+                return
+            lhs_color, rhs_color = colors.get(lhs), colors.get(rhs)
+            if lhs_color is not None and rhs_color is not None:
+                if lhs_color != rhs_color:
+                    reg_names = sorted((f"{lhs_color}", f"{rhs_color}"))
+                    raise DiagnosticException(
+                        f"Cannot allocate registers to the same register {reg_names}"
+                    )
+            groups.union(lhs, rhs)
+            new = groups.find(lhs)
+            old = rhs if new == lhs else lhs
+            members[new].extend(members.pop(old))
+            color = lhs_color if lhs_color is not None else rhs_color
+            colors.pop(old, None)
+            if color is not None:
+                colors[new] = color
+
+        def interfere(lhs: SSAValue, rhs: SSAValue) -> bool:
+            rhs_members = set(members[rhs])
+            return any(
+                not ranges.interference.get(val, set()).isdisjoint(rhs_members)
+                for val in members[lhs]
+            )
+
+        for op in func.walk():
+            for carried in _loop_carried_values(op):
+                for val in carried[1:]:
+                    union(carried[0], val)
+            for args, successor in _edge_arguments(op):
+                for arg, block_arg in zip(args, successor.args, strict=True):
+                    union(arg, block_arg)
+            if isinstance(op, RISCVAsmOperation):
+                for inout in op.get_register_constraints().inouts:
+                    for val in inout[1:]:
+                        union(inout[0], val)
+
+        for op in func.walk():
+            if not isinstance(op, _MOVE_OPS):
+                continue
+            src, dst = groups.find(op.rs), groups.find(op.rd)
+            if src == dst:
+                continue
+            src_color, dst_color = colors.get(src), colors.get(dst)
+            if src_color is not None and dst_color is not None:
+                continue
+            color = src_color if src_color is not None else dst_color
+            if color is not None:
+                # Only preallocated registers that are excluded from allocation can be
+                # shared, and writes to `zero` would be discarded
+                if (
+                    not self.exclude_preallocated
+                    or color == Registers.ZERO
+                    or not isinstance(color.index, IntAttr)
+                    or color.index.data < 0
+                ):
+                    continue
+                uncolored = dst if src_color is not None else src
+                if any(
+                    other_color == color and interfere(uncolored, other)
+                    for other, other_color in colors.items()
+                ):
+                    continue
+            elif interfere(src, dst):
+                continue
+            union(src, dst)
+
+        return members, colors
+
+    def _is_spillable(
+        self, val: SSAValue, end: int, unspillable: set[SSAValue]
+    ) -> bool:
+        """
+        Returns whether spilling the value would shorten its live range.
+        This is not the case for values only used by the next operation, or used to
+        control the iteration of a loop, as reloads would be live for as long.
+        """
+        op = val.owner
+        if val in unspillable or not isinstance(op, Operation) or op.regions:
+            return False
+        _, def_position = self._positions[op]
+        if end <= def_position + 1:
+            return False
+        return not any(val in _loop_control_values(use.operation) for use in val.uses)
+
+    def _allocate_intervals(
+        self,
+        func: riscv_func.FuncOp,
+        unspillable: set[SSAValue],
+    ) -> tuple[dict[SSAValue, IntRegisterType | FloatRegisterType], list[SSAValue]]:
+        """
+        Runs a single pass of linear scan allocation, returning the registers assigned
+        to each value, and the values to spill before trying again.
+        """
+        values = self._number_operations(func)
+        ranges = self._live_ranges(func)
+        members, colors = self._group_values(func, values, ranges)
+
+        assignment: dict[SSAValue, IntRegisterType | FloatRegisterType] = {}
+        for rep, color in colors.items():
+            for val in members[rep]:
+                assignment[val] = color
+
+        intervals: list[_Interval] = []
+        for rep, group in members.items():
+            if rep in colors:
+                continue
+            if (
+                len(group) == 1
+                and (val := get_constant_value(rep)) is not None
+                and val.value.data == 0
+            ):
+                assignment[rep] = Registers.ZERO
+                continue
+            starts, ends = zip(*(ranges.bounds[val] for val in group))
+            spillable = len(group) == 1 and self._is_spillable(
+                rep, max(ends), unspillable
+            )
+            reg_type = type(cast(IntRegisterType | FloatRegisterType, rep.type))
+            intervals.append(
+                _Interval(min(starts), max(ends), group, reg_type, spillable)
             )
+        intervals.sort(key=lambda interval: interval.start)
+
+        has_registers = {
+            IntRegisterType: self.available_registers.can_pop(IntRegisterType),
+            FloatRegisterType: self.available_registers.can_pop(FloatRegisterType),
+        }
+        registers: dict[_Interval, IntRegisterType | FloatRegisterType] = {}
+        active: list[_Interval] = []
+        spilled: list[SSAValue] = []
+
+        for interval in intervals:
+            # Free the registers of intervals that ended before this one starts
+            for expired in [other for other in active if other.end < interval.start]:
+                active.remove(expired)
+                self.available_registers.push(registers[expired])
+
+            if (
+                self.available_registers.can_pop(interval.reg_type)
+                or not (has_registers[interval.reg_type])
+            ):
+                registers[interval] = self.available_registers.pop(interval.reg_type)
+                active.append(interval)
+                continue
+
+            candidates = [
+                other
+                for other in active
+                if other.reg_type is interval.reg_type
+                and other.spillable
+                and cast(IntAttr, registers[other].index).data >= 0
+            ]
+            if interval.spillable:
+                candidates.append(interval)
+            if not candidates:
+                # Nothing can be spilled, fall back to an "infinite" register
+                registers[interval] = self.available_registers.pop(interval.reg_type)
+                active.append(interval)
+                continue
+
+            victim = max(candidates, key=lambda other: other.end)
+            spilled.append(victim.values[0])
+            if victim is not interval:
+                active.remove(victim)
+                registers[interval] = registers.pop(victim)
+                active.append(interval)
+
+        for interval, reg in registers.items():
+            for val in interval.values:
+                assignment[val] = reg
+
+        return assignment, spilled
+
+    def allocate_func(
+        self, func: riscv_func.FuncOp, *, add_regalloc_stats: bool = False
+    ) -> None:
+        """
+        Allocates values in function passed in to registers, spilling values to the
+        stack if they do not fit.
+        The whole function must have been lowered to the relevant riscv dialects
+        and it must contain no unrealized casts.
+        If `add_regalloc_stats` is set to `True`, then a comment op will be inserted
+        before the function op passed in with a json containing the relevant data.
+        """
+        if not func.body.blocks:
+            # External function declaration
+            return
 
+        preallocated: set[IntRegisterType | FloatRegisterType] = set()
 
-def _live_ins_per_block(
-    block: Block, acc: dict[Block, OrderedSet[SSAValue]]
-) -> OrderedSet[SSAValue]:
-    res = OrderedSet[SSAValue]([])
+        if self.exclude_preallocated:
+            preallocated |= gather_allocated(func)
 
-    for op in reversed(block.ops):
-        # Remove values defined in the block
-        # We are traversing backwards, so cannot use the value removed here again
-        res.difference_update(op.results)
-        # Add values used in the block
-        res.update(op.operands)
+        if self.exclude_snitch_reserved and _uses_snitch_stream(func):
+            preallocated |= get_snitch_reserved()
 
-        # Process inner blocks
-        for region in op.regions:
-            for inner in region.blocks:
-                # Add the values used in the inner block
-                res.update(_live_ins_per_block(inner, acc))
+        for pa_reg in preallocated:
+            self.available_registers.reserve_register(pa_reg)
+            self.available_registers.exclude_register(pa_reg)
+
+        self._spill_slot_count = 0
+        self._stack_pointer = None
+        self._insert_edge_copies(func)
 
-    # Remove the block arguments
-    res.difference_update(block.args)
+        initial_registers = deepcopy(self.available_registers)
+        unspillable: set[SSAValue] = set()
+        while True:
+            self.available_registers = deepcopy(initial_registers)
+            assignment, spilled = self._allocate_intervals(func, unspillable)
+            if not spilled:
+                break
+            for val in spilled:
+                self._spill(func, val, unspillable)
 
-    acc[block] = res
+        for val, reg in assignment.items():
+            if val.type != reg:
+                Rewriter.replace_value_with_new_type(val, reg)
 
-    return res
+        # Remove copies between values allocated to the same register
+        for op in tuple(func.walk()):
+            if isinstance(op, _MOVE_OPS) and op.rs.type == op.rd.type:
+                op.rd.replace_by(op.rs)
+                Rewriter.erase_op(op)
+
+        self._insert_spill_frame(func)
+
+        if add_regalloc_stats:
+            _insert_regalloc_stats(func, preallocated)
 
 
 def live_ins_per_block(block: Block) -> dict[Block, OrderedSet[SSAValue]]:
@@ -432,6 +1059,4 @@ def live_ins_per_block(block: Block) -> dict[Block, OrderedSet[SSAValue]]:
     Returns a mapping from a block to the set of values used in it but defined outside of
     it.
     """
-    res: dict[Block, OrderedSet[SSAValue]] = {}
-    _ = _live_ins_per_block(block, res)
-    return res
+    return uses_from_above_per_block(block)
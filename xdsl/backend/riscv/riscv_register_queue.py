@@ -124,6 +124,17 @@ class RiscvRegisterQueue(RegisterQueue[IntRegisterType | FloatRegisterType]):
         )
         return reg
 
+    def can_pop(
+        self, reg_type: type[IntRegisterType] | type[FloatRegisterType]
+    ) -> bool:
+        """
+        Returns whether a register of the given type is available for allocation,
+        without falling back to an "infinite" register.
+        """
+        if issubclass(reg_type, IntRegisterType):
+            return bool(self.available_int_registers)
+        return bool(self.available_float_registers)
+
     def reserve_register(self, reg: IntRegisterType | FloatRegisterType) -> None:
         """
         Increase the reservation count for a register.
@@ -0,0 +1,353 @@
+"""
+An analytical performance model of the Snitch core, estimating the number of cycles
+taken by the functions in a module of `riscv`, `riscv_snitch` and `snitch_stream`
+operations without running them.
+
+The model schedules each block in order on a single-issue core, stalling operations
+until their operands are ready, and multiplies the cost of loop bodies by their trip
+counts when these are known at compile time. The initiation interval of a loop is
+bounded by the number of instructions in its body, by the latency of its loop-carried
+dependencies, and by the number of elements read from or written to each stream
+register per iteration.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, fields
+from math import prod
+from typing import IO
+
+from xdsl.dialects import riscv, riscv_func, riscv_scf, riscv_snitch, snitch_stream
+from xdsl.dialects.builtin import IntegerAttr, ModuleOp
+from xdsl.ir import Block, Operation, SSAValue
+
+_FREE_OPS = (
+    riscv.CommentOp,
+    riscv.LabelOp,
+    riscv.DirectiveOp,
+    riscv.GetRegisterOp,
+    riscv.GetFloatRegisterOp,
+    riscv_snitch.ReadOp,
+    riscv_snitch.WriteOp,
+    riscv_snitch.GetStreamOp,
+    riscv_snitch.FrepYieldOp,
+    riscv_scf.YieldOp,
+    riscv_scf.ConditionOp,
+)
+"""Operations that are not issued as instructions."""
+
+_FPU_COMPUTE_OPS = (
+    riscv.RdRsRsFloatOperation,
+    riscv.RdRsRsFloatOperationWithFastMath,
+    riscv.RdRsRsRsFloatOperation,
+    riscv.FSqrtSOp,
+    riscv_snitch.RdRsRsAccumulatingFloatOperationWithFastMath,
+    riscv_snitch.RdRsAccumulatingFloatOperation,
+)
+"""Floating-point operations counted towards the utilization of the FPU."""
+
+_FPU_DIV_OPS = (riscv.FDivSOp, riscv.FDivDOp, riscv.FSqrtSOp)
+_INT_MUL_OPS = (riscv.MulOp, riscv.MulhOp, riscv.MulhsuOp, riscv.MulhuOp)
+_INT_DIV_OPS = (riscv.DivOp, riscv.DivuOp, riscv.RemOp, riscv.RemuOp)
+_LOAD_OPS = (
+    riscv.LbOp,
+    riscv.LbuOp,
+    riscv.LhOp,
+    riscv.LhuOp,
+    riscv.LwOp,
+    riscv.FLwOp,
+    riscv.FLdOp,
+)
+
+
+@dataclass
+class PerformanceEstimate:
+    """Estimated dynamic counts for a piece of code."""
+
+    cycles: int = 0
+    """The number of cycles taken to execute the code."""
+
+    instructions: int = 0
+    """The number of instructions issued, including those repeated by `frep`."""
+
+    fpu_ops: int = 0
+    """The number of floating-point arithmetic operations executed."""
+
+    stall_cycles: int = 0
+    """The number of cycles spent waiting for operands or stream registers."""
+
+    frep_iterations: int = 0
+    """The number of iterations of `frep` loops."""
+
+    stream_elements: int = 0
+    """The number of elements transferred by stream registers."""
+
+    unknown_trip_counts: int = 0
+    """
+    The number of loops executed whose trip count is not known at compile time, and
+    which are counted as executing once.
+    """
+
+    @property
+    def fpu_utilization(self) -> float:
+        """The fraction of cycles in which the FPU executes an arithmetic operation."""
+        return self.fpu_ops / self.cycles if self.cycles else 0.0
+
+    def add_counts(self, other: PerformanceEstimate, times: int = 1) -> None:
+        """Add the counts of `other` repeated `times` times, except for the cycles."""
+        for f in fields(self):
+            if f.name != "cycles":
+                setattr(
+                    self, f.name, getattr(self, f.name) + times * getattr(other, f.name)
+                )
+
+    def to_json(self) -> dict[str, int | float]:
+        res: dict[str, int | float] = {
+            f.name: getattr(self, f.name) for f in fields(self)
+        }
+        res["fpu_utilization"] = round(self.fpu_utilization, 4)
+        return res
+
+
+@dataclass
+class _BlockSchedule:
+    estimate: PerformanceEstimate
+    issue_end: int
+    """The cycle after the last instruction of the block is issued."""
+    ready: dict[SSAValue, int]
+    """The cycle at which each value is available to later instructions."""
+    issue_times: dict[Operation, int]
+
+    @property
+    def drain_end(self) -> int:
+        """The cycle at which all the values computed in the block are available."""
+        return max((self.issue_end, *self.ready.values()))
+
+
+@dataclass(frozen=True)
+class SnitchPerformanceModel:
+    """
+    Latencies of the Snitch integer core and FPU, in cycles, used to estimate the
+    performance of functions.
+    """
+
+    int_latency: int = 1
+    int_mul_latency: int = 3
+    int_div_latency: int = 10
+    load_latency: int = 2
+    fpu_latency: int = 3
+    """The latency of pipelined floating-point arithmetic, such as `fmadd.d`."""
+    fpu_div_latency: int = 12
+    fpu_move_latency: int = 1
+    """The latency of floating-point moves, sign injections and conversions."""
+    loop_overhead: int = 2
+    """The instructions added to each iteration of a `riscv_scf` loop."""
+    stream_setup_per_dimension: int = 2
+    """The configuration writes for the bound and stride of each stream dimension."""
+    stream_setup_per_stream: int = 2
+    """The configuration writes for the pointer and repeat count of each stream."""
+
+    def latency(self, op: Operation) -> int:
+        if isinstance(op, _LOAD_OPS):
+            return self.load_latency
+        if isinstance(op, _INT_MUL_OPS):
+            return self.int_mul_latency
+        if isinstance(op, _INT_DIV_OPS):
+            return self.int_div_latency
+        if isinstance(op, _FPU_DIV_OPS):
+            return self.fpu_div_latency
+        if isinstance(op, _FPU_COMPUTE_OPS):
+            return self.fpu_latency
+        if any(isinstance(r.type, riscv.FloatRegisterType) for r in op.results):
+            return self.fpu_move_latency
+        return self.int_latency
+
+    def estimate_function(self, func: riscv_func.FuncOp) -> PerformanceEstimate:
+        """Estimate the cost of a single call to `func`."""
+        total = PerformanceEstimate()
+        for block in func.body.blocks:
+            schedule = self._schedule_block(block)
+            total.cycles += schedule.drain_end
+            total.add_counts(schedule.estimate)
+        return total
+
+    def estimate_module(self, module: ModuleOp) -> dict[str, PerformanceEstimate]:
+        """Estimate the cost of each function defined in `module`."""
+        return {
+            op.sym_name.data: self.estimate_function(op)
+            for op in module.walk()
+            if isinstance(op, riscv_func.FuncOp) and op.body.blocks
+        }
+
+    def _schedule_block(self, block: Block, start: int = 0) -> _BlockSchedule:
+        estimate = PerformanceEstimate()
+        ready: dict[SSAValue, int] = {}
+        issue_times: dict[Operation, int] = {}
+        t = start
+        for op in block.ops:
+            operands_ready = max((ready.get(v, start) for v in op.operands), default=0)
+            if isinstance(op, _FREE_OPS):
+                issue_times[op] = max(t, operands_ready)
+                for result in op.results:
+                    ready[result] = t
+                continue
+            issue = max(t, operands_ready)
+            estimate.stall_cycles += issue - t
+            issue_times[op] = issue
+            nested = self._estimate_nested(op)
+            if nested is None:
+                t = issue + 1
+                estimate.instructions += 1
+                if isinstance(op, _FPU_COMPUTE_OPS):
+                    estimate.fpu_ops += 1
+                latency = self.latency(op)
+                for result in op.results:
+                    ready[result] = issue + latency
+            else:
+                t = issue + nested.cycles
+                estimate.add_counts(nested)
+                for result in op.results:
+                    ready[result] = t
+        return _BlockSchedule(estimate, t, ready, issue_times)
+
+    def _estimate_nested(self, op: Operation) -> PerformanceEstimate | None:
+        """
+        Return the estimate of an operation with regions, or None for a single
+        instruction.
+        """
+        match op:
+            case riscv_snitch.FRepOperation():
+                trip_count = _constant(op.max_rep)
+                if trip_count is not None:
+                    trip_count += 1
+                estimate = self._estimate_loop(op.body.block, trip_count, overhead=0)
+                estimate.frep_iterations += trip_count or 1
+                return estimate
+            case riscv_scf.ForRofOperation():
+                return self._estimate_loop(
+                    op.body.block, _trip_count(op), overhead=self.loop_overhead
+                )
+            case riscv_scf.WhileOp():
+                estimate = PerformanceEstimate(unknown_trip_counts=1)
+                for region in (op.before_region, op.after_region):
+                    for block in region.blocks:
+                        schedule = self._schedule_block(block)
+                        estimate.cycles += schedule.drain_end + self.loop_overhead
+                        estimate.add_counts(schedule.estimate)
+                return estimate
+            case snitch_stream.StreamingRegionOp():
+                return self._estimate_streaming_region(op)
+            case _:
+                return None
+
+    def _estimate_loop(
+        self,
+        body: Block,
+        trip_count: int | None,
+        overhead: int,
+    ) -> PerformanceEstimate:
+        schedule = self._schedule_block(body)
+        yield_op = body.last_op
+        yielded = yield_op.operands if yield_op is not None else ()
+
+        # The next iteration can only use a loop-carried value once it is computed
+        recurrence = 0
+        carried_args = body.args[len(body.args) - len(yielded) :]
+        for arg, value in zip(carried_args, yielded):
+            uses = [
+                schedule.issue_times[use.operation]
+                for use in arg.uses
+                if use.operation in schedule.issue_times
+            ]
+            if uses and value is not arg:
+                recurrence = max(recurrence, schedule.ready[value] - min(uses))
+
+        # Each stream register transfers one element per cycle
+        stream_bound = max(
+            (
+                sum(1 for use in arg.uses if use.operation.parent_block() is body)
+                for arg in _streams_used_in(body)
+            ),
+            default=0,
+        )
+
+        interval = max(schedule.issue_end, recurrence, stream_bound) + overhead
+        unknown = trip_count is None
+        iterations = 1 if trip_count is None else trip_count
+
+        estimate = PerformanceEstimate(unknown_trip_counts=int(unknown))
+        estimate.add_counts(schedule.estimate, iterations)
+        estimate.stall_cycles += iterations * (interval - overhead - schedule.issue_end)
+        tail = schedule.drain_end - schedule.issue_end
+        # One instruction to set up the loop, and the latency of the last iteration
+        estimate.cycles = 1 + iterations * interval + (tail if iterations else 0)
+        estimate.instructions += 1 + iterations * overhead
+        return estimate
+
+    def _estimate_streaming_region(
+        self, op: snitch_stream.StreamingRegionOp
+    ) -> PerformanceEstimate:
+        streams = len(op.inputs) + len(op.outputs)
+        patterns = tuple(op.stride_patterns)
+        if len(patterns) == 1:
+            patterns = patterns * streams
+
+        setup = 0
+        elements = 0
+        for pattern in patterns:
+            setup += (
+                self.stream_setup_per_dimension * len(pattern.ub)
+                + self.stream_setup_per_stream
+            )
+            elements += prod(bound.data for bound in pattern.ub)
+        # Enabling and disabling the stream registers
+        setup += 2
+
+        schedule = self._schedule_block(op.body.block, setup)
+        estimate = PerformanceEstimate(
+            cycles=schedule.drain_end,
+            instructions=setup,
+            stream_elements=elements,
+        )
+        estimate.add_counts(schedule.estimate)
+        return estimate
+
+
+def _constant(value: SSAValue) -> int | None:
+    if isinstance(op := value.owner, riscv.LiOp) and isinstance(
+        op.immediate, IntegerAttr
+    ):
+        return op.immediate.value.data
+    return None
+
+
+def _trip_count(op: riscv_scf.ForRofOperation) -> int | None:
+    lb, ub, step = _constant(op.lb), _constant(op.ub), _constant(op.step)
+    if lb is None or ub is None or step is None or step <= 0:
+        return None
+    return max(0, -((lb - ub) // step))
+
+
+def _streams_used_in(body: Block) -> set[SSAValue]:
+    return {
+        op.stream
+        for op in body.ops
+        if isinstance(op, riscv_snitch.ReadOp | riscv_snitch.WriteOp)
+    }
+
+
+def print_performance_report(
+    module: ModuleOp,
+    output: IO[str],
+    model: SnitchPerformanceModel | None = None,
+) -> None:
+    """
+    Print the estimated performance of each function in `module` as a JSON object
+    keyed by function name.
+    """
+    if model is None:
+        model = SnitchPerformanceModel()
+    estimates = model.estimate_module(module)
+    report = {name: estimate.to_json() for name, estimate in estimates.items()}
+    print(json.dumps(report, indent=2), file=output)
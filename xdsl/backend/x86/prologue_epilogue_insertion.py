@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+
+from ordered_set import OrderedSet
+
+from xdsl.backend.x86.x86_register_queue import CALLEE_SAVED_REGISTERS
+from xdsl.builder import Builder, InsertPoint
+from xdsl.context import Context
+from xdsl.dialects import builtin, x86, x86_func
+from xdsl.dialects.builtin import IntegerAttr
+from xdsl.dialects.x86.register import GeneralRegisterType
+from xdsl.ir import SSAValue
+from xdsl.passes import ModulePass
+
+STACK_SLOT_SIZE_BYTES = 8
+
+
+@dataclass(frozen=True)
+class X86PrologueEpilogueInsertion(ModulePass):
+    """
+    Pass inserting a prologue and epilogue according to the System V AMD64 ABI.
+    The prologues and epilogues are responsible for saving any callee-saved registers,
+    'rbx', 'rbp' and 'r12' to 'r15', by pushing them onto the stack on entry and popping
+    them in reverse order before each return.
+
+    As the pushes move the stack pointer, accesses to memory relative to the stack
+    pointer passed to the function, such as stack-carried arguments, are offset
+    accordingly.
+
+    This pass should be run late in the pipeline after register allocation.
+    It does not itself require register allocation nor invalidate the result of the
+    register allocator.
+    """
+
+    name = "x86-prologue-epilogue-insertion"
+
+    def _process_function(self, func: x86_func.FuncOp) -> None:
+        # Find all callee-saved registers that are clobbered. We define clobbered as it
+        # being the result of some operation and therefore written to.
+        used_callee_saved_registers = OrderedSet(
+            res.type
+            for op in func.walk()
+            if not isinstance(op, x86.GetRegisterOp)
+            for res in op.results
+            if isinstance(res.type, GeneralRegisterType)
+            if res.type in CALLEE_SAVED_REGISTERS
+        )
+
+        if not used_callee_saved_registers:
+            return
+
+        entry = func.body.blocks[0]
+        entry_sp = next(
+            (arg for arg in entry.args if arg.type == x86.register.RSP), None
+        )
+
+        # Offset accesses to memory relative to the incoming stack pointer, which is
+        # moved by the pushes below
+        if entry_sp is not None:
+            frame_size = STACK_SLOT_SIZE_BYTES * len(used_callee_saved_registers)
+            for use in tuple(entry_sp.uses):
+                offset = use.operation.attributes.get("offset")
+                if isinstance(offset, IntegerAttr):
+                    use.operation.attributes["offset"] = IntegerAttr(
+                        offset.value.data + frame_size, offset.type
+                    )
+
+        # Build the prologue at the beginning of the function.
+        builder = Builder(InsertPoint.at_start(entry))
+        sp: SSAValue
+        if entry_sp is None:
+            sp = builder.insert(x86.GetRegisterOp(x86.register.RSP)).result
+        else:
+            sp = entry_sp
+        for reg in used_callee_saved_registers:
+            reg_op = builder.insert(x86.GetRegisterOp(reg))
+            push_op = builder.insert(
+                x86.R_PushOp(sp, reg_op, rsp_output=x86.register.RSP)
+            )
+            sp = push_op.rsp_output
+
+        # Now build the epilogue right before every return operation.
+        for block in func.body.blocks:
+            ret_op = block.last_op
+            if not isinstance(ret_op, x86_func.RetOp):
+                continue
+
+            builder = Builder(InsertPoint.before(ret_op))
+            block_sp = sp
+            for reg in reversed(used_callee_saved_registers):
+                pop_op = builder.insert(
+                    x86.R_PopOp(block_sp, destination=reg, rsp_output=x86.register.RSP)
+                )
+                block_sp = pop_op.rsp_output
+
+    def apply(self, ctx: Context, op: builtin.ModuleOp) -> None:
+        for func in op.walk():
+            if not isinstance(func, x86_func.FuncOp):
+                continue
+
+            if len(func.body.blocks) == 0:
+                continue
+
+            self._process_function(func)
@@ -0,0 +1,268 @@
+import abc
+from collections.abc import Sequence
+from typing import cast
+
+from xdsl.backend.register_allocatable import HasRegisterConstraints
+from xdsl.backend.register_queue import RegisterQueue
+from xdsl.dialects import x86_func
+from xdsl.dialects.builtin import IntAttr
+from xdsl.dialects.x86.ops import (
+    GetAVXRegisterOp,
+    GetRegisterOp,
+    RR_MovOp,
+    RR_VmovapdOp,
+)
+from xdsl.dialects.x86.register import (
+    RFLAGS,
+    GeneralRegisterType,
+    RFLAGSRegisterType,
+    X86RegisterType,
+    X86VectorRegisterType,
+)
+from xdsl.ir import Attribute, Operation, SSAValue
+from xdsl.rewriter import InsertPoint, Rewriter
+from xdsl.utils.exceptions import DiagnosticException
+
+
+def gather_allocated(func: x86_func.FuncOp) -> set[X86RegisterType]:
+    """Utility method to gather already allocated registers"""
+
+    allocated: set[X86RegisterType] = set()
+
+    for op in func.walk():
+        for param in (*op.operands, *op.results):
+            if (
+                isinstance(param.type, X86RegisterType)
+                and not isinstance(param.type, RFLAGSRegisterType)
+                and param.type.is_allocated
+                and isinstance(param.type.index, IntAttr)
+                and param.type.index.data >= 0
+            ):
+                allocated.add(param.type)
+
+    return allocated
+
+
+class RegisterAllocator(abc.ABC):
+    """
+    Base class for x86 register allocation strategies.
+    """
+
+    @abc.abstractmethod
+    def allocate_func(self, func: x86_func.FuncOp) -> None:
+        raise NotImplementedError()
+
+
+class RegisterAllocatorLivenessBlockNaive(RegisterAllocator):
+    """
+    Allocates the registers of a single-block function by traversing the use-def SSA
+    chain backwards, allocating registers to operands, and freeing the registers of
+    results, as they are not used before their definition.
+
+    The `inouts` register constraints of operations model the two-address form of most
+    x86 instructions, where the destination register is also the first source.
+    When that source is still used after the instruction, it is first copied to a new
+    register, which the instruction then overwrites.
+    The only `rflags` register is allocated to all flag values.
+
+    See the RISC-V allocator of the same name for more details.
+    """
+
+    available_registers: RegisterQueue[X86RegisterType]
+    new_value_by_old_value: dict[SSAValue, SSAValue]
+    processed_ops: set[Operation]
+
+    exclude_preallocated: bool = True
+
+    def __init__(self, available_registers: RegisterQueue[X86RegisterType]) -> None:
+        self.available_registers = available_registers
+        self.new_value_by_old_value = {}
+        self.processed_ops = set()
+
+    def _replace_value_with_new_type(
+        self, val: SSAValue, new_type: Attribute
+    ) -> SSAValue:
+        new_val = Rewriter.replace_value_with_new_type(val, new_type)
+        self.new_value_by_old_value[val] = new_val
+        return new_val
+
+    def _pop(self, reg_type: X86RegisterType) -> X86RegisterType:
+        if isinstance(reg_type, RFLAGSRegisterType):
+            return RFLAGS
+        return self.available_registers.pop(type(reg_type))
+
+    def allocate(self, reg: SSAValue) -> SSAValue | None:
+        """
+        Allocate a register if not already allocated.
+        """
+        if reg in self.new_value_by_old_value:
+            reg = self.new_value_by_old_value[reg]
+        if isinstance(reg.type, X86RegisterType) and not reg.type.is_allocated:
+            return self._replace_value_with_new_type(reg, self._pop(reg.type))
+
+    def allocate_same(self, vals: Sequence[SSAValue]) -> bool:
+        """
+        Allocates the values passed in to the same register.
+        If some of the values are already allocated, they must be allocated to the same
+        register, and unallocated values are then allocated to this register.
+        If the values passed in are already allocated to differing registers, a
+        `DiagnosticException` is raised.
+        """
+        vals = tuple(self.new_value_by_old_value.get(val, val) for val in vals)
+        reg_types = set(val.type for val in vals)
+        assert all(isinstance(reg_type, X86RegisterType) for reg_type in reg_types)
+        reg_types = cast(set[X86RegisterType], reg_types)
+
+        allocated = [reg_type for reg_type in reg_types if reg_type.is_allocated]
+        if len(allocated) > 1:
+            reg_names = sorted(f"{reg_type}" for reg_type in allocated)
+            raise DiagnosticException(
+                f"Cannot allocate registers to the same register {reg_names}"
+            )
+        if not reg_types:
+            return False
+        if allocated:
+            reg_type = allocated[0]
+        else:
+            reg_type = self._pop(next(iter(reg_types)))
+
+        did_allocate = False
+
+        for val in vals:
+            if val.type != reg_type:
+                self._replace_value_with_new_type(val, reg_type)
+                did_allocate = True
+
+        return did_allocate
+
+    def _free(self, reg: SSAValue) -> None:
+        if reg in self.new_value_by_old_value:
+            reg = self.new_value_by_old_value[reg]
+        if (
+            isinstance(reg.type, X86RegisterType)
+            and not isinstance(reg.type, RFLAGSRegisterType)
+            and reg.type.is_allocated
+        ):
+            self.available_registers.push(reg.type)
+
+    def _is_live_after(
+        self, op: Operation, operand: SSAValue, group: Sequence[SSAValue]
+    ) -> bool:
+        """
+        Whether `operand`, tied to the other values of `group`, is still needed after
+        `op` overwrites its register, either because it is used by a later operation,
+        or because it is already allocated to another register than the group.
+        """
+        if any(
+            use.operation is not op and use.operation in self.processed_ops
+            for use in operand.uses
+        ):
+            return True
+        operand_type = operand.type
+        return (
+            isinstance(operand_type, X86RegisterType)
+            and operand_type.is_allocated
+            and any(
+                isinstance(val.type, X86RegisterType)
+                and val.type.is_allocated
+                and val.type != operand_type
+                for val in group
+            )
+        )
+
+    def _copy_operand(self, op: Operation, operand: SSAValue) -> Operation:
+        """
+        Copy `operand` to a new unallocated register before `op`, and return the copy
+        operation.
+        """
+        operand_type = operand.type
+        if isinstance(operand_type, GeneralRegisterType):
+            dest = GetRegisterOp(GeneralRegisterType.unallocated())
+            copy = RR_MovOp(dest, operand, result=GeneralRegisterType.unallocated())
+        elif isinstance(operand_type, X86VectorRegisterType):
+            dest = GetAVXRegisterOp(type(operand_type).unallocated())
+            copy = RR_VmovapdOp(dest, operand, result=type(operand_type).unallocated())
+        else:
+            raise DiagnosticException(
+                f"Cannot copy value of type {operand_type} to a new register"
+            )
+        Rewriter.insert_op((dest, copy), InsertPoint.before(op))
+        op.operands = [copy.result if val is operand else val for val in op.operands]
+        return copy
+
+    def process_operation(self, op: Operation) -> None:
+        """
+        Allocate registers for one operation.
+        """
+        self.processed_ops.add(op)
+
+        if not isinstance(op, HasRegisterConstraints):
+            # Ignore operations without register constraints
+            return
+
+        ins, outs, inouts = op.get_register_constraints()
+
+        # Tied operands that are still needed after the operation are copied, so that
+        # the operation overwrites the copy instead
+        copies: list[Operation] = []
+        for group in inouts:
+            for operand in group:
+                if (
+                    operand in op.operands
+                    and operand not in op.results
+                    and self._is_live_after(op, operand, group)
+                ):
+                    copies.append(self._copy_operand(op, operand))
+        if copies:
+            ins, outs, inouts = op.get_register_constraints()
+
+        # Allocate registers to inout operand groups since they are defined further up
+        # in the use-def SSA chain
+        for operand_group in inouts:
+            self.allocate_same(operand_group)
+
+        for result in outs:
+            # Allocate registers to result if not already allocated
+            if (new_result := self.allocate(result)) is not None:
+                result = new_result
+            self._free(result)
+
+        # Allocate registers to operands since they are defined further up
+        # in the use-def SSA chain
+        for operand in ins:
+            self.allocate(operand)
+
+        # The copies are inserted before the operation, which the backwards traversal
+        # of the block has already moved past
+        for copy in copies:
+            self.process_operation(copy)
+            assert copy.prev_op is not None
+            self.process_operation(copy.prev_op)
+
+    def allocate_func(self, func: x86_func.FuncOp) -> None:
+        """
+        Allocates values in function passed in to registers.
+        The whole function must have been lowered to the x86 dialects and it must
+        contain no unrealized casts. Functions with several blocks are not supported,
+        and raise a `DiagnosticException`.
+        """
+        if not func.body.blocks:
+            # External function declaration
+            return
+
+        if len(func.body.blocks) != 1:
+            raise DiagnosticException(
+                f"Cannot register allocate func {func.sym_name.data} with "
+                f"{len(func.body.blocks)} blocks, only single-block functions are "
+                "supported."
+            )
+
+        if self.exclude_preallocated:
+            for pa_reg in gather_allocated(func):
+                self.available_registers.reserve_register(pa_reg)
+                self.available_registers.exclude_register(pa_reg)
+
+        block = func.body.block
+
+        for op in reversed(block.ops):
+            self.process_operation(op)
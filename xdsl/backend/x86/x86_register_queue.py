@@ -0,0 +1,230 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from xdsl.backend.register_queue import RegisterQueue
+from xdsl.dialects.builtin import IntAttr
+from xdsl.dialects.x86 import register
+from xdsl.dialects.x86.register import (
+    GeneralRegisterType,
+    X86RegisterType,
+    X86VectorRegisterType,
+)
+
+GENERAL_REGISTER_BY_INDEX = (
+    register.RAX,
+    register.RCX,
+    register.RDX,
+    register.RBX,
+    register.RSP,
+    register.RBP,
+    register.RSI,
+    register.RDI,
+    register.R8,
+    register.R9,
+    register.R10,
+    register.R11,
+    register.R12,
+    register.R13,
+    register.R14,
+    register.R15,
+)
+"""
+The 64-bit general registers by index, as the 32-bit registers share their indices.
+"""
+
+CALLEE_SAVED_REGISTERS = (
+    register.RBX,
+    register.RBP,
+    register.R12,
+    register.R13,
+    register.R14,
+    register.R15,
+)
+"""
+Registers that must hold the same values when a function returns, according to the
+System V AMD64 calling convention.
+"""
+
+
+@dataclass
+class X86RegisterQueue(RegisterQueue[X86RegisterType]):
+    """
+    LIFO queue of registers available for allocation.
+
+    The SSE, AVX2 and AVX512 registers alias each other, so they are allocated from a
+    single set of vector registers.
+    """
+
+    DEFAULT_RESERVED_REGISTERS = {
+        register.RSP,
+        register.RBP,
+    }
+
+    DEFAULT_GENERAL_REGISTERS = (
+        register.R15,
+        register.R14,
+        register.R13,
+        register.R12,
+        register.RBX,
+        register.RAX,
+        register.RDI,
+        register.RSI,
+        register.RDX,
+        register.RCX,
+        register.R8,
+        register.R9,
+        register.R10,
+        register.R11,
+    )
+    """
+    Caller-saved registers are popped first, so that callee-saved registers, which must
+    be saved in the prologue, are only used when needed.
+    """
+
+    DEFAULT_VECTOR_REGISTERS = tuple(
+        register.AVX2RegisterType.from_index(i) for i in reversed(range(16))
+    )
+
+    _general_idx: int = 0
+    """Next infinite general register index."""
+
+    _vector_idx: int = 0
+    """Next infinite vector register index."""
+
+    reserved_general_registers: defaultdict[int, int] = field(
+        default_factory=lambda: defaultdict[int, int](lambda: 0)
+    )
+    "General registers unavailable to be used by the register allocator."
+
+    reserved_vector_registers: defaultdict[int, int] = field(
+        default_factory=lambda: defaultdict[int, int](lambda: 0)
+    )
+    "Vector registers unavailable to be used by the register allocator."
+
+    available_general_registers: list[int] = field(default_factory=list)
+    "Registers that general values can be allocated to in the current context."
+
+    available_vector_registers: list[int] = field(default_factory=list)
+    "Registers that vector values can be allocated to in the current context."
+
+    @classmethod
+    def default(
+        cls,
+        reserved_registers: Iterable[X86RegisterType] | None = None,
+        available_registers: Iterable[X86RegisterType] | None = None,
+    ):
+        if reserved_registers is None:
+            reserved_registers = X86RegisterQueue.DEFAULT_RESERVED_REGISTERS
+        if available_registers is None:
+            available_registers = (
+                X86RegisterQueue.DEFAULT_GENERAL_REGISTERS
+                + X86RegisterQueue.DEFAULT_VECTOR_REGISTERS
+            )
+        res = cls()
+        for reg in reserved_registers:
+            res.reserve_register(reg)
+        for reg in available_registers:
+            res.push(reg)
+        return res
+
+    def _registers(
+        self, reg_type: type[X86RegisterType]
+    ) -> tuple[list[int], defaultdict[int, int]]:
+        if issubclass(reg_type, GeneralRegisterType):
+            return self.available_general_registers, self.reserved_general_registers
+        if issubclass(reg_type, X86VectorRegisterType):
+            return self.available_vector_registers, self.reserved_vector_registers
+        raise ValueError(f"Cannot allocate registers of type {reg_type.name}")
+
+    def push(self, reg: X86RegisterType) -> None:
+        """
+        Return a register to be made available for allocation.
+        """
+        if not isinstance(reg.index, IntAttr):
+            raise ValueError("Cannot push an unallocated register")
+
+        available, reserved = self._registers(type(reg))
+        if reg.index.data in reserved:
+            return
+        available.append(reg.index.data)
+
+    def pop(self, reg_type: type[X86RegisterType]) -> X86RegisterType:
+        """
+        Get the next available register for allocation.
+        """
+        available, reserved = self._registers(reg_type)
+
+        if available:
+            index = available.pop()
+            if issubclass(reg_type, GeneralRegisterType):
+                reg = GENERAL_REGISTER_BY_INDEX[index]
+            else:
+                reg = reg_type.from_index(index)
+        elif issubclass(reg_type, GeneralRegisterType):
+            reg = reg_type.infinite_register(self._general_idx)
+            self._general_idx += 1
+        else:
+            reg = reg_type.infinite_register(self._vector_idx)
+            self._vector_idx += 1
+
+        assert isinstance(reg.index, IntAttr)
+        assert reg.index.data not in reserved, (
+            f"Cannot pop a reserved register ({reg.register_name.data}), it must have been reserved while available."
+        )
+        return reg
+
+    def can_pop(self, reg_type: type[X86RegisterType]) -> bool:
+        """
+        Returns whether a register of the given type is available for allocation,
+        without falling back to an "infinite" register.
+        """
+        available, _ = self._registers(reg_type)
+        return bool(available)
+
+    def reserve_register(self, reg: X86RegisterType) -> None:
+        """
+        Increase the reservation count for a register.
+        If the reservation count is greater than 0, a register cannot be pushed back onto
+        the queue.
+        It is invalid to reserve a register that is available, and popping it before
+        unreserving a register will result in an AssertionError.
+        """
+        assert isinstance(reg.index, IntAttr)
+        _, reserved = self._registers(type(reg))
+        reserved[reg.index.data] += 1
+
+    def unreserve_register(self, reg: X86RegisterType) -> None:
+        """
+        Decrease the reservation count for a register. If the reservation count is 0, make
+        the register available for allocation.
+        """
+        assert isinstance(reg.index, IntAttr)
+        _, reserved = self._registers(type(reg))
+        if reg.index.data not in reserved:
+            raise ValueError(f"Cannot unreserve register {reg.register_name}")
+        reserved[reg.index.data] -= 1
+        if not reserved[reg.index.data]:
+            del reserved[reg.index.data]
+
+    def limit_registers(self, limit: int) -> None:
+        """
+        Limits the number of currently available registers to the provided limit.
+        """
+        if limit < 0:
+            raise ValueError(f"Invalid negative limit value {limit}")
+        if limit:
+            self.available_general_registers = self.available_general_registers[-limit:]
+            self.available_vector_registers = self.available_vector_registers[-limit:]
+        else:
+            self.available_general_registers = []
+            self.available_vector_registers = []
+
+    def exclude_register(self, reg: X86RegisterType) -> None:
+        """
+        Removes register from available set, if present.
+        """
+        assert isinstance(reg.index, IntAttr)
+        available, _ = self._registers(type(reg))
+        if reg.index.data in available:
+            available.remove(reg.index.data)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from functools import cache
 
 from xdsl.backend.assembly_printer import AssemblyPrinter, OneLineAssemblyPrintable
 from xdsl.dialects.builtin import StringAttr
@@ -22,6 +23,11 @@ class ARMOperation(IRDLOperation, OneLineAssemblyPrintable, ABC):
     """
 
 
+@cache
+def _instruction_name(op_name: str) -> str:
+    return op_name.split(".")[-1]
+
+
 class ARMInstruction(ARMOperation, ABC):
     """
     Base class for operations that can be a part of x86 assembly printing. Must
@@ -47,7 +53,7 @@ class ARMInstruction(ARMOperation, ABC):
         By default, the name of the instruction is the same as the name of the operation.
         """
 
-        return self.name.split(".")[-1]
+        return _instruction_name(self.name)
 
     def assembly_line(self) -> str | None:
         # default assembly code generator
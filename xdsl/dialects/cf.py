@@ -10,6 +10,7 @@ from xdsl.dialects.builtin import (
     DenseIntOrFPElementsAttr,
     IndexType,
     IndexTypeConstr,
+    IntegerAttr,
     IntegerType,
     SignlessIntegerConstraint,
     StringAttr,
@@ -35,7 +36,12 @@ from xdsl.irdl import (
 from xdsl.parser import Parser
 from xdsl.pattern_rewriter import RewritePattern
 from xdsl.printer import Printer
-from xdsl.traits import HasCanonicalizationPatternsTrait, IsTerminator, Pure
+from xdsl.traits import (
+    BranchOpInterface,
+    HasCanonicalizationPatternsTrait,
+    IsTerminator,
+    Pure,
+)
 from xdsl.utils.exceptions import VerifyException
 
 
@@ -80,6 +86,20 @@ class BranchOpHasCanonicalizationPatterns(HasCanonicalizationPatternsTrait):
         return (SimplifyBrToBlockWithSinglePred(), SimplifyPassThroughBr())
 
 
+class BranchOpBranchInterface(BranchOpInterface):
+    @classmethod
+    def get_successor_operands(cls, op: Operation, index: int) -> Sequence[SSAValue]:
+        assert isinstance(op, BranchOp)
+        return op.arguments
+
+    @classmethod
+    def get_successor_for_operands(
+        cls, op: Operation, operands: Sequence[Attribute | None]
+    ) -> Block | None:
+        assert isinstance(op, BranchOp)
+        return op.successor
+
+
 @irdl_op_definition
 class BranchOp(IRDLOperation):
     """Branch operation"""
@@ -89,7 +109,11 @@ class BranchOp(IRDLOperation):
     arguments = var_operand_def()
     successor = successor_def()
 
-    traits = traits_def(IsTerminator(), BranchOpHasCanonicalizationPatterns())
+    traits = traits_def(
+        IsTerminator(),
+        BranchOpHasCanonicalizationPatterns(),
+        BranchOpBranchInterface(),
+    )
 
     def __init__(self, dest: Block, *ops: Operation | SSAValue):
         super().__init__(operands=[[op for op in ops]], successors=[dest])
@@ -115,6 +139,23 @@ class ConditionalBranchOpHasCanonicalizationPatterns(HasCanonicalizationPatterns
         )
 
 
+class ConditionalBranchOpBranchInterface(BranchOpInterface):
+    @classmethod
+    def get_successor_operands(cls, op: Operation, index: int) -> Sequence[SSAValue]:
+        assert isinstance(op, ConditionalBranchOp)
+        return op.then_arguments if index == 0 else op.else_arguments
+
+    @classmethod
+    def get_successor_for_operands(
+        cls, op: Operation, operands: Sequence[Attribute | None]
+    ) -> Block | None:
+        assert isinstance(op, ConditionalBranchOp)
+        cond = operands[0]
+        if not isinstance(cond, IntegerAttr):
+            return None
+        return op.then_block if cond.value.data else op.else_block
+
+
 @irdl_op_definition
 class ConditionalBranchOp(IRDLOperation):
     """Conditional branch operation"""
@@ -131,7 +172,9 @@ class ConditionalBranchOp(IRDLOperation):
     else_block = successor_def()
 
     traits = traits_def(
-        IsTerminator(), ConditionalBranchOpHasCanonicalizationPatterns()
+        IsTerminator(),
+        ConditionalBranchOpHasCanonicalizationPatterns(),
+        ConditionalBranchOpBranchInterface(),
     )
 
     def __init__(
@@ -174,6 +217,31 @@ class SwitchOpHasCanonicalizationPatterns(HasCanonicalizationPatternsTrait):
         )
 
 
+class SwitchOpBranchInterface(BranchOpInterface):
+    @classmethod
+    def get_successor_operands(cls, op: Operation, index: int) -> Sequence[SSAValue]:
+        assert isinstance(op, SwitchOp)
+        return op.default_operands if index == 0 else op.case_operand[index - 1]
+
+    @classmethod
+    def get_successor_for_operands(
+        cls, op: Operation, operands: Sequence[Attribute | None]
+    ) -> Block | None:
+        assert isinstance(op, SwitchOp)
+        flag = operands[0]
+        if not isinstance(flag, IntegerAttr):
+            return None
+        case_values = () if op.case_values is None else op.case_values.get_attrs()
+        return next(
+            (
+                block
+                for c, block in zip(case_values, op.case_blocks, strict=True)
+                if flag.value.data == c.value.data
+            ),
+            op.default_block,
+        )
+
+
 @irdl_op_definition
 class SwitchOp(IRDLOperation):
     """Switch operation"""
@@ -197,7 +265,12 @@ class SwitchOp(IRDLOperation):
 
     irdl_options = [AttrSizedOperandSegments(as_property=True)]
 
-    traits = traits_def(IsTerminator(), Pure(), SwitchOpHasCanonicalizationPatterns())
+    traits = traits_def(
+        IsTerminator(),
+        Pure(),
+        SwitchOpHasCanonicalizationPatterns(),
+        SwitchOpBranchInterface(),
+    )
 
     def __init__(
         self,
@@ -7,6 +7,7 @@ from typing import Annotated, ClassVar, cast
 from typing_extensions import Self
 
 from xdsl.dialects.builtin import (
+    DYNAMIC_INDEX,
     I64,
     AnyFloatConstr,
     ArrayAttr,
@@ -26,6 +27,7 @@ from xdsl.dialects.builtin import (
     SymbolRefAttr,
     UnitAttr,
     UnrankedMemRefType,
+    i8,
     i32,
     i64,
 )
@@ -908,6 +910,69 @@ class CastOp(IRDLOperation):
         return CastOp.build(operands=[source], result_types=[type])
 
 
+@irdl_op_definition
+class ViewOp(IRDLOperation):
+    """
+    A view of a flat buffer of bytes as a memref of another element type and shape,
+    starting `byte_shift` bytes into the buffer.
+
+    https://mlir.llvm.org/docs/Dialects/MemRef/#memrefview-memrefviewop
+    """
+
+    name = "memref.view"
+
+    source = operand_def(MemRefType)
+    byte_shift = operand_def(IndexType)
+    sizes = var_operand_def(IndexType)
+    result = result_def(MemRefType)
+
+    traits = traits_def(NoMemoryEffect())
+
+    assembly_format = (
+        "$source `[` $byte_shift `]` `[` $sizes `]` attr-dict "
+        "`:` type($source) `to` type($result)"
+    )
+
+    def __init__(
+        self,
+        source: SSAValue | Operation,
+        byte_shift: SSAValue | Operation,
+        sizes: Sequence[SSAValue | Operation],
+        result_type: MemRefType[Attribute],
+    ):
+        super().__init__(
+            operands=[source, byte_shift, sizes], result_types=[result_type]
+        )
+
+    def verify_(self) -> None:
+        source_type = cast(MemRefType[Attribute], self.source.type)
+        result_type = cast(MemRefType[Attribute], self.result.type)
+
+        if (
+            source_type.get_num_dims() != 1
+            or source_type.element_type != i8
+            or not isinstance(source_type.layout, NoneAttr)
+        ):
+            raise VerifyException(
+                "Expected source to be a 1-D memref of i8 with an identity layout, "
+                f"got {source_type}"
+            )
+        if not isinstance(result_type.layout, NoneAttr):
+            raise VerifyException(
+                f"Expected result to have an identity layout, got {result_type}"
+            )
+        if source_type.memory_space != result_type.memory_space:
+            raise VerifyException(
+                "Expected source and result to be in the same memory space"
+            )
+        dynamic_dims = sum(dim == DYNAMIC_INDEX for dim in result_type.get_shape())
+        if dynamic_dims != len(self.sizes):
+            raise VerifyException(
+                f"Expected {dynamic_dims} size operands for {result_type}, got "
+                f"{len(self.sizes)}"
+            )
+
+
 @irdl_op_definition
 class MemorySpaceCastOp(IRDLOperation):
     name = "memref.memory_space_cast"
@@ -1313,6 +1378,7 @@ MemRef = Dialect(
         CastOp,
         MemorySpaceCastOp,
         ReinterpretCastOp,
+        ViewOp,
         DmaStartOp,
         DmaWaitOp,
         RankOp,
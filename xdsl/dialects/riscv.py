@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import Sequence, Set
+from functools import cache
 from io import StringIO
 from itertools import chain
 from typing import IO, Annotated, Generic, Literal, TypeAlias, TypeVar
@@ -69,7 +70,6 @@ from xdsl.traits import (
     Pure,
 )
 from xdsl.utils.exceptions import VerifyException
-from xdsl.utils.hints import isa
 
 
 def is_non_zero(reg: IntRegisterType) -> bool:
@@ -473,7 +473,7 @@ class RISCVInstruction(RISCVAsmOperation, ABC):
         By default, the name of the instruction is the same as the name of the operation.
         """
 
-        return Dialect.split_name(self.name)[1]
+        return _instruction_name(self.name)
 
     def assembly_line(self) -> str | None:
         # default assembly code generator
@@ -485,12 +485,34 @@ class RISCVInstruction(RISCVAsmOperation, ABC):
         )
         return AssemblyPrinter.assembly_line(instruction_name, arg_str, self.comment)
 
+    def machine_code(self, *, compress: bool = False) -> bytes:
+        """
+        The binary encoding of the instruction, which must have allocated registers
+        and must not refer to labels. If `compress` is set, the 16-bit encoding of the
+        C extension is returned when there is one.
+        """
+        from xdsl.backend.riscv.machine_code import instruction_encoding
+
+        return instruction_encoding(self, compress=compress)
+
 
 # region Assembly printing
 
 
+@cache
+def _instruction_name(op_name: str) -> str:
+    return Dialect.split_name(op_name)[1]
+
+
 def _assembly_arg_str(arg: AssemblyInstructionArg) -> str:
-    if isa(arg, IntegerAttr):
+    # Registers are by far the most common arguments, so they are checked first
+    if isinstance(arg, SSAValue):
+        if isinstance(arg.type, IntRegisterType | FloatRegisterType):
+            return arg.type.register_name.data
+        raise ValueError(f"Unexpected register type {arg.type}")
+    elif isinstance(arg, IntRegisterType | FloatRegisterType):
+        return arg.register_name.data
+    elif isinstance(arg, IntegerAttr):
         return f"{arg.value.data}"
     elif isinstance(arg, int):
         return f"{arg}"
@@ -498,19 +520,6 @@ def _assembly_arg_str(arg: AssemblyInstructionArg) -> str:
         return arg.data
     elif isinstance(arg, str):
         return arg
-    elif isinstance(arg, IntRegisterType):
-        return arg.register_name.data
-    elif isinstance(arg, FloatRegisterType):
-        return arg.register_name.data
-    else:
-        if isinstance(arg.type, IntRegisterType):
-            reg = arg.type.register_name.data
-            return reg
-        elif isinstance(arg.type, FloatRegisterType):
-            reg = arg.type.register_name.data
-            return reg
-        else:
-            raise ValueError(f"Unexpected register type {arg.type}")
     assert_never(arg)
 
 
@@ -8,6 +8,7 @@ from typing_extensions import Self
 from xdsl.dialects.builtin import (
     DenseArrayBase,
     IndexType,
+    IntegerAttr,
     IntegerType,
     SignlessIntegerConstraint,
     i64,
@@ -43,6 +44,7 @@ from xdsl.traits import (
     Pure,
     RecursivelySpeculatable,
     RecursiveMemoryEffect,
+    RegionBranchOpInterface,
     SingleBlockImplicitTerminator,
     ensure_terminator,
 )
@@ -168,6 +170,26 @@ class YieldOp(AbstractYieldOperation[Attribute]):
     )
 
 
+class IfOpRegionBranchInterface(RegionBranchOpInterface):
+    @classmethod
+    def get_entry_successor_regions(
+        cls, op: Operation, operands: Sequence[Attribute | None]
+    ) -> Sequence[Region | None]:
+        assert isinstance(op, IfOp)
+        # An empty else region branches back to the operation directly
+        false_successor = op.false_region if op.false_region.blocks else None
+        cond = operands[0]
+        if not isinstance(cond, IntegerAttr):
+            return (op.true_region, false_successor)
+        return (op.true_region,) if cond.value.data else (false_successor,)
+
+    @classmethod
+    def get_region_successors(
+        cls, op: Operation, region: Region
+    ) -> Sequence[Region | None]:
+        return (None,)
+
+
 @irdl_op_definition
 class IfOp(IRDLOperation):
     name = "scf.if"
@@ -182,6 +204,7 @@ class IfOp(IRDLOperation):
         SingleBlockImplicitTerminator(YieldOp),
         RecursiveMemoryEffect(),
         RecursivelySpeculatable(),
+        IfOpRegionBranchInterface(),
     )
 
     def __init__(
@@ -281,6 +304,31 @@ class ForOpHasCanonicalizationPatternsTrait(HasCanonicalizationPatternsTrait):
         return (SimplifyTrivialLoops(), RehoistConstInLoops())
 
 
+class ForOpRegionBranchInterface(RegionBranchOpInterface):
+    @classmethod
+    def get_entry_successor_regions(
+        cls, op: Operation, operands: Sequence[Attribute | None]
+    ) -> Sequence[Region | None]:
+        assert isinstance(op, ForOp)
+        lb, ub = operands[0], operands[1]
+        if isinstance(lb, IntegerAttr) and isinstance(ub, IntegerAttr):
+            return (op.body,) if lb.value.data < ub.value.data else (None,)
+        return (op.body, None)
+
+    @classmethod
+    def get_entry_successor_operands(
+        cls, op: Operation, successor: Region | None
+    ) -> Sequence[SSAValue]:
+        assert isinstance(op, ForOp)
+        return op.iter_args
+
+    @classmethod
+    def get_region_successors(
+        cls, op: Operation, region: Region
+    ) -> Sequence[Region | None]:
+        return (region, None)
+
+
 @irdl_op_definition
 class ForOp(IRDLOperation):
     name = "scf.for"
@@ -301,6 +349,7 @@ class ForOp(IRDLOperation):
         SingleBlockImplicitTerminator(YieldOp),
         ForOpHasCanonicalizationPatternsTrait(),
         RecursiveMemoryEffect(),
+        ForOpRegionBranchInterface(),
     )
 
     def __init__(
@@ -1,6 +1,29 @@
 from xdsl.ir import Dialect
 
 from .ops import (
+    CallOp,
+    DropOp,
+    F32AddOp,
+    F32ConstOp,
+    F32MulOp,
+    F32SubOp,
+    F64AddOp,
+    F64ConstOp,
+    F64MulOp,
+    F64SubOp,
+    I32AddOp,
+    I32ConstOp,
+    I32MulOp,
+    I32SubOp,
+    I64AddOp,
+    I64ConstOp,
+    I64MulOp,
+    I64SubOp,
+    LocalGetOp,
+    LocalSetOp,
+    LocalTeeOp,
+    ReturnOp,
+    WasmFuncOp,
     WasmModuleOp,
 )
 
@@ -8,6 +31,29 @@ Wasm = Dialect(
     "wasm",
     [
         WasmModuleOp,
+        WasmFuncOp,
+        CallOp,
+        DropOp,
+        ReturnOp,
+        LocalGetOp,
+        LocalSetOp,
+        LocalTeeOp,
+        I32ConstOp,
+        I64ConstOp,
+        F32ConstOp,
+        F64ConstOp,
+        I32AddOp,
+        I32SubOp,
+        I32MulOp,
+        I64AddOp,
+        I64SubOp,
+        I64MulOp,
+        F32AddOp,
+        F32SubOp,
+        F32MulOp,
+        F64AddOp,
+        F64SubOp,
+        F64MulOp,
     ],
 )
 """
@@ -1,18 +1,177 @@
 """
 Helpers for encoding modules in the `wasm` dialect to the WebAssembly binary format.
+
+https://webassembly.github.io/spec/core/binary/index.html
 """
 
 import abc
+import struct
+from collections.abc import Iterator
+from contextlib import contextmanager
+from io import BytesIO
 from typing import BinaryIO
 
+from xdsl.dialects.builtin import (
+    Float32Type,
+    Float64Type,
+    FunctionType,
+    IntegerType,
+)
+from xdsl.ir import Attribute
+
+_PADDED_SIZE_WIDTH = 5
+"""The number of bytes of the padded LEB128 encoding of a back-patched u32 size."""
+
+
+class EncodingException(Exception): ...
+
+
+def write_unsigned_leb128(io: BinaryIO, value: int) -> None:
+    """Write `value` in the unsigned LEB128 variable-length encoding."""
+    if value < 0:
+        raise EncodingException(f"Cannot encode negative value {value} as unsigned")
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            io.write(bytes((byte | 0x80,)))
+        else:
+            io.write(bytes((byte,)))
+            return
+
+
+def write_signed_leb128(io: BinaryIO, value: int) -> None:
+    """Write `value` in the signed LEB128 variable-length encoding."""
+    while True:
+        byte = value & 0x7F
+        # Arithmetic shift, so that negative values converge to -1
+        value >>= 7
+        if (value == 0 and not byte & 0x40) or (value == -1 and byte & 0x40):
+            io.write(bytes((byte,)))
+            return
+        io.write(bytes((byte | 0x80,)))
+
+
+def padded_unsigned_leb128(value: int, width: int = _PADDED_SIZE_WIDTH) -> bytes:
+    """
+    The unsigned LEB128 encoding of `value` padded to exactly `width` bytes, which
+    allows writing a placeholder and patching it once the value is known.
+    """
+    if not 0 <= value < 1 << (7 * width):
+        raise EncodingException(f"Cannot encode {value} in {width} LEB128 bytes")
+    res = bytearray()
+    for _ in range(width - 1):
+        res.append((value & 0x7F) | 0x80)
+        value >>= 7
+    res.append(value)
+    return bytes(res)
+
+
+def write_name(io: BinaryIO, name: str) -> None:
+    """Write a UTF-8 name prefixed by its length."""
+    encoded = name.encode()
+    write_unsigned_leb128(io, len(encoded))
+    io.write(encoded)
+
+
+def write_f32(io: BinaryIO, value: float) -> None:
+    io.write(struct.pack("<f", value))
+
+
+def write_f64(io: BinaryIO, value: float) -> None:
+    io.write(struct.pack("<d", value))
+
+
+def value_type_encoding(type: Attribute) -> int:
+    """
+    The byte encoding a WebAssembly number type, represented by the corresponding
+    builtin type.
+    """
+    match type:
+        case IntegerType(width=width) if width.data == 32:
+            return 0x7F
+        case IntegerType(width=width) if width.data == 64:
+            return 0x7E
+        case Float32Type():
+            return 0x7D
+        case Float64Type():
+            return 0x7C
+        case _:
+            raise EncodingException(f"Unsupported WebAssembly value type {type}")
+
+
+def write_result_type(io: BinaryIO, types: tuple[Attribute, ...]) -> None:
+    write_unsigned_leb128(io, len(types))
+    for type in types:
+        io.write(bytes((value_type_encoding(type),)))
+
+
+@contextmanager
+def size_prefixed(io: BinaryIO) -> Iterator[BinaryIO]:
+    """
+    Prefix what is written in the context by its size in bytes.
+
+    On seekable streams, a padded placeholder is written first and patched once the
+    contents are written, so that nothing is buffered. Other streams buffer the
+    contents of the context only.
+    """
+    if io.seekable():
+        start = io.tell()
+        io.write(padded_unsigned_leb128(0))
+        yield io
+        end = io.tell()
+        io.seek(start)
+        io.write(padded_unsigned_leb128(end - start - _PADDED_SIZE_WIDTH))
+        io.seek(end)
+    else:
+        buffer = BytesIO()
+        yield buffer
+        contents = buffer.getbuffer()
+        write_unsigned_leb128(io, len(contents))
+        io.write(contents)
+
+
+@contextmanager
+def section(io: BinaryIO, id: int) -> Iterator[BinaryIO]:
+    """Write a section with the given id, whose contents are written in the context."""
+    io.write(bytes((id,)))
+    with size_prefixed(io) as contents:
+        yield contents
+
 
 class WasmBinaryEncodingContext:
     """
     A class to store the state of encoding.
+
+    The index spaces map function types and function names to their indices in the
+    type and function sections, in the order in which they are defined.
     """
 
+    types: dict[FunctionType, int]
+    """The index of each function type in the type section."""
 
-class EncodingException(Exception): ...
+    funcs: dict[str, int]
+    """The index of each function in the function index space."""
+
+    def __init__(self):
+        self.types = {}
+        self.funcs = {}
+
+    def add_type(self, type: FunctionType) -> int:
+        """Return the index of `type`, adding it to the type section if needed."""
+        return self.types.setdefault(type, len(self.types))
+
+    def add_func(self, name: str) -> int:
+        if name in self.funcs:
+            raise EncodingException(f"Function ${name} is defined more than once")
+        index = len(self.funcs)
+        self.funcs[name] = index
+        return index
+
+    def func_index(self, name: str) -> int:
+        if name not in self.funcs:
+            raise EncodingException(f"Unknown function ${name}")
+        return self.funcs[name]
 
 
 class WasmBinaryEncodable(abc.ABC):
@@ -9,19 +9,57 @@ excerpts from the WebAssembly Specification, which is licensed under the terms
 at the bottom of this file.
 """
 
+from __future__ import annotations
+
+from abc import ABC
+from collections.abc import Sequence
 from io import BytesIO, StringIO
-from typing import BinaryIO
+from typing import BinaryIO, ClassVar
 
 from typing_extensions import Self
 
+from xdsl.dialects.builtin import (
+    I32,
+    I64,
+    ArrayAttr,
+    Float32Type,
+    Float64Type,
+    FloatAttr,
+    FunctionType,
+    IntegerAttr,
+    StringAttr,
+    SymbolRefAttr,
+    i32,
+    i64,
+)
+from xdsl.ir import Attribute, Block, Operation, Region
 from xdsl.irdl import (
     IRDLOperation,
     irdl_op_definition,
+    opt_prop_def,
+    prop_def,
+    region_def,
+    traits_def,
 )
 from xdsl.parser import Parser
 from xdsl.printer import Printer
-
-from .encoding import WasmBinaryEncodable, WasmBinaryEncodingContext
+from xdsl.traits import HasParent, NoTerminator
+from xdsl.utils.exceptions import VerifyException
+
+from .encoding import (
+    EncodingException,
+    WasmBinaryEncodable,
+    WasmBinaryEncodingContext,
+    section,
+    size_prefixed,
+    value_type_encoding,
+    write_f32,
+    write_f64,
+    write_name,
+    write_result_type,
+    write_signed_leb128,
+    write_unsigned_leb128,
+)
 from .wat import WatPrintable, WatPrinter
 
 ##==------------------------------------------------------------------------==##
@@ -41,10 +79,15 @@ class WasmModuleOp(IRDLOperation, WasmBinaryEncodable, WatPrintable):
 
     name = "wasm.module"
 
+    body = region_def()
+
+    traits = traits_def(NoTerminator())
+
     def __init__(
         self,
+        ops: Sequence[Operation] = (),
     ):
-        super().__init__()
+        super().__init__(regions=[Region(Block(ops)) if ops else Region()])
 
     @classmethod
     def parse(cls, parser: Parser) -> Self:
@@ -55,6 +98,10 @@ class WasmModuleOp(IRDLOperation, WasmBinaryEncodable, WatPrintable):
         if attr_dict is not None:
             op.attributes |= attr_dict.data
 
+        region = parser.parse_optional_region()
+        if region is not None:
+            region.move_blocks(op.body)
+
         return op
 
     def print(self, printer: Printer):
@@ -64,6 +111,23 @@ class WasmModuleOp(IRDLOperation, WasmBinaryEncodable, WatPrintable):
             printer.print_string(" attributes ")
             printer.print_attr_dict(attr_dict)
 
+        if self.body.blocks:
+            printer.print_string(" ")
+            printer.print_region(self.body)
+
+    def verify_(self) -> None:
+        if len(self.body.blocks) > 1:
+            raise VerifyException("Expected at most one block in wasm.module")
+
+    @property
+    def funcs(self) -> tuple[WasmFuncOp, ...]:
+        return tuple(
+            op
+            for block in self.body.blocks
+            for op in block.ops
+            if isinstance(op, WasmFuncOp)
+        )
+
     def encode(self, ctx: WasmBinaryEncodingContext, io: BinaryIO) -> None:
         # https://webassembly.github.io/spec/core/binary/modules.html#binary-module
         magic = b"\x00asm"
@@ -71,9 +135,47 @@ class WasmModuleOp(IRDLOperation, WasmBinaryEncodable, WatPrintable):
         io.write(magic)
         io.write(version)
 
+        funcs = self.funcs
+        for func in funcs:
+            ctx.add_func(func.sym_name.data)
+        type_indices = [ctx.add_type(func.function_type) for func in funcs]
+
+        if ctx.types:
+            with section(io, 1) as contents:
+                write_unsigned_leb128(contents, len(ctx.types))
+                for type in ctx.types:
+                    contents.write(b"\x60")
+                    write_result_type(contents, type.inputs.data)
+                    write_result_type(contents, type.outputs.data)
+
+        if funcs:
+            with section(io, 3) as contents:
+                write_unsigned_leb128(contents, len(type_indices))
+                for index in type_indices:
+                    write_unsigned_leb128(contents, index)
+
+        exports = [func for func in funcs if func.export is not None]
+        if exports:
+            with section(io, 7) as contents:
+                write_unsigned_leb128(contents, len(exports))
+                for func in exports:
+                    assert func.export is not None
+                    write_name(contents, func.export.data)
+                    contents.write(b"\x00")
+                    write_unsigned_leb128(contents, ctx.func_index(func.sym_name.data))
+
+        if funcs:
+            with section(io, 10) as contents:
+                write_unsigned_leb128(contents, len(funcs))
+                for func in funcs:
+                    func.encode(ctx, contents)
+
     def print_wat(self, printer: WatPrinter) -> None:
         with printer.in_parens():
             printer.print_string("module")
+            for func in self.funcs:
+                printer.print_string(" ")
+                func.print_wat(printer)
 
     def wasm(self) -> bytes:
         ctx = WasmBinaryEncodingContext()
@@ -90,6 +192,448 @@ class WasmModuleOp(IRDLOperation, WasmBinaryEncodable, WatPrintable):
         return res
 
 
+def _value_type_name(type: Attribute) -> str:
+    # Check that the type is a WebAssembly value type
+    value_type_encoding(type)
+    return str(type)
+
+
+##==------------------------------------------------------------------------==##
+# WebAssembly functions
+##==------------------------------------------------------------------------==##
+
+
+@irdl_op_definition
+class WasmFuncOp(IRDLOperation, WasmBinaryEncodable, WatPrintable):
+    """
+    wasm> The funcs component of a module defines a vector of functions with the
+    following structure: func ::= {type typeidx, locals vec(valtype), body expr}
+
+    The parameters and results of the function are given by its function type, and
+    its body is a sequence of stack instructions.
+    """
+
+    name = "wasm.func"
+
+    sym_name = prop_def(StringAttr)
+    function_type = prop_def(FunctionType)
+    locals = opt_prop_def(ArrayAttr)
+    export = opt_prop_def(StringAttr)
+    """The name the function is exported as, if any."""
+
+    body = region_def("single_block")
+
+    traits = traits_def(NoTerminator(), HasParent(WasmModuleOp))
+
+    def __init__(
+        self,
+        name: str,
+        function_type: FunctionType,
+        body: Region | Sequence[Operation] = (),
+        locals: Sequence[Attribute] = (),
+        export: str | None = None,
+    ):
+        if not isinstance(body, Region):
+            body = Region(Block(body))
+        super().__init__(
+            properties={
+                "sym_name": StringAttr(name),
+                "function_type": function_type,
+                "locals": ArrayAttr(locals) if locals else None,
+                "export": StringAttr(export) if export is not None else None,
+            },
+            regions=[body],
+        )
+
+    @property
+    def local_types(self) -> tuple[Attribute, ...]:
+        return self.locals.data if self.locals is not None else ()
+
+    def verify_(self) -> None:
+        for type in (
+            *self.function_type.inputs,
+            *self.function_type.outputs,
+            *self.local_types,
+        ):
+            try:
+                value_type_encoding(type)
+            except EncodingException as e:
+                raise VerifyException(str(e)) from e
+
+    @classmethod
+    def parse(cls, parser: Parser) -> Self:
+        name = parser.parse_symbol_name().data
+        parser.parse_punctuation(":")
+        function_type = parser.parse_type()
+        if not isinstance(function_type, FunctionType):
+            parser.raise_error("Expected a function type")
+        export = None
+        if parser.parse_optional_keyword("export") is not None:
+            export = parser.parse_str_literal()
+        locals: list[Attribute] = []
+        if parser.parse_optional_keyword("locals") is not None:
+            locals = parser.parse_comma_separated_list(
+                parser.Delimiter.PAREN, parser.parse_type
+            )
+        attr_dict = parser.parse_optional_attr_dict_with_keyword()
+        body = parser.parse_region()
+        if not body.blocks:
+            body.add_block(Block())
+        op = cls(name, function_type, body, locals, export)
+        if attr_dict is not None:
+            op.attributes |= attr_dict.data
+        return op
+
+    def print(self, printer: Printer):
+        printer.print_string(" @")
+        printer.print_identifier_or_string_literal(self.sym_name.data)
+        printer.print_string(" : ")
+        printer.print_attribute(self.function_type)
+        if self.export is not None:
+            printer.print_string(" export ")
+            printer.print_string_literal(self.export.data)
+        if self.locals is not None:
+            printer.print_string(" locals(")
+            printer.print_list(self.locals, printer.print_attribute)
+            printer.print_string(")")
+        printer.print_op_attributes(self.attributes, print_keyword=True)
+        printer.print_string(" ")
+        printer.print_region(self.body)
+
+    def encode(self, ctx: WasmBinaryEncodingContext, io: BinaryIO) -> None:
+        # https://webassembly.github.io/spec/core/binary/modules.html#code-section
+        with size_prefixed(io) as code:
+            # Consecutive locals of the same type are encoded together
+            runs: list[tuple[int, int]] = []
+            for type in self.local_types:
+                encoding = value_type_encoding(type)
+                if runs and runs[-1][1] == encoding:
+                    runs[-1] = (runs[-1][0] + 1, encoding)
+                else:
+                    runs.append((1, encoding))
+            write_unsigned_leb128(code, len(runs))
+            for count, encoding in runs:
+                write_unsigned_leb128(code, count)
+                code.write(bytes((encoding,)))
+
+            for op in self.body.ops:
+                if not isinstance(op, WasmBinaryEncodable):
+                    raise EncodingException(f"Cannot encode {op.name} to WebAssembly")
+                op.encode(ctx, code)
+            # end
+            code.write(b"\x0b")
+
+    def print_wat(self, printer: WatPrinter) -> None:
+        with printer.in_parens():
+            printer.print_string(f"func ${self.sym_name.data}")
+            if self.export is not None:
+                printer.print_string(f' (export "{self.export.data}")')
+            for keyword, types in (
+                ("param", self.function_type.inputs.data),
+                ("result", self.function_type.outputs.data),
+                ("local", self.local_types),
+            ):
+                if types:
+                    names = " ".join(_value_type_name(type) for type in types)
+                    printer.print_string(f" ({keyword} {names})")
+            for op in self.body.ops:
+                if not isinstance(op, WatPrintable):
+                    raise EncodingException(f"Cannot print {op.name} as wat")
+                printer.print_string(" ")
+                op.print_wat(printer)
+
+
+##==------------------------------------------------------------------------==##
+# WebAssembly instructions
+##==------------------------------------------------------------------------==##
+
+
+class WasmInstructionOp(IRDLOperation, WasmBinaryEncodable, WatPrintable, ABC):
+    """
+    A WebAssembly instruction, operating on the implicit operand stack of the
+    enclosing function.
+    """
+
+    OPCODE: ClassVar[int]
+
+    traits = traits_def(HasParent(WasmFuncOp))
+
+    @property
+    def instruction_name(self) -> str:
+        return self.name.removeprefix("wasm.")
+
+    def encode_immediates(self, ctx: WasmBinaryEncodingContext, io: BinaryIO) -> None:
+        """Write the immediate arguments following the opcode."""
+
+    def encode(self, ctx: WasmBinaryEncodingContext, io: BinaryIO) -> None:
+        io.write(bytes((self.OPCODE,)))
+        self.encode_immediates(ctx, io)
+
+    def print_wat_immediates(self, printer: WatPrinter) -> None:
+        """Print the immediate arguments following the instruction name."""
+
+    def print_wat(self, printer: WatPrinter) -> None:
+        printer.print_string(self.instruction_name)
+        self.print_wat_immediates(printer)
+
+
+class SimpleInstructionOp(WasmInstructionOp, ABC):
+    """An instruction without immediate arguments."""
+
+    assembly_format = "attr-dict"
+
+    def __init__(self):
+        super().__init__()
+
+
+@irdl_op_definition
+class DropOp(SimpleInstructionOp):
+    name = "wasm.drop"
+    OPCODE: ClassVar[int] = 0x1A
+
+
+@irdl_op_definition
+class ReturnOp(SimpleInstructionOp):
+    name = "wasm.return"
+    OPCODE: ClassVar[int] = 0x0F
+
+
+@irdl_op_definition
+class I32AddOp(SimpleInstructionOp):
+    name = "wasm.i32.add"
+    OPCODE: ClassVar[int] = 0x6A
+
+
+@irdl_op_definition
+class I32SubOp(SimpleInstructionOp):
+    name = "wasm.i32.sub"
+    OPCODE: ClassVar[int] = 0x6B
+
+
+@irdl_op_definition
+class I32MulOp(SimpleInstructionOp):
+    name = "wasm.i32.mul"
+    OPCODE: ClassVar[int] = 0x6C
+
+
+@irdl_op_definition
+class I64AddOp(SimpleInstructionOp):
+    name = "wasm.i64.add"
+    OPCODE: ClassVar[int] = 0x7C
+
+
+@irdl_op_definition
+class I64SubOp(SimpleInstructionOp):
+    name = "wasm.i64.sub"
+    OPCODE: ClassVar[int] = 0x7D
+
+
+@irdl_op_definition
+class I64MulOp(SimpleInstructionOp):
+    name = "wasm.i64.mul"
+    OPCODE: ClassVar[int] = 0x7E
+
+
+@irdl_op_definition
+class F32AddOp(SimpleInstructionOp):
+    name = "wasm.f32.add"
+    OPCODE: ClassVar[int] = 0x92
+
+
+@irdl_op_definition
+class F32SubOp(SimpleInstructionOp):
+    name = "wasm.f32.sub"
+    OPCODE: ClassVar[int] = 0x93
+
+
+@irdl_op_definition
+class F32MulOp(SimpleInstructionOp):
+    name = "wasm.f32.mul"
+    OPCODE: ClassVar[int] = 0x94
+
+
+@irdl_op_definition
+class F64AddOp(SimpleInstructionOp):
+    name = "wasm.f64.add"
+    OPCODE: ClassVar[int] = 0xA0
+
+
+@irdl_op_definition
+class F64SubOp(SimpleInstructionOp):
+    name = "wasm.f64.sub"
+    OPCODE: ClassVar[int] = 0xA1
+
+
+@irdl_op_definition
+class F64MulOp(SimpleInstructionOp):
+    name = "wasm.f64.mul"
+    OPCODE: ClassVar[int] = 0xA2
+
+
+class LocalInstructionOp(WasmInstructionOp, ABC):
+    """An instruction accessing a parameter or local of the enclosing function."""
+
+    local_index = prop_def(IntegerAttr[I32])
+
+    def __init__(self, local_index: int | IntegerAttr[I32]):
+        if isinstance(local_index, int):
+            local_index = IntegerAttr(local_index, i32)
+        super().__init__(properties={"local_index": local_index})
+
+    @classmethod
+    def parse(cls, parser: Parser) -> Self:
+        op = cls(parser.parse_integer(allow_boolean=False, allow_negative=False))
+        op.attributes |= parser.parse_optional_attr_dict()
+        return op
+
+    def print(self, printer: Printer):
+        printer.print_string(f" {self.local_index.value.data}")
+        printer.print_op_attributes(self.attributes)
+
+    def encode_immediates(self, ctx: WasmBinaryEncodingContext, io: BinaryIO) -> None:
+        write_unsigned_leb128(io, self.local_index.value.data)
+
+    def print_wat_immediates(self, printer: WatPrinter) -> None:
+        printer.print_string(f" {self.local_index.value.data}")
+
+
+@irdl_op_definition
+class LocalGetOp(LocalInstructionOp):
+    name = "wasm.local.get"
+    OPCODE: ClassVar[int] = 0x20
+
+
+@irdl_op_definition
+class LocalSetOp(LocalInstructionOp):
+    name = "wasm.local.set"
+    OPCODE: ClassVar[int] = 0x21
+
+
+@irdl_op_definition
+class LocalTeeOp(LocalInstructionOp):
+    name = "wasm.local.tee"
+    OPCODE: ClassVar[int] = 0x22
+
+
+class IntegerConstOp(WasmInstructionOp, ABC):
+    VALUE_TYPE: ClassVar[I32 | I64]
+
+    value = prop_def(IntegerAttr)
+
+    def __init__(self, value: int):
+        super().__init__(properties={"value": IntegerAttr(value, self.VALUE_TYPE)})
+
+    @classmethod
+    def parse(cls, parser: Parser) -> Self:
+        op = cls(parser.parse_integer(allow_boolean=False))
+        op.attributes |= parser.parse_optional_attr_dict()
+        return op
+
+    def print(self, printer: Printer):
+        printer.print_string(f" {self.value.value.data}")
+        printer.print_op_attributes(self.attributes)
+
+    def verify_(self) -> None:
+        if self.value.type != self.VALUE_TYPE:
+            raise VerifyException(
+                f"Expected {self.VALUE_TYPE} value, got {self.value.type}"
+            )
+
+    def encode_immediates(self, ctx: WasmBinaryEncodingContext, io: BinaryIO) -> None:
+        # Integers are encoded as signed, regardless of their interpretation
+        width = self.VALUE_TYPE.width.data
+        value = self.value.value.data
+        if value >= 1 << (width - 1):
+            value -= 1 << width
+        write_signed_leb128(io, value)
+
+    def print_wat_immediates(self, printer: WatPrinter) -> None:
+        printer.print_string(f" {self.value.value.data}")
+
+
+@irdl_op_definition
+class I32ConstOp(IntegerConstOp):
+    name = "wasm.i32.const"
+    OPCODE: ClassVar[int] = 0x41
+    VALUE_TYPE: ClassVar[I32] = i32
+
+
+@irdl_op_definition
+class I64ConstOp(IntegerConstOp):
+    name = "wasm.i64.const"
+    OPCODE: ClassVar[int] = 0x42
+    VALUE_TYPE: ClassVar[I64] = i64
+
+
+class FloatConstOp(WasmInstructionOp, ABC):
+    VALUE_TYPE: ClassVar[Float32Type | Float64Type]
+
+    value = prop_def(FloatAttr)
+
+    def __init__(self, value: float):
+        super().__init__(properties={"value": FloatAttr(value, self.VALUE_TYPE)})
+
+    @classmethod
+    def parse(cls, parser: Parser) -> Self:
+        op = cls(float(parser.parse_number()))
+        op.attributes |= parser.parse_optional_attr_dict()
+        return op
+
+    def print(self, printer: Printer):
+        printer.print_string(f" {self.value.value.data!r}")
+        printer.print_op_attributes(self.attributes)
+
+    def verify_(self) -> None:
+        if self.value.type != self.VALUE_TYPE:
+            raise VerifyException(
+                f"Expected {self.VALUE_TYPE} value, got {self.value.type}"
+            )
+
+    def print_wat_immediates(self, printer: WatPrinter) -> None:
+        printer.print_string(f" {self.value.value.data!r}")
+
+
+@irdl_op_definition
+class F32ConstOp(FloatConstOp):
+    name = "wasm.f32.const"
+    OPCODE: ClassVar[int] = 0x43
+    VALUE_TYPE: ClassVar[Float32Type] = Float32Type()
+
+    def encode_immediates(self, ctx: WasmBinaryEncodingContext, io: BinaryIO) -> None:
+        write_f32(io, self.value.value.data)
+
+
+@irdl_op_definition
+class F64ConstOp(FloatConstOp):
+    name = "wasm.f64.const"
+    OPCODE: ClassVar[int] = 0x44
+    VALUE_TYPE: ClassVar[Float64Type] = Float64Type()
+
+    def encode_immediates(self, ctx: WasmBinaryEncodingContext, io: BinaryIO) -> None:
+        write_f64(io, self.value.value.data)
+
+
+@irdl_op_definition
+class CallOp(WasmInstructionOp):
+    name = "wasm.call"
+    OPCODE: ClassVar[int] = 0x10
+
+    callee = prop_def(SymbolRefAttr)
+
+    assembly_format = "$callee attr-dict"
+
+    def __init__(self, callee: str | SymbolRefAttr):
+        if isinstance(callee, str):
+            callee = SymbolRefAttr(callee)
+        super().__init__(properties={"callee": callee})
+
+    def encode_immediates(self, ctx: WasmBinaryEncodingContext, io: BinaryIO) -> None:
+        write_unsigned_leb128(io, ctx.func_index(self.callee.string_value()))
+
+    def print_wat_immediates(self, printer: WatPrinter) -> None:
+        printer.print_string(f" ${self.callee.string_value()}")
+
+
 """
 --- Licensing Terms for the WebAssembly Specification
 --- Only applies to the parts of the documentation specified in the header
@@ -6,7 +6,6 @@ from xdsl.dialects.builtin import IndexType, IntegerAttr, IntegerType
 from xdsl.ir import SSAValue
 from xdsl.parser import Parser
 from xdsl.printer import Printer
-from xdsl.utils.hints import isa
 
 from .attributes import LabelAttr
 from .register import GeneralRegisterType, RFLAGSRegisterType, X86VectorRegisterType
@@ -17,32 +16,26 @@ AssemblyInstructionArg: TypeAlias = (
 
 
 def assembly_arg_str(arg: AssemblyInstructionArg) -> str:
-    if isa(arg, IntegerAttr):
+    # Registers are by far the most common arguments, so they are checked first
+    if isinstance(arg, SSAValue):
+        if isinstance(
+            arg.type, GeneralRegisterType | RFLAGSRegisterType | X86VectorRegisterType
+        ):
+            return arg.type.register_name.data
+        raise ValueError(f"Unexpected register type {arg.type}")
+    elif isinstance(
+        arg, GeneralRegisterType | RFLAGSRegisterType | X86VectorRegisterType
+    ):
+        return arg.register_name.data
+    elif isinstance(arg, IntegerAttr):
         return f"{arg.value.data}"
     elif isinstance(arg, int):
         return f"{arg}"
     elif isinstance(arg, str):
         return arg
-    elif isinstance(arg, GeneralRegisterType):
-        return arg.register_name.data
-    elif isinstance(arg, RFLAGSRegisterType):
-        return arg.register_name.data
-    elif isinstance(arg, X86VectorRegisterType):
-        return arg.register_name.data
     elif isinstance(arg, LabelAttr):
         return arg.data
-    else:
-        if isinstance(arg.type, GeneralRegisterType):
-            reg = arg.type.register_name
-            return reg.data
-        elif isinstance(arg.type, RFLAGSRegisterType):
-            reg = arg.type.register_name
-            return reg.data
-        elif isinstance(arg.type, X86VectorRegisterType):
-            reg = arg.type.register_name
-            return reg.data
-        else:
-            raise ValueError(f"Unexpected register type {arg.type}")
+    raise ValueError(f"Unexpected assembly argument {arg}")
 
 
 def parse_immediate_value(
@@ -2,12 +2,17 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import Sequence, Set
+from functools import cache
 from io import StringIO
 from typing import IO, Generic, TypeVar
 
 from typing_extensions import Self
 
 from xdsl.backend.assembly_printer import AssemblyPrinter, OneLineAssemblyPrintable
+from xdsl.backend.register_allocatable import (
+    HasRegisterConstraints,
+    RegisterConstraints,
+)
 from xdsl.dialects.builtin import (
     IntegerAttr,
     IntegerType,
@@ -64,7 +69,9 @@ R2InvT = TypeVar("R2InvT", bound=X86RegisterType)
 R3InvT = TypeVar("R3InvT", bound=X86RegisterType)
 
 
-class X86AsmOperation(IRDLOperation, OneLineAssemblyPrintable, ABC):
+class X86AsmOperation(
+    HasRegisterConstraints, IRDLOperation, OneLineAssemblyPrintable, ABC
+):
     """
     Base class for operations that can be a part of x86 assembly printing.
     """
@@ -73,6 +80,9 @@ class X86AsmOperation(IRDLOperation, OneLineAssemblyPrintable, ABC):
     def assembly_line(self) -> str | None:
         raise NotImplementedError()
 
+    def get_register_constraints(self) -> RegisterConstraints:
+        return RegisterConstraints(self.operands, self.results, ())
+
 
 class X86CustomFormatOperation(IRDLOperation, ABC):
     @classmethod
@@ -156,6 +166,11 @@ class X86CustomFormatOperation(IRDLOperation, ABC):
         printer.print_operation_type(self)
 
 
+@cache
+def _instruction_name(op_name: str) -> str:
+    return op_name.split(".")[-1]
+
+
 class X86Instruction(X86AsmOperation):
     """
     Base class for operations that can be a part of x86 assembly printing. Must
@@ -181,7 +196,7 @@ class X86Instruction(X86AsmOperation):
         By default, the name of the instruction is the same as the name of the operation.
         """
 
-        return self.name.split(".")[-1]
+        return _instruction_name(self.name)
 
     def assembly_line(self) -> str | None:
         # default assembly code generator
@@ -228,6 +243,9 @@ class R_RR_Operation(
     def assembly_line_args(self) -> tuple[AssemblyInstructionArg | None, ...]:
         return self.r1, self.r2
 
+    def get_register_constraints(self) -> RegisterConstraints:
+        return RegisterConstraints((self.r2,), (), ((self.r1, self.result),))
+
 
 @irdl_op_definition
 class RR_AddOp(R_RR_Operation[GeneralRegisterType, GeneralRegisterType]):
@@ -363,6 +381,11 @@ class R_PushOp(X86Instruction, X86CustomFormatOperation):
     def assembly_line_args(self) -> tuple[AssemblyInstructionArg | None, ...]:
         return (self.source,)
 
+    def get_register_constraints(self) -> RegisterConstraints:
+        return RegisterConstraints(
+            (self.source,), (), ((self.rsp_input, self.rsp_output),)
+        )
+
 
 @irdl_op_definition
 class R_PopOp(X86Instruction, X86CustomFormatOperation):
@@ -400,6 +423,11 @@ class R_PopOp(X86Instruction, X86CustomFormatOperation):
     def assembly_line_args(self) -> tuple[AssemblyInstructionArg | None, ...]:
         return (self.destination,)
 
+    def get_register_constraints(self) -> RegisterConstraints:
+        return RegisterConstraints(
+            (), (self.destination,), ((self.rsp_input, self.rsp_output),)
+        )
+
 
 class R_R_Operation(Generic[R1InvT], X86Instruction, X86CustomFormatOperation, ABC):
     """
@@ -430,6 +458,9 @@ class R_R_Operation(Generic[R1InvT], X86Instruction, X86CustomFormatOperation, A
     def assembly_line_args(self) -> tuple[AssemblyInstructionArg | None, ...]:
         return (self.source,)
 
+    def get_register_constraints(self) -> RegisterConstraints:
+        return RegisterConstraints((), (), ((self.source, self.destination),))
+
 
 @irdl_op_definition
 class R_NegOp(R_R_Operation[GeneralRegisterType]):
@@ -613,6 +644,9 @@ class R_RM_Operation(
         destination = assembly_arg_str(self.r1)
         return (destination, memory_access)
 
+    def get_register_constraints(self) -> RegisterConstraints:
+        return RegisterConstraints((self.r2,), (), ((self.r1, self.result),))
+
     @classmethod
     def custom_parse_attributes(cls, parser: Parser) -> dict[str, Attribute]:
         attributes = dict[str, Attribute]()
@@ -827,6 +861,9 @@ class R_RI_Operation(Generic[R1InvT], X86Instruction, X86CustomFormatOperation,
     def assembly_line_args(self) -> tuple[AssemblyInstructionArg | None, ...]:
         return self.r1, self.immediate
 
+    def get_register_constraints(self) -> RegisterConstraints:
+        return RegisterConstraints((), (), ((self.r1, self.result),))
+
     @classmethod
     def custom_parse_attributes(cls, parser: Parser) -> dict[str, Attribute]:
         attributes = dict[str, Attribute]()
@@ -1374,6 +1411,11 @@ class M_PushOp(X86Instruction, X86CustomFormatOperation):
         memory_access = memory_access_str(self.source, self.offset)
         return (memory_access,)
 
+    def get_register_constraints(self) -> RegisterConstraints:
+        return RegisterConstraints(
+            (self.source,), (), ((self.rsp_input, self.rsp_output),)
+        )
+
     @classmethod
     def custom_parse_attributes(cls, parser: Parser) -> dict[str, Attribute]:
         attributes = dict[str, Attribute]()
@@ -1432,6 +1474,11 @@ class M_PopOp(X86Instruction, X86CustomFormatOperation):
         memory_access = memory_access_str(self.destination, self.offset)
         return (memory_access,)
 
+    def get_register_constraints(self) -> RegisterConstraints:
+        return RegisterConstraints(
+            (self.destination,), (), ((self.rsp_input, self.rsp_output),)
+        )
+
     @classmethod
     def custom_parse_attributes(cls, parser: Parser) -> dict[str, Attribute]:
         attributes = dict[str, Attribute]()
@@ -2633,6 +2680,9 @@ class RRROperation(
     def assembly_line_args(self) -> tuple[AssemblyInstructionArg | None, ...]:
         return self.r1, self.r2, self.r3
 
+    def get_register_constraints(self) -> RegisterConstraints:
+        return RegisterConstraints((self.r2, self.r3), (), ((self.r1, self.result),))
+
 
 @irdl_op_definition
 class RRR_Vfmadd231pdOp(
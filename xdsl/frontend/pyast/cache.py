@@ -0,0 +1,152 @@
+import ast
+import hashlib
+import inspect
+import marshal
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from io import StringIO
+from typing import Any
+
+from xdsl import __version__
+from xdsl.context import Context
+from xdsl.dialects import get_all_dialects
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.ir import TypeAttribute
+from xdsl.parser import Parser
+from xdsl.printer import Printer
+from xdsl.utils.compilation_cache import CompilationCache
+
+
+def _source_hash(value: Any) -> str | None:
+    """A hash of the source of a function or class, if it can be found."""
+    if not (inspect.isfunction(value) or inspect.isclass(value)):
+        return None
+    try:
+        source = inspect.getsource(value).encode()
+    except (OSError, TypeError):
+        # Defined without a source file, such as in `exec`
+        if not inspect.isfunction(value):
+            return None
+        source = marshal.dumps(value.__code__)
+    return hashlib.sha256(source).hexdigest()
+
+
+def _global_fingerprint(value: Any) -> str:
+    """
+    A description of a global that changes when it is redefined, including the hash
+    of the source of functions and classes, which may be redefined under the same
+    qualified name.
+    """
+    module = getattr(value, "__module__", None)
+    qualname = getattr(value, "__qualname__", None)
+    if isinstance(qualname, str):
+        if (source_hash := _source_hash(value)) is not None:
+            return f"{module}.{qualname}#{source_hash}"
+        return f"{module}.{qualname}"
+    if (name := getattr(value, "__name__", None)) is not None:
+        return str(name)
+    return repr(value)
+
+
+def program_key(
+    stmts: Sequence[ast.stmt],
+    globals: dict[str, Any],
+    type_registry: dict[type, type[TypeAttribute]],
+    desymref: bool,
+) -> str:
+    """
+    The cache key of a frontend program, derived from its source, the globals it
+    refers to, the registered types, and the xDSL version.
+    """
+    names = sorted(
+        {
+            node.id
+            for stmt in stmts
+            for node in ast.walk(stmt)
+            if isinstance(node, ast.Name) and node.id in globals
+        }
+    )
+    return CompilationCache.key(
+        (
+            str(__version__),
+            str(desymref),
+            *(ast.dump(stmt) for stmt in stmts),
+            *(f"{name}={_global_fingerprint(globals[name])}" for name in names),
+            *sorted(
+                f"{_global_fingerprint(source_type)}->{ir_type.name}"
+                for source_type, ir_type in type_registry.items()
+            ),
+        )
+    )
+
+
+@dataclass
+class ProgramCache:
+    """
+    A cache of the modules generated from frontend programs, so that programs
+    compiled repeatedly skip code generation entirely.
+
+    The most recently used modules are kept in memory. If `directory` is set, modules
+    are also stored there as MLIR text and shared with other processes.
+    """
+
+    max_entries: int = 128
+    """The maximum number of modules kept in memory."""
+
+    directory: str | None = None
+    """The directory of the on-disk cache, if any."""
+
+    _modules: OrderedDict[str, ModuleOp] = field(
+        default_factory=OrderedDict[str, ModuleOp], init=False, repr=False
+    )
+    _ctx: Context | None = field(default=None, init=False, repr=False)
+
+    def _disk_cache(self) -> CompilationCache | None:
+        if self.directory is None:
+            return None
+        return CompilationCache(self.directory)
+
+    def _parse(self, text: str) -> ModuleOp:
+        if self._ctx is None:
+            self._ctx = Context()
+            for name, dialect in get_all_dialects().items():
+                self._ctx.register_dialect(name, dialect)
+        return Parser(self._ctx, text).parse_module()
+
+    def _remember(self, key: str, module: ModuleOp):
+        self._modules[key] = module
+        self._modules.move_to_end(key)
+        while len(self._modules) > self.max_entries:
+            self._modules.popitem(last=False)
+
+    def get(self, key: str) -> ModuleOp | None:
+        """Return a copy of the module cached for `key`, if any."""
+        if (module := self._modules.get(key)) is not None:
+            self._modules.move_to_end(key)
+            return module.clone()
+
+        if (disk_cache := self._disk_cache()) is None:
+            return None
+        text = StringIO()
+        if not disk_cache.load(key, StringIO(), text):
+            return None
+        module = self._parse(text.getvalue())
+        self._remember(key, module)
+        return module.clone()
+
+    def put(self, key: str, module: ModuleOp):
+        """Cache a copy of `module` for `key`."""
+        self._remember(key, module.clone())
+        if (disk_cache := self._disk_cache()) is not None:
+            text = StringIO()
+            Printer(stream=text).print_op(module)
+            disk_cache.store(key, "", text.getvalue())
+
+    def clear(self):
+        """Remove all modules kept in memory."""
+        self._modules.clear()
+
+
+default_cache = ProgramCache()
+"""The cache shared by all programs unless they are given another one."""
@@ -4,7 +4,7 @@ from xdsl.context import Context
 from xdsl.dialects import builtin
 from xdsl.frontend.pyast import symref
 from xdsl.frontend.pyast.exception import FrontendProgramException
-from xdsl.ir import Block, Operation, Region
+from xdsl.ir import Block, Operation, Region, SSAValue
 from xdsl.passes import ModulePass
 from xdsl.rewriter import Rewriter
 
@@ -95,6 +95,20 @@ from xdsl.rewriter import Rewriter
 # of the block) at most one update (end of the block). This means that using
 # specification of an operation we can promote these symbols outside.
 # TODO: Add op promotion.
+#
+# Within a block, both cases are handled by local value numbering, the first step
+# of "Simple and Efficient SSA Construction" by Braun et al. Walking the block
+# once, we record the value last written to each symbol and replace every read
+# by it. Reads of symbols which were not written yet observe the value from the
+# parent region, so the first of them is kept and becomes the value of the
+# symbol. Writes are kept only if they are the last ones to symbols which are
+# not declared in the block. This takes time linear in the size of the block.
+#
+# Until op promotion is supported, the reads and writes left in nested regions
+# are kept as is. An operation holding them may then read and write their symbols,
+# so the last write to these symbols before the operation is kept, and reads after
+# it observe the symbol again. Symbols used in nested regions are kept even if
+# they are declared in the block.
 
 
 def has_symbol(op: Operation) -> bool:
@@ -114,48 +128,6 @@ def get_symbol(op: Operation) -> str | None:
         return None
 
 
-def get_symbols(block: Block) -> set[str]:
-    """Returns a set of all symbols defined/used in a basic block."""
-    symbols: set[str] = set()
-    for op in block.ops:
-        if has_symbol(op):
-            symbol = get_symbol(op)
-            assert symbol is not None
-            symbols.add(symbol)
-    return symbols
-
-
-def lower_positional_bound(
-    writes: list[symref.UpdateOp], read: symref.FetchOp
-) -> Operation | None:
-    """
-    Returns a nearest write preceeding the `read`. If there is no such write,
-    `None` is returned.
-
-    Pre-condition: list `writes` is sorted based on operation indices.
-    """
-    block = read.parent_block()
-    assert block is not None
-
-    idx = block.get_operation_index(read)
-    low_idx = -1
-    high_idx = len(writes) - 1
-
-    # Binary search to find the right write.
-    while low_idx < high_idx:
-        mid_idx = (high_idx - low_idx + 1) // 2 + low_idx
-        user_idx = block.get_operation_index(writes[mid_idx])
-
-        if user_idx < idx:
-            low_idx = mid_idx
-        else:
-            high_idx = mid_idx - 1
-
-    if low_idx == -1:
-        return None
-    return writes[low_idx]
-
-
 @dataclass
 class Desymrefier:
     """
@@ -222,150 +194,73 @@ class Desymrefier:
         for op in block.ops:
             self.desymrefy(op)
 
-        self.prune_definitions(block)
-        self.prune_uses_without_definitions(block)
-
-        # Ensure that each symbol is read/written at most once.
-        symbols = get_symbols(block)
-        for symbol in symbols:
-            num_reads = sum(
-                isinstance(op, symref.FetchOp)
-                for op in block.ops
-                if get_symbol(op) == symbol
-            )
-            num_writes = sum(
-                isinstance(op, symref.UpdateOp)
-                for op in block.ops
-                if get_symbol(op) == symbol
-            )
-            if num_reads > 1 or num_writes > 1:
-                raise FrontendProgramException(
-                    f"Block {block} not ready for promotion: found {num_reads}"
-                    f" reads and {num_writes} writes."
-                )
-
-    def prune_definitions(self, block: Block):
-        """Removes all symbol definitions and their uses from the block."""
-
-        # Find all symbol definitions in this block. If no definitions
-        # found, terminate.
-        while (
-            len(
-                definitions := [
-                    op for op in block.ops if isinstance(op, symref.DeclareOp)
-                ]
-            )
-            > 0
-        ):
-            # Otherwise, some definitions are still alive.
-            for definition in definitions:
-                symbol = get_symbol(definition)
-
-                # Find all reads and writes for this symbol.
-                reads = [
-                    op
-                    for op in block.ops
-                    if isinstance(op, symref.FetchOp) and get_symbol(op) == symbol
-                ]
-                writes = [
-                    op
-                    for op in block.ops
-                    if isinstance(op, symref.UpdateOp) and get_symbol(op) == symbol
-                ]
-
-                # Symbol is never read, so remove its definition and any writes.
-                if len(reads) == 0:
-                    for write in writes:
-                        Rewriter.erase_op(write)
-                    Rewriter.erase_op(definition)
-                    continue
-
-                # For symbols which are written once, the write dominates all
-                # the uses and therefore can be trivially replaced.
-                if len(writes) == 1:
-                    write = writes[0]
-                    for read in reads:
-                        Rewriter.replace_op(read, [], [write.operands[0]])
-                    Rewriter.erase_op(write)
-                    Rewriter.erase_op(definition)
-                    continue
-
-                # If there are multiple reads and writes, replace every
-                # read with the closest preceding write.
-                for read in reads:
-                    write = lower_positional_bound(writes, read)
-                    if write is not None:
-                        Rewriter.replace_op(read, [], [write.operands[0]])
-
-    def _prune_unused_reads(self, block: Block):
-        def is_unused_read(op: Operation) -> bool:
-            return isinstance(op, symref.FetchOp) and len(op.results[0].uses) == 0
-
-        unused_reads = [op for op in block.ops if is_unused_read(op)]
-        for read in unused_reads:
-            Rewriter.erase_op(read)
-
-    def prune_uses_without_definitions(self, block: Block):
-        """Removes all possible symbol uses in a single block."""
-        prepared_symbols: set[str] = set()
+        self.number_values(block)
 
-        while True:
-            self._prune_unused_reads(block)
-
-            # Find all symbols that are still in use in this block.
-            symbol_worklist: set[str] = {
-                symbol
-                for symbol in get_symbols(block)
-                if symbol not in prepared_symbols
-            }
-            if len(symbol_worklist) == 0:
-                return
-
-            for symbol in symbol_worklist:
-                reads = [
-                    op
-                    for op in block.ops
-                    if isinstance(op, symref.FetchOp) and get_symbol(op) == symbol
-                ]
-                writes = [
-                    op
-                    for op in block.ops
-                    if isinstance(op, symref.UpdateOp) and get_symbol(op) == symbol
-                ]
-                assert len(reads) > 0 or len(writes) > 0
-
-                # There are no reads, so we can only keep the last write to the
-                # symbol.
-                if len(reads) == 0:
-                    for write in writes[:-1]:
-                        Rewriter.erase_op(write)
-                    prepared_symbols.add(symbol)
-                    continue
-
-                # There are no writes, so we can replace all reads with this
-                # symbol.
-                if len(writes) == 0:
-                    for read in reads[1:]:
-                        Rewriter.replace_op(read, [], [reads[0].results[0]])
-                    prepared_symbols.add(symbol)
-                    continue
+    def number_values(self, block: Block):
+        """
+        Replaces the reads of symbols in the block with the values they observe, in
+        a single pass over its operations.
 
-                # sets of reads and writes are disjoint.
-                last_read_idx = block.get_operation_index(reads[-1])
-                first_write_idx = block.get_operation_index(writes[0])
-                if last_read_idx < first_write_idx:
-                    for read in reads[1:]:
-                        Rewriter.replace_op(read, [], [reads[0].results[0]])
-                    for write in writes[:-1]:
-                        Rewriter.erase_op(write)
-                    prepared_symbols.add(symbol)
+        Symbols declared in the block are removed entirely. Any other symbol is left
+        with at most one read, before it is first written, and at most one write,
+        the last one, between the operations whose nested regions use it.
+        """
+        # The symbols read or written in the nested regions of each operation.
+        nested: dict[Operation, set[str]] = {}
+        for op in block.ops:
+            if op.regions:
+                nested[op] = {
+                    symbol
+                    for nested_op in op.walk()
+                    if isinstance(nested_op, symref.FetchOp | symref.UpdateOp)
+                    and (symbol := get_symbol(nested_op)) is not None
+                }
+        declared = {
+            op.sym_name.data for op in block.ops if isinstance(op, symref.DeclareOp)
+        }.difference(*nested.values())
+
+        # The value of each symbol at the current operation.
+        values: dict[str, SSAValue] = {}
+        # The last write to each symbol which is not declared in this block.
+        last_writes: dict[str, symref.UpdateOp] = {}
+        # The reads of symbols which are not declared in this block. These are
+        # kept if used.
+        reads: list[symref.FetchOp] = []
+
+        for op in list(block.ops):
+            if isinstance(op, symref.DeclareOp):
+                if op.sym_name.data in declared:
+                    Rewriter.erase_op(op)
+            elif isinstance(op, symref.FetchOp):
+                symbol = op.symbol.root_reference.data
+                if (value := values.get(symbol)) is not None:
+                    Rewriter.replace_op(op, [], [value])
+                elif symbol in declared:
+                    raise FrontendProgramException(
+                        f"Symbol '{symbol}' is read before it is written."
+                    )
+                else:
+                    values[symbol] = op.value
+                    reads.append(op)
+            elif isinstance(op, symref.UpdateOp):
+                symbol = op.symbol.root_reference.data
+                values[symbol] = op.value
+                if symbol in declared:
+                    Rewriter.erase_op(op)
                     continue
-
-                # Otherwise, replace reads with the closest preceding write.
-                for read in reads:
-                    write = lower_positional_bound(writes, read)
-                    if write is not None:
-                        Rewriter.replace_op(read, [], [write.operands[0]])
+                if (last_write := last_writes.get(symbol)) is not None:
+                    Rewriter.erase_op(last_write)
+                last_writes[symbol] = op
+            elif op in nested:
+                # The operation may read the last write, and write new values.
+                for symbol in nested[op]:
+                    values.pop(symbol, None)
+                    last_writes.pop(symbol, None)
+
+        # Reads are unused if all the writes of their value were overwritten.
+        for read in reads:
+            if not read.value.uses:
+                Rewriter.erase_op(read)
 
 
 class FrontendDesymrefyPass(ModulePass):
@@ -4,6 +4,7 @@ from io import StringIO
 from typing import Any
 
 from xdsl.dialects.builtin import ModuleOp
+from xdsl.frontend.pyast.cache import ProgramCache, default_cache, program_key
 from xdsl.frontend.pyast.code_generation import CodeGeneration
 from xdsl.frontend.pyast.exception import FrontendProgramException
 from xdsl.frontend.pyast.passes.desymref import Desymrefier
@@ -44,6 +45,12 @@ class FrontendProgram:
     file: str | None = field(default=None)
     """Path to the file that contains the program."""
 
+    cache: ProgramCache | None = field(default_factory=lambda: default_cache)
+    """
+    Cache of generated modules, shared by all programs by default. Set to None to
+    always run code generation.
+    """
+
     def register_type(self, source_type: type, ir_type: type[TypeAttribute]) -> None:
         """Associate a type in the source code with its type in the IR."""
         if (type_name := source_type.__name__) in self.type_names:
@@ -70,9 +77,17 @@ Cannot compile program without the code context. Try to use:
         # Both statements and globals msut be initialized from within the
         # `CodeContext`.
         self._check_can_compile()
+        assert self.stmts is not None
         assert self.globals is not None
         assert self.functions_and_blocks is not None
 
+        key = None
+        if self.cache is not None:
+            key = program_key(self.stmts, self.globals, self.type_registry, desymref)
+            if (module := self.cache.get(key)) is not None:
+                self.xdsl_program = module
+                return
+
         type_converter = TypeConverter(
             globals=self.globals,
             _type_names=self.type_names,
@@ -87,6 +102,9 @@ Cannot compile program without the code context. Try to use:
         if desymref:
             self.desymref()
 
+        if key is not None:
+            self.cache.put(key, self.xdsl_program)
+
     def desymref(self) -> None:
         """Desymrefy the generated xDSL."""
         assert self.xdsl_program is not None
@@ -14,7 +14,7 @@ from dataclasses import fields
 from io import StringIO
 from typing import Any, ClassVar
 
-from textual import events, on
+from textual import events, on, work
 from textual.app import App, ComposeResult
 from textual.containers import Horizontal, ScrollableContainer, Vertical
 from textual.reactive import reactive
@@ -30,6 +30,7 @@ from textual.widgets import (
     Tree,
 )
 from textual.widgets.tree import TreeNode
+from textual.worker import get_current_worker
 
 from xdsl.dialects import get_all_dialects
 from xdsl.dialects.builtin import ModuleOp
@@ -248,25 +249,69 @@ class InputApp(App[None]):
         # initialize GUI with specified pass pipeline
         self.pass_pipeline = self.pre_loaded_pass_pipeline
 
-    def compute_available_pass_list(self) -> tuple[AvailablePass, ...]:
+    def update_available_pass_list(self) -> None:
         """
-        When any reactive variable is modified, this function (re-)computes the
-        available_pass_list variable.
+        (Re-)computes the available_pass_list variable when the current module or the
+        condense mode change.
+
+        In condense mode, the passes that change the module are found in a background
+        worker, cancelling any computation started for a previous state.
         """
+        self.workers.cancel_group(self, "condensed_passes")
         match self.current_module:
             case None:
-                return tuple(AvailablePass(p.name, p) for _, p in self.all_passes)
+                self.available_pass_list = tuple(
+                    AvailablePass(p.name, p) for _, p in self.all_passes
+                )
             case Exception():
-                return ()
+                self.available_pass_list = ()
             case ModuleOp():
-                return get_available_pass_list(
-                    self.all_dialects,
-                    self.all_passes,
-                    self.input_text_area.text,
-                    self.pass_pipeline,
-                    self.condense_mode,
-                    individual_rewrite.INDIVIDUAL_REWRITE_PATTERNS_BY_NAME,
-                )
+                if self.condense_mode:
+                    self.find_condensed_passes(
+                        self.input_text_area.text, self.pass_pipeline
+                    )
+                else:
+                    self.available_pass_list = get_available_pass_list(
+                        self.all_dialects,
+                        self.all_passes,
+                        self.input_text_area.text,
+                        self.pass_pipeline,
+                        False,
+                        individual_rewrite.INDIVIDUAL_REWRITE_PATTERNS_BY_NAME,
+                    )
+
+    @work(thread=True, exclusive=True, group="condensed_passes", exit_on_error=False)
+    def find_condensed_passes(
+        self, input_text: str, pass_pipeline: tuple[ModulePass, ...]
+    ) -> None:
+        """
+        Computes the condensed available pass list in a background thread, and sets
+        available_pass_list unless the computation was cancelled in the meantime.
+        """
+        worker = get_current_worker()
+        pass_list = get_available_pass_list(
+            self.all_dialects,
+            self.all_passes,
+            input_text,
+            pass_pipeline,
+            True,
+            individual_rewrite.INDIVIDUAL_REWRITE_PATTERNS_BY_NAME,
+            lambda: worker.is_cancelled,
+        )
+
+        def set_available_pass_list():
+            # Cancellation happens on the main thread, so this check cannot race
+            if not worker.is_cancelled:
+                self.available_pass_list = pass_list
+
+        self.call_from_thread(set_available_pass_list)
+
+    def watch_condense_mode(self) -> None:
+        """
+        Function called when the reactive variable condense_mode changes - updates the
+        available pass list accordingly.
+        """
+        self.update_available_pass_list()
 
     def watch_available_pass_list(
         self,
@@ -532,6 +577,7 @@ class InputApp(App[None]):
 
         self.output_text_area.load_text(output_text)
         self.update_operation_count_diff_tuple()
+        self.update_available_pass_list()
 
     def get_query_string(self) -> str:
         """
@@ -20,9 +20,11 @@ def get_available_pass_list(
     pass_pipeline: tuple[ModulePass, ...],
     condense_mode: bool,
     rewrite_by_names_dict: dict[str, dict[str, RewritePattern]],
+    is_cancelled: Callable[[], bool] | None = None,
 ) -> tuple[AvailablePass, ...]:
     """
     This function returns the available pass list file based on an input text string, pass_pipeline and condense_mode.
+    The condensed pass computation stops early once `is_cancelled` returns `True`.
     """
     ctx = get_new_registered_context(all_dialects)
     parser = Parser(ctx, input_text)
@@ -37,7 +39,7 @@ def get_available_pass_list(
     )
     # merge rewrite passes with "other" pass list
     if condense_mode:
-        pass_list = get_condensed_pass_list(current_module, all_passes)
+        pass_list = get_condensed_pass_list(current_module, all_passes, is_cancelled)
     else:
         pass_list = tuple(AvailablePass(p.name, p) for _, p in all_passes)
     return pass_list + tuple(individual_rewrites)
@@ -1,3 +1,5 @@
+import threading
+from collections import OrderedDict
 from collections.abc import Callable
 from typing import NamedTuple
 
@@ -6,6 +8,7 @@ from xdsl.dialects import builtin, get_all_dialects
 from xdsl.ir import Dialect
 from xdsl.passes import ModulePass, PipelinePass
 from xdsl.transforms.mlir_opt import MLIROptPass
+from xdsl.utils.hashable_module import HashableModule
 
 
 class AvailablePass(NamedTuple):
@@ -44,38 +47,113 @@ def apply_passes_to_module(
     return module
 
 
+class CondensedPassCache:
+    """
+    A bounded cache recording, for recently seen modules, whether each pass changes
+    them.
+
+    Modules are looked up once per condensed pass computation, and the results of
+    individual passes are then found by pass spec.
+    """
+
+    max_modules: int
+    """The maximum number of modules to keep results for."""
+
+    _results: OrderedDict[HashableModule, dict[str, bool]]
+    _lock: threading.Lock
+
+    def __init__(self, max_modules: int = 16):
+        self.max_modules = max_modules
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def results_for(self, module: builtin.ModuleOp) -> dict[str, bool]:
+        """
+        Return the mutable mapping from pass spec to whether the pass changes the
+        module, creating it if the module was not seen recently.
+        """
+        key = HashableModule(module)
+        with self._lock:
+            results = self._results.get(key)
+            if results is None:
+                # The key must not be mutated while it is in the cache
+                results = {}
+                self._results[HashableModule(module.clone())] = results
+                if len(self._results) > self.max_modules:
+                    self._results.popitem(last=False)
+            else:
+                self._results.move_to_end(key)
+            return results
+
+
+CONDENSED_PASS_CACHE = CondensedPassCache()
+"""The cache shared by condensed pass computations by default."""
+
+
 def iter_condensed_passes(
     input: builtin.ModuleOp,
     all_passes: tuple[tuple[str, type[ModulePass]], ...],
+    cache: CondensedPassCache | None = None,
+    is_cancelled: Callable[[], bool] | None = None,
 ):
+    """
+    Yield the passes that change the input, along with the resulting module.
+
+    If a cache is provided, passes already known not to change the input are skipped,
+    and passes known to change it are yielded without a resulting module.
+    Passes that can report whether they changed the module avoid a structural
+    comparison with the input.
+    Iteration stops early once `is_cancelled` returns `True`.
+    """
     ctx = Context(True)
 
     for dialect_name, dialect_factory in get_all_dialects().items():
         ctx.register_dialect(dialect_name, dialect_factory)
 
+    results = None if cache is None else cache.results_for(input)
+
     for _, pass_type in all_passes:
+        if is_cancelled is not None and is_cancelled():
+            return
         if pass_type is MLIROptPass:
             # Always keep MLIROptPass as an option in condensed list
             yield AvailablePass(pass_type.name, pass_type), None
             continue
-        cloned_module = input.clone()
-        cloned_ctx = ctx.clone()
         try:
             pass_instance = pass_type()
-            pass_instance.apply(cloned_ctx, cloned_module)
-            if input.is_structurally_equivalent(cloned_module):
-                continue
         except Exception:
             continue
-        yield AvailablePass(pass_type.name, pass_instance), cloned_module
+        spec = str(pass_instance.pipeline_pass_spec())
+        if results is not None and spec in results:
+            if results[spec]:
+                yield AvailablePass(pass_type.name, pass_instance), None
+            continue
+        cloned_module = input.clone()
+        cloned_ctx = ctx.clone()
+        try:
+            changed = pass_instance.apply_and_check_changed(cloned_ctx, cloned_module)
+            if changed is None:
+                changed = not input.is_structurally_equivalent(cloned_module)
+        except Exception:
+            changed = False
+        if results is not None:
+            results[spec] = changed
+        if changed:
+            yield AvailablePass(pass_type.name, pass_instance), cloned_module
 
 
 def get_condensed_pass_list(
     input: builtin.ModuleOp,
     all_passes: tuple[tuple[str, type[ModulePass]], ...],
+    is_cancelled: Callable[[], bool] | None = None,
 ) -> tuple[AvailablePass, ...]:
     """
     Function that returns the condensed pass list for a given ModuleOp, i.e. the passes that
     change the ModuleOp.
     """
-    return tuple(ap for ap, _ in iter_condensed_passes(input, all_passes))
+    return tuple(
+        ap
+        for ap, _ in iter_condensed_passes(
+            input, all_passes, CONDENSED_PASS_CACHE, is_cancelled
+        )
+    )
@@ -10,6 +10,7 @@ from xdsl.interpreters import (
     memref,
     memref_stream,
     ml_program,
+    mpi,
     pdl,
     printf,
     riscv,
@@ -21,7 +22,9 @@ from xdsl.interpreters import (
     riscv_snitch,
     scf,
     snitch_stream,
+    stencil,
     tensor,
+    vector,
 )
 
 
@@ -35,6 +38,7 @@ def register_implementations(interpreter: Interpreter, ctx: Context):
     interpreter.register_implementations(memref_stream.MemRefStreamFunctions())
     interpreter.register_implementations(memref.MemRefFunctions())
     interpreter.register_implementations(ml_program.MLProgramFunctions())
+    interpreter.register_implementations(mpi.MpiFunctions())
     interpreter.register_implementations(pdl.PDLRewriteFunctions(ctx))
     interpreter.register_implementations(printf.PrintfFunctions())
     interpreter.register_implementations(riscv_cf.RiscvCfFunctions())
@@ -46,4 +50,6 @@ def register_implementations(interpreter: Interpreter, ctx: Context):
     interpreter.register_implementations(riscv.RiscvFunctions())
     interpreter.register_implementations(scf.ScfFunctions())
     interpreter.register_implementations(snitch_stream.SnitchStreamFunctions())
+    interpreter.register_implementations(stencil.StencilFunctions())
     interpreter.register_implementations(tensor.TensorFunctions())
+    interpreter.register_implementations(vector.VectorFunctions())
@@ -1,5 +1,7 @@
+import operator
+from collections.abc import Callable
 from math import copysign, isnan
-from typing import cast
+from typing import Any, cast
 
 from xdsl.dialects import arith
 from xdsl.dialects.builtin import FloatAttr, IntegerAttr
@@ -10,11 +12,53 @@ from xdsl.interpreter import (
     impl,
     register_impls,
 )
+from xdsl.interpreters.shaped_array import ShapedArray
 from xdsl.irdl import base
 from xdsl.utils.exceptions import InterpretationError
 from xdsl.utils.isattr import isattr
 
 
+def _minimumf(lhs: float, rhs: float) -> float:
+    if isnan(lhs) or isnan(rhs):
+        return float("NaN")
+    if lhs == 0 and rhs == 0:
+        if copysign(1.0, lhs) < 0 or copysign(1.0, rhs) < 0:
+            return -0.0
+        else:
+            return 0.0
+    return min(lhs, rhs)
+
+
+def _maximumf(lhs: float, rhs: float) -> float:
+    if isnan(lhs) or isnan(rhs):
+        return float("NaN")
+    if lhs == 0 and rhs == 0:
+        if copysign(1.0, lhs) > 0 or copysign(1.0, rhs) > 0:
+            return 0.0
+        else:
+            return -0.0
+    return max(lhs, rhs)
+
+
+def _remsi(lhs: int, rhs: int) -> int:
+    # The remainder has the sign of the dividend
+    remainder = abs(lhs) % abs(rhs)
+    return remainder if lhs >= 0 else -remainder
+
+
+def _elementwise(f: Callable[..., Any], args: PythonValues) -> Any:
+    """
+    Apply `f` to the operands, or to each of their elements if they are vectors.
+    """
+    if not isinstance(args[0], ShapedArray):
+        return f(*args)
+    vectors = cast(tuple[ShapedArray[Any], ...], args)
+    result = vectors[0].copy()
+    for index in result.indices():
+        result.store(index, f(*(vector.load(index) for vector in vectors)))
+    return result
+
+
 @register_impls
 class ArithFunctions(InterpreterFunctions):
     @impl(arith.ConstantOp)
@@ -31,53 +75,53 @@ class ArithFunctions(InterpreterFunctions):
 
     @impl(arith.SubiOp)
     def run_subi(self, interpreter: Interpreter, op: arith.SubiOp, args: PythonValues):
-        return (args[0] - args[1],)
+        return (_elementwise(operator.sub, args),)
 
     @impl(arith.AddiOp)
     def run_addi(self, interpreter: Interpreter, op: arith.AddiOp, args: PythonValues):
-        return (args[0] + args[1],)
+        return (_elementwise(operator.add, args),)
 
     @impl(arith.MuliOp)
     def run_muli(self, interpreter: Interpreter, op: arith.MuliOp, args: PythonValues):
-        return (args[0] * args[1],)
+        return (_elementwise(operator.mul, args),)
 
     @impl(arith.SubfOp)
     def run_subf(self, interpreter: Interpreter, op: arith.SubfOp, args: PythonValues):
-        return (args[0] - args[1],)
+        return (_elementwise(operator.sub, args),)
 
     @impl(arith.AddfOp)
     def run_addf(self, interpreter: Interpreter, op: arith.AddfOp, args: PythonValues):
-        return (args[0] + args[1],)
+        return (_elementwise(operator.add, args),)
 
     @impl(arith.MulfOp)
     def run_mulf(self, interpreter: Interpreter, op: arith.MulfOp, args: PythonValues):
-        return (args[0] * args[1],)
+        return (_elementwise(operator.mul, args),)
+
+    @impl(arith.DivfOp)
+    def run_divf(self, interpreter: Interpreter, op: arith.DivfOp, args: PythonValues):
+        return (_elementwise(operator.truediv, args),)
+
+    @impl(arith.NegfOp)
+    def run_negf(self, interpreter: Interpreter, op: arith.NegfOp, args: PythonValues):
+        return (_elementwise(operator.neg, args),)
 
     @impl(arith.MinimumfOp)
     def run_minimumf(
         self, interpreter: Interpreter, op: arith.MinimumfOp, args: PythonValues
     ):
-        if isnan(args[0]) or isnan(args[1]):
-            return (float("NaN"),)
-        if args[0] == 0 and args[1] == 0:
-            if copysign(1.0, args[0]) < 0 or copysign(1.0, args[1]) < 0:
-                return (-0.0,)
-            else:
-                return (0.0,)
-        return (min(args[0], args[1]),)
+        return (_elementwise(_minimumf, args),)
 
     @impl(arith.MaximumfOp)
     def run_maximumf(
         self, interpreter: Interpreter, op: arith.MaximumfOp, args: PythonValues
     ):
-        if isnan(args[0]) or isnan(args[1]):
-            return (float("NaN"),)
-        if args[0] == 0 and args[1] == 0:
-            if copysign(1.0, args[0]) > 0 or copysign(1.0, args[1]) > 0:
-                return (0.0,)
-            else:
-                return (-0.0,)
-        return (max(args[0], args[1]),)
+        return (_elementwise(_maximumf, args),)
+
+    @impl(arith.RemSIOp)
+    def run_remsi(
+        self, interpreter: Interpreter, op: arith.RemSIOp, args: PythonValues
+    ):
+        return (_elementwise(_remsi, args),)
 
     @impl(arith.CmpiOp)
     def run_cmpi(self, interpreter: Interpreter, op: arith.CmpiOp, args: PythonValues):
@@ -49,11 +49,11 @@ class LinalgFunctions(InterpreterFunctions):
                 for i, indexing_map in zip(args, indexing_maps, strict=True)
             )
             loop_results = interpreter.run_ssacfg_region(op.body, loop_args, "for_loop")
-            for res, indexing_map in zip(
-                loop_results, output_indexing_maps, strict=True
+            for output, res, indexing_map in zip(
+                outputs, loop_results, output_indexing_maps, strict=True
             ):
                 result_indices = indexing_map.eval(indices, ())
-                outputs[0].store(result_indices, res)
+                output.store(result_indices, res)
 
         return ()
 
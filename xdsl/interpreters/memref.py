@@ -64,6 +64,25 @@ class MemRefFunctions(InterpreterFunctions):
 
         return (value,)
 
+    @impl(memref.ViewOp)
+    def run_view(
+        self, interpreter: Interpreter, op: memref.ViewOp, args: PythonValues
+    ) -> PythonValues:
+        source, byte_shift, *sizes = args
+        source = cast(ShapedArray[Any], source)
+
+        result_type = op.result.type
+        sizes = iter(sizes)
+        shape = [
+            dim if dim != builtin.DYNAMIC_INDEX else next(sizes)
+            for dim in result_type.get_shape()
+        ]
+        xtype = xtype_for_el_type(
+            result_type.get_element_type(), interpreter.index_bitwidth
+        )
+        data_ptr = TypedPtr[Any](source.data_ptr.raw + byte_shift, xtype=xtype)
+        return (ShapedArray(data_ptr, shape),)
+
     @impl(memref.GetGlobalOp)
     def run_get_global(
         self, interpreter: Interpreter, op: memref.GetGlobalOp, args: PythonValues
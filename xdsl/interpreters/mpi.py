@@ -0,0 +1,509 @@
+"""
+Interpreter for the mpi dialect, backed by an in-process simulation of the ranks of
+`MPI_COMM_WORLD`.
+
+Each rank of an `MpiWorld` runs the interpreted program in its own thread, with its own
+`Interpreter`. Messages are copied between the buffers of the ranks, which all live in
+the memory of this process, and the number of point-to-point messages and bytes sent
+between each pair of ranks is recorded:
+
+``` python
+world = MpiWorld(4)
+world.run(module, ctx, "main")
+assert world.message_counts[(0, 1)] == 2
+```
+"""
+
+from __future__ import annotations
+
+import operator
+import threading
+from collections import Counter, deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from xdsl.context import Context
+from xdsl.dialects import mpi
+from xdsl.dialects.builtin import ModuleOp, PackableType
+from xdsl.interpreter import (
+    Interpreter,
+    InterpreterFunctions,
+    PythonValues,
+    impl,
+    register_impls,
+)
+from xdsl.interpreters.builtin import xtype_for_el_type
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.utils.ptr import TypedPtr
+from xdsl.utils.exceptions import InterpretationError
+
+_REDUCTIONS: dict[str, Callable[[Any, Any], Any]] = {
+    "MPI_SUM": operator.add,
+    "MPI_PROD": operator.mul,
+    "MPI_MAX": max,
+    "MPI_MIN": min,
+    "MPI_LAND": lambda a, b: int(bool(a) and bool(b)),
+    "MPI_LOR": lambda a, b: int(bool(a) or bool(b)),
+    "MPI_LXOR": lambda a, b: int(bool(a) != bool(b)),
+    "MPI_BAND": operator.and_,
+    "MPI_BOR": operator.or_,
+    "MPI_BXOR": operator.xor,
+}
+
+
+@dataclass(frozen=True)
+class MpiStatus:
+    """The value of an `MPI_Status`."""
+
+    source: int
+    tag: int
+    error: int = 0
+
+
+@dataclass(eq=False)
+class MpiRequest:
+    """
+    The value of an `MPI_Request`. Sends complete immediately, as messages are
+    buffered, and receives complete once a matching message is delivered.
+    """
+
+    complete: bool = True
+    status: MpiStatus | None = None
+    buffer: TypedPtr[Any] | None = None
+    capacity: int = 0
+
+    def reset(self) -> None:
+        """Turn this request into `MPI_REQUEST_NULL`."""
+        self.complete = True
+        self.status = None
+        self.buffer = None
+        self.capacity = 0
+
+
+def _read_bytes(ptr: TypedPtr[Any], nbytes: int) -> bytes:
+    return bytes(ptr.raw.memory[ptr.raw.offset : ptr.raw.offset + nbytes])
+
+
+def _write_bytes(ptr: TypedPtr[Any], data: bytes) -> None:
+    ptr.raw.memory[ptr.raw.offset : ptr.raw.offset + len(data)] = data
+
+
+class MpiWorld:
+    """
+    The shared state of the simulated ranks of `MPI_COMM_WORLD`: messages sent but not
+    yet received, receives posted but not yet matched, contributions to collective
+    operations, and the communication statistics.
+
+    All state is guarded by a single condition variable. Whenever every running rank
+    is waiting for an event that cannot happen, the ranks fail with a deadlock error
+    instead of hanging.
+    """
+
+    size: int
+    message_counts: Counter[tuple[int, int]]
+    """The number of point-to-point messages sent from each rank to each rank."""
+    byte_counts: Counter[tuple[int, int]]
+    """The number of bytes of the point-to-point messages from each rank to each rank."""
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError(f"Expected at least one rank, got {size}")
+        self.size = size
+        self.message_counts = Counter()
+        self.byte_counts = Counter()
+        self._condition = threading.Condition()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._mailboxes: dict[tuple[int, int, int], deque[bytes]] = {}
+        self._posted: dict[tuple[int, int, int], deque[MpiRequest]] = {}
+        self._contributions: dict[int, tuple[str, Any]] = {}
+        self._collective_results: list[Any] = []
+        self._collective_count = 0
+        self._waiting: dict[int, Callable[[], bool]] = {}
+        self._running = self.size
+        self._error: BaseException | None = None
+
+    def run(
+        self,
+        module: ModuleOp,
+        ctx: Context,
+        name: str = "main",
+        args: Sequence[PythonValues] | None = None,
+    ) -> list[PythonValues]:
+        """
+        Call the function `name` of `module` on each rank, with the arguments
+        `args[rank]`, and return the results of each rank.
+        """
+        from xdsl.interpreters import register_implementations
+
+        if args is not None and len(args) != self.size:
+            raise ValueError(f"Expected arguments for {self.size} ranks")
+        self._reset()
+        results: list[PythonValues] = [()] * self.size
+
+        def run_rank(rank: int) -> None:
+            try:
+                interpreter = Interpreter(module)
+                register_implementations(interpreter, ctx)
+                interpreter.register_implementations(
+                    MpiFunctions(self, rank), override=True
+                )
+                results[rank] = interpreter.call_op(
+                    name, args[rank] if args is not None else ()
+                )
+            except BaseException as e:
+                with self._condition:
+                    if self._error is None:
+                        self._error = e
+                    self._condition.notify_all()
+            finally:
+                with self._condition:
+                    self._running -= 1
+                    self._condition.notify_all()
+
+        threads = [
+            threading.Thread(target=run_rank, args=(rank,), name=f"mpi-rank-{rank}")
+            for rank in range(self.size)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+        return results
+
+    def _wait(self, rank: int, ready: Callable[[], bool]) -> None:
+        """Block `rank` until `ready()` holds. Must be called with the lock held."""
+        self._waiting[rank] = ready
+        try:
+            while not ready():
+                if self._error is not None:
+                    raise InterpretationError(
+                        f"Rank {rank} aborted: another rank failed"
+                    )
+                if len(self._waiting) == self._running and not any(
+                    r() for r in self._waiting.values()
+                ):
+                    raise InterpretationError(
+                        f"Deadlock: all {self._running} running ranks are waiting"
+                    )
+                self._condition.wait()
+        finally:
+            del self._waiting[rank]
+
+    def send(self, source: int, dest: int, tag: int, data: bytes) -> None:
+        if not 0 <= dest < self.size:
+            raise InterpretationError(
+                f"Invalid destination rank {dest} in a world of size {self.size}"
+            )
+        with self._condition:
+            self.message_counts[(source, dest)] += 1
+            self.byte_counts[(source, dest)] += len(data)
+            key = (source, dest, tag)
+            posted = self._posted.get(key)
+            if posted:
+                self._deliver(posted.popleft(), source, tag, data)
+            else:
+                self._mailboxes.setdefault(key, deque()).append(data)
+            self._condition.notify_all()
+
+    def post_receive(
+        self, dest: int, source: int, tag: int, request: MpiRequest
+    ) -> None:
+        if not 0 <= source < self.size:
+            raise InterpretationError(
+                f"Invalid source rank {source} in a world of size {self.size}"
+            )
+        with self._condition:
+            key = (source, dest, tag)
+            mailbox = self._mailboxes.get(key)
+            if mailbox:
+                self._deliver(request, source, tag, mailbox.popleft())
+            else:
+                request.complete = False
+                self._posted.setdefault(key, deque()).append(request)
+
+    @staticmethod
+    def _deliver(request: MpiRequest, source: int, tag: int, data: bytes) -> None:
+        if len(data) > request.capacity:
+            raise InterpretationError(
+                f"Message of {len(data)} bytes from rank {source} truncated to a "
+                f"buffer of {request.capacity} bytes"
+            )
+        assert request.buffer is not None
+        _write_bytes(request.buffer, data)
+        request.complete = True
+        request.status = MpiStatus(source, tag)
+
+    def wait(self, rank: int, request: MpiRequest) -> None:
+        with self._condition:
+            self._wait(rank, lambda: request.complete)
+
+    def exchange(self, rank: int, kind: str, value: Any) -> list[Any]:
+        """
+        Contribute `value` to the collective operation `kind`, and return the
+        contributions of all ranks once they have all contributed.
+        """
+        with self._condition:
+            count = self._collective_count
+            self._contributions[rank] = (kind, value)
+            if len(self._contributions) == self.size:
+                kinds = {k for k, _ in self._contributions.values()}
+                if len(kinds) != 1:
+                    raise InterpretationError(
+                        f"Mismatched collective operations {sorted(kinds)}"
+                    )
+                self._collective_results = [
+                    self._contributions[r][1] for r in range(self.size)
+                ]
+                self._contributions = {}
+                self._collective_count += 1
+                self._condition.notify_all()
+            else:
+                self._wait(rank, lambda: self._collective_count != count)
+            return self._collective_results
+
+
+@register_impls
+@dataclass
+class MpiFunctions(InterpreterFunctions):
+    """
+    Implementations of the mpi operations for rank `rank` of `world`. By default, the
+    world only has one rank.
+
+    Buffers are the `TypedPtr`s of `ShapedArray`s, as returned by `mpi.unwrap_memref`,
+    and datatypes are the `PackableType`s of their elements.
+    """
+
+    world: MpiWorld = field(default_factory=lambda: MpiWorld(1))
+    rank: int = 0
+
+    def _receive_request(
+        self, buffer: TypedPtr[Any], count: int, datatype: PackableType[Any]
+    ) -> MpiRequest:
+        return MpiRequest(
+            complete=False,
+            buffer=buffer,
+            capacity=count * datatype.compile_time_size,
+        )
+
+    @impl(mpi.InitOp)
+    def run_init(
+        self, interpreter: Interpreter, op: mpi.InitOp, args: PythonValues
+    ) -> PythonValues:
+        return ()
+
+    @impl(mpi.FinalizeOp)
+    def run_finalize(
+        self, interpreter: Interpreter, op: mpi.FinalizeOp, args: PythonValues
+    ) -> PythonValues:
+        return ()
+
+    @impl(mpi.CommRankOp)
+    def run_comm_rank(
+        self, interpreter: Interpreter, op: mpi.CommRankOp, args: PythonValues
+    ) -> PythonValues:
+        return (self.rank,)
+
+    @impl(mpi.CommSizeOp)
+    def run_comm_size(
+        self, interpreter: Interpreter, op: mpi.CommSizeOp, args: PythonValues
+    ) -> PythonValues:
+        return (self.world.size,)
+
+    @impl(mpi.UnwrapMemRefOp)
+    def run_unwrap_memref(
+        self, interpreter: Interpreter, op: mpi.UnwrapMemRefOp, args: PythonValues
+    ) -> PythonValues:
+        (ref,) = args
+        assert isinstance(ref, ShapedArray)
+        return ref.data_ptr, ref.size, ref.element_type
+
+    @impl(mpi.GetDtypeOp)
+    def run_get_dtype(
+        self, interpreter: Interpreter, op: mpi.GetDtypeOp, args: PythonValues
+    ) -> PythonValues:
+        return (xtype_for_el_type(op.dtype, interpreter.index_bitwidth),)
+
+    @impl(mpi.AllocateTypeOp)
+    def run_allocate(
+        self, interpreter: Interpreter, op: mpi.AllocateTypeOp, args: PythonValues
+    ) -> PythonValues:
+        (count,) = args
+        if isinstance(op.dtype, mpi.RequestType):
+            return ([MpiRequest() for _ in range(count)],)
+        return ([None] * count,)
+
+    @impl(mpi.VectorGetOp)
+    def run_vector_get(
+        self, interpreter: Interpreter, op: mpi.VectorGetOp, args: PythonValues
+    ) -> PythonValues:
+        vector, index = args
+        return (vector[index],)
+
+    @impl(mpi.NullRequestOp)
+    def run_request_null(
+        self, interpreter: Interpreter, op: mpi.NullRequestOp, args: PythonValues
+    ) -> PythonValues:
+        (request,) = args
+        request.reset()
+        return ()
+
+    @impl(mpi.SendOp)
+    def run_send(
+        self, interpreter: Interpreter, op: mpi.SendOp, args: PythonValues
+    ) -> PythonValues:
+        buffer, count, datatype, dest, tag = args
+        data = _read_bytes(buffer, count * datatype.compile_time_size)
+        self.world.send(self.rank, dest, tag, data)
+        return ()
+
+    @impl(mpi.IsendOp)
+    def run_isend(
+        self, interpreter: Interpreter, op: mpi.IsendOp, args: PythonValues
+    ) -> PythonValues:
+        buffer, count, datatype, dest, tag, request = args
+        data = _read_bytes(buffer, count * datatype.compile_time_size)
+        self.world.send(self.rank, dest, tag, data)
+        request.reset()
+        request.status = MpiStatus(self.rank, tag)
+        return ()
+
+    @impl(mpi.RecvOp)
+    def run_recv(
+        self, interpreter: Interpreter, op: mpi.RecvOp, args: PythonValues
+    ) -> PythonValues:
+        buffer, count, datatype, source, tag = args
+        request = self._receive_request(buffer, count, datatype)
+        self.world.post_receive(self.rank, source, tag, request)
+        self.world.wait(self.rank, request)
+        return (request.status,) if op.status is not None else ()
+
+    @impl(mpi.IrecvOp)
+    def run_irecv(
+        self, interpreter: Interpreter, op: mpi.IrecvOp, args: PythonValues
+    ) -> PythonValues:
+        buffer, count, datatype, source, tag, request = args
+        request.reset()
+        request.buffer = buffer
+        request.capacity = count * datatype.compile_time_size
+        self.world.post_receive(self.rank, source, tag, request)
+        return ()
+
+    @impl(mpi.TestOp)
+    def run_test(
+        self, interpreter: Interpreter, op: mpi.TestOp, args: PythonValues
+    ) -> PythonValues:
+        (request,) = args
+        return request.complete, request.status
+
+    @impl(mpi.WaitOp)
+    def run_wait(
+        self, interpreter: Interpreter, op: mpi.WaitOp, args: PythonValues
+    ) -> PythonValues:
+        (request,) = args
+        self.world.wait(self.rank, request)
+        return (request.status,) if op.status is not None else ()
+
+    @impl(mpi.WaitallOp)
+    def run_waitall(
+        self, interpreter: Interpreter, op: mpi.WaitallOp, args: PythonValues
+    ) -> PythonValues:
+        requests, count = args
+        for request in requests[:count]:
+            self.world.wait(self.rank, request)
+        if op.statuses is None:
+            return ()
+        return ([request.status for request in requests[:count]],)
+
+    @impl(mpi.GetStatusFieldOp)
+    def run_status_get(
+        self, interpreter: Interpreter, op: mpi.GetStatusFieldOp, args: PythonValues
+    ) -> PythonValues:
+        (status,) = args
+        interpreter.interpreter_assert(status is not None, "Status of a null request")
+        match op.field.data:
+            case mpi.StatusTypeField.MPI_SOURCE.value:
+                return (status.source,)
+            case mpi.StatusTypeField.MPI_TAG.value:
+                return (status.tag,)
+            case mpi.StatusTypeField.MPI_ERROR.value:
+                return (status.error,)
+            case field_name:
+                raise InterpretationError(f"Unknown MPI_Status field {field_name}")
+
+    def _reduce(
+        self,
+        op: mpi.AllreduceOp | mpi.ReduceOp,
+        contributions: Sequence[list[Any]],
+    ) -> list[Any]:
+        name = op.operationtype.op_str.data
+        if name not in _REDUCTIONS:
+            raise InterpretationError(f"Reduction {name} not implemented")
+        function = _REDUCTIONS[name]
+        result = list(contributions[0])
+        for contribution in contributions[1:]:
+            result = [function(a, b) for a, b in zip(result, contribution)]
+        return result
+
+    @impl(mpi.AllreduceOp)
+    def run_allreduce(
+        self, interpreter: Interpreter, op: mpi.AllreduceOp, args: PythonValues
+    ) -> PythonValues:
+        *send_buffer, recv_buffer, count, datatype = args
+        # Without a send buffer, the reduction is in place
+        source = send_buffer[0] if send_buffer else recv_buffer
+        values = TypedPtr(source.raw, xtype=datatype).get_list(count)
+        contributions = self.world.exchange(self.rank, op.name, values)
+        result = TypedPtr(recv_buffer.raw, xtype=datatype)
+        for i, value in enumerate(self._reduce(op, contributions)):
+            result[i] = value
+        return ()
+
+    @impl(mpi.ReduceOp)
+    def run_reduce(
+        self, interpreter: Interpreter, op: mpi.ReduceOp, args: PythonValues
+    ) -> PythonValues:
+        send_buffer, recv_buffer, count, datatype, root = args
+        values = TypedPtr(send_buffer.raw, xtype=datatype).get_list(count)
+        contributions = self.world.exchange(self.rank, f"{op.name} {root}", values)
+        if self.rank == root:
+            result = TypedPtr(recv_buffer.raw, xtype=datatype)
+            for i, value in enumerate(self._reduce(op, contributions)):
+                result[i] = value
+        return ()
+
+    @impl(mpi.BcastOp)
+    def run_bcast(
+        self, interpreter: Interpreter, op: mpi.BcastOp, args: PythonValues
+    ) -> PythonValues:
+        buffer, count, datatype, root = args
+        nbytes = count * datatype.compile_time_size
+        data = _read_bytes(buffer, nbytes) if self.rank == root else None
+        contributions = self.world.exchange(self.rank, f"{op.name} {root}", data)
+        if self.rank != root:
+            _write_bytes(buffer, contributions[root])
+        return ()
+
+    @impl(mpi.GatherOp)
+    def run_gather(
+        self, interpreter: Interpreter, op: mpi.GatherOp, args: PythonValues
+    ) -> PythonValues:
+        send_buffer, send_count, send_type, recv_buffer, recv_count, recv_type, root = (
+            args
+        )
+        data = _read_bytes(send_buffer, send_count * send_type.compile_time_size)
+        contributions = self.world.exchange(self.rank, f"{op.name} {root}", data)
+        if self.rank == root:
+            gathered = b"".join(contributions)
+            capacity = recv_count * recv_type.compile_time_size
+            interpreter.interpreter_assert(
+                len(gathered) <= capacity,
+                f"Gathered {len(gathered)} bytes into a buffer of {capacity} bytes",
+            )
+            _write_bytes(recv_buffer, gathered)
+        return ()
@@ -0,0 +1,803 @@
+"""
+A fast simulator for programs in the `riscv` family of dialects.
+
+Unlike the `RiscvFunctions` interpreter, which executes operations one by one through
+the generic interpreter, the simulator first decodes the module into a flat array of
+instructions, each a Python closure with its register indices and immediates already
+resolved. Registers are stored in Python lists indexed by register number, and memory
+in a single `bytearray`, so that executing an instruction is a single call in a tight
+loop.
+
+The simulator expects registers to be allocated, but supports the "infinite"
+registers of the `unlimited_regs` mode of riscemu. Code and data live in separate
+address spaces: return addresses are indices into the instruction array.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+import sys
+from collections.abc import Callable, Iterable, Sequence
+from typing import IO, Any, cast
+
+from xdsl.dialects import riscv, riscv_cf, riscv_debug, riscv_func, riscv_snitch
+from xdsl.dialects.builtin import IntAttr, IntegerAttr, ModuleOp
+from xdsl.ir import Attribute, Block, Operation, SSAValue
+from xdsl.utils.bitwise_casts import (
+    convert_f32_to_u32,
+    convert_u32_to_f32,
+)
+from xdsl.utils.exceptions import InterpretationError
+
+Instruction = Callable[[int], int]
+"""
+A decoded instruction, taking the index of the instruction and returning the index of
+the next instruction to execute, or a negative value to stop the simulation.
+"""
+
+_XLEN_MASK = 0xFFFF_FFFF
+_SIGN_BIT = 0x8000_0000
+_NUM_REGISTERS = 32
+_EXIT_SYSCALL = 93
+_STOP = -1
+
+_I8 = struct.Struct("<b")
+_U8 = struct.Struct("<B")
+_I16 = struct.Struct("<h")
+_U16 = struct.Struct("<H")
+_I32 = struct.Struct("<i")
+_U32 = struct.Struct("<I")
+_F32 = struct.Struct("<f")
+_F64 = struct.Struct("<d")
+
+
+def _wrap(value: int) -> int:
+    """Truncate an integer to a signed 32-bit value."""
+    return ((value + _SIGN_BIT) & _XLEN_MASK) - _SIGN_BIT
+
+
+def _f32(value: float) -> float:
+    """Round a float to single precision."""
+    return convert_u32_to_f32(convert_f32_to_u32(value))
+
+
+def _div(lhs: int, rhs: int) -> int:
+    if rhs == 0:
+        return -1
+    quotient = abs(lhs) // abs(rhs)
+    return _wrap(-quotient if (lhs < 0) != (rhs < 0) else quotient)
+
+
+def _rem(lhs: int, rhs: int) -> int:
+    if rhs == 0:
+        return lhs
+    return _wrap(lhs - rhs * _div(lhs, rhs))
+
+
+def _divu(lhs: int, rhs: int) -> int:
+    if rhs == 0:
+        return -1
+    return _wrap((lhs & _XLEN_MASK) // (rhs & _XLEN_MASK))
+
+
+def _remu(lhs: int, rhs: int) -> int:
+    if rhs == 0:
+        return lhs
+    return _wrap((lhs & _XLEN_MASK) % (rhs & _XLEN_MASK))
+
+
+def _fcvt_w(value: float) -> int:
+    if math.isnan(value):
+        return _SIGN_BIT - 1
+    if math.isinf(value):
+        return _SIGN_BIT - 1 if value > 0 else -_SIGN_BIT
+    return max(-_SIGN_BIT, min(_SIGN_BIT - 1, round(value)))
+
+
+def _fcvt_wu(value: float) -> int:
+    if math.isnan(value) or value == math.inf:
+        return -1
+    if value == -math.inf:
+        return 0
+    return _wrap(max(0, min(_XLEN_MASK, round(value))))
+
+
+def _fsqrt(value: float) -> float:
+    # The square root of a negative number is the canonical NaN
+    if value < 0:
+        return math.nan
+    return _f32(math.sqrt(value))
+
+
+def _fclass(value: float) -> int:
+    negative = math.copysign(1.0, value) < 0
+    if math.isnan(value):
+        return 1 << 9
+    if math.isinf(value):
+        return 1 << 0 if negative else 1 << 7
+    if value == 0:
+        return 1 << 3 if negative else 1 << 4
+    if abs(value) < 2.0**-126:
+        return 1 << 2 if negative else 1 << 5
+    return 1 << 1 if negative else 1 << 6
+
+
+def _fsgnjx(lhs: float, rhs: float) -> float:
+    return -lhs if math.copysign(1.0, rhs) < 0 else lhs
+
+
+def _packed_f32(fn: Callable[[float, float], float]) -> Callable[[float, float], float]:
+    """
+    Lift a binary operation on floats to two single precision values packed in a
+    double precision register.
+    """
+
+    def packed(lhs: float, rhs: float) -> float:
+        lhs_lo, lhs_hi = struct.unpack("<ff", _F64.pack(lhs))
+        rhs_lo, rhs_hi = struct.unpack("<ff", _F64.pack(rhs))
+        res = struct.pack("<ff", _f32(fn(lhs_lo, rhs_lo)), _f32(fn(lhs_hi, rhs_hi)))
+        return _F64.unpack(res)[0]
+
+    return packed
+
+
+_INT_BINARY: dict[type[Operation], Callable[[int, int], int]] = {
+    riscv.AddOp: lambda a, b: _wrap(a + b),
+    riscv.SubOp: lambda a, b: _wrap(a - b),
+    riscv.SltOp: lambda a, b: int(a < b),
+    riscv.SltuOp: lambda a, b: int((a & _XLEN_MASK) < (b & _XLEN_MASK)),
+    riscv.AndOp: lambda a, b: a & b,
+    riscv.OrOp: lambda a, b: a | b,
+    riscv.XorOp: lambda a, b: a ^ b,
+    riscv.SllOp: lambda a, b: _wrap(a << (b & 31)),
+    riscv.SrlOp: lambda a, b: _wrap((a & _XLEN_MASK) >> (b & 31)),
+    riscv.SraOp: lambda a, b: a >> (b & 31),
+    riscv.MulOp: lambda a, b: _wrap(a * b),
+    riscv.MulhOp: lambda a, b: _wrap((a * b) >> 32),
+    riscv.MulhsuOp: lambda a, b: _wrap((a * (b & _XLEN_MASK)) >> 32),
+    riscv.MulhuOp: lambda a, b: _wrap(((a & _XLEN_MASK) * (b & _XLEN_MASK)) >> 32),
+    riscv.DivOp: _div,
+    riscv.DivuOp: _divu,
+    riscv.RemOp: _rem,
+    riscv.RemuOp: _remu,
+}
+
+_INT_IMMEDIATE: dict[type[Operation], Callable[[int, int], int]] = {
+    riscv.AddiOp: lambda a, imm: _wrap(a + imm),
+    riscv.SltiOp: lambda a, imm: int(a < imm),
+    riscv.SltiuOp: lambda a, imm: int((a & _XLEN_MASK) < (imm & _XLEN_MASK)),
+    riscv.AndiOp: lambda a, imm: a & imm,
+    riscv.OriOp: lambda a, imm: a | imm,
+    riscv.XoriOp: lambda a, imm: a ^ imm,
+    riscv.SlliOp: lambda a, imm: _wrap(a << imm),
+    riscv.SrliOp: lambda a, imm: _wrap((a & _XLEN_MASK) >> imm),
+    riscv.SraiOp: lambda a, imm: a >> imm,
+}
+
+_BRANCH: dict[type[Operation], Callable[[int, int], bool]] = {
+    riscv.BeqOp: lambda a, b: a == b,
+    riscv.BneOp: lambda a, b: a != b,
+    riscv.BltOp: lambda a, b: a < b,
+    riscv.BgeOp: lambda a, b: a >= b,
+    riscv.BltuOp: lambda a, b: (a & _XLEN_MASK) < (b & _XLEN_MASK),
+    riscv.BgeuOp: lambda a, b: (a & _XLEN_MASK) >= (b & _XLEN_MASK),
+    riscv_cf.BeqOp: lambda a, b: a == b,
+    riscv_cf.BneOp: lambda a, b: a != b,
+    riscv_cf.BltOp: lambda a, b: a < b,
+    riscv_cf.BgeOp: lambda a, b: a >= b,
+    riscv_cf.BltuOp: lambda a, b: (a & _XLEN_MASK) < (b & _XLEN_MASK),
+    riscv_cf.BgeuOp: lambda a, b: (a & _XLEN_MASK) >= (b & _XLEN_MASK),
+}
+
+_MOVES: tuple[type[Operation], ...] = (riscv.MVOp, riscv.FMVOp, riscv.FMvDOp)
+
+_UNARY: dict[type[Operation], Callable[..., int | float]] = {
+    riscv.FSqrtSOp: _fsqrt,
+    riscv.FCvtWSOp: _fcvt_w,
+    riscv.FCvtWuSOp: _fcvt_wu,
+    riscv.FMvXWOp: lambda a: _wrap(convert_f32_to_u32(a)),
+    riscv.FClassSOp: _fclass,
+    riscv.FCvtSWOp: lambda a: _f32(float(a)),
+    riscv.FCvtSWuOp: lambda a: _f32(float(a & _XLEN_MASK)),
+    riscv.FMvWXOp: lambda a: convert_u32_to_f32(a & _XLEN_MASK),
+    riscv.FCvtDWOp: lambda a: float(a),
+    riscv.FCvtDWuOp: lambda a: float(a & _XLEN_MASK),
+}
+
+_FLOAT_BINARY: dict[type[Operation], Callable[[float, float], int | float]] = {
+    riscv.FAddSOp: lambda a, b: _f32(a + b),
+    riscv.FSubSOp: lambda a, b: _f32(a - b),
+    riscv.FMulSOp: lambda a, b: _f32(a * b),
+    riscv.FDivSOp: lambda a, b: _f32(a / b),
+    riscv.FSgnJSOp: math.copysign,
+    riscv.FSgnJNSOp: lambda a, b: math.copysign(a, -b),
+    riscv.FSgnJXSOp: _fsgnjx,
+    riscv.FMinSOp: min,
+    riscv.FMaxSOp: max,
+    riscv.FeqSOp: lambda a, b: int(a == b),
+    riscv.FltSOp: lambda a, b: int(a < b),
+    riscv.FleSOp: lambda a, b: int(a <= b),
+    riscv.FAddDOp: lambda a, b: a + b,
+    riscv.FSubDOp: lambda a, b: a - b,
+    riscv.FMulDOp: lambda a, b: a * b,
+    riscv.FDivDOp: lambda a, b: a / b,
+    riscv.FMinDOp: min,
+    riscv.FMaxDOp: max,
+    riscv.VFAddSOp: _packed_f32(lambda a, b: a + b),
+    riscv.VFMulSOp: _packed_f32(lambda a, b: a * b),
+}
+
+_FLOAT_TERNARY: dict[type[Operation], Callable[[float, float, float], float]] = {
+    riscv.FMAddSOp: lambda a, b, c: _f32(a * b + c),
+    riscv.FMSubSOp: lambda a, b, c: _f32(a * b - c),
+    riscv.FNMSubSOp: lambda a, b, c: _f32(-(a * b) + c),
+    riscv.FNMAddSOp: lambda a, b, c: _f32(-(a * b) - c),
+    riscv.FMAddDOp: lambda a, b, c: a * b + c,
+    riscv.FMSubDOp: lambda a, b, c: a * b - c,
+}
+
+_LOADS: dict[type[Operation], struct.Struct] = {
+    riscv.LbOp: _I8,
+    riscv.LbuOp: _U8,
+    riscv.LhOp: _I16,
+    riscv.LhuOp: _U16,
+    riscv.LwOp: _I32,
+    riscv.FLwOp: _F32,
+    riscv.FLdOp: _F64,
+}
+
+_STORES: dict[type[Operation], tuple[struct.Struct, Callable[..., int | float]]] = {
+    riscv.SbOp: (_U8, lambda v: v & 0xFF),
+    riscv.ShOp: (_U16, lambda v: v & 0xFFFF),
+    riscv.SwOp: (_I32, lambda v: v),
+    riscv.FSwOp: (_F32, _f32),
+    riscv.FSdOp: (_F64, lambda v: v),
+}
+
+_LATENCIES: dict[type[Operation], int] = {
+    **{op: 3 for op in (riscv.MulOp, riscv.MulhOp, riscv.MulhsuOp, riscv.MulhuOp)},
+    **{op: 10 for op in (riscv.DivOp, riscv.DivuOp, riscv.RemOp, riscv.RemuOp)},
+    **{op: 2 for op in _LOADS},
+    **{op: 3 for op in _FLOAT_TERNARY},
+    **{
+        op: 3
+        for op in (
+            riscv.FAddSOp,
+            riscv.FSubSOp,
+            riscv.FMulSOp,
+            riscv.FAddDOp,
+            riscv.FSubDOp,
+            riscv.FMulDOp,
+            riscv.VFAddSOp,
+            riscv.VFMulSOp,
+        )
+    },
+    **{op: 10 for op in (riscv.FDivSOp, riscv.FDivDOp, riscv.FSqrtSOp)},
+}
+"""
+Approximate latencies of instructions on a single-issue in-order core, in cycles.
+Instructions not listed take a single cycle.
+"""
+
+_NO_CODE: tuple[type[Operation], ...] = (
+    riscv.CommentOp,
+    riscv.DirectiveOp,
+    riscv.GetRegisterOp,
+    riscv.GetFloatRegisterOp,
+)
+"""Operations that do not correspond to an executed instruction."""
+
+
+class RiscvSimulator:
+    """
+    Simulates a module of register-allocated `riscv` operations.
+
+    Supports the base integer, multiplication, and single and double precision
+    floating point instructions, as well as `riscv_func`, `riscv_cf`,
+    `riscv_debug.printf`, the `print` custom instruction of riscemu, and Snitch `frep`
+    loops.
+    """
+
+    memory: bytearray
+    """The memory of the simulated program, starting with the data section."""
+
+    int_registers: list[int]
+    """The integer registers, `x0` to `x31` followed by the infinite registers."""
+
+    float_registers: list[float]
+    """The float registers, `f0` to `f31` followed by the infinite registers."""
+
+    instruction_count: int
+    """The number of instructions executed."""
+
+    cycle_count: int
+    """The approximate number of cycles taken to execute the instructions."""
+
+    exit_code: int | None
+    """The exit code passed to the exit syscall, if any."""
+
+    file: IO[str] | None
+    """The stream to print to, `sys.stdout` if `None`."""
+
+    labels: dict[str, int]
+    """The index of the instruction following each label or function name."""
+
+    _code: list[Instruction]
+    _latencies: list[int]
+    _entries: list[Operation]
+    _block_pcs: dict[Block, int]
+    _data_labels: dict[str, int]
+    _int_slots: dict[int, int]
+    _float_slots: dict[int, int]
+    _frep_counters: dict[riscv_snitch.FRepOperation, int]
+    _discard_slot: int
+
+    def __init__(
+        self,
+        module: ModuleOp,
+        *,
+        memory_size: int = 1 << 20,
+        file: IO[str] | None = None,
+    ):
+        self.memory = bytearray(memory_size)
+        self.instruction_count = 0
+        self.cycle_count = 0
+        self.exit_code = None
+        self.file = file
+        self.labels = {}
+
+        self._entries = []
+        self._block_pcs = {}
+        self._data_labels = {}
+        self._int_slots = {}
+        self._float_slots = {}
+        self._frep_counters = {}
+
+        self._layout_data(module)
+        self._layout_ops(module.ops)
+
+        # Assign slots to all registers before sizing the register files, so that the
+        # decoded instructions can capture them directly.
+        for entry in self._entries:
+            for value in (*entry.operands, *entry.results):
+                self._register(value)
+            if isinstance(entry, riscv_snitch.FRepOperation):
+                self._frep_counters[entry] = len(self._frep_counters)
+        num_int_registers = _NUM_REGISTERS + len(self._int_slots)
+        self._frep_counters = {
+            op: num_int_registers + counter
+            for op, counter in self._frep_counters.items()
+        }
+        # The last integer slot absorbs writes to the zero register
+        self._discard_slot = num_int_registers + len(self._frep_counters)
+        self.int_registers = [0] * (self._discard_slot + 1)
+        self.float_registers = [0.0] * (_NUM_REGISTERS + len(self._float_slots))
+        self.int_registers[riscv.Registers.SP.index.data] = memory_size
+
+        self._code = [self._decode(entry) for entry in self._entries]
+        self._latencies = [_LATENCIES.get(type(entry), 1) for entry in self._entries]
+
+    def run(self, entry: str = "main") -> int | None:
+        """
+        Run the program from the function or label `entry` until it returns or
+        exits, and return the exit code, if any.
+        """
+        if entry not in self.labels:
+            raise InterpretationError(f"Could not find entry point {entry}")
+
+        code = self._code
+        latencies = self._latencies
+        instruction_count = self.instruction_count
+        cycle_count = self.cycle_count
+        # Returning from the entry point stops the simulation
+        self.int_registers[riscv.Registers.RA.index.data] = _STOP
+        pc = self.labels[entry]
+        try:
+            while pc >= 0:
+                instruction_count += 1
+                cycle_count += latencies[pc]
+                pc = code[pc](pc)
+        except IndexError as e:
+            if pc >= len(code):
+                raise InterpretationError(
+                    "Simulation ran past the end of the program"
+                ) from e
+            raise
+        finally:
+            self.instruction_count = instruction_count
+            self.cycle_count = cycle_count
+        return self.exit_code
+
+    # region Layout
+
+    def _layout_data(self, module: ModuleOp):
+        offset = 0
+        for op in module.walk():
+            if not isinstance(op, riscv.AssemblySectionOp):
+                continue
+            if op.directive.data != ".data" or op.data is None:
+                continue
+            for data_op in op.data.block.ops:
+                if isinstance(data_op, riscv.LabelOp):
+                    self._data_labels[data_op.label.data] = offset
+                    continue
+                if not isinstance(data_op, riscv.DirectiveOp):
+                    continue
+                if data_op.directive.data != ".word" or data_op.value is None:
+                    raise InterpretationError(
+                        f"Cannot simulate data directive {data_op.directive.data}"
+                    )
+                for word in data_op.value.data.split(","):
+                    # Words are decimal or prefixed, and may be negative
+                    value = int(word.strip(), 0) & _XLEN_MASK
+                    _U32.pack_into(self.memory, offset, value)
+                    offset += 4
+
+    def _layout_ops(self, ops: Iterable[Operation]):
+        for op in ops:
+            if isinstance(op, _NO_CODE):
+                continue
+            if isinstance(op, riscv.LabelOp):
+                self.labels[op.label.data] = len(self._entries)
+            elif isinstance(op, riscv.AssemblySectionOp):
+                if op.directive.data != ".data" and op.data is not None:
+                    self._layout_ops(op.data.block.ops)
+            elif isinstance(op, ModuleOp):
+                self._layout_ops(op.ops)
+            elif isinstance(op, riscv_func.FuncOp):
+                if op.body.blocks:
+                    self.labels[op.sym_name.data] = len(self._entries)
+                    for block in op.body.blocks:
+                        self._block_pcs[block] = len(self._entries)
+                        self._layout_ops(block.ops)
+            elif isinstance(op, riscv_snitch.FRepOperation):
+                self._entries.append(op)
+                self._block_pcs[op.body.block] = len(self._entries)
+                self._layout_ops(op.body.block.ops)
+            else:
+                # Includes the yields of frep loops, which jump back to the start
+                self._entries.append(op)
+
+    # endregion
+
+    # region Decoding
+
+    def _register(self, value: SSAValue | Attribute) -> tuple[bool, int]:
+        """
+        Return whether the register is a float register, and its index in the
+        corresponding register file.
+        """
+        reg = value.type if isinstance(value, SSAValue) else value
+        if not isinstance(reg, riscv.RISCVRegisterType) or not reg.is_allocated:
+            raise InterpretationError(
+                f"Cannot simulate value of type {reg}, registers must be allocated"
+            )
+        assert isinstance(reg.index, IntAttr)
+        is_float = isinstance(reg, riscv.FloatRegisterType)
+        index = reg.index.data
+        if index >= 0:
+            return is_float, index
+        slots = self._float_slots if is_float else self._int_slots
+        return is_float, _NUM_REGISTERS + slots.setdefault(index, len(slots))
+
+    def _source(self, value: SSAValue) -> tuple[list[Any], int]:
+        is_float, index = self._register(value)
+        return (self.float_registers if is_float else self.int_registers), index
+
+    def _destination(self, value: SSAValue | Attribute) -> tuple[list[Any], int]:
+        is_float, index = self._register(value)
+        if is_float:
+            return self.float_registers, index
+        if index == 0:
+            return self.int_registers, self._discard_slot
+        return self.int_registers, index
+
+    def _immediate(self, imm: Attribute) -> int:
+        if isinstance(imm, IntegerAttr):
+            return cast(IntegerAttr, imm).value.data
+        if isinstance(imm, riscv.LabelAttr):
+            if imm.data in self._data_labels:
+                return self._data_labels[imm.data]
+            if imm.data in self.labels:
+                return self.labels[imm.data]
+            raise InterpretationError(f"Unknown label {imm.data}")
+        raise InterpretationError(f"Cannot simulate immediate {imm}")
+
+    def _label(self, name: str) -> int:
+        if name not in self.labels:
+            raise InterpretationError(f"Unknown label {name}")
+        return self.labels[name]
+
+    def _decode(self, op: Operation) -> Instruction:
+        op_type = type(op)
+        if (fn := _INT_BINARY.get(op_type) or _FLOAT_BINARY.get(op_type)) is not None:
+            return self._decode_binary(op, fn)
+        if (fn := _INT_IMMEDIATE.get(op_type)) is not None:
+            return self._decode_immediate(op, fn)
+        if (fn := _FLOAT_TERNARY.get(op_type)) is not None:
+            return self._decode_ternary(op, fn)
+        if (fn := _UNARY.get(op_type)) is not None:
+            return self._decode_unary(op, fn)
+        if isinstance(op, _MOVES):
+            return self._decode_move(op)
+        if (fmt := _LOADS.get(op_type)) is not None:
+            return self._decode_load(op, fmt)
+        if (store := _STORES.get(op_type)) is not None:
+            return self._decode_store(op, *store)
+        if (cond := _BRANCH.get(op_type)) is not None:
+            return self._decode_branch(op, cond)
+
+        match op:
+            case riscv.LiOp():
+                return self._decode_constant(op.rd, self._immediate(op.immediate))
+            case riscv.LuiOp():
+                value = _wrap(self._immediate(op.immediate) << 12)
+                return self._decode_constant(op.rd, value)
+            case riscv.NopOp():
+                return lambda pc: pc + 1
+            case riscv_func.CallOp():
+                target = self._label(op.callee.string_value())
+                return self._decode_jump(riscv.Registers.RA, target)
+            case riscv.JOp():
+                assert isinstance(op.immediate, riscv.LabelAttr)
+                target = self._label(op.immediate.data)
+                return lambda pc: target
+            case riscv.JalOp():
+                if not isinstance(op.immediate, riscv.LabelAttr):
+                    raise InterpretationError("Cannot simulate jal to an offset")
+                rd = riscv.Registers.RA if op.rd is None else op.rd
+                return self._decode_jump(rd, self._label(op.immediate.data))
+            case riscv_cf.JOp() | riscv_cf.BranchOp():
+                target = self._block_pcs[op.successor]
+                return lambda pc: target
+            case riscv.JalrOp():
+                return self._decode_jalr(op)
+            case riscv.ReturnOp() | riscv_func.ReturnOp():
+                regs, ra = self._source_register(riscv.Registers.RA)
+                return lambda pc: regs[ra]
+            case riscv_snitch.FRepOperation():
+                return self._decode_frep(op)
+            case riscv_snitch.FrepYieldOp():
+                parent = op.parent_op()
+                assert isinstance(parent, riscv_snitch.FRepOperation)
+                return self._decode_frep_yield(parent)
+            case riscv.EcallOp():
+                return self._decode_ecall()
+            case riscv_func.SyscallOp():
+                return self._decode_syscall(op)
+            case riscv_debug.PrintfOp():
+                return self._decode_print(op.format_str.data, op.inputs)
+            case riscv.CustomAssemblyInstructionOp() if (
+                op.instruction_name.data == "print" and len(op.inputs) == 1
+            ):
+                return self._decode_print("{}\n", op.inputs)
+            case _:
+                raise InterpretationError(
+                    f"Unsupported operation {op.name} in RISC-V simulator"
+                )
+
+    def _source_register(self, reg: Attribute) -> tuple[list[Any], int]:
+        is_float, index = self._register(reg)
+        return (self.float_registers if is_float else self.int_registers), index
+
+    def _decode_binary(self, op: Operation, fn: Callable[[Any, Any], Any]):
+        (lhs, s1), (rhs, s2) = (self._source(operand) for operand in op.operands)
+        regs, d = self._destination(op.results[0])
+
+        def step(pc: int) -> int:
+            regs[d] = fn(lhs[s1], rhs[s2])
+            return pc + 1
+
+        return step
+
+    def _decode_immediate(self, op: Operation, fn: Callable[[int, int], int]):
+        (src, s1), imm = self._source(op.operands[0]), self._immediate_of(op)
+        regs, d = self._destination(op.results[0])
+
+        def step(pc: int) -> int:
+            regs[d] = fn(src[s1], imm)
+            return pc + 1
+
+        return step
+
+    def _decode_ternary(self, op: Operation, fn: Callable[[Any, Any, Any], Any]):
+        (r1, s1), (r2, s2), (r3, s3) = (self._source(v) for v in op.operands)
+        regs, d = self._destination(op.results[0])
+
+        def step(pc: int) -> int:
+            regs[d] = fn(r1[s1], r2[s2], r3[s3])
+            return pc + 1
+
+        return step
+
+    def _decode_unary(self, op: Operation, fn: Callable[[Any], Any]):
+        src, s = self._source(op.operands[0])
+        regs, d = self._destination(op.results[0])
+
+        def step(pc: int) -> int:
+            regs[d] = fn(src[s])
+            return pc + 1
+
+        return step
+
+    def _decode_move(self, op: Operation):
+        src, s = self._source(op.operands[0])
+        regs, d = self._destination(op.results[0])
+
+        def step(pc: int) -> int:
+            regs[d] = src[s]
+            return pc + 1
+
+        return step
+
+    def _decode_constant(self, rd: SSAValue, value: int):
+        regs, d = self._destination(rd)
+
+        def step(pc: int) -> int:
+            regs[d] = value
+            return pc + 1
+
+        return step
+
+    def _immediate_of(self, op: Operation) -> int:
+        imm = op.attributes.get("immediate")
+        if imm is None:
+            raise InterpretationError(f"Expected immediate in {op.name}")
+        return self._immediate(imm)
+
+    def _invalid_access(self, addr: int, size: int, access: str):
+        raise InterpretationError(
+            f"Invalid {access} of {size} bytes at address {addr}, memory size is "
+            f"{len(self.memory)}"
+        )
+
+    def _decode_load(self, op: Operation, fmt: struct.Struct):
+        base_regs, base = self._source(op.operands[0])
+        offset = self._immediate_of(op)
+        regs, d = self._destination(op.results[0])
+        memory = self.memory
+        unpack_from = fmt.unpack_from
+        limit = len(memory) - fmt.size
+        size = fmt.size
+        invalid_access = self._invalid_access
+
+        def step(pc: int) -> int:
+            addr = base_regs[base] + offset
+            if not 0 <= addr <= limit:
+                invalid_access(addr, size, "load")
+            regs[d] = unpack_from(memory, addr)[0]
+            return pc + 1
+
+        return step
+
+    def _decode_store(
+        self, op: Operation, fmt: struct.Struct, convert: Callable[[Any], Any]
+    ):
+        base_regs, base = self._source(op.operands[0])
+        value_regs, value = self._source(op.operands[1])
+        offset = self._immediate_of(op)
+        memory = self.memory
+        pack_into = fmt.pack_into
+        limit = len(memory) - fmt.size
+        size = fmt.size
+        invalid_access = self._invalid_access
+
+        def step(pc: int) -> int:
+            addr = base_regs[base] + offset
+            if not 0 <= addr <= limit:
+                invalid_access(addr, size, "store")
+            pack_into(memory, addr, convert(value_regs[value]))
+            return pc + 1
+
+        return step
+
+    def _decode_branch(self, op: Operation, cond: Callable[[int, int], bool]):
+        (lhs, s1), (rhs, s2) = (self._source(v) for v in op.operands[:2])
+        if isinstance(op, riscv_cf.ConditionalBranchOperation):
+            then_pc = self._block_pcs[op.then_block]
+            else_pc = self._block_pcs[op.else_block]
+        else:
+            offset = op.attributes["offset"]
+            if not isinstance(offset, riscv.LabelAttr):
+                raise InterpretationError("Cannot simulate branch to an offset")
+            then_pc = self._label(offset.data)
+            else_pc = None
+
+        def step(pc: int) -> int:
+            if cond(lhs[s1], rhs[s2]):
+                return then_pc
+            return pc + 1 if else_pc is None else else_pc
+
+        return step
+
+    def _decode_jump(self, rd: Attribute, target: int):
+        regs, d = self._destination(rd)
+
+        def step(pc: int) -> int:
+            regs[d] = pc + 1
+            return target
+
+        return step
+
+    def _decode_jalr(self, op: riscv.JalrOp):
+        src, s = self._source(op.rs1)
+        offset = self._immediate(op.immediate)
+        rd = riscv.Registers.RA if op.rd is None else op.rd
+        regs, d = self._destination(rd)
+
+        def step(pc: int) -> int:
+            target = src[s] + offset
+            regs[d] = pc + 1
+            return target
+
+        return step
+
+    def _decode_frep(self, op: riscv_snitch.FRepOperation):
+        for iter_arg, arg in zip(op.iter_args, op.body.block.args, strict=True):
+            if iter_arg.type != arg.type:
+                raise InterpretationError(
+                    "Loop-carried values of frep must be allocated to the same "
+                    "registers"
+                )
+        src, s = self._source(op.max_rep)
+        regs = self.int_registers
+        counter = self._frep_counters[op]
+
+        def step(pc: int) -> int:
+            regs[counter] = src[s]
+            return pc + 1
+
+        return step
+
+    def _decode_frep_yield(self, op: riscv_snitch.FRepOperation):
+        regs = self.int_registers
+        counter = self._frep_counters[op]
+        start = self._block_pcs[op.body.block]
+
+        def step(pc: int) -> int:
+            if regs[counter] > 0:
+                regs[counter] -= 1
+                return start
+            return pc + 1
+
+        return step
+
+    def _exit(self, code: int) -> int:
+        self.exit_code = code
+        return _STOP
+
+    def _decode_ecall(self):
+        regs = self.int_registers
+        a0 = riscv.Registers.A0.index.data
+        a7 = riscv.Registers.A7.index.data
+
+        def step(pc: int) -> int:
+            if regs[a7] != _EXIT_SYSCALL:
+                raise InterpretationError(f"Unsupported syscall {regs[a7]}")
+            return self._exit(regs[a0])
+
+        return step
+
+    def _decode_syscall(self, op: riscv_func.SyscallOp):
+        if op.syscall_num.value.data != _EXIT_SYSCALL:
+            raise InterpretationError(
+                f"Unsupported syscall {op.syscall_num.value.data}"
+            )
+        if op.args:
+            src, s = self._source(op.args[0])
+            return lambda pc: self._exit(src[s])
+        return lambda pc: self._exit(0)
+
+    def _decode_print(self, format_str: str, inputs: Sequence[SSAValue]):
+        sources = tuple(self._source(value) for value in inputs)
+
+        def step(pc: int) -> int:
+            args = tuple(regs[index] for regs, index in sources)
+            file = sys.stdout if self.file is None else self.file
+            print(format_str.format(*args), end="", file=file)
+            return pc + 1
+
+        return step
+
+    # endregion
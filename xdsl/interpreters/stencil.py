@@ -0,0 +1,636 @@
+"""
+Interpreter for the stencil dialect.
+
+A `stencil.apply` is evaluated over its whole iteration domain at once: each value
+computed in its body is a vector holding one element per point of the domain, and each
+`stencil.access` is a shifted, strided slice of the accessed temp or field. When NumPy
+is installed, vectors are NumPy arrays viewing the memory of the interpreted arrays,
+otherwise they are lists gathered through the strides of the arrays.
+
+Fields and temps are represented as `ShapedArray`s, whose first element is at the
+lower bound of their type. The interpreted IR is therefore expected to have been
+through `stencil-shape-inference`.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from itertools import product
+from math import prod
+from typing import Any
+
+from xdsl.dialects import stencil
+from xdsl.dialects.builtin import ShapedType
+from xdsl.interpreter import (
+    Interpreter,
+    InterpreterFunctions,
+    PythonValues,
+    impl,
+    register_impls,
+)
+from xdsl.interpreters.builtin import xtype_for_el_type
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.utils.ptr import TypedPtr
+from xdsl.ir import Attribute, Operation, SSAValue
+from xdsl.utils.exceptions import InterpretationError
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _bounds(type: Attribute) -> stencil.StencilBoundsAttr:
+    if not isinstance(type, stencil.StencilType) or not isinstance(
+        type.bounds, stencil.StencilBoundsAttr
+    ):
+        raise InterpretationError(
+            f"Expected a stencil type with known bounds, got {type}. Run "
+            "stencil-shape-inference before interpreting stencil operations."
+        )
+    return type.bounds
+
+
+def _raise_out_of_bounds(
+    index: Sequence[int], array_lb: Sequence[int], shape: Sequence[int]
+):
+    point = tuple(i + l for i, l in zip(index, array_lb))
+    array_ub = tuple(l + n for l, n in zip(array_lb, shape))
+    raise InterpretationError(
+        f"Dynamic access at {point} out of bounds [{tuple(array_lb)}, {array_ub})"
+    )
+
+
+@dataclass(frozen=True)
+class _Domain:
+    """
+    The points at which a stencil is evaluated: `shape[d]` points starting at `lb[d]`
+    and `step[d]` apart in each dimension `d`.
+    """
+
+    lb: tuple[int, ...]
+    step: tuple[int, ...]
+    shape: tuple[int, ...]
+
+    @staticmethod
+    def box(lb: Sequence[int], ub: Sequence[int]) -> _Domain:
+        return _Domain(
+            tuple(lb), (1,) * len(lb), tuple(u - l for l, u in zip(lb, ub, strict=True))
+        )
+
+    @property
+    def rank(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return prod(self.shape)
+
+    def coordinates(self, dim: int) -> range:
+        return range(
+            self.lb[dim],
+            self.lb[dim] + self.shape[dim] * self.step[dim],
+            self.step[dim],
+        )
+
+
+@dataclass
+class _Vectors(ABC):
+    """
+    Operations on vectors holding one element per point of a domain, in row-major
+    order.
+    """
+
+    domain: _Domain
+
+    def check_in_bounds(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        offset: Sequence[int],
+        mapping: Sequence[int],
+    ) -> None:
+        for k, (o, m) in enumerate(zip(offset, mapping, strict=True)):
+            coordinates = self.domain.coordinates(m)
+            first = coordinates[0] + o - array_lb[k]
+            last = coordinates[-1] + o - array_lb[k]
+            if first < 0 or last >= array.shape[k]:
+                raise InterpretationError(
+                    f"Access at offset {tuple(offset)} out of bounds in dimension {k}: "
+                    f"[{first + array_lb[k]}, {last + array_lb[k]}] is not within "
+                    f"[{array_lb[k]}, {array_lb[k] + array.shape[k] - 1}]"
+                )
+
+    @abstractmethod
+    def gather(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        offset: Sequence[int],
+        mapping: Sequence[int],
+    ) -> Any:
+        """
+        The elements of `array` at each point of the domain shifted by `offset`, where
+        the dimensions of the array are the dimensions `mapping` of the domain.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def gather_at(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        indices: Sequence[Any],
+        varying: Sequence[bool],
+    ) -> Any:
+        """
+        The elements of `array` at absolute coordinates `indices`, which are vectors
+        where `varying` is set and scalars otherwise.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def scatter(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        offset: Sequence[int],
+        value: Any,
+        varying: bool,
+    ) -> None:
+        """
+        Store `value`, a vector if `varying` is set and a scalar otherwise, to `array`
+        at each point of the domain shifted by `offset`.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def index(self, dim: int, offset: int) -> Any:
+        """The coordinates of the points of the domain in dimension `dim`."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def from_elements(self, elements: list[Any]) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def elements(self, vector: Any) -> Sequence[Any]:
+        raise NotImplementedError()
+
+    def elementwise(
+        self,
+        interpreter: Interpreter,
+        op: Operation,
+        args: PythonValues,
+        varying: Sequence[bool],
+    ) -> PythonValues:
+        """
+        Run `op` once per point of the domain, and return the vectors of its results.
+        """
+        columns = [
+            self.elements(arg) if v else (arg,) * self.domain.size
+            for arg, v in zip(args, varying, strict=True)
+        ]
+        rows = [interpreter.run_op(op, point) for point in zip(*columns)]
+        return tuple(
+            self.from_elements([row[i] for row in rows]) for i in range(len(op.results))
+        )
+
+
+class _ListVectors(_Vectors):
+    """Vectors as lists, gathered from arrays through their strides."""
+
+    def _flat_offsets(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        offset: Sequence[int],
+        mapping: Sequence[int],
+    ) -> list[int]:
+        self.check_in_bounds(array, array_lb, offset, mapping)
+        strides = ShapedType.strides_for_shape(array.shape)
+        terms = [[0] * n for n in self.domain.shape]
+        for k, (o, m) in enumerate(zip(offset, mapping, strict=True)):
+            terms[m] = [
+                (c + o - array_lb[k]) * strides[k] for c in self.domain.coordinates(m)
+            ]
+        return [sum(point) for point in product(*terms)]
+
+    def gather(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        offset: Sequence[int],
+        mapping: Sequence[int],
+    ) -> list[Any]:
+        data = array.data
+        return [data[i] for i in self._flat_offsets(array, array_lb, offset, mapping)]
+
+    def gather_at(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        indices: Sequence[Any],
+        varying: Sequence[bool],
+    ) -> list[Any]:
+        columns = [
+            index if v else (index,) * self.domain.size
+            for index, v in zip(indices, varying, strict=True)
+        ]
+        points = [
+            tuple(i - l for i, l in zip(point, array_lb, strict=True))
+            for point in zip(*columns)
+        ]
+        for point in points:
+            if not all(0 <= i < n for i, n in zip(point, array.shape)):
+                _raise_out_of_bounds(point, array_lb, array.shape)
+        return [array.load(point) for point in points]
+
+    def scatter(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        offset: Sequence[int],
+        value: Any,
+        varying: bool,
+    ) -> None:
+        offsets = self._flat_offsets(array, array_lb, offset, range(self.domain.rank))
+        values = value if varying else (value,) * len(offsets)
+        ptr = array.data_ptr
+        for i, v in zip(offsets, values, strict=True):
+            if v is not None:
+                ptr[i] = v
+
+    def index(self, dim: int, offset: int) -> list[int]:
+        coordinates = (self.domain.coordinates(d) for d in range(self.domain.rank))
+        return [point[dim] + offset for point in product(*coordinates)]
+
+    def from_elements(self, elements: list[Any]) -> list[Any]:
+        return elements
+
+    def elements(self, vector: list[Any]) -> Sequence[Any]:
+        return vector
+
+
+class _NumpyVectors(_Vectors):
+    """
+    Vectors as NumPy arrays of the shape of the domain, gathered from slices of views
+    of the interpreted arrays.
+    """
+
+    @staticmethod
+    def view(array: ShapedArray[Any]) -> Any:
+        assert np is not None
+        ptr = array.data_ptr
+        return np.frombuffer(
+            ptr.raw.memory,
+            dtype=np.dtype(ptr.xtype.format),
+            count=array.size,
+            offset=ptr.raw.offset,
+        ).reshape(array.shape)
+
+    def _slices(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        offset: Sequence[int],
+        mapping: Sequence[int],
+    ) -> tuple[slice, ...]:
+        self.check_in_bounds(array, array_lb, offset, mapping)
+        slices: list[slice] = []
+        for k, (o, m) in enumerate(zip(offset, mapping, strict=True)):
+            coordinates = self.domain.coordinates(m)
+            start = coordinates[0] + o - array_lb[k]
+            stop = coordinates[-1] + o - array_lb[k] + 1
+            slices.append(slice(start, stop, self.domain.step[m]))
+        return tuple(slices)
+
+    def gather(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        offset: Sequence[int],
+        mapping: Sequence[int],
+    ) -> Any:
+        assert np is not None
+        values = self.view(array)[self._slices(array, array_lb, offset, mapping)]
+        # Insert the dimensions of the domain that the array does not have
+        shape = [1] * self.domain.rank
+        for m in mapping:
+            shape[m] = self.domain.shape[m]
+        return np.broadcast_to(values.reshape(shape), self.domain.shape)
+
+    def gather_at(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        indices: Sequence[Any],
+        varying: Sequence[bool],
+    ) -> Any:
+        assert np is not None
+        index = np.broadcast_arrays(
+            *(np.asarray(i) - l for i, l in zip(indices, array_lb, strict=True))
+        )
+        outside = np.logical_or.reduce(
+            [(i < 0) | (i >= n) for i, n in zip(index, array.shape)]
+        )
+        if outside.any():
+            first = np.flatnonzero(outside)[0]
+            point = tuple(int(i.ravel()[first]) for i in index)
+            _raise_out_of_bounds(point, array_lb, array.shape)
+        values = self.view(array)[tuple(index)]
+        return np.broadcast_to(values, self.domain.shape)
+
+    def scatter(
+        self,
+        array: ShapedArray[Any],
+        array_lb: Sequence[int],
+        offset: Sequence[int],
+        value: Any,
+        varying: bool,
+    ) -> None:
+        if value is None:
+            return
+        slices = self._slices(array, array_lb, offset, range(self.domain.rank))
+        self.view(array)[slices] = value
+
+    def index(self, dim: int, offset: int) -> Any:
+        assert np is not None
+        shape = [1] * self.domain.rank
+        shape[dim] = self.domain.shape[dim]
+        coordinates = np.arange(
+            self.domain.coordinates(dim).start + offset,
+            self.domain.coordinates(dim).stop + offset,
+            self.domain.step[dim],
+        )
+        return np.broadcast_to(coordinates.reshape(shape), self.domain.shape)
+
+    def from_elements(self, elements: list[Any]) -> Any:
+        assert np is not None
+        return np.array(elements).reshape(self.domain.shape)
+
+    def elements(self, vector: Any) -> Sequence[Any]:
+        return vector.ravel()
+
+    def elementwise(
+        self,
+        interpreter: Interpreter,
+        op: Operation,
+        args: PythonValues,
+        varying: Sequence[bool],
+    ) -> PythonValues:
+        assert np is not None
+        # Most implementations only use operators, which also apply to whole arrays
+        try:
+            results = interpreter.run_op(op, args)
+        except (TypeError, ValueError):
+            return super().elementwise(interpreter, op, args, varying)
+        return tuple(np.broadcast_to(r, self.domain.shape) for r in results)
+
+
+@register_impls
+@dataclass
+class StencilFunctions(InterpreterFunctions):
+    """
+    Implementations of the stencil operations, evaluating each `stencil.apply` over its
+    whole domain at once. Operations nested in a `stencil.apply` are run with their
+    implementations on whole vectors when possible, and once per point otherwise.
+    """
+
+    use_numpy: bool = field(default=np is not None)
+    """Whether to represent vectors as NumPy arrays rather than lists."""
+
+    def _vectors(self, domain: _Domain) -> _Vectors:
+        if self.use_numpy:
+            if np is None:
+                raise InterpretationError("NumPy is not installed")
+            return _NumpyVectors(domain)
+        return _ListVectors(domain)
+
+    @staticmethod
+    def _zeros(interpreter: Interpreter, type: Attribute) -> ShapedArray[Any]:
+        assert isinstance(type, stencil.StencilType)
+        shape = list(_bounds(type).ub - _bounds(type).lb)
+        xtype = xtype_for_el_type(type.get_element_type(), interpreter.index_bitwidth)
+        return ShapedArray(TypedPtr[Any].zeros(prod(shape), xtype=xtype), shape)
+
+    def _copy(
+        self,
+        source: ShapedArray[Any],
+        source_type: Attribute,
+        dest: ShapedArray[Any],
+        dest_type: Attribute,
+        lb: Sequence[int],
+        ub: Sequence[int],
+    ) -> None:
+        """Copy the elements in `[lb, ub)` from `source` to `dest`."""
+        vectors = self._vectors(_Domain.box(lb, ub))
+        zeros = (0,) * len(lb)
+        values = vectors.gather(
+            source, tuple(_bounds(source_type).lb), zeros, range(len(lb))
+        )
+        vectors.scatter(dest, tuple(_bounds(dest_type).lb), zeros, values, True)
+
+    @impl(stencil.ApplyOp)
+    def run_apply(
+        self, interpreter: Interpreter, op: stencil.ApplyOp, args: PythonValues
+    ) -> PythonValues:
+        bounds = op.get_bounds()
+        if not isinstance(bounds, stencil.StencilBoundsAttr):
+            raise InterpretationError(
+                "Expected stencil.apply with known bounds. Run stencil-shape-inference "
+                "before interpreting stencil operations."
+            )
+        block = op.region.block
+        return_op = block.last_op
+        assert isinstance(return_op, stencil.ReturnOp)
+        unroll = (
+            tuple(return_op.unroll)
+            if return_op.unroll is not None
+            else (1,) * len(bounds.lb)
+        )
+        lb, ub = tuple(bounds.lb), tuple(bounds.ub)
+        if any((u - l) % s for l, u, s in zip(lb, ub, unroll, strict=True)):
+            raise InterpretationError(
+                f"Bounds {bounds} of stencil.apply are not a multiple of its unroll "
+                f"factors {unroll}"
+            )
+        domain = _Domain(
+            lb, unroll, tuple((u - l) // s for l, u, s in zip(lb, ub, unroll))
+        )
+        vectors = self._vectors(domain)
+
+        env: dict[SSAValue, Any] = dict(zip(block.args, args[: len(op.args)]))
+        varying: set[SSAValue] = set()
+        for body_op in block.ops:
+            if body_op is return_op:
+                break
+            operands = tuple(env[operand] for operand in body_op.operands)
+            results, is_varying = self._run_body_op(
+                interpreter, vectors, body_op, operands, varying
+            )
+            env.update(zip(body_op.results, results, strict=True))
+            if is_varying:
+                varying.update(body_op.results)
+
+        if op.dest:
+            outputs = args[len(op.args) :]
+            output_types = op.dest.types
+        else:
+            output_types = op.res.types
+            outputs = tuple(self._zeros(interpreter, t) for t in output_types)
+
+        # stencil.return has one value per unrolled point for each output
+        unroll_offsets = tuple(product(*(range(u) for u in unroll)))
+        for i, (output, output_type) in enumerate(zip(outputs, output_types)):
+            output_lb = tuple(_bounds(output_type).lb)
+            for k, unroll_offset in enumerate(unroll_offsets):
+                value = return_op.arg[i * len(unroll_offsets) + k]
+                vectors.scatter(
+                    output, output_lb, unroll_offset, env[value], value in varying
+                )
+
+        return () if op.dest else outputs
+
+    def _run_body_op(
+        self,
+        interpreter: Interpreter,
+        vectors: _Vectors,
+        op: Operation,
+        args: PythonValues,
+        varying: set[SSAValue],
+    ) -> tuple[PythonValues, bool]:
+        """
+        Run an operation nested in a `stencil.apply`, returning its results and whether
+        they are vectors.
+        """
+        match op:
+            case stencil.AccessOp():
+                offset = tuple(op.offset)
+                mapping = (
+                    tuple(op.offset_mapping)
+                    if op.offset_mapping is not None
+                    else range(len(offset))
+                )
+                lb = tuple(_bounds(op.temp.type).lb)
+                return (vectors.gather(args[0], lb, offset, mapping),), True
+            case stencil.DynAccessOp():
+                lb = tuple(_bounds(op.temp.type).lb)
+                is_varying = [o in varying for o in op.offset]
+                return (vectors.gather_at(args[0], lb, args[1:], is_varying),), True
+            case stencil.IndexOp():
+                dim = op.dim.value.data
+                return (vectors.index(dim, tuple(op.offset)[dim]),), True
+            case stencil.StoreResultOp():
+                # An empty store_result leaves the output unchanged
+                value = args[0] if args else None
+                return (value,), op.arg is not None and op.arg in varying
+            case _ if op.regions:
+                raise InterpretationError(
+                    f"Operations with regions such as {op.name} are not supported in "
+                    "the body of a stencil.apply"
+                )
+            case _:
+                is_varying = [operand in varying for operand in op.operands]
+                if not any(is_varying):
+                    return interpreter.run_op(op, args), False
+                return vectors.elementwise(interpreter, op, args, is_varying), True
+
+    @impl(stencil.LoadOp)
+    def run_load(
+        self, interpreter: Interpreter, op: stencil.LoadOp, args: PythonValues
+    ) -> PythonValues:
+        temp = self._zeros(interpreter, op.res.type)
+        bounds = _bounds(op.res.type)
+        self._copy(args[0], op.field.type, temp, op.res.type, bounds.lb, bounds.ub)
+        return (temp,)
+
+    @impl(stencil.StoreOp)
+    def run_store(
+        self, interpreter: Interpreter, op: stencil.StoreOp, args: PythonValues
+    ) -> PythonValues:
+        temp, field = args
+        lb, ub = op.bounds.lb, op.bounds.ub
+        self._copy(temp, op.temp.type, field, op.field.type, lb, ub)
+        return ()
+
+    @impl(stencil.CombineOp)
+    def run_combine(
+        self, interpreter: Interpreter, op: stencil.CombineOp, args: PythonValues
+    ) -> PythonValues:
+        dim = op.dim.value.data
+        index = op.index.value.data
+        operands = tuple(zip(op.operands, args))
+        lower = operands[: len(op.lower)]
+        upper = operands[len(op.lower) : 2 * len(op.lower)]
+        lowerext = operands[2 * len(op.lower) : 2 * len(op.lower) + len(op.lowerext)]
+        upperext = operands[2 * len(op.lower) + len(op.lowerext) :]
+        # The extra operands are only defined on one side of the index
+        sources = (
+            *zip(lower, upper),
+            *((e, None) for e in lowerext),
+            *((None, e) for e in upperext),
+        )
+
+        results: list[ShapedArray[Any]] = []
+        for (lower_source, upper_source), result in zip(sources, op.results_):
+            array = self._zeros(interpreter, result.type)
+            bounds = _bounds(result.type)
+            lb, ub = list(bounds.lb), list(bounds.ub)
+            split = min(max(index, lb[dim]), ub[dim])
+            if lower_source is not None and lb[dim] < split:
+                value, source = lower_source
+                split_ub = ub[:dim] + [split] + ub[dim + 1 :]
+                self._copy(source, value.type, array, result.type, lb, split_ub)
+            if upper_source is not None and split < ub[dim]:
+                value, source = upper_source
+                split_lb = lb[:dim] + [split] + lb[dim + 1 :]
+                self._copy(source, value.type, array, result.type, split_lb, ub)
+            results.append(array)
+        return tuple(results)
+
+    @impl(stencil.BufferOp)
+    def run_buffer(
+        self, interpreter: Interpreter, op: stencil.BufferOp, args: PythonValues
+    ) -> PythonValues:
+        return args
+
+    @impl(stencil.CastOp)
+    def run_cast(
+        self, interpreter: Interpreter, op: stencil.CastOp, args: PythonValues
+    ) -> PythonValues:
+        (field,) = args
+        shape = list(op.result.type.get_shape())
+        interpreter.interpreter_assert(
+            field.shape == shape,
+            f"Cannot cast field of shape {field.shape} to {op.result.type}",
+        )
+        return args
+
+    @impl(stencil.AllocOp)
+    def run_alloc(
+        self, interpreter: Interpreter, op: stencil.AllocOp, args: PythonValues
+    ) -> PythonValues:
+        return (self._zeros(interpreter, op.field.type),)
+
+    @impl(stencil.ExternalLoadOp)
+    def run_external_load(
+        self, interpreter: Interpreter, op: stencil.ExternalLoadOp, args: PythonValues
+    ) -> PythonValues:
+        return args
+
+    @impl(stencil.ExternalStoreOp)
+    def run_external_store(
+        self, interpreter: Interpreter, op: stencil.ExternalStoreOp, args: PythonValues
+    ) -> PythonValues:
+        field, external = args
+        if field is not external:
+            interpreter.interpreter_assert(
+                field.size == external.size,
+                f"Cannot store field of shape {field.shape} to {op.field.type}",
+            )
+            for i, value in enumerate(field.data):
+                external.data_ptr[i] = value
+        return ()
@@ -0,0 +1,111 @@
+from typing import Any, cast
+
+from xdsl.dialects import vector
+from xdsl.dialects.builtin import VectorType
+from xdsl.interpreter import (
+    Interpreter,
+    InterpreterFunctions,
+    PythonValues,
+    impl,
+    register_impls,
+)
+from xdsl.interpreters.builtin import xtype_for_el_type
+from xdsl.interpreters.shaped_array import ShapedArray
+from xdsl.interpreters.utils.ptr import TypedPtr
+from xdsl.ir import Attribute
+
+
+def _new_vector(
+    interpreter: Interpreter, vector_type: VectorType[Attribute], values: list[Any]
+) -> ShapedArray[Any]:
+    xtype = xtype_for_el_type(
+        vector_type.get_element_type(), interpreter.index_bitwidth
+    )
+    return ShapedArray(
+        TypedPtr[Any].new(values, xtype=xtype), list(vector_type.get_shape())
+    )
+
+
+def _lane_indices(indices: tuple[int, ...], lanes: int) -> list[tuple[int, ...]]:
+    """The indices of the elements of a 1-D vector along the innermost dimension."""
+    *outer, inner = indices
+    return [(*outer, inner + lane) for lane in range(lanes)]
+
+
+@register_impls
+class VectorFunctions(InterpreterFunctions):
+    @impl(vector.LoadOp)
+    def run_load(
+        self, interpreter: Interpreter, op: vector.LoadOp, args: PythonValues
+    ) -> PythonValues:
+        memref, *indices = args
+        memref = cast(ShapedArray[Any], memref)
+        result_type = cast(VectorType[Attribute], op.result.type)
+        interpreter.interpreter_assert(
+            result_type.get_num_dims() == 1,
+            "vector.load is only implemented for 1-D vectors",
+        )
+        values = [
+            memref.load(index)
+            for index in _lane_indices(tuple(indices), result_type.get_shape()[0])
+        ]
+        return (_new_vector(interpreter, result_type, values),)
+
+    @impl(vector.StoreOp)
+    def run_store(
+        self, interpreter: Interpreter, op: vector.StoreOp, args: PythonValues
+    ) -> PythonValues:
+        value, memref, *indices = args
+        value = cast(ShapedArray[Any], value)
+        memref = cast(ShapedArray[Any], memref)
+        interpreter.interpreter_assert(
+            len(value.shape) == 1,
+            "vector.store is only implemented for 1-D vectors",
+        )
+        for index, element in zip(
+            _lane_indices(tuple(indices), value.shape[0]), value.data, strict=True
+        ):
+            memref.store(index, element)
+        return ()
+
+    @impl(vector.BroadcastOp)
+    def run_broadcast(
+        self, interpreter: Interpreter, op: vector.BroadcastOp, args: PythonValues
+    ) -> PythonValues:
+        (source,) = args
+        result_type = cast(VectorType[Attribute], op.vector.type)
+        values = [source] * result_type.element_count()
+        return (_new_vector(interpreter, result_type, values),)
+
+    @impl(vector.FMAOp)
+    def run_fma(
+        self, interpreter: Interpreter, op: vector.FMAOp, args: PythonValues
+    ) -> PythonValues:
+        lhs, rhs, acc = cast(tuple[ShapedArray[float], ...], args)
+        result = acc.copy()
+        for index in result.indices():
+            result.store(index, lhs.load(index) * rhs.load(index) + acc.load(index))
+        return (result,)
+
+    @impl(vector.ExtractElementOp)
+    def run_extractelement(
+        self,
+        interpreter: Interpreter,
+        op: vector.ExtractElementOp,
+        args: PythonValues,
+    ) -> PythonValues:
+        source, *position = args
+        source = cast(ShapedArray[Any], source)
+        return (source.data[position[0] if position else 0],)
+
+    @impl(vector.InsertElementOp)
+    def run_insertelement(
+        self,
+        interpreter: Interpreter,
+        op: vector.InsertElementOp,
+        args: PythonValues,
+    ) -> PythonValues:
+        source, dest, *position = args
+        result = cast(ShapedArray[Any], dest).copy()
+        result.data_ptr[position[0] if position else 0] = source
+        return (result,)
@@ -1883,12 +1883,42 @@ def irdl_op_init(
     )
 
 
+def _fixed_position_accessor(
+    construct: VarIRConstruct, num_defs: int, idx: int
+) -> Callable[[Operation], Any]:
+    """
+    Get an accessor to an operand, result, region, or successor of an operation
+    without variadic definitions of this construct, whose position is then known
+    statically.
+    """
+    def_type_name = get_construct_name(construct)
+
+    def fun(self: Operation):
+        args = get_op_constructs(self, construct)
+        if len(args) != num_defs:
+            raise VerifyException(
+                f"Expected {num_defs} {def_type_name}, but got {len(args)}"
+            )
+        return args[idx]
+
+    return fun
+
+
 def irdl_op_arg_definition(
     new_attrs: dict[str, Any], construct: VarIRConstruct, op_def: OpDef
 ) -> None:
     previous_variadics = 0
     defs = get_construct_defs(op_def, construct)
+    attribute_option = get_attr_size_option(construct)
+    has_variadics = any(isinstance(arg_def, VariadicDef) for _, arg_def in defs) or any(
+        isinstance(o, attribute_option) for o in op_def.options
+    )
     for arg_idx, (arg_name, arg_def) in enumerate(defs):
+        if not has_variadics:
+            new_attrs[arg_name] = property(
+                _fixed_position_accessor(construct, len(defs), arg_idx)
+            )
+            continue
 
         def fun(self: Any, idx: int = arg_idx, previous_vars: int = previous_variadics):
             return get_operand_result_or_region(
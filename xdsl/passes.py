@@ -13,6 +13,11 @@ from typing import (
     get_origin,
 )
 
+from xdsl.analysis.analysis_manager import (
+    NO_ANALYSES,
+    AnalysisManager,
+    PreservedAnalyses,
+)
 from xdsl.context import Context
 from xdsl.dialects import builtin
 from xdsl.utils.hints import isa, type_repr
@@ -56,9 +61,28 @@ class ModulePass(ABC):
 
     name: ClassVar[str]
 
+    preserved_analyses: ClassVar[PreservedAnalyses] = NO_ANALYSES
+    """
+    The analyses whose cached results remain valid after the pass, which are kept by
+    the analysis manager of the pipeline, see `AnalysisManager.for_op`.
+    """
+
     @abstractmethod
     def apply(self, ctx: Context, op: builtin.ModuleOp) -> None: ...
 
+    def apply_and_check_changed(
+        self, ctx: Context, op: builtin.ModuleOp
+    ) -> bool | None:
+        """
+        Apply the pass, and return whether it modified the module, or `None` if the
+        pass cannot tell cheaply.
+
+        Passes that track their own modifications can override this, letting callers
+        skip comparing the module with a copy of its previous state.
+        """
+        self.apply(ctx, op)
+        return None
+
     @classmethod
     def from_pass_spec(cls: type[ModulePassT], spec: PipelinePassSpec) -> ModulePassT:
         """
@@ -202,12 +226,15 @@ class PipelinePass(ModulePass):
             return
         callback = self.callback
 
-        for prev, next in zip(self.passes[:-1], self.passes[1:]):
-            prev.apply(ctx, op)
-            if callback is not None:
-                callback(prev, op, next)
+        with AnalysisManager.for_op(op).scope(op) as analyses:
+            for prev, next in zip(self.passes[:-1], self.passes[1:]):
+                prev.apply(ctx, op)
+                analyses.invalidate(prev.preserved_analyses)
+                if callback is not None:
+                    callback(prev, op, next)
 
-        self.passes[-1].apply(ctx, op)
+            self.passes[-1].apply(ctx, op)
+            analyses.invalidate(self.passes[-1].preserved_analyses)
 
     @classmethod
     def build_pipeline_tuples(
@@ -809,6 +809,12 @@ class PatternRewriteWalker:
         pattern. Returns `True` if the IR was mutated.
         """
         pattern_listener = self._get_rewriter_listener()
+        if (parent := region.parent_op()) is not None:
+            # Keep the analyses cached by the pipeline running on the region valid
+            from xdsl.analysis.analysis_manager import AnalysisManager
+
+            if (analyses := AnalysisManager.active(parent)) is not None:
+                pattern_listener.extend_from_listener(analyses.listener())
 
         self._populate_worklist(region)
         op_was_modified = self._process_worklist(pattern_listener)
@@ -1,7 +1,9 @@
 import argparse
+import multiprocessing
 import os
 import sys
 from collections.abc import Callable
+from multiprocessing.context import BaseContext
 from typing import IO
 
 from xdsl.context import Context
@@ -12,6 +14,19 @@ from xdsl.utils.exceptions import DiagnosticException, ParseError
 from xdsl.utils.lexer import Span
 
 
+def get_worker_context() -> BaseContext:
+    """
+    The multiprocessing context of the worker processes of command line tools.
+
+    Workers are started from a fresh interpreter rather than forked, as forking a
+    process whose libraries run threads, such as JAX, may deadlock. Their
+    initializers and tasks must then be picklable.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
 class CommandLineTool:
     ctx: Context
     args: argparse.Namespace
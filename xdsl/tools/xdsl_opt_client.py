@@ -0,0 +1,73 @@
+"""Thin client sending a single program to an `xdsl-opt --server` process."""
+
+import argparse
+import json
+import socket
+import sys
+from collections.abc import Sequence
+from typing import Any
+
+
+def send_request(socket_path: str, request: dict[str, Any]) -> dict[str, Any]:
+    """
+    Send a request to the server listening on `socket_path` and return its
+    response.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
+
+
+def main(args: Sequence[str] | None = None):
+    arg_parser = argparse.ArgumentParser(
+        description="Send a program to a running xdsl-opt server."
+    )
+    arg_parser.add_argument(
+        "input_file", type=str, nargs="?", help="path to input file"
+    )
+    arg_parser.add_argument(
+        "-s",
+        "--socket",
+        type=str,
+        required=True,
+        help="path of the Unix socket the server listens on",
+    )
+    arg_parser.add_argument(
+        "-p", "--passes", type=str, required=False, help="Delimited list of passes."
+    )
+    arg_parser.add_argument("-t", "--target", type=str, required=False, help="target")
+    arg_parser.add_argument(
+        "-o", "--output-file", type=str, required=False, help="path to output file"
+    )
+    parsed = arg_parser.parse_args(args=args)
+
+    if parsed.input_file is None:
+        source = sys.stdin.read()
+    else:
+        with open(parsed.input_file) as f:
+            source = f.read()
+
+    request: dict[str, Any] = {"input": source}
+    if parsed.passes is not None:
+        request["passes"] = parsed.passes
+    if parsed.target is not None:
+        request["target"] = parsed.target
+
+    response = send_request(parsed.socket, request)
+
+    if parsed.output_file is None:
+        sys.stdout.write(response["output"])
+    else:
+        with open(parsed.output_file, "w") as f:
+            f.write(response["output"])
+
+    if "error" in response:
+        print(response["error"], file=sys.stderr)
+        exit(1)
+
+
+if "__main__" == __name__:
+    main()
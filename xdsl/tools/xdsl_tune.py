@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Search the numeric parameters of a pass pipeline, such as tile sizes or interleave
+factors, for the pipeline minimizing a cost function of the transformed module.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import itertools
+import math
+import os
+import random
+import string
+import sys
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from io import StringIO
+
+from xdsl import __version__
+from xdsl.context import Context
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.passes import ModulePass, PipelinePass
+from xdsl.tools.command_line_tool import CommandLineTool, get_worker_context
+from xdsl.transforms import get_all_passes
+from xdsl.utils.compilation_cache import CompilationCache
+from xdsl.utils.parse_pipeline import parse_pipeline
+
+CostFunction = Callable[[Context, ModuleOp, argparse.Namespace], float]
+"""
+A function returning the cost of a transformed module, lower is better. It is passed
+the context and the parsed command line arguments of `xdsl-tune`.
+"""
+
+
+def op_count_cost(ctx: Context, module: ModuleOp, args: argparse.Namespace) -> float:
+    """The number of operations in the module."""
+    return sum(1 for _ in module.walk()) - 1
+
+
+def interpreter_op_count_cost(
+    ctx: Context, module: ModuleOp, args: argparse.Namespace
+) -> float:
+    """The number of operations executed when interpreting the `--symbol` function."""
+    from xdsl.interpreter import Interpreter, OpCounter
+    from xdsl.interpreters import register_implementations
+
+    counter = OpCounter()
+    interpreter = Interpreter(module, listeners=(counter,))
+    register_implementations(interpreter, ctx)
+    interpreter.call_op(args.symbol, ())
+    return sum(counter.ops.values())
+
+
+def snitch_cycles_cost(
+    ctx: Context, module: ModuleOp, args: argparse.Namespace
+) -> float:
+    """The cycles of the `--symbol` function estimated by the Snitch model."""
+    from xdsl.backend.riscv.snitch_performance import SnitchPerformanceModel
+
+    estimates = SnitchPerformanceModel().estimate_module(module)
+    if args.symbol not in estimates:
+        raise ValueError(f"Could not find riscv_func.func @{args.symbol}")
+    return estimates[args.symbol].cycles
+
+
+def get_all_cost_functions() -> dict[str, CostFunction]:
+    return {
+        "interpreter-ops": interpreter_op_count_cost,
+        "op-count": op_count_cost,
+        "snitch-cycles": snitch_cycles_cost,
+    }
+
+
+def load_cost_function(name: str) -> CostFunction:
+    """
+    Return the registered cost function with this name, or import it from a
+    `module:function` path.
+    """
+    cost_functions = get_all_cost_functions()
+    if name in cost_functions:
+        return cost_functions[name]
+    module_name, sep, function_name = name.partition(":")
+    if not sep:
+        raise ValueError(
+            f"Unknown cost function {name}, expected one of "
+            f"{', '.join(cost_functions)} or a module:function path"
+        )
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def parse_parameter_values(values: Sequence[str]) -> tuple[str, ...]:
+    """
+    Parse the values of a parameter, where `a..b` denotes the integers from `a` to
+    `b` inclusive.
+    """
+    res: list[str] = []
+    for value in values:
+        start, sep, stop = value.partition("..")
+        if sep:
+            res.extend(str(i) for i in range(int(start), int(stop) + 1))
+        else:
+            res.append(value)
+    return tuple(res)
+
+
+@dataclass(frozen=True)
+class ParameterSpace:
+    """
+    A pipeline with `$name` placeholders, and the values each placeholder can take.
+    """
+
+    pipeline: str
+    parameters: dict[str, tuple[str, ...]]
+
+    def __post_init__(self):
+        template = string.Template(self.pipeline)
+        if not template.is_valid():
+            raise ValueError(f"Invalid placeholder in pipeline {self.pipeline}")
+        missing = set(template.get_identifiers()) - set(self.parameters)
+        if missing:
+            raise ValueError(
+                f"No values given for parameters {', '.join(sorted(missing))}"
+            )
+
+    @property
+    def size(self) -> int:
+        return math.prod(len(values) for values in self.parameters.values())
+
+    def instantiate(self, values: dict[str, str]) -> str:
+        return string.Template(self.pipeline).substitute(values)
+
+    def grid(self) -> Iterator[dict[str, str]]:
+        """All combinations of parameter values."""
+        names = tuple(self.parameters)
+        for values in itertools.product(*self.parameters.values()):
+            yield dict(zip(names, values))
+
+    def sample(self, count: int, seed: int | None = None) -> Iterator[dict[str, str]]:
+        """`count` distinct combinations of parameter values, picked at random."""
+        names = tuple(self.parameters)
+        rng = random.Random(seed)
+        indices = rng.sample(range(self.size), min(count, self.size))
+        for index in indices:
+            values: dict[str, str] = {}
+            for name in reversed(names):
+                index, i = divmod(index, len(self.parameters[name]))
+                values[name] = self.parameters[name][i]
+            yield {name: values[name] for name in names}
+
+
+@dataclass(frozen=True)
+class TuningResult:
+    pipeline: str
+    """The normalized pipeline that was evaluated."""
+    cost: float | None
+    """The cost of the transformed module, or None if the evaluation failed."""
+    error: str | None = None
+
+
+class xDSLTuneMain(CommandLineTool):
+    available_passes: dict[str, Callable[[], type[ModulePass]]]
+
+    def __init__(
+        self,
+        description: str = "xDSL pass parameter tuner",
+        args: Sequence[str] | None = None,
+    ):
+        self.available_frontends = {}
+        self.available_passes = get_all_passes()
+
+        self.ctx = Context()
+        self.register_all_dialects()
+        self.register_all_frontends()
+
+        self.argv = list(sys.argv[1:] if args is None else args)
+        arg_parser = argparse.ArgumentParser(description=description)
+        self.register_all_arguments(arg_parser)
+        self.args = arg_parser.parse_args(args=args)
+
+        self.ctx.allow_unregistered = self.args.allow_unregistered_dialect
+
+    def register_all_arguments(self, arg_parser: argparse.ArgumentParser):
+        super().register_all_arguments(arg_parser)
+        arg_parser.add_argument(
+            "-p",
+            "--passes",
+            required=True,
+            type=str,
+            help="Pipeline to tune, with `$name` placeholders for the parameters, "
+            'e.g. "memref-stream-interleave{factor=$factor}".',
+        )
+        arg_parser.add_argument(
+            "--param",
+            nargs="+",
+            action="append",
+            default=[],
+            metavar=("NAME", "VALUE"),
+            help="Values of a parameter, where a..b is the range of integers from a "
+            "to b inclusive, e.g. `--param factor 1 2 4` or `--param factor 1..8`.",
+        )
+        arg_parser.add_argument(
+            "--cost",
+            type=str,
+            default="op-count",
+            help="Cost function to minimize, one of "
+            f"{', '.join(get_all_cost_functions())}, or a module:function path to a "
+            "custom cost function.",
+        )
+        arg_parser.add_argument(
+            "--symbol",
+            type=str,
+            default="main",
+            help="Function evaluated by the interpreter-ops and snitch-cycles costs.",
+        )
+        arg_parser.add_argument(
+            "--strategy",
+            choices=("grid", "random"),
+            default="grid",
+            help="Evaluate all combinations of parameters, or a random sample.",
+        )
+        arg_parser.add_argument(
+            "--samples",
+            type=int,
+            default=16,
+            help="Number of candidates evaluated by the random strategy.",
+        )
+        arg_parser.add_argument(
+            "--seed", type=int, default=None, help="Seed of the random strategy."
+        )
+        arg_parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of worker processes evaluating candidates in parallel.",
+        )
+        arg_parser.add_argument(
+            "--cache-dir",
+            type=str,
+            required=False,
+            help="Directory caching the cost of each pipeline on each module. "
+            "Defaults to the XDSL_TUNE_CACHE_DIR environment variable, if set.",
+        )
+        arg_parser.add_argument(
+            "--verbose",
+            default=False,
+            action="store_true",
+            help="Print the cost of every candidate to stderr.",
+        )
+
+    def parameter_space(self) -> ParameterSpace:
+        parameters: dict[str, tuple[str, ...]] = {}
+        for name, *values in self.args.param:
+            if not values:
+                raise ValueError(f"No values given for parameter {name}")
+            parameters[name] = parse_parameter_values(values)
+        return ParameterSpace(self.args.passes, parameters)
+
+    def candidates(self, space: ParameterSpace) -> list[dict[str, str]]:
+        if self.args.strategy == "random":
+            return list(space.sample(self.args.samples, self.args.seed))
+        return list(space.grid())
+
+    def build_pipeline(self, pipeline: str) -> PipelinePass:
+        return PipelinePass(
+            tuple(
+                pass_type.from_pass_spec(spec)
+                for pass_type, spec in PipelinePass.build_pipeline_tuples(
+                    self.available_passes, parse_pipeline(pipeline)
+                )
+            )
+        )
+
+    def normalize_pipeline(self, pipeline: str) -> str:
+        """The pipeline with all pass arguments, including default ones."""
+        return ",".join(
+            str(p.pipeline_pass_spec(include_default=True))
+            for p in self.build_pipeline(pipeline).passes
+        )
+
+    def parse_source(self, source: str) -> ModuleOp:
+        _, file_extension = os.path.splitext(self.args.input_file or "")
+        module = self.parse_chunk(StringIO(source), file_extension[1:] or "mlir")
+        assert module is not None
+        if not self.args.disable_verify:
+            module.verify()
+        return module
+
+    def evaluate(self, source: str, pipeline: str) -> TuningResult:
+        """Apply the pipeline to a fresh copy of the module and compute its cost."""
+        try:
+            module = self.parse_source(source)
+            self.build_pipeline(pipeline).apply(self.ctx, module)
+            if not self.args.disable_verify:
+                module.verify()
+            cost = float(
+                load_cost_function(self.args.cost)(self.ctx, module, self.args)
+            )
+        except Exception as e:
+            return TuningResult(pipeline, None, f"{type(e).__name__}: {e}")
+        return TuningResult(pipeline, cost)
+
+    def get_cache(self) -> CompilationCache | None:
+        directory = self.args.cache_dir or os.environ.get("XDSL_TUNE_CACHE_DIR")
+        if not directory:
+            return None
+        return CompilationCache(directory)
+
+    def cache_key(self, module_hash: str, pipeline: str) -> str:
+        return CompilationCache.key(
+            (str(__version__), module_hash, pipeline, self.args.cost, self.args.symbol)
+        )
+
+    def tune(self, source: str) -> list[TuningResult]:
+        """
+        Evaluate the candidates of the parameter space on the module, returning their
+        results in candidate order.
+        """
+        space = self.parameter_space()
+        # Hash the printed module so that formatting and comments do not matter
+        module_hash = hashlib.sha256(
+            str(self.parse_source(source)).encode()
+        ).hexdigest()
+        cache = self.get_cache()
+
+        pipelines: list[str] = []
+        for values in self.candidates(space):
+            pipeline = self.normalize_pipeline(space.instantiate(values))
+            if pipeline not in pipelines:
+                pipelines.append(pipeline)
+
+        results: dict[str, TuningResult] = {}
+        pending: list[str] = []
+        for pipeline in pipelines:
+            if cache is not None:
+                stdout, output = StringIO(), StringIO()
+                if cache.load(self.cache_key(module_hash, pipeline), stdout, output):
+                    results[pipeline] = TuningResult(pipeline, float(output.getvalue()))
+                    continue
+            pending.append(pipeline)
+
+        if self.args.jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(
+                min(self.args.jobs, len(pending)),
+                mp_context=get_worker_context(),
+                initializer=_init_worker,
+                initargs=(self.argv, source),
+            ) as executor:
+                futures: list[Future[TuningResult]] = [
+                    executor.submit(_evaluate, pipeline) for pipeline in pending
+                ]
+                evaluated = [future.result() for future in futures]
+        else:
+            evaluated = [self.evaluate(source, pipeline) for pipeline in pending]
+
+        for result in evaluated:
+            results[result.pipeline] = result
+            if cache is not None and result.cost is not None:
+                cache.store(
+                    self.cache_key(module_hash, result.pipeline), "", repr(result.cost)
+                )
+
+        return [results[pipeline] for pipeline in pipelines]
+
+    def run(self):
+        f, _ = self.get_input_stream()
+        try:
+            source = f.read()
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+        results = self.tune(source)
+
+        if self.args.verbose:
+            for result in results:
+                cost = result.error if result.cost is None else f"{result.cost:g}"
+                print(f"{cost}\t{result.pipeline}", file=sys.stderr)
+
+        successful = [result for result in results if result.cost is not None]
+        if not successful:
+            print("No candidate pipeline could be evaluated", file=sys.stderr)
+            exit(1)
+        best = min(successful, key=lambda result: result.cost or 0.0)
+        print(best.pipeline)
+
+
+_worker: tuple[xDSLTuneMain, str] | None = None
+
+
+def _init_worker(argv: list[str], source: str):
+    global _worker
+    _worker = (xDSLTuneMain(args=argv), source)
+
+
+def _evaluate(pipeline: str) -> TuningResult:
+    assert _worker is not None
+    tool, source = _worker
+    return tool.evaluate(source, pipeline)
+
+
+def main():
+    return xDSLTuneMain().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import abc
-from collections.abc import Iterator
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import TYPE_CHECKING, TypeVar, final
@@ -10,7 +10,7 @@ from xdsl.utils.exceptions import VerifyException
 
 if TYPE_CHECKING:
     from xdsl.dialects.builtin import StringAttr, SymbolRefAttr
-    from xdsl.ir import Attribute, Operation, Region, SSAValue
+    from xdsl.ir import Attribute, Block, Operation, Region, SSAValue
     from xdsl.pattern_rewriter import RewritePattern
 
 
@@ -451,6 +451,81 @@ class CallableOpInterface(OpTrait, abc.ABC):
         raise NotImplementedError()
 
 
+class BranchOpInterface(OpTrait, abc.ABC):
+    """
+    Interface for terminators branching to successor blocks, forwarding some of their
+    operands to the arguments of the successors.
+
+    See external [documentation](https://mlir.llvm.org/docs/Interfaces/#branchopinterface).
+    """
+
+    @classmethod
+    @abc.abstractmethod
+    def get_successor_operands(cls, op: Operation, index: int) -> Sequence[SSAValue]:
+        """
+        The operands forwarded to the arguments of the successor at `index`.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def get_successor_for_operands(
+        cls, op: Operation, operands: Sequence[Attribute | None]
+    ) -> Block | None:
+        """
+        The successor taken when the operands have the given constant values, with
+        None for the operands whose value is not known. Returns None if the successor
+        cannot be determined from these values.
+        """
+        return None
+
+
+class RegionBranchOpInterface(OpTrait, abc.ABC):
+    """
+    Interface for operations with regions whose control flow is known.
+
+    On entry, control flows from the operation to some of its regions, or directly
+    back to the operation, in which case the values of its results are the forwarded
+    operands. The terminators of the regions then branch to other regions, or back to
+    the operation, forwarding all of their operands. Values forwarded to a region
+    are the trailing arguments of its entry block.
+
+    See external [documentation](https://mlir.llvm.org/docs/Interfaces/#regionbranchopinterface).
+    """
+
+    @classmethod
+    @abc.abstractmethod
+    def get_entry_successor_regions(
+        cls, op: Operation, operands: Sequence[Attribute | None]
+    ) -> Sequence[Region | None]:
+        """
+        The regions to which control may flow on entry, or None for the results of
+        the operation, given the constant values of the operands, with None for the
+        operands whose value is not known.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def get_entry_successor_operands(
+        cls, op: Operation, successor: Region | None
+    ) -> Sequence[SSAValue]:
+        """
+        The operands forwarded to `successor` on entry, a region or None for the
+        results of the operation.
+        """
+        return ()
+
+    @classmethod
+    @abc.abstractmethod
+    def get_region_successors(
+        cls, op: Operation, region: Region
+    ) -> Sequence[Region | None]:
+        """
+        The regions to which the terminators of `region` may branch, or None for the
+        results of the operation.
+        """
+        raise NotImplementedError()
+
+
 @dataclass(frozen=True)
 class HasCanonicalizationPatternsTrait(OpTrait):
     """
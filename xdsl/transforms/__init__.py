@@ -218,6 +218,11 @@ def get_all_passes() -> dict[str, Callable[[], type[ModulePass]]]:
 
         return stencil_global_to_local.DistributeStencilPass
 
+    def get_dmp_choose_decomposition():
+        from xdsl.transforms.experimental.dmp import decomposition_cost
+
+        return decomposition_cost.ChooseDecompositionPass
+
     def get_dmp_to_mpi():
         from xdsl.transforms.experimental.dmp import stencil_global_to_local
 
@@ -273,11 +278,21 @@ def get_all_passes() -> dict[str, Callable[[], type[ModulePass]]]:
 
         return inline_snrt.InlineSnrtPass
 
+    def get_int_range_optimizations():
+        from xdsl.transforms import int_range_optimizations
+
+        return int_range_optimizations.IntRangeOptimizationsPass
+
     def get_lift_arith_to_linalg():
         from xdsl.transforms.lift_arith_to_linalg import LiftArithToLinalg
 
         return LiftArithToLinalg
 
+    def get_linalg_fuse_elementwise():
+        from xdsl.transforms import generic_fusion
+
+        return generic_fusion.LinalgFuseElementwisePass
+
     def get_linalg_fuse_multiply_add():
         from xdsl.transforms.linalg_transformations import LinalgFuseMultiplyAddPass
 
@@ -333,11 +348,21 @@ def get_all_passes() -> dict[str, Callable[[], type[ModulePass]]]:
 
         return lower_snitch.LowerSnitchPass
 
+    def get_memref_plan_memory():
+        from xdsl.transforms import memref_plan_memory
+
+        return memref_plan_memory.MemRefPlanMemoryPass
+
     def get_memref_stream_fold_fill():
         from xdsl.transforms import memref_stream_fold_fill
 
         return memref_stream_fold_fill.MemRefStreamFoldFillPass
 
+    def get_memref_stream_fuse_elementwise():
+        from xdsl.transforms import generic_fusion
+
+        return generic_fusion.MemRefStreamFuseElementwisePass
+
     def get_memref_stream_generalize_fill():
         from xdsl.transforms import memref_stream_generalize_fill
 
@@ -418,11 +443,26 @@ def get_all_passes() -> dict[str, Callable[[], type[ModulePass]]]:
 
         return prologue_epilogue_insertion.PrologueEpilogueInsertion
 
+    def get_x86_register_allocation():
+        from xdsl.transforms import x86_register_allocation
+
+        return x86_register_allocation.X86RegisterAllocation
+
+    def get_x86_prologue_epilogue_insertion():
+        from xdsl.backend.x86 import prologue_epilogue_insertion
+
+        return prologue_epilogue_insertion.X86PrologueEpilogueInsertion
+
     def get_riscv_scf_loop_range_folding():
         from xdsl.transforms import riscv_scf_loop_range_folding
 
         return riscv_scf_loop_range_folding.RiscvScfLoopRangeFoldingPass
 
+    def get_sccp():
+        from xdsl.transforms import sccp
+
+        return sccp.SCCPPass
+
     def get_scf_for_loop_flatten():
         from xdsl.transforms import scf_for_loop_flatten
 
@@ -433,6 +473,16 @@ def get_all_passes() -> dict[str, Callable[[], type[ModulePass]]]:
 
         return scf_for_loop_range_folding.ScfForLoopRangeFoldingPass
 
+    def get_scf_for_unroll():
+        from xdsl.transforms import scf_for_unroll
+
+        return scf_for_unroll.ScfForUnrollPass
+
+    def get_scf_for_vectorize():
+        from xdsl.transforms import scf_for_vectorize
+
+        return scf_for_vectorize.ScfForVectorizePass
+
     def get_scf_parallel_loop_tiling():
         from xdsl.transforms import scf_parallel_loop_tiling
 
@@ -538,6 +588,7 @@ def get_all_passes() -> dict[str, Callable[[], type[ModulePass]]]:
         "csl-wrapper-hoist-buffers": get_csl_wrapper_hoist_buffers,
         "dce": get_dce,
         "distribute-stencil": get_distribute_stencil,
+        "dmp-choose-decomposition": get_dmp_choose_decomposition,
         "dmp-to-mpi": get_dmp_to_mpi,
         "empty-tensor-to-alloc-tensor": get_empty_tensor_to_alloc_tensor,
         "eqsat-add-costs": get_eqsat_add_costs,
@@ -549,7 +600,9 @@ def get_all_passes() -> dict[str, Callable[[], type[ModulePass]]]:
         "gpu-map-parallel-loops": get_gpu_map_parallel_loops,
         "hls-convert-stencil-to-ll-mlir": get_hls_convert_stencil_to_ll_mlir,
         "inline-snrt": get_inline_snrt,
+        "int-range-optimizations": get_int_range_optimizations,
         "lift-arith-to-linalg": get_lift_arith_to_linalg,
+        "linalg-fuse-elementwise": get_linalg_fuse_elementwise,
         "linalg-fuse-multiply-add": get_linalg_fuse_multiply_add,
         "linalg-to-csl": get_linalg_to_csl,
         "loop-hoist-memref": get_loop_hoist_memref,
@@ -561,7 +614,9 @@ def get_all_passes() -> dict[str, Callable[[], type[ModulePass]]]:
         "lower-riscv-func": get_lower_riscv_func,
         "lower-riscv-scf-to-labels": get_lower_riscv_scf_to_labels,
         "lower-snitch": get_lower_snitch,
+        "memref-plan-memory": get_memref_plan_memory,
         "memref-stream-fold-fill": get_memref_stream_fold_fill,
+        "memref-stream-fuse-elementwise": get_memref_stream_fuse_elementwise,
         "memref-stream-generalize-fill": get_memref_stream_generalize_fill,
         "memref-stream-infer-fill": get_memref_stream_infer_fill,
         "memref-stream-interleave": get_memref_stream_interleave,
@@ -579,8 +634,11 @@ def get_all_passes() -> dict[str, Callable[[], type[ModulePass]]]:
         "riscv-allocate-registers": get_riscv_register_allocation,
         "riscv-prologue-epilogue-insertion": get_riscv_prologue_epilogue_insertion,
         "riscv-scf-loop-range-folding": get_riscv_scf_loop_range_folding,
+        "sccp": get_sccp,
         "scf-for-loop-flatten": get_scf_for_loop_flatten,
         "scf-for-loop-range-folding": get_scf_for_loop_range_folding,
+        "scf-for-unroll": get_scf_for_unroll,
+        "scf-for-vectorize": get_scf_for_vectorize,
         "scf-parallel-loop-tiling": get_scf_parallel_loop_tiling,
         "shape-inference": get_shape_inference,
         "snitch-allocate-registers": get_snitch_allocate_registers,
@@ -593,4 +651,6 @@ def get_all_passes() -> dict[str, Callable[[], type[ModulePass]]]:
         "test-add-timers-to-top-level-funcs": get_test_add_timers_to_top_level_funcs,
         "test-lower-linalg-to-snitch": get_test_lower_linalg_to_snitch,
         "varith-fuse-repeated-operands": get_varith_fuse_repeated_operands,
+        "x86-allocate-registers": get_x86_register_allocation,
+        "x86-prologue-epilogue-insertion": get_x86_prologue_epilogue_insertion,
     }
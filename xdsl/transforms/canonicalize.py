@@ -34,7 +34,11 @@ class CanonicalizePass(ModulePass):
     name = "canonicalize"
 
     def apply(self, ctx: Context, op: builtin.ModuleOp) -> None:
+        self.apply_and_check_changed(ctx, op)
+
+    def apply_and_check_changed(self, ctx: Context, op: builtin.ModuleOp) -> bool:
         pattern = GreedyRewritePatternApplier(
             [RemoveUnusedOperations(), CanonicalizationRewritePattern()]
         )
-        PatternRewriteWalker(pattern, post_walk_func=region_dce).rewrite_module(op)
+        walker = PatternRewriteWalker(pattern, post_walk_func=region_dce)
+        return walker.rewrite_module(op)
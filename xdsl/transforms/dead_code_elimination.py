@@ -164,3 +164,6 @@ class DeadCodeElimination(ModulePass):
 
     def apply(self, ctx: Context, op: ModuleOp) -> None:
         region_dce(op.body)
+
+    def apply_and_check_changed(self, ctx: Context, op: ModuleOp) -> bool:
+        return region_dce(op.body)
@@ -0,0 +1,276 @@
+"""
+Estimate the communication cost of the domain decompositions of `dmp.swap`
+operations.
+
+For every rank of the grid a swap is distributed over, the analysis counts the halo
+exchanges whose neighbor is inside the grid, and the number of bytes they transfer.
+This is the communication `dmp-to-mpi` generates. The number of points computed per
+rank is taken from the bounds of the `stencil.apply` operations, so the module should
+have gone through shape inference.
+
+Candidate decompositions are evaluated by distributing a copy of the global module
+over each topology with the given number of ranks.
+"""
+
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from itertools import product
+from math import prod
+from typing import IO, cast
+
+from xdsl.context import Context
+from xdsl.dialects import builtin, stencil
+from xdsl.dialects.builtin import ContainerType
+from xdsl.dialects.experimental import dmp
+from xdsl.ir import Attribute
+from xdsl.passes import ModulePass
+from xdsl.transforms.experimental.dmp.stencil_global_to_local import (
+    DistributeStencilPass,
+)
+from xdsl.transforms.shape_inference import infer_shapes
+from xdsl.utils.exceptions import PassFailedException
+
+
+@dataclass
+class RankCost:
+    """The halo exchanges performed by a single rank."""
+
+    rank: int
+    coords: tuple[int, ...]
+    messages: int = 0
+    """Number of messages received, which is also the number of messages sent."""
+    halo_bytes: int = 0
+    """Number of bytes received into the halos."""
+
+    def to_json(self) -> dict[str, int | list[int]]:
+        return {
+            "rank": self.rank,
+            "coords": list(self.coords),
+            "messages": self.messages,
+            "halo_bytes": self.halo_bytes,
+        }
+
+
+@dataclass
+class DecompositionCost:
+    """The communication and computation of all ranks of a decomposition."""
+
+    topology: tuple[int, ...]
+    compute_points: int = 0
+    """Number of points computed by each rank, summed over all `stencil.apply`."""
+    ranks: list[RankCost] = field(default_factory=list[RankCost])
+
+    @property
+    def messages(self) -> int:
+        """Messages received by the busiest rank."""
+        return max((rank.messages for rank in self.ranks), default=0)
+
+    @property
+    def halo_bytes(self) -> int:
+        """Bytes received by the busiest rank."""
+        return max((rank.halo_bytes for rank in self.ranks), default=0)
+
+    @property
+    def total_messages(self) -> int:
+        return sum(rank.messages for rank in self.ranks)
+
+    @property
+    def total_halo_bytes(self) -> int:
+        return sum(rank.halo_bytes for rank in self.ranks)
+
+    @property
+    def compute_to_communication(self) -> float | None:
+        """
+        Points computed per halo byte received by the busiest rank, or None if no
+        rank communicates.
+        """
+        if not self.halo_bytes:
+            return None
+        return self.compute_points / self.halo_bytes
+
+    def sort_key(self) -> tuple[int, int, int]:
+        """
+        Decompositions are ranked by the bytes and then messages of their busiest
+        rank, which bound the time taken by each exchange.
+        """
+        return (self.halo_bytes, self.messages, self.total_halo_bytes)
+
+    def to_json(self) -> dict[str, object]:
+        return {
+            "topology": list(self.topology),
+            "compute_points": self.compute_points,
+            "messages": self.messages,
+            "halo_bytes": self.halo_bytes,
+            "total_messages": self.total_messages,
+            "total_halo_bytes": self.total_halo_bytes,
+            "compute_to_communication": self.compute_to_communication,
+            "ranks": [rank.to_json() for rank in self.ranks],
+        }
+
+
+def _element_size(op: dmp.SwapOp) -> int:
+    element_type = cast(
+        ContainerType[Attribute], op.input_stencil.type
+    ).get_element_type()
+    if not isinstance(element_type, builtin.CompileTimeFixedBitwidthType):
+        raise ValueError(f"Cannot compute the size of {element_type}")
+    return element_type.compile_time_size
+
+
+def _grid_coords(topology: tuple[int, ...]) -> Iterator[tuple[int, ...]]:
+    """Coordinates of the ranks of a grid, in the order of their rank."""
+    return product(*(range(size) for size in topology))
+
+
+def _add_swap_cost(op: dmp.SwapOp, cost: DecompositionCost):
+    element_size = _element_size(op)
+    topology = op.strategy.comm_layout().as_tuple()
+    for rank_cost in cost.ranks:
+        for exchange in op.swaps:
+            neighbor = exchange.neighbor
+            # dimensions of the exchange beyond the grid are not decomposed
+            coords = rank_cost.coords + (0,) * (len(neighbor) - len(topology))
+            sizes = topology + (1,) * (len(neighbor) - len(topology))
+            if all(
+                0 <= coord + offset < size
+                for coord, offset, size in zip(coords, neighbor, sizes)
+            ):
+                rank_cost.messages += 1
+                rank_cost.halo_bytes += exchange.elem_count * element_size
+
+
+def _compute_points(op: stencil.ApplyOp) -> int:
+    bounds = op.get_bounds()
+    if not isinstance(bounds, stencil.StencilBoundsAttr):
+        return 0
+    return prod(ub - lb for lb, ub in zip(bounds.lb, bounds.ub))
+
+
+def decomposition_cost(module: builtin.ModuleOp) -> DecompositionCost | None:
+    """
+    Compute the cost of the `dmp.swap` operations in a distributed module, or None
+    if it contains none.
+
+    All swaps must be distributed over the same grid.
+    """
+    swaps = [op for op in module.walk() if isinstance(op, dmp.SwapOp)]
+    if not swaps:
+        return None
+
+    topology = swaps[0].strategy.comm_layout().as_tuple()
+    for swap in swaps:
+        if swap.strategy.comm_layout().as_tuple() != topology:
+            raise ValueError("All dmp.swap operations must use the same grid")
+
+    cost = DecompositionCost(
+        topology,
+        sum(
+            _compute_points(op)
+            for op in module.walk()
+            if isinstance(op, stencil.ApplyOp)
+        ),
+        [RankCost(rank, coords) for rank, coords in enumerate(_grid_coords(topology))],
+    )
+    for swap in swaps:
+        _add_swap_cost(swap, cost)
+    return cost
+
+
+def _factorizations(ranks: int, dims: int) -> Iterator[tuple[int, ...]]:
+    """All ordered ways of writing `ranks` as a product of `dims` factors."""
+    if dims == 1:
+        yield (ranks,)
+        return
+    for factor in range(1, ranks + 1):
+        if ranks % factor == 0:
+            for rest in _factorizations(ranks // factor, dims - 1):
+                yield (factor, *rest)
+
+
+def _divides_stores(module: builtin.ModuleOp, topology: tuple[int, ...]) -> bool:
+    """Check that the stores of the module can be evenly split over the topology."""
+    for op in module.walk():
+        if isinstance(op, stencil.StoreOp):
+            if any(op.bounds.lb) or len(op.bounds.ub) < len(topology):
+                return False
+            if any(size % slices for size, slices in zip(op.bounds.ub, topology)):
+                return False
+    return True
+
+
+def candidate_costs(
+    module: builtin.ModuleOp, ctx: Context, ranks: int, strategy: str
+) -> list[DecompositionCost]:
+    """
+    Distribute copies of the global `module` over all topologies of `ranks` ranks
+    that evenly divide its stores, and return their costs from cheapest to most
+    expensive.
+    """
+    if strategy not in DistributeStencilPass.STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    dims = 2 if strategy == "2d-grid" else 3
+
+    costs: list[DecompositionCost] = []
+    for topology in _factorizations(ranks, dims):
+        if not _divides_stores(module, topology):
+            continue
+        candidate = module.clone()
+        DistributeStencilPass(topology, strategy).apply(ctx, candidate)
+        infer_shapes(candidate)
+        cost = decomposition_cost(candidate)
+        if cost is None:
+            # Nothing to exchange, every topology is equally good
+            cost = DecompositionCost(topology)
+        costs.append(cost)
+
+    return sorted(costs, key=DecompositionCost.sort_key)
+
+
+def print_decomposition_cost_report(module: builtin.ModuleOp, output: IO[str]):
+    """
+    Print the cost of the `dmp.swap` operations in a distributed module as a JSON
+    object.
+    """
+    cost = decomposition_cost(module)
+    print(json.dumps(None if cost is None else cost.to_json(), indent=2), file=output)
+
+
+@dataclass(frozen=True)
+class ChooseDecompositionPass(ModulePass):
+    """
+    Distribute the stencils of the module over the topology of `ranks` ranks with
+    the least halo traffic on its busiest rank.
+
+    The costs of all candidate topologies are written as a JSON list to `report`, if
+    set.
+    """
+
+    name = "dmp-choose-decomposition"
+
+    ranks: int
+    """
+    Number of ranks to distribute the module over
+    """
+
+    strategy: str = "3d-grid"
+    """
+    Name of the decomposition strategy, see DistributeStencilPass.STRATEGIES
+    """
+
+    report: str | None = None
+    """
+    Path of the JSON report of all candidates
+    """
+
+    def apply(self, ctx: Context, op: builtin.ModuleOp) -> None:
+        costs = candidate_costs(op, ctx, self.ranks, self.strategy)
+        if self.report is not None:
+            with open(self.report, "w") as f:
+                json.dump([cost.to_json() for cost in costs], f, indent=2)
+        if not costs:
+            raise PassFailedException(
+                f"No {self.strategy} topology of {self.ranks} ranks evenly divides "
+                "the stencil stores"
+            )
+        DistributeStencilPass(costs[0].topology, self.strategy).apply(ctx, op)
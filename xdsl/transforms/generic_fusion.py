@@ -0,0 +1,531 @@
+"""
+Producer-consumer fusion and tiling of `linalg.generic` and `memref_stream.generic`
+operations.
+
+A parallel generic writing an operand read by a parallel consumer is fused into the
+consumer: the producer's body is computed at each point of the consumer's iteration
+space, and its inputs are read with the producer's indexing maps composed with the
+inverse of the map of the fused output and the consumer's map of the fused operand.
+This covers elementwise chains as well as producers broadcast by their consumer.
+
+On buffers, the producer is the last operation writing the fused buffer before the
+consumer, and only side-effect free operations may separate them. The fused values
+are no longer stored if the buffer is a temporary allocation that is otherwise only
+freed, in which case the allocation is removed. Otherwise, they are written to the
+buffer as an extra output of the fused operation, as are the other outputs of the
+producer, which requires the consumer to access each of their elements exactly once.
+
+After fusion, the parallel dimensions of generics on buffers may be tiled by
+`scf.for` loops over subviews, so that each tile of a fused chain of operations is
+computed at once.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import cast
+
+from xdsl.context import Context
+from xdsl.dialects import arith, linalg, memref, memref_stream, scf
+from xdsl.dialects.builtin import (
+    AffineMapAttr,
+    ArrayAttr,
+    IndexType,
+    IntegerAttr,
+    MemRefType,
+    ModuleOp,
+    ShapedType,
+    TensorType,
+)
+from xdsl.dialects.utils import AbstractYieldOperation
+from xdsl.ir import Attribute, Block, Operation, OpResult, Region, SSAValue
+from xdsl.ir.affine import AffineMap
+from xdsl.passes import ModulePass
+from xdsl.pattern_rewriter import (
+    PatternRewriter,
+    PatternRewriteWalker,
+    RewritePattern,
+    op_type_rewrite_pattern,
+)
+from xdsl.rewriter import InsertPoint, Rewriter
+from xdsl.traits import MemoryEffectKind, is_side_effect_free, only_has_effect
+from xdsl.transforms.memref_stream_tile_outer_loops import insert_subview
+
+GenericOp = linalg.GenericOp | memref_stream.GenericOp
+
+
+def _is_parallel(op: GenericOp) -> bool:
+    if isinstance(op, memref_stream.GenericOp):
+        return not op.inits and all(
+            it.data == memref_stream.IteratorType.PARALLEL for it in op.iterator_types
+        )
+    return all(it.data == linalg.IteratorType.PARALLEL for it in op.iterator_types)
+
+
+def _is_permutation(map: AffineMap) -> bool:
+    return len(map.results) == map.num_dims and map.inverse_permutation() is not None
+
+
+def _static_bounds(op: GenericOp) -> tuple[int, ...] | None:
+    if isinstance(op, memref_stream.GenericOp):
+        return tuple(bound.value.data for bound in op.bounds)
+    try:
+        return op.get_static_loop_ranges()
+    except NotImplementedError:
+        return None
+
+
+def _covers(op: GenericOp, map: AffineMap, value: SSAValue) -> bool:
+    """Check that `op` accesses each element of `value` once through `map`."""
+    bounds = _static_bounds(op)
+    if bounds is None or not _is_permutation(map):
+        return False
+    last = map.eval(tuple(bound - 1 for bound in bounds), ())
+    return (
+        tuple(index + 1 for index in last) == cast(ShapedType, value.type).get_shape()
+    )
+
+
+def _buffer_producer(consumer: GenericOp, buffer: SSAValue) -> GenericOp | None:
+    """
+    The last operation writing `buffer` before `consumer`, if it is a generic of the
+    same kind separated from `consumer` by side-effect free operations only.
+    """
+    op = consumer.prev_op
+    while op is not None:
+        if isinstance(op, type(consumer)) and buffer in op.outputs:
+            return op
+        if not (is_side_effect_free(op) or only_has_effect(op, MemoryEffectKind.ALLOC)):
+            return None
+        op = op.prev_op
+    return None
+
+
+def _is_temporary(buffer: SSAValue, producer: GenericOp, consumer: GenericOp) -> bool:
+    """
+    Check that `buffer` is only allocated to pass values from `producer` to
+    `consumer`.
+    """
+    return isinstance(buffer.owner, memref.AllocOp) and all(
+        use.operation in (producer, consumer)
+        or isinstance(use.operation, memref.DeallocOp)
+        for use in buffer.uses
+    )
+
+
+def _used_after(value: SSAValue, consumer: Operation) -> bool:
+    """Check that all uses of `value` other than `consumer` follow it in its block."""
+    block = consumer.parent_block()
+    assert block is not None
+    position = block.get_operation_index(consumer)
+    return all(
+        use.operation is consumer
+        or use.operation.parent_block() is block
+        and block.get_operation_index(use.operation) > position
+        for use in value.uses
+    )
+
+
+@dataclass(frozen=True)
+class Fusion:
+    """
+    The fusion of the output `output` of `producer` into the input `index` of
+    `consumer`.
+    """
+
+    producer: GenericOp
+    consumer: GenericOp
+    index: int
+    output: int
+    kept_outputs: tuple[int, ...]
+    """The outputs of the producer that are still written by the fused operation."""
+
+    def _to_producer(self) -> AffineMap:
+        """The map from the consumer iteration space to the producer's."""
+        output_map = self.producer.indexing_maps.data[
+            len(self.producer.inputs) + self.output
+        ].data
+        inverse = output_map.inverse_permutation()
+        assert inverse is not None
+        return inverse.compose(self.consumer.indexing_maps.data[self.index].data)
+
+    def inputs(self) -> tuple[SSAValue, ...]:
+        inputs = self.consumer.inputs
+        return (*inputs[: self.index], *self.producer.inputs, *inputs[self.index + 1 :])
+
+    def outputs(self) -> tuple[SSAValue, ...]:
+        return (
+            *self.consumer.outputs,
+            *(self.producer.outputs[output] for output in self.kept_outputs),
+        )
+
+    def indexing_maps(self) -> tuple[AffineMapAttr, ...]:
+        to_producer = self._to_producer()
+        consumer_maps = self.consumer.indexing_maps.data
+        producer_maps = self.producer.indexing_maps.data
+        num_producer_inputs = len(self.producer.inputs)
+        return (
+            *consumer_maps[: self.index],
+            *(
+                AffineMapAttr(m.data.compose(to_producer))
+                for m in producer_maps[:num_producer_inputs]
+            ),
+            *consumer_maps[self.index + 1 :],
+            *(
+                AffineMapAttr(
+                    producer_maps[num_producer_inputs + output].data.compose(
+                        to_producer
+                    )
+                )
+                for output in self.kept_outputs
+            ),
+        )
+
+    def body(self) -> Region:
+        """
+        The body of the fused operation, computing the producer's body before the
+        consumer's.
+        """
+        producer = self.producer.body.block
+        consumer = self.consumer.body.block
+        num_producer_inputs = len(self.producer.inputs)
+        old_args = (
+            *consumer.args[: self.index],
+            *producer.args[:num_producer_inputs],
+            *consumer.args[self.index + 1 :],
+            *(
+                producer.args[num_producer_inputs + output]
+                for output in self.kept_outputs
+            ),
+        )
+        block = Block(arg_types=(arg.type for arg in old_args))
+        value_map: dict[SSAValue, SSAValue] = {}
+        for old, new in zip(old_args, block.args, strict=True):
+            new.name_hint = old.name_hint
+            value_map[old] = new
+
+        *producer_ops, producer_yield = producer.ops
+        for op in producer_ops:
+            block.add_op(op.clone(value_map))
+        producer_results = tuple(
+            value_map.get(arg, arg)
+            for arg in cast(AbstractYieldOperation[Attribute], producer_yield).arguments
+        )
+        value_map[consumer.args[self.index]] = producer_results[self.output]
+
+        *consumer_ops, consumer_yield = consumer.ops
+        for op in consumer_ops:
+            block.add_op(op.clone(value_map))
+        consumer_yield = cast(AbstractYieldOperation[Attribute], consumer_yield)
+        block.add_op(
+            type(consumer_yield)(
+                *(value_map.get(arg, arg) for arg in consumer_yield.arguments),
+                *(producer_results[output] for output in self.kept_outputs),
+            )
+        )
+        return Region(block)
+
+    def is_legal(self) -> bool:
+        """
+        Check that the producer computes each element of the fused operand
+        independently, and that the outputs it still writes are written entirely.
+        """
+        producer = self.producer
+        num_producer_inputs = len(producer.inputs)
+        output_maps = producer.indexing_maps.data[num_producer_inputs:]
+        if (
+            not _is_parallel(producer)
+            or any(arg.uses for arg in producer.body.block.args[num_producer_inputs:])
+            or not _is_permutation(output_maps[self.output].data)
+        ):
+            return False
+        to_producer = self._to_producer()
+        return all(
+            _covers(
+                self.consumer,
+                output_maps[output].data.compose(to_producer),
+                producer.outputs[output],
+            )
+            for output in self.kept_outputs
+        )
+
+
+def _tensor_fusion(consumer: GenericOp, index: int) -> Fusion | None:
+    operand = consumer.inputs[index]
+    producer = operand.owner
+    if not isinstance(producer, type(consumer)) or not isinstance(operand, OpResult):
+        return None
+    results = producer.results
+    if any(result is not operand and result in consumer.operands for result in results):
+        return None
+    kept_outputs = tuple(
+        output
+        for output, result in enumerate(results)
+        if len(result.uses) > (result is operand)
+    )
+    if not all(_used_after(results[output], consumer) for output in kept_outputs):
+        return None
+    return Fusion(producer, consumer, index, operand.index, kept_outputs)
+
+
+def _buffer_fusion(consumer: GenericOp, index: int) -> Fusion | None:
+    buffer = consumer.inputs[index]
+    producer = _buffer_producer(consumer, buffer)
+    if (
+        producer is None
+        or list(producer.outputs).count(buffer) != 1
+        or buffer in producer.inputs
+        or any(input in consumer.outputs for input in producer.inputs)
+        or any(
+            output is not buffer and output in consumer.operands
+            for output in producer.outputs
+        )
+    ):
+        return None
+    output = list(producer.outputs).index(buffer)
+    kept_outputs = tuple(
+        i
+        for i in range(len(producer.outputs))
+        if i != output or not _is_temporary(buffer, producer, consumer)
+    )
+    return Fusion(producer, consumer, index, output, kept_outputs)
+
+
+def fusion_candidate(consumer: GenericOp) -> Fusion | None:
+    """The fusion of the producer of the first input of `consumer` that allows it."""
+    if not _is_parallel(consumer):
+        return None
+    for index, operand in enumerate(consumer.inputs):
+        if list(consumer.inputs).count(operand) != 1 or operand in consumer.outputs:
+            continue
+        if isinstance(operand.type, TensorType):
+            fusion = _tensor_fusion(consumer, index)
+        elif isinstance(operand.type, MemRefType):
+            fusion = _buffer_fusion(consumer, index)
+        else:
+            continue
+        if fusion is not None and fusion.is_legal():
+            return fusion
+    return None
+
+
+def _erase_fused_producer(fusion: Fusion, rewriter: PatternRewriter):
+    buffer = fusion.producer.outputs[fusion.output]
+    rewriter.erase_op(fusion.producer)
+    if isinstance(buffer.type, MemRefType) and fusion.output not in fusion.kept_outputs:
+        for use in tuple(buffer.uses):
+            rewriter.erase_op(use.operation)
+        rewriter.erase_op(cast(Operation, buffer.owner))
+
+
+class FuseLinalgGenericPattern(RewritePattern):
+    @op_type_rewrite_pattern
+    def match_and_rewrite(self, op: linalg.GenericOp, rewriter: PatternRewriter, /):
+        if (fusion := fusion_candidate(op)) is None:
+            return
+        producer = fusion.producer
+        assert isinstance(producer, linalg.GenericOp)
+
+        # Generics on buffers have no results
+        kept_results = (
+            tuple(producer.res[output] for output in fusion.kept_outputs)
+            if producer.res
+            else ()
+        )
+        fused = linalg.GenericOp(
+            fusion.inputs(),
+            fusion.outputs(),
+            fusion.body(),
+            fusion.indexing_maps(),
+            op.iterator_types,
+            (*op.res.types, *(result.type for result in kept_results)),
+            op.doc,
+            op.library_call,
+        )
+        rewriter.replace_matched_op(fused, fused.res[: len(op.res)])
+        for result, fused_result in zip(
+            kept_results, fused.res[len(op.res) :], strict=True
+        ):
+            result.replace_by(fused_result)
+        _erase_fused_producer(fusion, rewriter)
+
+
+class FuseMemRefStreamGenericPattern(RewritePattern):
+    @op_type_rewrite_pattern
+    def match_and_rewrite(
+        self, op: memref_stream.GenericOp, rewriter: PatternRewriter, /
+    ):
+        if (fusion := fusion_candidate(op)) is None:
+            return
+
+        fused = memref_stream.GenericOp(
+            fusion.inputs(),
+            fusion.outputs(),
+            (),
+            fusion.body(),
+            ArrayAttr(fusion.indexing_maps()),
+            op.iterator_types,
+            op.bounds,
+            op.init_indices,
+            op.doc,
+            op.library_call,
+        )
+        rewriter.replace_matched_op(fused)
+        _erase_fused_producer(fusion, rewriter)
+
+
+def tile_generic(
+    op: GenericOp, tile_sizes: Sequence[int], rewriter: PatternRewriter
+) -> bool:
+    """
+    Replace a parallel generic on buffers by a nest of loops over tiles of its
+    leading dimensions, and return whether it was tiled.
+
+    Dimensions with a tile size of 0, or that the tile size does not evenly divide,
+    are not tiled.
+    """
+    if not _is_parallel(op) or any(
+        isinstance(operand.type, TensorType) for operand in op.operands
+    ):
+        return False
+    bounds = _static_bounds(op)
+    if bounds is None:
+        return False
+    tiles = tuple(
+        tile if 0 < tile < bound and not bound % tile else bound
+        for tile, bound in zip(tuple(tile_sizes) + (0,) * len(bounds), bounds)
+    )
+    tiled_dims = tuple(dim for dim, tile in enumerate(tiles) if tile != bounds[dim])
+    if not tiled_dims:
+        return False
+
+    zero = arith.ConstantOp(IntegerAttr.from_index_int_value(0))
+    zero.result.name_hint = "c0"
+    constants: list[Operation] = [zero]
+    blocks = [Block(arg_types=(IndexType(),)) for _ in tiled_dims]
+    offsets: list[SSAValue] = [zero.result] * len(bounds)
+    for dim, block in zip(tiled_dims, blocks):
+        offsets[dim] = block.args[0]
+        block.args[0].name_hint = "i"
+
+    innermost_yield = scf.YieldOp()
+    blocks[-1].add_op(innermost_yield)
+    loc = InsertPoint.before(innermost_yield)
+    operands = tuple(
+        insert_subview(operand, m.data, offsets, tiles, loc)
+        if isinstance(operand.type, MemRefType)
+        else operand
+        for operand, m in zip((*op.inputs, *op.outputs), op.indexing_maps, strict=True)
+    )
+    inputs, outputs = operands[: len(op.inputs)], operands[len(op.inputs) :]
+    body = Rewriter.move_region_contents_to_new_regions(op.body)
+    if isinstance(op, memref_stream.GenericOp):
+        tiled_op = memref_stream.GenericOp(
+            inputs,
+            outputs,
+            (),
+            body,
+            op.indexing_maps,
+            op.iterator_types,
+            ArrayAttr(IntegerAttr.from_index_int_value(tile) for tile in tiles),
+            op.init_indices,
+            op.doc,
+            op.library_call,
+        )
+    else:
+        tiled_op = linalg.GenericOp(
+            inputs,
+            outputs,
+            body,
+            op.indexing_maps,
+            op.iterator_types,
+            (),
+            op.doc,
+            op.library_call,
+        )
+    Rewriter.insert_op(tiled_op, loc)
+
+    loop_bounds: list[tuple[SSAValue, SSAValue]] = []
+    for dim in tiled_dims:
+        ub = arith.ConstantOp(IntegerAttr.from_index_int_value(bounds[dim]))
+        step = arith.ConstantOp(IntegerAttr.from_index_int_value(tiles[dim]))
+        ub.result.name_hint = "ub"
+        step.result.name_hint = "step"
+        constants.extend((ub, step))
+        loop_bounds.append((ub.result, step.result))
+
+    loop: Operation | None = None
+    for (ub, step), block in reversed(tuple(zip(loop_bounds, blocks))):
+        if loop is not None:
+            block.add_ops((loop, scf.YieldOp()))
+        loop = scf.ForOp(zero, ub, step, (), Region(block))
+    assert loop is not None
+
+    rewriter.replace_matched_op((*constants, loop), ())
+    return True
+
+
+@dataclass(frozen=True)
+class TileLinalgGenericPattern(RewritePattern):
+    tile_sizes: tuple[int, ...]
+
+    @op_type_rewrite_pattern
+    def match_and_rewrite(self, op: linalg.GenericOp, rewriter: PatternRewriter, /):
+        tile_generic(op, self.tile_sizes, rewriter)
+
+
+@dataclass(frozen=True)
+class TileMemRefStreamGenericPattern(RewritePattern):
+    tile_sizes: tuple[int, ...]
+
+    @op_type_rewrite_pattern
+    def match_and_rewrite(
+        self, op: memref_stream.GenericOp, rewriter: PatternRewriter, /
+    ):
+        tile_generic(op, self.tile_sizes, rewriter)
+
+
+@dataclass(frozen=True)
+class LinalgFuseElementwisePass(ModulePass):
+    """
+    Fuses parallel `linalg.generic` operations into the parallel generics consuming
+    their output, and optionally tiles the result.
+    """
+
+    name = "linalg-fuse-elementwise"
+
+    tile_sizes: tuple[int, ...] | None = None
+    """
+    Sizes of the tiles of the leading dimensions of the fused generics on buffers,
+    0 leaves a dimension untiled
+    """
+
+    def apply(self, ctx: Context, op: ModuleOp) -> None:
+        PatternRewriteWalker(FuseLinalgGenericPattern()).rewrite_module(op)
+        if self.tile_sizes:
+            PatternRewriteWalker(
+                TileLinalgGenericPattern(self.tile_sizes), apply_recursively=False
+            ).rewrite_module(op)
+
+
+@dataclass(frozen=True)
+class MemRefStreamFuseElementwisePass(ModulePass):
+    """
+    Fuses parallel `memref_stream.generic` operations into the parallel generics
+    consuming their output, and optionally tiles the result.
+    """
+
+    name = "memref-stream-fuse-elementwise"
+
+    tile_sizes: tuple[int, ...] | None = None
+    """
+    Sizes of the tiles of the leading dimensions of the fused generics, 0 leaves a
+    dimension untiled
+    """
+
+    def apply(self, ctx: Context, op: ModuleOp) -> None:
+        PatternRewriteWalker(FuseMemRefStreamGenericPattern()).rewrite_module(op)
+        if self.tile_sizes:
+            PatternRewriteWalker(
+                TileMemRefStreamGenericPattern(self.tile_sizes),
+                apply_recursively=False,
+            ).rewrite_module(op)
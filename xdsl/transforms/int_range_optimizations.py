@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+
+from xdsl.analysis.dataflow import DataFlowSolver, DeadCodeAnalysis
+from xdsl.analysis.integer_range import IntegerRangeAnalysis
+from xdsl.context import Context
+from xdsl.dialects import builtin
+from xdsl.passes import ModulePass
+from xdsl.transforms.sccp import replace_with_constants
+
+
+@dataclass(frozen=True)
+class IntRangeOptimizationsPass(ModulePass):
+    """
+    Replaces integer SSA values whose range of possible values is a single value with
+    constants, such as comparisons whose result is known from the ranges of their
+    operands.
+    """
+
+    name = "int-range-optimizations"
+
+    def apply(self, ctx: Context, op: builtin.ModuleOp) -> None:
+        solver = DataFlowSolver()
+        solver.load(DeadCodeAnalysis(solver))
+        solver.load(IntegerRangeAnalysis(solver))
+        solver.initialize_and_run(op)
+        replace_with_constants(solver, op)
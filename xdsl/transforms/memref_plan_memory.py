@@ -0,0 +1,313 @@
+"""
+Statically plan the memory of the `memref.alloc` operations of each block.
+
+The lifetime of an allocation spans from the allocation to the last operation of the
+block that uses it, or one of its aliases. Allocations of the same block and memory
+space whose lifetimes do not overlap may then share memory. They are packed greedily,
+largest first, into a single arena of bytes, at the lowest offset that does not
+overlap the allocations already placed whose lifetimes overlap theirs, and replaced by
+`memref.view` operations into the arena.
+
+Only statically shaped allocations with an identity layout and an element type of
+known size are planned, and only if they do not escape their block through a
+terminator, or through an operation that derives a value other than a memref from
+them, such as a pointer. This is most useful for targets with small local memories, where the
+peak memory use of a kernel bounds the problem sizes it supports.
+"""
+
+import json
+from dataclasses import dataclass, field
+from math import prod
+
+from xdsl.context import Context
+from xdsl.dialects import affine, arith, builtin, linalg, memref, memref_stream, vector
+from xdsl.dialects.builtin import (
+    FixedBitwidthType,
+    IndexType,
+    IntegerAttr,
+    MemRefType,
+    NoneAttr,
+    StringAttr,
+    UnrankedMemRefType,
+    i8,
+)
+from xdsl.ir import Attribute, Block, Operation, SSAValue
+from xdsl.passes import ModulePass
+from xdsl.rewriter import InsertPoint, Rewriter
+from xdsl.traits import IsTerminator
+
+
+@dataclass
+class PlannedAllocation:
+    """An allocation of a block, and its place in the arena."""
+
+    op: memref.AllocOp
+    size: int
+    """Size in bytes."""
+    alignment: int
+    start: int
+    """Index in the block of the allocation."""
+    end: int
+    """Index in the block of the last operation using the allocation."""
+    deallocs: list[memref.DeallocOp]
+    offset: int = 0
+    """Offset in bytes in the arena."""
+
+    def overlaps(self, other: "PlannedAllocation") -> bool:
+        return self.start <= other.end and other.start <= self.end
+
+    def to_json(self) -> dict[str, int]:
+        return {
+            "size": self.size,
+            "offset": self.offset,
+            "start": self.start,
+            "end": self.end,
+        }
+
+
+@dataclass
+class MemoryPlan:
+    """The arena shared by the allocations of a block in a memory space."""
+
+    parent: str
+    """Name of the symbol containing the block."""
+    memory_space: Attribute
+    allocations: list[PlannedAllocation] = field(
+        default_factory=list[PlannedAllocation]
+    )
+
+    @property
+    def naive_bytes(self) -> int:
+        """Bytes used if every allocation has its own memory."""
+        return sum(alloc.size for alloc in self.allocations)
+
+    @property
+    def peak_bytes(self) -> int:
+        """Bytes used by the allocations live at the same time, at most."""
+        events = sorted(
+            [(alloc.start, alloc.size) for alloc in self.allocations]
+            + [(alloc.end + 1, -alloc.size) for alloc in self.allocations]
+        )
+        live = peak = 0
+        for _, size in events:
+            live += size
+            peak = max(peak, live)
+        return peak
+
+    @property
+    def arena_bytes(self) -> int:
+        """Size of the arena."""
+        return max((alloc.offset + alloc.size for alloc in self.allocations), default=0)
+
+    def pack(self):
+        """Assign offsets to the allocations, largest first."""
+        placed: list[PlannedAllocation] = []
+        for alloc in sorted(self.allocations, key=lambda a: (-a.size, a.start)):
+            offset = 0
+            for other in sorted(
+                (other for other in placed if other.overlaps(alloc)),
+                key=lambda a: a.offset,
+            ):
+                if offset + alloc.size <= other.offset:
+                    break
+                offset = max(offset, _align(other.offset + other.size, alloc.alignment))
+            alloc.offset = offset
+            placed.append(alloc)
+
+    def to_json(self) -> dict[str, object]:
+        return {
+            "parent": self.parent,
+            "memory_space": None
+            if isinstance(self.memory_space, NoneAttr)
+            else str(self.memory_space),
+            "naive_bytes": self.naive_bytes,
+            "peak_bytes": self.peak_bytes,
+            "arena_bytes": self.arena_bytes,
+            "saved_bytes": self.naive_bytes - self.arena_bytes,
+            "allocations": [alloc.to_json() for alloc in self.allocations],
+        }
+
+
+def _align(offset: int, alignment: int) -> int:
+    return -(-offset // alignment) * alignment
+
+
+_NON_CAPTURING_OPS = (
+    memref.LoadOp,
+    memref.DimOp,
+    memref.RankOp,
+    affine.LoadOp,
+    vector.LoadOp,
+    linalg.GenericOp,
+    memref_stream.GenericOp,
+)
+"""
+Operations that may derive values other than memrefs from their memref operands,
+without these values aliasing the memory of the operands.
+"""
+
+
+def _aliases_and_uses(value: SSAValue) -> list[Operation] | None:
+    """
+    All operations using `value`, or the memrefs derived from it, or None if another
+    value that may alias its memory is derived from it.
+    """
+    worklist = [value]
+    users: list[Operation] = []
+    while worklist:
+        for use in worklist.pop().uses:
+            user = use.operation
+            users.append(user)
+            for result in user.results:
+                if isinstance(result.type, MemRefType | UnrankedMemRefType):
+                    worklist.append(result)
+                elif not isinstance(user, _NON_CAPTURING_OPS):
+                    return None
+    return users
+
+
+def _ancestor_in_block(op: Operation, block: Block) -> Operation | None:
+    """The operation of `block` containing `op`, if any."""
+    ancestor: Operation | None = op
+    while ancestor is not None and ancestor.parent_block() is not block:
+        ancestor = ancestor.parent_op()
+    return ancestor
+
+
+def _parent_name(block: Block) -> str:
+    op = block.parent_op()
+    while op is not None:
+        if isinstance(sym_name := op.get_attr_or_prop("sym_name"), StringAttr):
+            return sym_name.data
+        op = op.parent_op()
+    return ""
+
+
+def _plan_allocation(
+    op: memref.AllocOp, block: Block, index: dict[Operation, int]
+) -> PlannedAllocation | None:
+    memref_type = op.memref.type
+    element_type = memref_type.get_element_type()
+    if (
+        op.dynamic_sizes
+        or op.symbol_operands
+        or not isinstance(memref_type.layout, NoneAttr)
+        or not isinstance(element_type, FixedBitwidthType)
+    ):
+        return None
+
+    end = index[op]
+    deallocs: list[memref.DeallocOp] = []
+    users = _aliases_and_uses(op.memref)
+    if users is None:
+        return None
+    for user in users:
+        if user.has_trait(IsTerminator):
+            return None
+        if isinstance(user, memref.DeallocOp):
+            deallocs.append(user)
+        ancestor = _ancestor_in_block(user, block)
+        if ancestor is None:
+            return None
+        end = max(end, index[ancestor])
+
+    alignment = element_type.size
+    if op.alignment is not None:
+        alignment = max(alignment, op.alignment.value.data)
+    return PlannedAllocation(
+        op,
+        prod(memref_type.get_shape()) * element_type.size,
+        alignment,
+        index[op],
+        end,
+        deallocs,
+    )
+
+
+def plan_block(block: Block) -> list[MemoryPlan]:
+    """Plan the allocations of a block, grouped by memory space."""
+    index = {op: i for i, op in enumerate(block.ops)}
+    plans: dict[Attribute, MemoryPlan] = {}
+    for op in block.ops:
+        if not isinstance(op, memref.AllocOp):
+            continue
+        alloc = _plan_allocation(op, block, index)
+        if alloc is None:
+            continue
+        memory_space = op.memref.type.memory_space
+        if memory_space not in plans:
+            plans[memory_space] = MemoryPlan(_parent_name(block), memory_space)
+        plans[memory_space].allocations.append(alloc)
+
+    for plan in plans.values():
+        plan.pack()
+    return list(plans.values())
+
+
+def _rewrite(plan: MemoryPlan, ops: list[Operation]):
+    """
+    Replace the allocations of `plan` by views of an arena, given the operations of
+    their block before any rewriting.
+    """
+    first = plan.allocations[0].op
+    last = ops[max(alloc.end for alloc in plan.allocations)]
+
+    alignment = None
+    if any(alloc.op.alignment is not None for alloc in plan.allocations):
+        alignment = max(alloc.alignment for alloc in plan.allocations)
+    arena = memref.AllocOp.get(
+        i8, alignment, [plan.arena_bytes], memory_space=plan.memory_space
+    )
+    Rewriter.insert_op(arena, InsertPoint.before(first))
+
+    # The arena is freed after its last use if any allocation was freed, as the
+    # deallocations of the allocations are erased
+    if any(alloc.deallocs for alloc in plan.allocations):
+        Rewriter.insert_op(memref.DeallocOp.get(arena), InsertPoint.after(last))
+
+    for alloc in plan.allocations:
+        offset = arith.ConstantOp(IntegerAttr(alloc.offset, IndexType()))
+        Rewriter.insert_op(offset, InsertPoint.before(alloc.op))
+        Rewriter.replace_op(
+            alloc.op, memref.ViewOp(arena, offset, (), alloc.op.memref.type)
+        )
+        for dealloc in alloc.deallocs:
+            Rewriter.erase_op(dealloc)
+
+
+@dataclass(frozen=True)
+class MemRefPlanMemoryPass(ModulePass):
+    """
+    Pack the `memref.alloc` operations of each block whose lifetimes do not overlap
+    into a single arena per memory space.
+
+    The plans of all blocks are written as a JSON list to `report`, if set.
+    """
+
+    name = "memref-plan-memory"
+
+    report: str | None = None
+    """
+    Path of the JSON report of the memory plans
+    """
+
+    def apply(self, ctx: Context, op: builtin.ModuleOp) -> None:
+        plans: list[MemoryPlan] = []
+        blocks = [
+            block
+            for region_op in op.walk()
+            for region in region_op.regions
+            for block in region.blocks
+        ]
+        for block in blocks:
+            ops = list(block.ops)
+            for plan in plan_block(block):
+                plans.append(plan)
+                # A single allocation, or allocations that are all live at once,
+                # cannot share memory
+                if plan.arena_bytes < plan.naive_bytes:
+                    _rewrite(plan, ops)
+
+        if self.report is not None:
+            with open(self.report, "w") as f:
+                json.dump([plan.to_json() for plan in plans], f, indent=2)
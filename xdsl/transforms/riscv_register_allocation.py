@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 
-from xdsl.backend.riscv.register_allocation import RegisterAllocatorLivenessBlockNaive
+from xdsl.backend.riscv.register_allocation import (
+    RegisterAllocatorLinearScan,
+    RegisterAllocatorLivenessBlockNaive,
+)
 from xdsl.backend.riscv.riscv_register_queue import RiscvRegisterQueue
 from xdsl.context import Context
 from xdsl.dialects import riscv_func
@@ -39,6 +42,7 @@ class RISCVRegisterAllocation(ModulePass):
     def apply(self, ctx: Context, op: ModuleOp) -> None:
         allocator_strategies = {
             "LivenessBlockNaive": RegisterAllocatorLivenessBlockNaive,
+            "LinearScan": RegisterAllocatorLinearScan,
         }
 
         if self.allocation_strategy not in allocator_strategies:
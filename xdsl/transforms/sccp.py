@@ -0,0 +1,113 @@
+"""
+Sparse conditional constant propagation, replacing SSA values that are constant in all
+executions of the program with constants.
+
+Unlike canonicalization, constants are propagated through the arguments of blocks and
+regions, and values computed in branches that are never taken do not prevent other
+values from being constant.
+"""
+
+from dataclasses import dataclass
+
+from xdsl.analysis.dataflow import (
+    ConstantValueLattice,
+    DataFlowSolver,
+    DeadCodeAnalysis,
+)
+from xdsl.analysis.sparse_constant_propagation import SparseConstantPropagation
+from xdsl.context import Context
+from xdsl.dialects import arith, builtin
+from xdsl.dialects.builtin import (
+    AnyFloat,
+    FloatAttr,
+    IndexType,
+    IntegerAttr,
+    IntegerType,
+    Signedness,
+)
+from xdsl.interpreter import Interpreter
+from xdsl.interpreters import register_implementations
+from xdsl.ir import Block, Operation, SSAValue
+from xdsl.passes import ModulePass
+from xdsl.rewriter import InsertPoint, Rewriter
+from xdsl.traits import ConstantLike
+from xdsl.transforms.dead_code_elimination import is_trivially_dead
+
+
+def _materialize_constant(solver: DataFlowSolver, value: SSAValue) -> Operation | None:
+    """
+    An `arith.constant` operation for the constant value of `value`, if the solver
+    found one that can be represented with `arith`.
+    """
+    if not value.uses:
+        return None
+    lattice = solver.lookup_state(value, ConstantValueLattice)
+    if lattice is None:
+        return None
+    constant = lattice.value.constant
+    match constant, value.type:
+        case IntegerAttr(), IndexType():
+            return arith.ConstantOp(constant, value.type)
+        case IntegerAttr(), IntegerType() if (
+            value.type.signedness.data == Signedness.SIGNLESS
+        ):
+            return arith.ConstantOp(constant, value.type)
+        case FloatAttr(), _ if isinstance(value.type, AnyFloat):
+            return arith.ConstantOp(constant, value.type)
+        case _:
+            return None
+
+
+def replace_with_constants(solver: DataFlowSolver, top: Operation) -> None:
+    """
+    Replace the SSA values nested in `top` that the solver found constant with
+    `arith.constant` operations, and erase the operations that become trivially dead.
+    """
+    replaced: list[Operation] = []
+    for op in top.walk():
+        if op is top or op.has_trait(ConstantLike):
+            continue
+        for result in op.results:
+            if (constant := _materialize_constant(solver, result)) is not None:
+                Rewriter.insert_op(constant, InsertPoint.before(op))
+                result.replace_by(constant.results[0])
+                replaced.append(op)
+        for region in op.regions:
+            for block in region.blocks:
+                _replace_arguments(solver, block)
+
+    # Erase nested operations before their parents
+    for op in reversed(dict.fromkeys(replaced)):
+        if is_trivially_dead(op):
+            Rewriter.erase_op(op)
+
+
+def _replace_arguments(solver: DataFlowSolver, block: Block) -> None:
+    for arg in block.args:
+        if (constant := _materialize_constant(solver, arg)) is not None:
+            Rewriter.insert_op(constant, InsertPoint.at_start(block))
+            arg.replace_by(constant.results[0])
+
+
+@dataclass(frozen=True)
+class SCCPPass(ModulePass):
+    """
+    Replaces SSA values that are constant in all executions of the program with
+    constants, using sparse conditional constant propagation.
+
+    The values of operations are computed with the interpreter, and branches whose
+    condition is constant are only explored in the direction that is taken. The
+    analysis is intraprocedural: the arguments of functions and the results of calls
+    are not constant.
+    """
+
+    name = "sccp"
+
+    def apply(self, ctx: Context, op: builtin.ModuleOp) -> None:
+        interpreter = Interpreter(op)
+        register_implementations(interpreter, ctx)
+        solver = DataFlowSolver()
+        solver.load(DeadCodeAnalysis(solver))
+        solver.load(SparseConstantPropagation(solver, interpreter))
+        solver.initialize_and_run(op)
+        replace_with_constants(solver, op)
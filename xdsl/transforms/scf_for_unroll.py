@@ -0,0 +1,418 @@
+"""
+Unroll `scf.for` loops, to expose instruction-level parallelism to scalar backends.
+
+Innermost loops with a positive constant step are unrolled by `factor`: the body of
+the loop is replicated for `factor` consecutive iterations, threading the values
+carried between iterations from one copy to the next. The iterations left over when
+the trip count is not a multiple of the factor are executed by the original loop,
+after the unrolled loop. Loops with a constant trip count are fully unrolled if
+`full` is set.
+
+With `jam`, loops whose body contains a single innermost loop are unrolled and
+jammed instead: the outer loop is unrolled, and the copies of the inner loop are
+fused into a single loop, so that the independent iterations of the outer loop are
+interleaved in the inner loop. This requires the outer loop not to carry values, the
+bounds of the inner loop to be invariant, and every memref stored to in the outer
+loop to be accessed at the same indices, one of which is the outer induction
+variable, so that the copies access disjoint elements.
+
+Each copy of the body keeps its values live at the same time as the other copies. If
+`target` is set, the unroll factor of a loop is reduced until the estimated number
+of live values fits in the registers the target allocates.
+"""
+
+from dataclasses import dataclass
+from typing import Literal
+
+from xdsl.backend.riscv.riscv_register_queue import RiscvRegisterQueue
+from xdsl.backend.x86.x86_register_queue import X86RegisterQueue
+from xdsl.context import Context
+from xdsl.dialects import arith, builtin, memref, scf
+from xdsl.dialects.builtin import (
+    AnyFloat,
+    IndexType,
+    IntegerAttr,
+    IntegerType,
+    VectorType,
+)
+from xdsl.ir import Attribute, Block, Operation, SSAValue
+from xdsl.passes import ModulePass
+from xdsl.rewriter import InsertPoint, Rewriter
+from xdsl.traits import is_side_effect_free
+from xdsl.transforms.canonicalization_patterns.utils import const_evaluate_operand
+
+
+@dataclass(frozen=True)
+class RegisterUse:
+    """Numbers of values held in integer and in floating-point registers."""
+
+    int_registers: int = 0
+    float_registers: int = 0
+
+    def __add__(self, other: "RegisterUse") -> "RegisterUse":
+        return RegisterUse(
+            self.int_registers + other.int_registers,
+            self.float_registers + other.float_registers,
+        )
+
+    def __sub__(self, other: "RegisterUse") -> "RegisterUse":
+        return RegisterUse(
+            self.int_registers - other.int_registers,
+            self.float_registers - other.float_registers,
+        )
+
+    def __mul__(self, factor: int) -> "RegisterUse":
+        return RegisterUse(self.int_registers * factor, self.float_registers * factor)
+
+    def fits(self, available: "RegisterUse") -> bool:
+        return (
+            self.int_registers <= available.int_registers
+            and self.float_registers <= available.float_registers
+        )
+
+
+TARGET_REGISTERS: dict[str, RegisterUse] = {
+    "riscv": RegisterUse(
+        len(RiscvRegisterQueue.DEFAULT_INT_REGISTERS),
+        len(RiscvRegisterQueue.DEFAULT_FLOAT_REGISTERS),
+    ),
+    "x86": RegisterUse(
+        len(X86RegisterQueue.DEFAULT_GENERAL_REGISTERS),
+        len(X86RegisterQueue.DEFAULT_VECTOR_REGISTERS),
+    ),
+}
+"""The registers available to the register allocator of each target."""
+
+
+def _register_use(value: SSAValue) -> RegisterUse:
+    if isinstance(value.type, AnyFloat | VectorType):
+        return RegisterUse(float_registers=1)
+    return RegisterUse(int_registers=1)
+
+
+def _is_defined_in(value: SSAValue, op: Operation) -> bool:
+    owner = value.owner
+    if isinstance(owner, Block):
+        parent = owner.parent_op()
+        return parent is not None and op.is_ancestor(parent)
+    return op.is_ancestor(owner)
+
+
+def estimate_register_use(loop: scf.ForOp) -> tuple[RegisterUse, RegisterUse]:
+    """
+    Estimate the registers used by the loop-invariant values of `loop`, and the most
+    registers used at once by the values of a single iteration.
+
+    The nested operations of the body are considered in order, and each value is live
+    from its definition to its last use. The operands of an operation stop being live
+    before its results are defined, so that they may share registers.
+    """
+    # The operands of the k-th operation die at 2k, and its results are defined at
+    # 2k + 1
+    defined: dict[SSAValue, int] = dict.fromkeys(loop.body.block.args, -1)
+    last_use: dict[SSAValue, int] = {}
+    invariant = RegisterUse()
+    invariants: set[SSAValue] = set()
+    for index, op in enumerate(loop.body.walk()):
+        for operand in op.operands:
+            if _is_defined_in(operand, loop):
+                last_use[operand] = 2 * index
+            elif operand not in invariants:
+                invariants.add(operand)
+                invariant += _register_use(operand)
+        for region in op.regions:
+            for block in region.blocks:
+                defined.update(dict.fromkeys(block.args, 2 * index + 1))
+        defined.update(dict.fromkeys(op.results, 2 * index + 1))
+
+    events: list[tuple[int, RegisterUse]] = []
+    for value, end in last_use.items():
+        events.append((defined[value], _register_use(value)))
+        events.append((end, RegisterUse() - _register_use(value)))
+    peak = live = RegisterUse()
+    for _, use in sorted(events, key=lambda event: event[0]):
+        live += use
+        peak = RegisterUse(
+            max(peak.int_registers, live.int_registers),
+            max(peak.float_registers, live.float_registers),
+        )
+    return invariant, peak
+
+
+def register_capped_factor(loop: scf.ForOp, factor: int, available: RegisterUse) -> int:
+    """
+    The largest unroll factor of `loop` up to `factor` whose copies of the body are
+    estimated to fit in the `available` registers, and at least 1.
+    """
+    invariant, iteration = estimate_register_use(loop)
+    while factor > 1 and not (invariant + iteration * factor).fits(available):
+        factor -= 1
+    return factor
+
+
+def _constant(value: int, type: Attribute) -> arith.ConstantOp:
+    """A constant of the type of an induction variable, an index or an integer."""
+    assert isinstance(type, IndexType | IntegerType)
+    return arith.ConstantOp(IntegerAttr(value, type))
+
+
+def _trip_count(loop: scf.ForOp, step: int) -> int | None:
+    lb = const_evaluate_operand(loop.lb)
+    ub = const_evaluate_operand(loop.ub)
+    if lb is None or ub is None:
+        return None
+    return max(0, -(-(ub - lb) // step))
+
+
+def _copy_ivs(
+    iv: SSAValue, step: int, factor: int, block: Block, lb: int | None
+) -> list[SSAValue]:
+    """
+    The induction variables of the copies of an unrolled body, added to `block`, and
+    constant if the body is executed once from `lb`.
+    """
+    ivs = [iv]
+    for copy in range(1, factor):
+        if lb is not None:
+            copy_iv = _constant(lb + copy * step, iv.type)
+            block.add_op(copy_iv)
+        else:
+            offset = _constant(copy * step, iv.type)
+            copy_iv = arith.AddiOp(iv, offset)
+            block.add_ops((offset, copy_iv))
+        ivs.append(copy_iv.result)
+    return ivs
+
+
+def _clone_ops(ops: list[Operation], mapping: dict[SSAValue, SSAValue], block: Block):
+    for op in ops:
+        block.add_op(op.clone(value_mapper=mapping))
+
+
+def _body_ops(block: Block) -> list[Operation]:
+    """The operations of a loop body, without its terminator."""
+    return [op for op in block.ops if op is not block.last_op]
+
+
+def _yielded(block: Block) -> tuple[SSAValue, ...]:
+    yield_op = block.last_op
+    assert isinstance(yield_op, scf.YieldOp)
+    return tuple(yield_op.operands)
+
+
+def unrolled_body(
+    loop: scf.ForOp, step: int, factor: int, lb: int | None = None
+) -> Block:
+    """
+    The body of `loop` repeated for `factor` consecutive iterations, which is
+    executed once if `lb` is set.
+    """
+    body = loop.body.block
+    block = Block(arg_types=body.arg_types)
+    for arg, new_arg in zip(body.args, block.args):
+        new_arg.name_hint = arg.name_hint
+    ivs = _copy_ivs(block.args[0], step, factor, block, lb)
+    carried: tuple[SSAValue, ...] = block.args[1:]
+    for iv in ivs:
+        mapping = {body.args[0]: iv, **dict(zip(body.args[1:], carried))}
+        _clone_ops(_body_ops(body), mapping, block)
+        carried = tuple(mapping.get(value, value) for value in _yielded(body))
+    block.add_op(scf.YieldOp(*carried))
+    return block
+
+
+def jammable_inner_loop(loop: scf.ForOp) -> scf.ForOp | None:
+    """
+    The inner loop of `loop` if `loop` can be unrolled and jammed into it, or None.
+    """
+    if loop.iter_args:
+        return None
+    inner_loops = [op for op in loop.body.block.ops if op.regions]
+    if len(inner_loops) != 1 or not isinstance(inner := inner_loops[0], scf.ForOp):
+        return None
+    if any(op.regions for op in inner.body.block.ops):
+        return None
+    if any(_is_defined_in(bound, loop) for bound in (inner.lb, inner.ub, inner.step)):
+        return None
+
+    accesses: dict[SSAValue, set[tuple[SSAValue, ...]]] = {}
+    stored: set[SSAValue] = set()
+    for op in loop.body.walk():
+        if isinstance(op, memref.LoadOp | memref.StoreOp):
+            accesses.setdefault(op.memref, set()).add(tuple(op.indices))
+            if isinstance(op, memref.StoreOp):
+                stored.add(op.memref)
+        elif not isinstance(op, scf.ForOp | scf.YieldOp) and not is_side_effect_free(
+            op
+        ):
+            return None
+    iv = loop.body.block.args[0]
+    for value in stored:
+        if len(accesses[value]) != 1 or iv not in next(iter(accesses[value])):
+            return None
+    return inner
+
+
+def jammed_body(
+    loop: scf.ForOp, inner: scf.ForOp, step: int, factor: int, lb: int | None = None
+) -> Block:
+    """
+    The body of `loop` repeated for `factor` consecutive iterations, with the copies
+    of `inner` fused into one loop, which is executed once if `lb` is set.
+    """
+    body = loop.body.block
+    block = Block(arg_types=body.arg_types)
+    block.args[0].name_hint = body.args[0].name_hint
+    ivs = _copy_ivs(block.args[0], step, factor, block, lb)
+    mappings = [{body.args[0]: iv} for iv in ivs]
+
+    ops = _body_ops(body)
+    before_inner, after_inner = ops[: ops.index(inner)], ops[ops.index(inner) + 1 :]
+    for mapping in mappings:
+        _clone_ops(before_inner, mapping, block)
+
+    inner_body = inner.body.block
+    carried_count = len(inner.iter_args)
+    inits = [
+        mapping.get(value, value) for mapping in mappings for value in inner.iter_args
+    ]
+    new_inner_body = Block(
+        arg_types=[inner_body.args[0].type, *(init.type for init in inits)]
+    )
+    for arg, new_arg in zip(
+        inner_body.args[1:] * factor, new_inner_body.args[1:], strict=True
+    ):
+        new_arg.name_hint = arg.name_hint
+    new_inner_body.args[0].name_hint = inner_body.args[0].name_hint
+    yielded: list[SSAValue] = []
+    for copy, mapping in enumerate(mappings):
+        args = new_inner_body.args[
+            1 + copy * carried_count : 1 + (copy + 1) * carried_count
+        ]
+        mapping[inner_body.args[0]] = new_inner_body.args[0]
+        mapping.update(zip(inner_body.args[1:], args))
+        _clone_ops(_body_ops(inner_body), mapping, new_inner_body)
+        yielded.extend(mapping.get(value, value) for value in _yielded(inner_body))
+    new_inner_body.add_op(scf.YieldOp(*yielded))
+    new_inner = scf.ForOp(inner.lb, inner.ub, inner.step, inits, new_inner_body)
+    for result, new_result in zip(inner.results * factor, new_inner.results):
+        new_result.name_hint = result.name_hint
+    block.add_op(new_inner)
+
+    for copy, mapping in enumerate(mappings):
+        results = new_inner.results[copy * carried_count : (copy + 1) * carried_count]
+        mapping.update(zip(inner.results, results))
+        _clone_ops(after_inner, mapping, block)
+    block.add_op(scf.YieldOp())
+    return block
+
+
+def unroll_loop(
+    loop: scf.ForOp,
+    factor: int,
+    full: bool = False,
+    jam: bool = False,
+    available: RegisterUse | None = None,
+) -> bool:
+    """
+    Unroll `loop` by `factor`, or fully if `full` is set and the trip count is
+    constant, and unroll and jam it into its inner loop if `jam` is set. Return
+    whether the loop was unrolled.
+    """
+    step = const_evaluate_operand(loop.step)
+    if step is None or step <= 0:
+        return False
+    inner = jammable_inner_loop(loop) if jam else None
+    if jam and inner is None:
+        return False
+
+    trip_count = _trip_count(loop, step)
+    if full and trip_count is not None:
+        factor = trip_count
+    if available is not None:
+        factor = register_capped_factor(loop, factor, available)
+    if trip_count is not None:
+        factor = min(factor, trip_count)
+    if factor < 2:
+        return False
+
+    lb = const_evaluate_operand(loop.lb) if trip_count == factor else None
+    if inner is not None:
+        block = jammed_body(loop, inner, step, factor, lb)
+    else:
+        block = unrolled_body(loop, step, factor, lb)
+    before_loop = InsertPoint.before(loop)
+
+    if trip_count == factor:
+        # The unrolled body executes once, and is inlined
+        yield_op = block.last_op
+        assert isinstance(yield_op, scf.YieldOp)
+        arg_values = (loop.lb, *loop.iter_args)
+        values = dict(zip(block.args, arg_values))
+        results = [values.get(value, value) for value in yield_op.operands]
+        Rewriter.erase_op(yield_op)
+        Rewriter.inline_block(block, before_loop, arg_values)
+        Rewriter.replace_op(loop, [], results)
+        return True
+
+    chunk = _constant(step * factor, loop.lb.type)
+    if trip_count is not None:
+        lb = const_evaluate_operand(loop.lb)
+        assert lb is not None
+        split = _constant(lb + trip_count // factor * factor * step, loop.lb.type)
+        Rewriter.insert_op((chunk, split), before_loop)
+    else:
+        span = arith.SubiOp(loop.ub, loop.lb)
+        remainder = arith.RemSIOp(span, chunk)
+        split = arith.SubiOp(loop.ub, remainder)
+        Rewriter.insert_op((chunk, span, remainder, split), before_loop)
+
+    unrolled = scf.ForOp(loop.lb, split, chunk, loop.iter_args, block)
+    Rewriter.insert_op(unrolled, before_loop)
+    if trip_count is not None and not trip_count % factor:
+        Rewriter.replace_op(loop, [], unrolled.results)
+    else:
+        loop.operands = [split.results[0], loop.ub, loop.step, *unrolled.results]
+    return True
+
+
+@dataclass(frozen=True)
+class ScfForUnrollPass(ModulePass):
+    """
+    Unroll the innermost `scf.for` loops, or unroll and jam perfectly nested loops
+    into their inner loop, optionally capping the factor by the registers of a target.
+    """
+
+    name = "scf-for-unroll"
+
+    factor: int = 4
+    """
+    Number of iterations of the original loop in each iteration of the unrolled loop
+    """
+
+    full: bool = False
+    """
+    Whether to fully unroll loops with a constant trip count
+    """
+
+    jam: bool = False
+    """
+    Whether to unroll and jam loops into their inner loop, instead of unrolling
+    innermost loops
+    """
+
+    target: Literal["riscv", "x86"] | None = None
+    """
+    Target whose registers must fit the values of the unrolled copies
+    """
+
+    def apply(self, ctx: Context, op: builtin.ModuleOp) -> None:
+        available = None if self.target is None else TARGET_REGISTERS[self.target]
+        loops = [
+            loop
+            for loop in op.walk()
+            if isinstance(loop, scf.ForOp)
+            and (self.jam or not any(op.regions for op in loop.body.block.ops))
+        ]
+        for loop in loops:
+            unroll_loop(loop, self.factor, self.full, self.jam, available)
@@ -0,0 +1,456 @@
+"""
+Vectorize innermost `scf.for` loops into operations of the `vector` dialect.
+
+A loop over indices with a unit step is vectorized by `vector_width` if its body only
+contains `arith` constants, elementwise `arith` operations, and `memref` loads and
+stores whose innermost index is the induction variable, possibly offset by a
+loop-invariant value, and whose other indices are loop-invariant. These accesses are contiguous, and become
+`vector.load` and `vector.store` operations. Loop-invariant values are computed once
+per vector iteration and broadcast to the vectors that use them.
+
+Loop-carried values are supported if they are reductions: each iteration combines
+them with a single `arith.addi`, `arith.muli`, `arith.addf`, `arith.mulf`,
+`arith.maximumf` or `arith.minimumf`, whose result is yielded. The vector loop
+accumulates a vector of partial results, which are combined after the loop. As this
+reassociates the reduction, floating-point reductions are only vectorized if their
+operation has the `reassoc` fast-math flag. Floating-point multiplications whose only
+use is an addition are contracted to `vector.fma` if both have the `contract` flag.
+
+The iterations left over when the trip count is not a multiple of the vector width
+are executed by the original scalar loop, after the vector loop.
+
+Accesses to distinct memrefs are assumed not to alias. Accesses to a memref stored to
+in the loop must all use the same indices, so that there is no dependence between
+iterations.
+
+Affine loops and linalg operations can be vectorized after lowering them to `scf.for`
+loops with `lower-affine` and `convert-linalg-to-loops`.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from xdsl.context import Context
+from xdsl.dialects import arith, builtin, memref, scf, vector
+from xdsl.dialects.builtin import (
+    AnyFloat,
+    FloatAttr,
+    IndexType,
+    IntegerAttr,
+    IntegerType,
+    MemRefType,
+    NoneAttr,
+    VectorType,
+)
+from xdsl.dialects.utils import FastMathFlag
+from xdsl.ir import Attribute, Block, Operation, SSAValue
+from xdsl.passes import ModulePass
+from xdsl.rewriter import InsertPoint, Rewriter
+from xdsl.transforms.canonicalization_patterns.utils import const_evaluate_operand
+
+ELEMENTWISE_OPS: tuple[type[Operation], ...] = (
+    arith.AddfOp,
+    arith.SubfOp,
+    arith.MulfOp,
+    arith.DivfOp,
+    arith.NegfOp,
+    arith.MaximumfOp,
+    arith.MinimumfOp,
+    arith.AddiOp,
+    arith.SubiOp,
+    arith.MuliOp,
+)
+"""The operations applied lane by lane to vectors."""
+
+REDUCTION_NEUTRAL_ELEMENTS: dict[type[Operation], float] = {
+    arith.AddfOp: 0.0,
+    arith.MulfOp: 1.0,
+    arith.MaximumfOp: float("-inf"),
+    arith.MinimumfOp: float("inf"),
+    arith.AddiOp: 0,
+    arith.MuliOp: 1,
+}
+"""The operations combining reductions, and their neutral elements."""
+
+
+def _has_flag(op: Operation, flag: FastMathFlag) -> bool:
+    fastmath = op.get_attr_or_prop("fastmath")
+    return isinstance(fastmath, arith.FastMathFlagsAttr) and flag in fastmath.flags
+
+
+@dataclass(frozen=True)
+class Reduction:
+    """A loop-carried value combined with the same operation in each iteration."""
+
+    index: int
+    """Index of the value in the iteration arguments of the loop."""
+    combiner: Operation
+
+    def neutral_element(self) -> Operation:
+        value_type = self.combiner.results[0].type
+        value = REDUCTION_NEUTRAL_ELEMENTS[type(self.combiner)]
+        if isinstance(value_type, AnyFloat):
+            return arith.ConstantOp(FloatAttr(value, value_type))
+        assert isinstance(value_type, IntegerType | IndexType)
+        return arith.ConstantOp(IntegerAttr(int(value), value_type))
+
+    def combine(self, lhs: SSAValue, rhs: SSAValue) -> Operation:
+        return type(self.combiner).create(
+            operands=[lhs, rhs],
+            result_types=[lhs.type],
+            properties=dict(self.combiner.properties),
+            attributes=dict(self.combiner.attributes),
+        )
+
+
+def _reduction(loop: scf.ForOp, index: int) -> Reduction | None:
+    arg = loop.body.block.args[index + 1]
+    yielded = loop.body.block.last_op
+    assert isinstance(yielded, scf.YieldOp)
+    if len(arg.uses) != 1:
+        return None
+    combiner = next(iter(arg.uses)).operation
+    if (
+        type(combiner) not in REDUCTION_NEUTRAL_ELEMENTS
+        or combiner.parent_block() is not loop.body.block
+        or combiner.results[0] is not yielded.operands[index]
+        or len(combiner.results[0].uses) != 1
+    ):
+        return None
+    if isinstance(arg.type, AnyFloat) and not _has_flag(combiner, FastMathFlag.REASSOC):
+        return None
+    return Reduction(index, combiner)
+
+
+@dataclass
+class LoopVectorization:
+    """The analysis of a loop, classifying the values its body defines."""
+
+    loop: scf.ForOp
+    reductions: list[Reduction] = field(default_factory=list[Reduction])
+    linear: set[SSAValue] = field(default_factory=set[SSAValue])
+    """Values of the body equal to the induction variable plus an invariant."""
+    varying: set[SSAValue] = field(default_factory=set[SSAValue])
+    """Values of the body that become vectors."""
+    contractions: dict[Operation, Operation] = field(
+        default_factory=dict[Operation, Operation]
+    )
+    """The additions contracted to a fused multiply-add, and their multiplication."""
+
+    def is_uniform(self, value: SSAValue) -> bool:
+        """Whether `value` is the same in all iterations."""
+        return value not in self.linear and value not in self.varying
+
+    def _is_contiguous(self, indices: tuple[SSAValue, ...]) -> bool:
+        return bool(indices) and (
+            indices[-1] in self.linear
+            and all(self.is_uniform(index) for index in indices[:-1])
+        )
+
+    def _classify(self, op: Operation) -> bool:
+        """Classify the results of `op`, or return False if it is not vectorizable."""
+        match op:
+            case arith.ConstantOp():
+                pass
+            case memref.LoadOp() | memref.StoreOp():
+                if not self.is_uniform(op.memref):
+                    return False
+                memref_type = op.memref.type
+                if not isinstance(memref_type, MemRefType) or not isinstance(
+                    memref_type.layout, NoneAttr
+                ):
+                    return False
+                indices = tuple(op.indices)
+                if isinstance(op, memref.StoreOp):
+                    return self._is_contiguous(indices) and (
+                        op.value not in self.linear
+                    )
+                if self._is_contiguous(indices):
+                    self.varying.add(op.res)
+                elif not all(self.is_uniform(index) for index in indices):
+                    return False
+            case _ if isinstance(op, ELEMENTWISE_OPS):
+                operands = op.operands
+                if any(operand in self.linear for operand in operands):
+                    # Only offsets of the induction variable by invariants are
+                    # supported as indices
+                    if not (
+                        isinstance(op, arith.AddiOp | arith.SubiOp)
+                        and op.lhs in self.linear
+                        and self.is_uniform(op.rhs)
+                    ) and not (
+                        isinstance(op, arith.AddiOp)
+                        and op.rhs in self.linear
+                        and self.is_uniform(op.lhs)
+                    ):
+                        return False
+                    self.linear.update(op.results)
+                elif not all(self.is_uniform(operand) for operand in operands):
+                    self.varying.update(op.results)
+            case _:
+                return False
+        return True
+
+    def _linear_uses_are_indices(self) -> bool:
+        for value in self.linear:
+            for use in value.uses:
+                user = use.operation
+                if isinstance(user, memref.LoadOp | memref.StoreOp):
+                    if use.index != len(user.operands) - 1:
+                        return False
+                elif not user.results or user.results[0] not in self.linear:
+                    return False
+        return True
+
+    def _has_loop_carried_dependences(self) -> bool:
+        """
+        Check whether an element of a memref stored to may be accessed by another
+        iteration, in which case the order of iterations matters.
+        """
+        accesses: dict[SSAValue, set[tuple[SSAValue, ...]]] = {}
+        stored: set[SSAValue] = set()
+        for op in self.loop.body.block.ops:
+            if isinstance(op, memref.LoadOp | memref.StoreOp):
+                accesses.setdefault(op.memref, set()).add(tuple(op.indices))
+                if isinstance(op, memref.StoreOp):
+                    stored.add(op.memref)
+        return any(len(accesses[value]) > 1 for value in stored)
+
+    def _find_contractions(self):
+        for op in self.loop.body.block.ops:
+            if not isinstance(op, arith.AddfOp) or op.result not in self.varying:
+                continue
+            for operand in op.operands:
+                mul = operand.owner
+                if (
+                    isinstance(mul, arith.MulfOp)
+                    and mul.result in self.varying
+                    and len(mul.result.uses) == 1
+                    and _has_flag(op, FastMathFlag.ALLOW_CONTRACT)
+                    and _has_flag(mul, FastMathFlag.ALLOW_CONTRACT)
+                ):
+                    self.contractions[op] = mul
+                    break
+
+    @staticmethod
+    def analyze(loop: scf.ForOp) -> "LoopVectorization | None":
+        """The analysis of `loop`, or None if it cannot be vectorized."""
+        if const_evaluate_operand(loop.step) != 1:
+            return None
+        if not isinstance(loop.body.block.args[0].type, IndexType):
+            # Only loops over indices have contiguous accesses
+            return None
+        analysis = LoopVectorization(loop)
+        block = loop.body.block
+        analysis.linear.add(block.args[0])
+        for index, arg in enumerate(block.args[1:]):
+            if (reduction := _reduction(loop, index)) is None:
+                return None
+            analysis.reductions.append(reduction)
+            analysis.varying.add(arg)
+
+        for op in block.ops:
+            if op is block.last_op:
+                break
+            if not analysis._classify(op):
+                return None
+
+        if not analysis._linear_uses_are_indices():
+            return None
+        if analysis._has_loop_carried_dependences():
+            return None
+        analysis._find_contractions()
+        return analysis
+
+
+@dataclass
+class _VectorBodyBuilder:
+    """Builds the body of the vector loop, mapping the values of the scalar body."""
+
+    analysis: LoopVectorization
+    width: int
+    block: Block
+    hoisted: InsertPoint
+    """Where broadcasts of values defined outside the loop are inserted."""
+    values: dict[SSAValue, SSAValue] = field(default_factory=dict[SSAValue, SSAValue])
+    broadcasts: dict[SSAValue, SSAValue] = field(
+        default_factory=dict[SSAValue, SSAValue]
+    )
+
+    def vector_type(self, element_type: Attribute) -> VectorType[Attribute]:
+        return VectorType(element_type, [self.width])
+
+    def vector(self, value: SSAValue) -> SSAValue:
+        """The vector of `value` in the vector loop, broadcasting invariants."""
+        if value in self.analysis.varying:
+            return self.values[value]
+        if value in self.broadcasts:
+            return self.broadcasts[value]
+        broadcast = vector.BroadcastOp.build(
+            operands=[self.values.get(value, value)],
+            result_types=[self.vector_type(value.type)],
+        )
+        if value in self.values:
+            self.block.add_op(broadcast)
+        else:
+            Rewriter.insert_op(broadcast, self.hoisted)
+        self.broadcasts[value] = broadcast.vector
+        return broadcast.vector
+
+    def scalars(self, values: Sequence[SSAValue]) -> list[SSAValue]:
+        return [self.values.get(value, value) for value in values]
+
+    def add(self, op: Operation):
+        analysis = self.analysis
+        match op:
+            case memref.LoadOp() if op.res in analysis.varying:
+                new_op = vector.LoadOp.build(
+                    operands=[op.memref, self.scalars(op.indices)],
+                    result_types=[self.vector_type(op.res.type)],
+                )
+            case memref.StoreOp():
+                new_op = vector.StoreOp.get(
+                    self.vector(op.value), op.memref, self.scalars(op.indices)
+                )
+            case _ if any(result in analysis.varying for result in op.results):
+                if op in analysis.contractions.values():
+                    # Emitted with the addition it is contracted into
+                    return
+                if (mul := analysis.contractions.get(op)) is not None:
+                    (acc,) = (
+                        operand
+                        for operand in op.operands
+                        if operand is not mul.results[0]
+                    )
+                    new_op = vector.FMAOp.build(
+                        operands=[
+                            self.vector(mul.operands[0]),
+                            self.vector(mul.operands[1]),
+                            self.vector(acc),
+                        ],
+                        result_types=[self.vector_type(op.results[0].type)],
+                    )
+                else:
+                    new_op = type(op).create(
+                        operands=[self.vector(operand) for operand in op.operands],
+                        result_types=[
+                            self.vector_type(result.type) for result in op.results
+                        ],
+                        properties=dict(op.properties),
+                        attributes=dict(op.attributes),
+                    )
+            case _:
+                self.block.add_op(op.clone(value_mapper=self.values))
+                return
+        self.block.add_op(new_op)
+        self.values.update(zip(op.results, new_op.results))
+
+
+def _constant_index(value: int) -> arith.ConstantOp:
+    return arith.ConstantOp(IntegerAttr(value, IndexType()))
+
+
+def _split_point(
+    loop: scf.ForOp, step: arith.ConstantOp
+) -> tuple[list[Operation], bool] | None:
+    """
+    The operations computing the end of the vector loop of the given step, and
+    whether the scalar loop is left with no iterations, or None if the loop is too
+    short to vectorize.
+    """
+    width = step.value
+    assert isinstance(width, IntegerAttr)
+    lb = const_evaluate_operand(loop.lb)
+    ub = const_evaluate_operand(loop.ub)
+    if lb is not None and ub is not None:
+        if ub - lb < width.value.data:
+            return None
+        remainder = (ub - lb) % width.value.data
+        return [_constant_index(ub - remainder)], not remainder
+    trip_count = arith.SubiOp(loop.ub, loop.lb)
+    remainder = arith.RemSIOp(trip_count, step)
+    return [trip_count, remainder, arith.SubiOp(loop.ub, remainder)], False
+
+
+def vectorize_loop(loop: scf.ForOp, width: int) -> bool:
+    """
+    Vectorize `loop` by `width`, keeping it for the remaining iterations. Return
+    whether the loop was vectorized.
+    """
+    if (analysis := LoopVectorization.analyze(loop)) is None:
+        return False
+    step = _constant_index(width)
+    if (split := _split_point(loop, step)) is None:
+        return False
+    split_ops, scalar_loop_is_empty = split
+    split_point = split_ops[-1].results[0]
+
+    before_loop = InsertPoint.before(loop)
+    Rewriter.insert_op([step, *split_ops], before_loop)
+
+    inits: list[SSAValue] = []
+    for reduction in analysis.reductions:
+        neutral = reduction.neutral_element()
+        init = vector.BroadcastOp.build(
+            operands=[neutral],
+            result_types=[VectorType(neutral.results[0].type, [width])],
+        )
+        Rewriter.insert_op([neutral, init], before_loop)
+        inits.append(init.vector)
+
+    block = Block(arg_types=[IndexType(), *(init.type for init in inits)])
+    builder = _VectorBodyBuilder(analysis, width, block, before_loop)
+    builder.values.update(zip(loop.body.block.args, block.args))
+    for arg, new_arg in zip(loop.body.block.args, block.args):
+        new_arg.name_hint = arg.name_hint
+    for op in loop.body.block.ops:
+        if op is loop.body.block.last_op:
+            break
+        builder.add(op)
+    yielded = loop.body.block.last_op
+    assert isinstance(yielded, scf.YieldOp)
+    block.add_op(scf.YieldOp(*(builder.values[value] for value in yielded.operands)))
+
+    vector_loop = scf.ForOp(loop.lb, split_point, step, inits, block)
+    Rewriter.insert_op(vector_loop, before_loop)
+
+    # Combine the partial results of each lane with the initial value
+    scalar_inits: list[SSAValue] = []
+    for reduction, partial, init in zip(
+        analysis.reductions, vector_loop.results, loop.iter_args, strict=True
+    ):
+        value = init
+        for lane in range(width):
+            position = _constant_index(lane)
+            element = vector.ExtractElementOp(partial, position)
+            combined = reduction.combine(value, element.result)
+            Rewriter.insert_op([position, element, combined], before_loop)
+            value = combined.results[0]
+        scalar_inits.append(value)
+
+    if scalar_loop_is_empty:
+        Rewriter.replace_op(loop, [], scalar_inits)
+    else:
+        loop.operands = [split_point, loop.ub, loop.step, *scalar_inits]
+    return True
+
+
+@dataclass(frozen=True)
+class ScfForVectorizePass(ModulePass):
+    """
+    Vectorize the innermost `scf.for` loops over memrefs, executing the iterations
+    left over by the vector loop in the original scalar loop.
+    """
+
+    name = "scf-for-vectorize"
+
+    vector_width: int = 4
+    """
+    Number of elements of the vectors
+    """
+
+    def apply(self, ctx: Context, op: builtin.ModuleOp) -> None:
+        if self.vector_width < 2:
+            return
+        for loop in [loop for loop in op.walk() if isinstance(loop, scf.ForOp)]:
+            vectorize_loop(loop, self.vector_width)
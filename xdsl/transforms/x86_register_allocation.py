@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+
+from xdsl.backend.x86.register_allocation import RegisterAllocatorLivenessBlockNaive
+from xdsl.backend.x86.x86_register_queue import X86RegisterQueue
+from xdsl.context import Context
+from xdsl.dialects import x86_func
+from xdsl.dialects.builtin import ModuleOp
+from xdsl.passes import ModulePass
+
+
+@dataclass(frozen=True)
+class X86RegisterAllocation(ModulePass):
+    """
+    Allocates unallocated registers in the module.
+    """
+
+    name = "x86-allocate-registers"
+
+    allocation_strategy: str = "LivenessBlockNaive"
+
+    limit_registers: int | None = None
+
+    exclude_preallocated: bool = True
+    """
+    Enables tracking of already allocated registers and excludes them from the
+    available set.
+    This does not keep track of any liveness information and the preallocated registers
+    are excluded completely from any further allocation decisions.
+    """
+
+    def apply(self, ctx: Context, op: ModuleOp) -> None:
+        allocator_strategies = {
+            "LivenessBlockNaive": RegisterAllocatorLivenessBlockNaive,
+        }
+
+        if self.allocation_strategy not in allocator_strategies:
+            raise ValueError(
+                f"Unknown register allocation strategy {self.allocation_strategy}. "
+                f"Available allocation types: {allocator_strategies.keys()}"
+            )
+
+        if self.limit_registers is not None and self.limit_registers < 0:
+            raise ValueError(
+                "The limit of available registers cannot be less than 0."
+                "When set to 0 it signifies all available registers are used."
+            )
+
+        for inner_op in op.walk():
+            if isinstance(inner_op, x86_func.FuncOp):
+                x86_register_queue = X86RegisterQueue.default()
+                if self.limit_registers is not None:
+                    x86_register_queue.limit_registers(self.limit_registers)
+                allocator = allocator_strategies[self.allocation_strategy](
+                    x86_register_queue
+                )
+                allocator.exclude_preallocated = self.exclude_preallocated
+                allocator.allocate_func(inner_op)
@@ -0,0 +1,100 @@
+"""
+A content-addressed on-disk cache of compilation outputs, shared between
+invocations of a tool.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable
+from typing import IO
+
+
+class CompilationCache:
+    """
+    A directory of cached outputs, each stored in a file named after the hash of
+    everything that influenced it.
+
+    Every entry holds what was printed to stdout and what was written to the output
+    stream. When the total size of the entries exceeds `max_size` bytes, the least
+    recently used ones are evicted.
+    """
+
+    directory: str
+    """The directory the entries are stored in."""
+
+    max_size: int
+    """The maximum total size of the entries, in bytes."""
+
+    SUFFIX = ".xdslcache"
+
+    def __init__(self, directory: str, max_size: int = 1 << 28):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(parts: Iterable[str]) -> str:
+        """Return the key of an entry from the strings that determine its contents."""
+        hasher = hashlib.sha256()
+        for part in parts:
+            encoded = part.encode()
+            hasher.update(len(encoded).to_bytes(8, "little"))
+            hasher.update(encoded)
+        return hasher.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def load(self, key: str, stdout: IO[str], output: IO[str]) -> bool:
+        """
+        Stream the entry for `key` to `stdout` and `output`, returning whether it
+        was present.
+        """
+        path = self._path(key)
+        try:
+            f = open(path, newline="")
+        except FileNotFoundError:
+            return False
+        with f:
+            stdout_size = int(f.readline())
+            stdout.write(f.read(stdout_size))
+            shutil.copyfileobj(f, output)
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted concurrently by another process
+            pass
+        return True
+
+    def store(self, key: str, stdout: str, output: str):
+        """Add the entry for `key`, evicting old entries if needed."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", newline="") as f:
+            f.write(f"{len(stdout)}\n")
+            f.write(stdout)
+            f.write(output)
+        # Atomically publish the entry, so that concurrent readers never observe a
+        # partially written file.
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits `max_size`."""
+        entries: list[tuple[float, int, str]] = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
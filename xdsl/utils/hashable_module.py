@@ -1,10 +1,102 @@
-from collections.abc import Hashable
+from collections.abc import Hashable, Mapping
 from dataclasses import dataclass
+from functools import cached_property
 
 from xdsl.dialects.builtin import ModuleOp
+from xdsl.ir import Attribute, Block, Operation, Region, SSAValue
 from xdsl.utils.hasher import Hasher
 
 
+def _attribute_dict_hash(attributes: Mapping[str, Attribute]) -> int:
+    """
+    A hash of an attribute dictionary that does not depend on the order of its
+    entries, as dictionaries compare equal regardless of their order.
+    """
+    try:
+        return hash(frozenset(attributes.items()))
+    except TypeError:
+        # Some attributes hold unhashable data, fall back to hashing the names only
+        return hash(frozenset(attributes))
+
+
+class _StructuralHasher:
+    """
+    Computes a hash of an operation in a single walk, such that structurally
+    equivalent operations have the same hash.
+
+    Values and blocks are numbered in the order they are defined, so that the hash
+    reflects the def-use structure of the IR rather than the identity of the values.
+    """
+
+    hasher: Hasher
+    value_numbers: dict[SSAValue, int]
+    block_numbers: dict[Block, int]
+
+    def __init__(self):
+        self.hasher = Hasher()
+        self.value_numbers = {}
+        self.block_numbers = {}
+
+    def value_key(self, value: SSAValue) -> Hashable:
+        number = self.value_numbers.get(value)
+        if number is None:
+            # Values defined outside of the hashed operation, or used before their
+            # definition, are only equivalent to themselves.
+            return ("external", id(value))
+        return number
+
+    def block_key(self, block: Block) -> Hashable:
+        number = self.block_numbers.get(block)
+        if number is None:
+            return ("external", id(block))
+        return number
+
+    def hash_op(self, op: Operation):
+        combine = self.hasher.combine
+        combine(op.name)
+        combine(_attribute_dict_hash(op.attributes))
+        combine(_attribute_dict_hash(op.properties))
+        combine(tuple(self.value_key(operand) for operand in op.operands))
+        combine(tuple(self.block_key(successor) for successor in op.successors))
+        combine(len(op.regions))
+        for region in op.regions:
+            self.hash_region(region)
+        # Results are defined after the regions, as in `is_structurally_equivalent`
+        combine(tuple(result.type for result in op.results))
+        for result in op.results:
+            self.value_numbers[result] = len(self.value_numbers)
+
+    def hash_region(self, region: Region):
+        # Number all blocks first, as successors may refer to later blocks
+        blocks = tuple(region.blocks)
+        for block in blocks:
+            self.block_numbers[block] = len(self.block_numbers)
+        self.hasher.combine(len(blocks))
+        for block in blocks:
+            self.hash_block(block)
+
+    def hash_block(self, block: Block):
+        self.hasher.combine(tuple(arg.type for arg in block.args))
+        for arg in block.args:
+            self.value_numbers[arg] = len(self.value_numbers)
+        self.hasher.combine(len(block.ops))
+        for op in block.ops:
+            self.hash_op(op)
+
+
+def structural_hash(op: Operation) -> int:
+    """
+    Return a hash of the operation, including its attributes, properties and types,
+    the def-use structure of its operands, and its nested regions.
+
+    Structurally equivalent operations have the same hash. The hash is computed in a
+    single walk over the IR, linear in its size.
+    """
+    hasher = _StructuralHasher()
+    hasher.hash_op(op)
+    return hasher.hasher.hash
+
+
 @dataclass(frozen=True)
 class HashableModule(Hashable):
     """
@@ -15,17 +107,19 @@ class HashableModule(Hashable):
     module: ModuleOp
 
     def __eq__(self, other: object) -> bool:
-        return isinstance(
-            other, HashableModule
-        ) and self.module.is_structurally_equivalent(other.module)
+        return (
+            isinstance(other, HashableModule)
+            and self._hash == other._hash
+            and self.module.is_structurally_equivalent(other.module)
+        )
+
+    @cached_property
+    def _hash(self) -> int:
+        return structural_hash(self.module)
 
     def __hash__(self) -> int:
         """
-        The hash of the module is a hash of the ordered combination of operation names.
-        As most transformations on IR modify at least one operation, this should be
-        enough to minimise collisions.
+        The hash of the module is its structural hash, computed once, so that distinct
+        modules rarely collide and lookups seldom need a full structural comparison.
         """
-        hasher = Hasher()
-        for op in self.module.walk():
-            hasher.combine(op.name)
-        return hasher.hash
+        return self._hash
@@ -1,18 +1,26 @@
 import argparse
+import json
+import os
+import pickle
+import socketserver
 import sys
+import threading
 from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
 from contextlib import redirect_stdout
 from importlib.metadata import version
-from io import StringIO
+from io import BytesIO, StringIO
 from itertools import accumulate
-from typing import IO, Any
+from typing import IO, Any, BinaryIO, cast
 
+from xdsl import __version__
 from xdsl.context import Context
 from xdsl.dialects.builtin import ModuleOp
 from xdsl.passes import ModulePass, PipelinePass
 from xdsl.printer import Printer
-from xdsl.tools.command_line_tool import CommandLineTool
+from xdsl.tools.command_line_tool import CommandLineTool, get_worker_context
 from xdsl.transforms import get_all_passes
+from xdsl.utils.compilation_cache import CompilationCache
 from xdsl.utils.exceptions import DiagnosticException, ShrinkException
 from xdsl.utils.parse_pipeline import parse_pipeline
 
@@ -29,9 +37,21 @@ class xDSLOptMain(CommandLineTool):
     stream.
     """
 
+    available_binary_targets: dict[str, Callable[[ModuleOp, BinaryIO], None]]
+    """
+    A mapping from target names to functions that serialize a ModuleOp into a
+    binary stream, such as an object file.
+    """
+
     pipeline: PipelinePass
     """ The pass-pipeline to be applied. """
 
+    pipeline_cache: dict[str, PipelinePass]
+    """
+    Pipelines already built from a pass-pipeline string, reused across server
+    requests.
+    """
+
     def __init__(
         self,
         description: str = "xDSL modular optimizer driver",
@@ -40,6 +60,9 @@ class xDSLOptMain(CommandLineTool):
         self.available_frontends = {}
         self.available_passes = {}
         self.available_targets = {}
+        self.available_binary_targets = {}
+        self.pipeline_cache = {}
+        self.argv = list(sys.argv[1:] if args is None else args)
 
         self.ctx = Context()
         self.register_all_dialects()
@@ -60,21 +83,20 @@ class xDSLOptMain(CommandLineTool):
         """
         Executes the different steps.
         """
+        if self.args.server:
+            self.run_server()
+            return
         chunks, file_extension = self.prepare_input()
+        if self.args.target in self.available_binary_targets:
+            self.run_binary(chunks, file_extension)
+            return
         output_stream = self.prepare_output()
         try:
-            for i, (chunk, offset) in enumerate(chunks):
-                try:
-                    if i > 0:
-                        output_stream.write("// -----\n")
-                    module = self.parse_chunk(chunk, file_extension, offset)
-
-                    if module is not None:
-                        if self.apply_passes(module):
-                            output_stream.write(self.output_resulting_program(module))
-                    output_stream.flush()
-                finally:
-                    chunk.close()
+            cache = self.get_cache()
+            if cache is None:
+                self.process_chunks(chunks, file_extension, output_stream)
+            else:
+                self.process_chunks_cached(cache, chunks, file_extension, output_stream)
         except ShrinkException:
             assert self.args.shrink
             print("Success, can shrink")
@@ -88,6 +110,231 @@ class xDSLOptMain(CommandLineTool):
             # Exit with non-0 value to let shrinkray know that it cannot shrink
             exit(1)
 
+    def run_binary(self, chunks: list[tuple[IO[str], int]], file_extension: str):
+        """
+        Parse, transform and encode each chunk in order with a binary target,
+        streaming the outputs to stdout, or writing them to the binary output file
+        once all chunks were encoded, so that a failure leaves it untouched.
+        """
+        target = self.available_binary_targets[self.args.target]
+        if self.args.output_file is None:
+            output_stream: BinaryIO = sys.stdout.buffer
+        else:
+            output_stream = BytesIO()
+        for chunk, offset in chunks:
+            try:
+                module = self.parse_chunk(chunk, file_extension, offset)
+                if module is not None and self.apply_passes(module):
+                    target(module, output_stream)
+                output_stream.flush()
+            finally:
+                chunk.close()
+        if self.args.output_file is not None:
+            assert isinstance(output_stream, BytesIO)
+            with open(self.args.output_file, "wb") as f:
+                f.write(output_stream.getvalue())
+
+    def process_chunks(
+        self,
+        chunks: list[tuple[IO[str], int]],
+        file_extension: str,
+        output_stream: IO[str],
+    ):
+        """
+        Parse, transform and print each chunk in order, separating the outputs
+        with `// -----`.
+
+        With more than one job, chunks are processed in a pool of worker processes
+        and their outputs are written back in order, if the driver can be passed to
+        worker processes.
+        """
+        if self.args.jobs > 1 and len(chunks) > 1 and self.can_use_workers():
+            self.process_chunks_in_parallel(chunks, file_extension, output_stream)
+            return
+        for i, (chunk, offset) in enumerate(chunks):
+            if i > 0:
+                output_stream.write("// -----\n")
+            self.process_chunk(chunk, file_extension, offset, output_stream)
+
+    def process_chunk(
+        self, chunk: IO[str], file_extension: str, offset: int, output_stream: IO[str]
+    ):
+        """Parse, transform and print a single chunk."""
+        try:
+            module = self.parse_chunk(chunk, file_extension, offset)
+
+            if module is not None:
+                if self.apply_passes(module):
+                    output_stream.write(self.output_resulting_program(module))
+            output_stream.flush()
+        finally:
+            chunk.close()
+
+    def process_chunk_text(
+        self, text: str, offset: int, file_extension: str
+    ) -> tuple[str, str, Exception | None]:
+        """
+        Process a single chunk, returning what was printed to stdout, the output of
+        the chunk, and the exception that interrupted processing, if any.
+        """
+        stdout = StringIO()
+        output = StringIO()
+        try:
+            with redirect_stdout(stdout):
+                self.process_chunk(StringIO(text), file_extension, offset, output)
+        except Exception as e:
+            return stdout.getvalue(), output.getvalue(), e
+        return stdout.getvalue(), output.getvalue(), None
+
+    def process_chunks_in_parallel(
+        self,
+        chunks: list[tuple[IO[str], int]],
+        file_extension: str,
+        output_stream: IO[str],
+    ):
+        """
+        Process independent chunks in a pool of `--jobs` worker processes.
+
+        Each chunk keeps its own diagnostics, and outputs are written in input
+        order. An exception raised by a chunk is re-raised after the output of all
+        previous chunks has been written.
+        """
+        texts: list[tuple[str, int]] = []
+        for chunk, offset in chunks:
+            texts.append((chunk.read(), offset))
+            chunk.close()
+
+        with self.worker_pool(min(self.args.jobs, len(texts))) as executor:
+            futures = [
+                executor.submit(_process_chunk_text, text, offset, file_extension)
+                for text, offset in texts
+            ]
+            for i, future in enumerate(futures):
+                if i > 0:
+                    output_stream.write("// -----\n")
+                stdout, output, exception = future.result()
+                sys.stdout.write(stdout)
+                output_stream.write(output)
+                output_stream.flush()
+                if exception is not None:
+                    for remaining in futures[i + 1 :]:
+                        remaining.cancel()
+                    raise exception
+
+    def can_use_workers(self) -> bool:
+        """
+        Whether the class of the driver can be passed to worker processes, which
+        requires it to be importable, unlike classes defined in functions.
+        Otherwise, chunks and requests are processed serially.
+        """
+        try:
+            pickle.dumps(type(self))
+        except (pickle.PicklingError, AttributeError):
+            return False
+        return True
+
+    def worker_pool(self, workers: int) -> ProcessPoolExecutor:
+        """
+        A pool of worker processes, each with a driver of the same class and
+        arguments as this one.
+        """
+        return ProcessPoolExecutor(
+            workers,
+            mp_context=get_worker_context(),
+            initializer=_init_worker,
+            initargs=(type(self), self.argv),
+        )
+
+    def get_cache(self) -> CompilationCache | None:
+        """
+        Return the compilation cache to use, if caching is enabled with
+        `--cache-dir` or the `XDSL_OPT_CACHE_DIR` environment variable.
+        """
+        if self.args.no_cache or self.args.shrink:
+            return None
+        directory = self.args.cache_dir or os.environ.get("XDSL_OPT_CACHE_DIR")
+        if not directory:
+            return None
+        return CompilationCache(directory, self.args.cache_max_size)
+
+    def cache_key(self, texts: list[tuple[str, int]], file_extension: str) -> str:
+        """
+        The cache key of an input, derived from its contents, the normalized
+        pipeline, the target and output options, the xDSL version and the
+        registered dialects.
+        """
+        # Options that do not influence the output of a run
+        ignored_args = (
+            "input_file",
+            "output_file",
+            "passes",
+            "jobs",
+            "cache_dir",
+            "no_cache",
+            "cache_max_size",
+            "server",
+            "server_socket",
+            "server_workers",
+        )
+        options = sorted(
+            (name, repr(value))
+            for name, value in vars(self.args).items()
+            if name not in ignored_args
+        )
+        pipeline = ",".join(
+            str(p.pipeline_pass_spec(include_default=True))
+            for p in self.pipeline.passes
+        )
+        return CompilationCache.key(
+            (
+                str(__version__),
+                ",".join(sorted(self.ctx.registered_dialect_names)),
+                pipeline,
+                repr(options),
+                self.get_input_name(),
+                file_extension,
+                *(f"{offset}:{text}" for text, offset in texts),
+            )
+        )
+
+    def process_chunks_cached(
+        self,
+        cache: CompilationCache,
+        chunks: list[tuple[IO[str], int]],
+        file_extension: str,
+        output_stream: IO[str],
+    ):
+        """
+        Process the chunks, or skip parsing and passes entirely and stream the
+        cached output if the same input was already processed in the same way.
+
+        Only runs that complete without raising an exception are cached.
+        """
+        texts: list[tuple[str, int]] = []
+        for chunk, offset in chunks:
+            texts.append((chunk.read(), offset))
+            chunk.close()
+
+        key = self.cache_key(texts, file_extension)
+        if cache.load(key, sys.stdout, output_stream):
+            output_stream.flush()
+            return
+
+        stdout = StringIO()
+        output = StringIO()
+        try:
+            with redirect_stdout(stdout):
+                self.process_chunks(
+                    [(StringIO(text), offset) for text, offset in texts],
+                    file_extension,
+                    output,
+                )
+        finally:
+            sys.stdout.write(stdout.getvalue())
+            output_stream.write(output.getvalue())
+            output_stream.flush()
+        cache.store(key, stdout.getvalue(), output.getvalue())
+
     def register_all_arguments(self, arg_parser: argparse.ArgumentParser):
         """
         Registers all the command line arguments that are used by this tool.
@@ -96,7 +343,7 @@ class xDSLOptMain(CommandLineTool):
         """
         super().register_all_arguments(arg_parser)
 
-        targets = [name for name in self.available_targets]
+        targets = [*self.available_targets, *self.available_binary_targets]
         arg_parser.add_argument(
             "-t",
             "--target",
@@ -152,6 +399,15 @@ class xDSLOptMain(CommandLineTool):
             "independently by using `// -----`",
         )
 
+        arg_parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of worker processes used to process the chunks of a split "
+            "input file in parallel",
+        )
+
         arg_parser.add_argument(
             "--print-op-generic",
             default=False,
@@ -186,6 +442,53 @@ class xDSLOptMain(CommandLineTool):
             help="Return success on exit if ShrinkException was raised.",
         )
 
+        arg_parser.add_argument(
+            "--cache-dir",
+            type=str,
+            required=False,
+            help="Directory of the compilation cache. Outputs of previous runs with "
+            "the same input, pipeline and options are reused from it. Defaults to "
+            "the XDSL_OPT_CACHE_DIR environment variable, if set.",
+        )
+
+        arg_parser.add_argument(
+            "--no-cache",
+            default=False,
+            action="store_true",
+            help="Disable the compilation cache.",
+        )
+
+        arg_parser.add_argument(
+            "--cache-max-size",
+            type=int,
+            default=1 << 28,
+            help="Maximum size of the compilation cache in bytes, least recently "
+            "used entries are evicted beyond it.",
+        )
+
+        arg_parser.add_argument(
+            "--server",
+            default=False,
+            action="store_true",
+            help="Keep running and serve JSON requests, one per line, reusing the "
+            "loaded dialects, passes and pipelines. Requests are read from stdin "
+            "unless --server-socket is set.",
+        )
+
+        arg_parser.add_argument(
+            "--server-socket",
+            type=str,
+            required=False,
+            help="Path of the Unix socket to listen on in server mode.",
+        )
+
+        arg_parser.add_argument(
+            "--server-workers",
+            type=int,
+            default=1,
+            help="Number of worker processes handling requests in server mode.",
+        )
+
     def register_pass(
         self, pass_name: str, pass_factory: Callable[[], type[ModulePass]]
     ):
@@ -242,25 +545,41 @@ class xDSLOptMain(CommandLineTool):
                     op.print_wat(printer)
                     print("", file=output)
 
-        def _emulate_riscv(prog: ModuleOp, output: IO[str]):
-            # import only if running riscv emulation
-            try:
-                from xdsl.interpreters.riscv_emulator import run_riscv
-            except ImportError:
-                print("Please install optional dependencies to run riscv emulation")
-                return
+        def _output_wasm(prog: ModuleOp, output: BinaryIO):
+            from xdsl.dialects.wasm import WasmModuleOp
+            from xdsl.dialects.wasm.encoding import WasmBinaryEncodingContext
 
-            from xdsl.dialects.riscv import riscv_code
+            for op in prog.walk():
+                if isinstance(op, WasmModuleOp):
+                    op.encode(WasmBinaryEncodingContext(), output)
 
-            code = riscv_code(prog)
-            with redirect_stdout(output):
-                run_riscv(code, unlimited_regs=True, verbosity=0)
+        def _output_riscv_obj(prog: ModuleOp, output: BinaryIO):
+            from xdsl.backend.riscv.machine_code import write_riscv_object
+
+            write_riscv_object(prog, output)
+
+        def _emulate_riscv(prog: ModuleOp, output: IO[str]):
+            from xdsl.interpreters.riscv_simulator import RiscvSimulator
+
+            RiscvSimulator(prog, file=output).run()
 
         def _output_csl(prog: ModuleOp, output: IO[str]):
             from xdsl.backend.csl.print_csl import print_to_csl
 
             print_to_csl(prog, output)
 
+        def _output_dmp_cost(prog: ModuleOp, output: IO[str]):
+            from xdsl.transforms.experimental.dmp.decomposition_cost import (
+                print_decomposition_cost_report,
+            )
+
+            print_decomposition_cost_report(prog, output)
+
+        def _output_snitch_perf(prog: ModuleOp, output: IO[str]):
+            from xdsl.backend.riscv.snitch_performance import print_performance_report
+
+            print_performance_report(prog, output)
+
         def _output_wgsl(prog: ModuleOp, output: IO[str]):
             from xdsl.backend.wgsl.wgsl_printer import WGSLPrinter
             from xdsl.dialects import gpu
@@ -272,10 +591,14 @@ class xDSLOptMain(CommandLineTool):
 
         self.available_targets["arm-asm"] = _output_arm_asm
         self.available_targets["csl"] = _output_csl
+        self.available_targets["dmp-cost"] = _output_dmp_cost
         self.available_targets["mlir"] = _output_mlir
         self.available_targets["riscemu"] = _emulate_riscv
         self.available_targets["riscv-asm"] = _output_riscv_asm
+        self.available_binary_targets["riscv-obj"] = _output_riscv_obj
+        self.available_targets["snitch-perf"] = _output_snitch_perf
         self.available_targets["wat"] = _output_wat
+        self.available_binary_targets["wasm"] = _output_wasm
         self.available_targets["wgsl"] = _output_wgsl
         self.available_targets["x86-asm"] = _output_x86_asm
 
@@ -297,15 +620,33 @@ class xDSLOptMain(CommandLineTool):
                 printer.print_op(module)
                 print("\n\n\n")
 
-        self.pipeline = PipelinePass(
-            tuple(
-                pass_type.from_pass_spec(spec)
-                for pass_type, spec in PipelinePass.build_pipeline_tuples(
-                    self.available_passes, parse_pipeline(self.args.passes)
-                )
-            ),
-            callback,
-        )
+        passes = self.args.passes
+        if passes not in self.pipeline_cache:
+            self.pipeline_cache[passes] = PipelinePass(
+                tuple(
+                    pass_type.from_pass_spec(spec)
+                    for pass_type, spec in PipelinePass.build_pipeline_tuples(
+                        self.available_passes, parse_pipeline(passes)
+                    )
+                ),
+                callback,
+            )
+        self.pipeline = self.pipeline_cache[passes]
+
+    def split_input(self, f: IO[str]) -> list[tuple[IO[str], int]]:
+        """
+        Split the input in chunks separated by `// -----` if the
+        `--split-input-file` flag is set, along with the line offset of each chunk.
+        """
+        if not self.args.split_input_file:
+            return [(f, 0)]
+        chunks_str = [chunk for chunk in f.read().split("// -----")]
+        chunks_off = accumulate([0, *[chunk.count("\n") for chunk in chunks_str[:-1]]])
+        f.close()
+        return [
+            (StringIO(chunk), off)
+            for chunk, off in zip(chunks_str, chunks_off, strict=True)
+        ]
 
     def prepare_input(self) -> tuple[list[tuple[IO[str], int]], str]:
         """
@@ -316,19 +657,8 @@ class xDSLOptMain(CommandLineTool):
         # when using the split input flag, program is split into multiple chunks
         # it's used for split input file
 
-        chunks: list[tuple[IO[str], int]] = []
         f, file_extension = self.get_input_stream()
-        chunks = [(f, 0)]
-        if self.args.split_input_file:
-            chunks_str = [chunk for chunk in f.read().split("// -----")]
-            chunks_off = accumulate(
-                [0, *[chunk.count("\n") for chunk in chunks_str[:-1]]]
-            )
-            chunks = [
-                (StringIO(chunk), off)
-                for chunk, off in zip(chunks_str, chunks_off, strict=True)
-            ]
-            f.close()
+        chunks = self.split_input(f)
         if self.args.frontend:
             file_extension = self.args.frontend
 
@@ -377,6 +707,159 @@ class xDSLOptMain(CommandLineTool):
                 raise
         return output.getvalue()
 
+    def process_request(self, request: Any) -> dict[str, Any]:
+        """
+        Handle a single server request, a JSON object with an `input` program and
+        optional `passes`, `target` and `id` fields. Binary targets are not supported,
+        as responses hold text.
+
+        The response contains the `id` of the request and the printed `output`,
+        along with an `error` message if processing failed.
+        """
+        if not isinstance(request, dict):
+            return {
+                "id": None,
+                "error": f"Expected a JSON object, got {type(request).__name__}",
+                "output": "",
+            }
+        request = cast(dict[str, Any], request)
+        base_args = self.args
+        response: dict[str, Any] = {"id": request.get("id")}
+        output = StringIO()
+        try:
+            self.args = argparse.Namespace(**vars(base_args))
+            self.args.passes = request.get("passes", base_args.passes)
+            self.args.target = request.get("target", base_args.target)
+            if self.args.target in self.available_binary_targets:
+                raise ValueError(
+                    f"Binary target {self.args.target} is not supported by the server"
+                )
+            self.args.input_file = None
+            self.args.output_file = None
+            self.setup_pipeline()
+            file_extension = self.args.frontend or "mlir"
+            chunks = self.split_input(StringIO(request["input"]))
+            with redirect_stdout(output):
+                self.process_chunks(chunks, file_extension, output)
+        except Exception as e:
+            response["error"] = str(e) or type(e).__name__
+        finally:
+            self.args = base_args
+        response["output"] = output.getvalue()
+        return response
+
+    def run_server(self):
+        """
+        Serve requests until the input is exhausted, or forever when listening on
+        a socket.
+
+        Each request and response is a JSON object on a single line.
+        """
+        lock = threading.Lock()
+        executor: ProcessPoolExecutor | None = None
+        if self.args.server_workers > 1 and self.can_use_workers():
+            executor = self.worker_pool(self.args.server_workers)
+
+        def submit(line: str) -> Future[dict[str, Any]]:
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                future = Future[dict[str, Any]]()
+                future.set_result({"id": None, "error": str(e), "output": ""})
+                return future
+            if executor is not None and isinstance(request, dict):
+                request_id = cast(dict[str, Any], request).get("id")
+                response = Future[dict[str, Any]]()
+
+                def set_response(future: Future[dict[str, Any]]):
+                    # The worker may fail unexpectedly, for example if it dies
+                    if (e := future.exception()) is not None:
+                        error = str(e) or type(e).__name__
+                        response.set_result(
+                            {"id": request_id, "error": error, "output": ""}
+                        )
+                    else:
+                        response.set_result(future.result())
+
+                executor.submit(_process_server_request, request).add_done_callback(
+                    set_response
+                )
+                return response
+            future = Future[dict[str, Any]]()
+            with lock:
+                future.set_result(self.process_request(request))
+            return future
+
+        try:
+            if self.args.server_socket is None:
+                self._serve_stream(sys.stdin, sys.stdout, submit)
+            else:
+                self._serve_socket(self.args.server_socket, submit)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    @staticmethod
+    def _serve_stream(
+        input: IO[str],
+        output: IO[str],
+        submit: Callable[[str], Future[dict[str, Any]]],
+    ):
+        lock = threading.Lock()
+
+        def respond(future: Future[dict[str, Any]]):
+            with lock:
+                output.write(json.dumps(future.result()) + "\n")
+                output.flush()
+
+        futures: list[Future[dict[str, Any]]] = []
+        for line in input:
+            if line.strip():
+                future = submit(line)
+                future.add_done_callback(respond)
+                futures.append(future)
+        for future in futures:
+            future.exception()
+
+    @staticmethod
+    def _serve_socket(path: str, submit: Callable[[str], Future[dict[str, Any]]]):
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if line.strip():
+                        response = submit(line.decode()).result()
+                        self.wfile.write(json.dumps(response).encode() + b"\n")
+                        self.wfile.flush()
+
+        if os.path.exists(path):
+            os.remove(path)
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+            try:
+                server.serve_forever()
+            finally:
+                os.remove(path)
+
+
+_worker: xDSLOptMain | None = None
+"""The driver instance of a worker process."""
+
+
+def _init_worker(cls: type[xDSLOptMain], argv: list[str]):
+    global _worker
+    _worker = cls(args=argv)
+
+
+def _process_server_request(request: dict[str, Any]) -> dict[str, Any]:
+    assert _worker is not None
+    return _worker.process_request(request)
+
+
+def _process_chunk_text(
+    text: str, offset: int, file_extension: str
+) -> tuple[str, str, Exception | None]:
+    assert _worker is not None
+    return _worker.process_chunk_text(text, offset, file_extension)
+
 
 class VersionAction(argparse.Action):
     def __init__(self, *args: Any, **kwargs: Any):